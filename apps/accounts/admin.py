@@ -488,6 +488,8 @@ class OrderAdmin(admin.ModelAdmin):
         "updated_at",
         "hotel_reservations_list",
         "registered_players_list",
+        # Vista de compatibilidad: los jugadores se consultan por OrderPlayer
+        "registered_player_ids",
     ]
     date_hierarchy = "created_at"
     fieldsets = (
@@ -8,4 +8,6 @@ class AccountsConfig(AppConfig):
 
     def ready(self):
         """Importar señales cuando la app esté lista"""
+        import apps.accounts.exports  # noqa
+        import apps.accounts.protected_media  # noqa
         import apps.accounts.signals  # noqa
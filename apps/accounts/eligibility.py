@@ -0,0 +1,290 @@
+"""
+Elegibilidad de jugadores por división.
+
+Reglas (las mismas que usan los métodos de Player):
+- División por edad: edad al 30 de abril. Menores de 5 no son elegibles y
+  18 o más juegan en 18U.
+- División por grado escolar (Grade Exceptions).
+- Un jugador con verificación de edad aprobada puede jugar en su división por
+  edad o hasta 2 divisiones arriba, nunca abajo.
+
+Las funciones en bloque calculan la edad y las divisiones en SQL (anotaciones
+sobre el queryset), de modo que evaluar o reasignar N jugadores cuesta una
+consulta de lectura y un bulk_update, en lugar de N lecturas del perfil y N
+save().
+"""
+
+from collections import namedtuple
+from datetime import date
+
+from django.db.models import Case, CharField, IntegerField, Value, When
+from django.db.models.functions import ExtractYear
+
+MIN_DIVISION_AGE = 5
+MAX_DIVISION_AGE = 18
+MAX_DIVISIONS_UP = 2
+
+AGE_DIVISIONS = {
+    age: f"{age:02d}U" for age in range(MIN_DIVISION_AGE, MAX_DIVISION_AGE + 1)
+}
+
+# Mapeo de grado a división según la tabla de Grade Exceptions
+GRADE_DIVISION_MAP = {
+    "pre_k": "05U",
+    "kindergarten": "06U",
+    "1st": "07U",
+    "2nd": "08U",
+    "3rd": "09U",
+    "4th": "10U",
+    "5th": "11U",
+    "6th": "12U",
+    "7th": "13U",
+    "8th": "14U",
+    "9th": "15U",
+    "10th": "16U",
+    "11th": "17U",
+    "12th": "18U",
+}
+
+BIRTH_DATE_FIELD = "user__profile__birth_date"
+
+PlayerEligibility = namedtuple(
+    "PlayerEligibility",
+    ["age", "age_division", "grade_division", "eligible_divisions", "age_verified"],
+)
+
+
+def age_division_for_age(age):
+    """División ("10U") para una edad al 30 de abril, o None si no aplica"""
+    if age is None or age < MIN_DIVISION_AGE:
+        return None
+    return AGE_DIVISIONS[min(age, MAX_DIVISION_AGE)]
+
+
+def eligible_divisions(age_division, grade_division):
+    """Divisiones elegibles (por edad y por grado) ordenadas"""
+    return sorted({name for name in (age_division, grade_division) if name})
+
+
+def division_base_name(target_division):
+    """
+    Nombre de la división sin sufijos: Division o "10U D1" -> "10U"
+    """
+    name = getattr(target_division, "name", target_division)
+    name = str(name or "").strip()
+    return name.split()[0] if name else ""
+
+
+def evaluate_division_eligibility(
+    age_verification_status, age_division, eligible, target_division
+):
+    """
+    Aplica las reglas de "jugar arriba" a una división objetivo.
+
+    Returns:
+        tuple: (puede_jugar, mensaje)
+    """
+    target_division_name = division_base_name(target_division)
+
+    # Verificar que tenga verificación de edad aprobada
+    if age_verification_status != "approved":
+        return False, "El jugador no tiene verificación de edad aprobada"
+
+    if not eligible:
+        return False, "No se puede determinar la elegibilidad del jugador"
+
+    if not age_division:
+        return False, "No se puede determinar la división basada en edad"
+
+    try:
+        target_num = int(target_division_name.replace("U", ""))
+    except ValueError:
+        return False, "División no elegible"
+    age_division_num = int(age_division.replace("U", ""))
+
+    # No puede jugar "down" (en una división menor)
+    if target_num < age_division_num:
+        return (
+            False,
+            f"El jugador no puede jugar en una división menor ({target_division_name}). División mínima elegible: {age_division}",
+        )
+
+    # Puede jugar "up" máximo 2 divisiones
+    if target_num > age_division_num + MAX_DIVISIONS_UP:
+        return (
+            False,
+            f"El jugador solo puede jugar hasta 2 divisiones arriba de su división basada en edad ({age_division}). División solicitada: {target_division_name}",
+        )
+
+    if target_division_name in eligible:
+        return True, "Elegible"
+
+    return True, "Elegible (jugando arriba)"
+
+
+def _cutoff_year(year):
+    return date.today().year if year is None else year
+
+
+def age_as_of_april_30_expression(year=None, birth_date_field=BIRTH_DATE_FIELD):
+    """
+    Edad al 30 de abril en SQL: año - año de nacimiento - (nació después de
+    abril). NULL si no hay fecha de nacimiento.
+    """
+    return (
+        Value(_cutoff_year(year))
+        - ExtractYear(birth_date_field)
+        - Case(
+            When(**{f"{birth_date_field}__month__gt": 4}, then=Value(1)),
+            default=Value(0),
+            output_field=IntegerField(),
+        )
+    )
+
+
+def annotate_eligibility(queryset, year=None):
+    """
+    Anota ``eligibility_age``, ``age_division_name`` y ``grade_division_name``
+    en un queryset de Player.
+    """
+    queryset = queryset.annotate(eligibility_age=age_as_of_april_30_expression(year))
+    return queryset.annotate(
+        age_division_name=Case(
+            When(eligibility_age__lt=MIN_DIVISION_AGE, then=Value(None)),
+            When(
+                eligibility_age__gte=MAX_DIVISION_AGE,
+                then=Value(AGE_DIVISIONS[MAX_DIVISION_AGE]),
+            ),
+            *[
+                When(eligibility_age=age, then=Value(name))
+                for age, name in AGE_DIVISIONS.items()
+            ],
+            default=Value(None),
+            output_field=CharField(),
+        ),
+        grade_division_name=Case(
+            *[
+                When(grade=grade, then=Value(name))
+                for grade, name in GRADE_DIVISION_MAP.items()
+            ],
+            default=Value(None),
+            output_field=CharField(),
+        ),
+    )
+
+
+def _player_queryset(players):
+    from .models import Player
+
+    if hasattr(players, "model"):
+        return players
+    return Player.objects.filter(pk__in=list(players))
+
+
+def get_players_eligibility(players, year=None):
+    """
+    Elegibilidad de varios jugadores con una sola consulta.
+
+    Args:
+        players: queryset de Player o iterable de ids
+
+    Returns:
+        dict: {player_id: PlayerEligibility}
+    """
+    rows = (
+        annotate_eligibility(_player_queryset(players), year)
+        .order_by()
+        .values_list(
+            "pk",
+            "eligibility_age",
+            "age_division_name",
+            "grade_division_name",
+            "age_verification_status",
+        )
+    )
+    result = {}
+    for pk, age, age_division, grade_division, status in rows:
+        result[pk] = PlayerEligibility(
+            age=age,
+            age_division=age_division,
+            grade_division=grade_division,
+            eligible_divisions=eligible_divisions(age_division, grade_division),
+            age_verified=status == "approved",
+        )
+    return result
+
+
+def check_players_division(players, target_division, year=None):
+    """
+    Equivalente en bloque de Player.can_play_in_division.
+
+    Returns:
+        dict: {player_id: (puede_jugar, mensaje)}
+    """
+    rows = (
+        annotate_eligibility(_player_queryset(players), year)
+        .order_by()
+        .values_list(
+            "pk", "age_division_name", "grade_division_name", "age_verification_status"
+        )
+    )
+    return {
+        pk: evaluate_division_eligibility(
+            status,
+            age_division,
+            eligible_divisions(age_division, grade_division),
+            target_division,
+        )
+        for pk, age_division, grade_division, status in rows
+    }
+
+
+def assign_age_divisions(
+    queryset=None, year=None, only_missing=False, dry_run=False, batch_size=500
+):
+    """
+    Asigna a cada jugador la Division de su edad al 30 de abril.
+
+    Los jugadores sin fecha de nacimiento, fuera de rango o cuya división no
+    existe en la tabla Division se dejan como están. Los cambios se escriben
+    con bulk_update y después se sincroniza el directorio público (bulk_update
+    no dispara señales).
+
+    Returns:
+        list: [(player_id, division_id_anterior, division_id_nueva)]
+    """
+    from apps.events.models import Division
+
+    from .models import Player
+    from .player_directory import sync_player_directory
+
+    if queryset is None:
+        queryset = Player.objects.all()
+    if only_missing:
+        queryset = queryset.filter(division__isnull=True)
+
+    division_ids = dict(
+        Division.objects.filter(name__in=AGE_DIVISIONS.values()).values_list(
+            "name", "id"
+        )
+    )
+    rows = (
+        annotate_eligibility(queryset, year)
+        .filter(age_division_name__isnull=False)
+        .order_by()
+        .values_list("pk", "division_id", "age_division_name")
+    )
+    changes = []
+    for pk, current_id, division_name in rows.iterator(chunk_size=batch_size):
+        new_id = division_ids.get(division_name)
+        if new_id and new_id != current_id:
+            changes.append((pk, current_id, new_id))
+
+    if changes and not dry_run:
+        Player.objects.bulk_update(
+            [Player(pk=pk, division_id=new_id) for pk, _, new_id in changes],
+            ["division"],
+            batch_size=batch_size,
+        )
+        sync_player_directory([pk for pk, _, _ in changes], batch_size=batch_size)
+    return changes
@@ -0,0 +1,118 @@
+"""
+Exportaciones de cuentas (órdenes, movimientos de billetera) registradas en
+apps.core.exports.
+"""
+
+from apps.core import exports
+
+from .models import Order, WalletTransaction
+
+ORDERS = "orders"
+WALLET_TRANSACTIONS = "wallet-transactions"
+
+ORDER_COLUMNS = [
+    "Número de orden",
+    "Fecha",
+    "Usuario",
+    "Email",
+    "Evento",
+    "Estado",
+    "Método de pago",
+    "Modalidad",
+    "Subtotal",
+    "Descuento",
+    "Impuestos",
+    "Total",
+    "Moneda",
+    "Pagada el",
+]
+
+WALLET_COLUMNS = [
+    "ID",
+    "Fecha",
+    "Usuario",
+    "Email",
+    "Tipo",
+    "Monto",
+    "Balance después",
+    "Descripción",
+    "Referencia",
+]
+
+
+def _orders(params):
+    orders = Order.objects.order_by("pk")
+    event_id = exports.int_param(params, "event")
+    if event_id:
+        orders = orders.filter(event_id=event_id)
+    if params.get("status"):
+        orders = orders.filter(status=params["status"])
+    return orders
+
+
+def order_rows(params):
+    return (
+        _orders(params)
+        .values_list(
+            "order_number",
+            "created_at",
+            "user__username",
+            "user__email",
+            "event__title",
+            "status",
+            "payment_method",
+            "payment_mode",
+            "subtotal",
+            "discount_amount",
+            "tax_amount",
+            "total_amount",
+            "currency",
+            "paid_at",
+        )
+        .iterator(chunk_size=exports.chunk_size())
+    )
+
+
+def _wallet_transactions(params):
+    transactions = WalletTransaction.objects.order_by("pk")
+    user_id = exports.int_param(params, "user")
+    if user_id:
+        transactions = transactions.filter(wallet__user_id=user_id)
+    if params.get("type"):
+        transactions = transactions.filter(transaction_type=params["type"])
+    return transactions
+
+
+def wallet_transaction_rows(params):
+    return (
+        _wallet_transactions(params)
+        .values_list(
+            "pk",
+            "created_at",
+            "wallet__user__username",
+            "wallet__user__email",
+            "transaction_type",
+            "amount",
+            "balance_after",
+            "description",
+            "reference_id",
+        )
+        .iterator(chunk_size=exports.chunk_size())
+    )
+
+
+exports.register(
+    ORDERS,
+    title="Órdenes",
+    columns=ORDER_COLUMNS,
+    get_rows=order_rows,
+    count=lambda params: _orders(params).count(),
+)
+
+exports.register(
+    WALLET_TRANSACTIONS,
+    title="Movimientos de billetera",
+    columns=WALLET_COLUMNS,
+    get_rows=wallet_transaction_rows,
+    count=lambda params: _wallet_transactions(params).count(),
+)
@@ -0,0 +1,48 @@
+"""
+Filtros de las listas administrativas de cuentas (ver apps.core.admin_lists)
+"""
+
+import django_filters
+
+from apps.core.admin_lists import SearchFilterSet, filter_active_status
+
+from .models import Order
+
+
+class OrderFilterSet(SearchFilterSet):
+    search_fields = (
+        "order_number",
+        "user__username",
+        "user__first_name",
+        "user__last_name",
+        "user__email",
+        "stripe_session_id",
+    )
+
+    status = django_filters.ChoiceFilter(choices=Order.ORDER_STATUS_CHOICES)
+    payment_mode = django_filters.CharFilter()
+    payment_method = django_filters.ChoiceFilter(choices=Order.PAYMENT_METHOD_CHOICES)
+    date_from = django_filters.DateFilter(field_name="created_at", lookup_expr="date__gte")
+    date_to = django_filters.DateFilter(field_name="created_at", lookup_expr="date__lte")
+
+
+class PlayerFilterSet(SearchFilterSet):
+    search_fields = (
+        "user__first_name",
+        "user__last_name",
+        "user__username",
+        "user__email",
+    )
+
+    country = django_filters.NumberFilter(field_name="user__profile__country_id")
+    state = django_filters.NumberFilter(field_name="user__profile__state_id")
+    city = django_filters.NumberFilter(field_name="user__profile__city_id")
+    division = django_filters.NumberFilter(field_name="division_id")
+    is_active = django_filters.CharFilter(field_name="is_active", method=filter_active_status)
+
+
+class UserFilterSet(SearchFilterSet):
+    search_fields = ("username", "first_name", "last_name", "email")
+
+    user_type = django_filters.CharFilter(field_name="profile__user_type")
+    is_active = django_filters.CharFilter(field_name="is_active", method=filter_active_status)
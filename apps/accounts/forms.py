@@ -14,6 +14,7 @@ from django.db.models import Q
 from django.utils.translation import gettext_lazy as _
 
 from apps.events.models import Division
+from apps.locations.choices import LocationChoiceField
 from apps.locations.models import City, Country, State
 
 from .models import (
@@ -27,6 +28,8 @@ from .models import (
     Team,
     UserProfile,
 )
+from .roster_import import RosterImportError, read_roster_file, validate_roster_rows
+from .usernames import allocate_usernames, username_base
 
 
 class EmailAuthenticationForm(AuthenticationForm):
@@ -235,26 +238,24 @@ class PublicRegistrationForm(UserCreationForm):
     )
 
     # Ubicación
-    country = forms.ModelChoiceField(
+    country = LocationChoiceField(
+        "country",
+        active_only=True,
         label=_("Country"),
-        queryset=Country.objects.filter(is_active=True).order_by("name"),
         required=True,
         empty_label=_("Select a country"),
-        widget=forms.Select(attrs={"class": "form-select"}),
     )
-    state = forms.ModelChoiceField(
+    state = LocationChoiceField(
+        "state",
         label=_("State"),
-        queryset=State.objects.none(),
         required=True,
         empty_label=_("Select a state"),
-        widget=forms.Select(attrs={"class": "form-select"}),
     )
-    city = forms.ModelChoiceField(
+    city = LocationChoiceField(
+        "city",
         label=_("City"),
-        queryset=City.objects.none(),
         required=True,
         empty_label=_("Select a city"),
-        widget=forms.Select(attrs={"class": "form-select"}),
     )
 
     # Dirección
@@ -372,92 +373,13 @@ class PublicRegistrationForm(UserCreationForm):
             {"class": "form-control", "placeholder": _("Confirm Password")}
         )
 
-        # Si hay un país seleccionado, cargar estados
-        if "country" in self.data:
-            try:
-                country_id = int(self.data.get("country"))
-                self.fields["state"].queryset = State.objects.filter(
-                    country_id=country_id
-                ).order_by("name")
-            except (ValueError, TypeError):
-                self.fields["state"].queryset = State.objects.none()
-
-        # Si hay un estado seleccionado, cargar ciudades
-        if "state" in self.data:
-            try:
-                state_id = int(self.data.get("state"))
-                self.fields["city"].queryset = City.objects.filter(
-                    state_id=state_id
-                ).order_by("name")
-            except (ValueError, TypeError):
-                self.fields["city"].queryset = City.objects.none()
+        # Estados y ciudades según el país y estado seleccionados
+        self.fields["state"].parent_id = self.data.get("country")
+        self.fields["city"].parent_id = self.data.get("state")
 
     def generate_username(self, first_name, last_name, last_name2=None):
         """Genera un username único basado en nombre y apellidos"""
-        # Limpiar y normalizar nombres
-        first_name = re.sub(r"[^a-zA-ZáéíóúÁÉÍÓÚñÑ]", "", first_name.strip().lower())
-        last_name = re.sub(r"[^a-zA-ZáéíóúÁÉÍÓÚñÑ]", "", last_name.strip().lower())
-        last_name2 = (
-            re.sub(r"[^a-zA-ZáéíóúÁÉÍÓÚñÑ]", "", last_name2.strip().lower())
-            if last_name2 and last_name2.strip()
-            else None
-        )
-
-        # Reemplazar acentos y caracteres especiales
-        replacements = {
-            "á": "a",
-            "é": "e",
-            "í": "i",
-            "ó": "o",
-            "ú": "u",
-            "Á": "a",
-            "É": "e",
-            "Í": "i",
-            "Ó": "o",
-            "Ú": "u",
-            "ñ": "n",
-            "Ñ": "n",
-        }
-        for old, new in replacements.items():
-            first_name = first_name.replace(old, new)
-            last_name = last_name.replace(old, new)
-            if last_name2:
-                last_name2 = last_name2.replace(old, new)
-
-        # Generar base del username
-        if first_name and last_name:
-            if last_name2:
-                # Si hay segundo apellido, usar solo la primera letra del segundo apellido
-                base_username = f"{first_name}.{last_name}{last_name2[0]}"
-            else:
-                base_username = f"{first_name}.{last_name}"
-        elif first_name:
-            base_username = first_name
-        elif last_name:
-            base_username = last_name
-        else:
-            base_username = "usuario"
-
-        # Limitar longitud
-        base_username = base_username[:25]  # Dejar espacio para números
-
-        # Verificar si existe y generar variante única
-        username = base_username
-        counter = 1
-        while User.objects.filter(username=username).exists():
-            suffix = str(counter)
-            # Asegurar que no exceda 30 caracteres (límite de Django)
-            max_base_len = 30 - len(suffix) - 1
-            username = f"{base_username[:max_base_len]}{suffix}"
-            counter += 1
-            # Prevenir loops infinitos
-            if counter > 9999:
-                import random
-
-                username = f"{base_username[:20]}{random.randint(1000, 9999)}"
-                break
-
-        return username
+        return allocate_usernames([username_base(first_name, last_name, last_name2)])[0]
 
     def clean_email(self):
         """Validar que el email sea único"""
@@ -814,26 +736,23 @@ class UserProfileForm(forms.ModelForm):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
-        # Campos de ubicación con ModelChoiceField
-        self.fields["country"] = forms.ModelChoiceField(
-            queryset=Country.objects.all().order_by("name"),
+        # Campos de ubicación (opciones cacheadas, ver apps.locations.choices)
+        self.fields["country"] = LocationChoiceField(
+            "country",
             required=True,
             empty_label=_("Select a country"),
-            widget=forms.Select(attrs={"class": "form-select"}),
         )
 
-        self.fields["state"] = forms.ModelChoiceField(
-            queryset=State.objects.none(),
+        self.fields["state"] = LocationChoiceField(
+            "state",
             required=True,
             empty_label=_("Select a state"),
-            widget=forms.Select(attrs={"class": "form-select"}),
         )
 
-        self.fields["city"] = forms.ModelChoiceField(
-            queryset=City.objects.none(),
+        self.fields["city"] = LocationChoiceField(
+            "city",
             required=True,
             empty_label=_("Select a city"),
-            widget=forms.Select(attrs={"class": "form-select"}),
         )
 
         posted_country_key = self.add_prefix("country")
@@ -847,13 +766,7 @@ class UserProfileForm(forms.ModelForm):
         else:
             country_id = None
 
-        if country_id:
-            try:
-                self.fields["state"].queryset = State.objects.filter(
-                    country_id=country_id
-                ).order_by("name")
-            except (ValueError, TypeError):
-                self.fields["state"].queryset = State.objects.none()
+        self.fields["state"].parent_id = country_id
 
         # Determinar el estado seleccionado
         if posted_state_key in self.data:
@@ -863,13 +776,7 @@ class UserProfileForm(forms.ModelForm):
         else:
             state_id = None
 
-        if state_id:
-            try:
-                self.fields["city"].queryset = City.objects.filter(
-                    state_id=state_id
-                ).order_by("name")
-            except (ValueError, TypeError):
-                self.fields["city"].queryset = City.objects.none()
+        self.fields["city"].parent_id = state_id
 
 
 class BillingAddressForm(forms.ModelForm):
@@ -897,23 +804,20 @@ class BillingAddressForm(forms.ModelForm):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
-        self.fields["country"] = forms.ModelChoiceField(
-            queryset=Country.objects.all().order_by("name"),
+        self.fields["country"] = LocationChoiceField(
+            "country",
             required=False,
             empty_label=_("Select a country"),
-            widget=forms.Select(attrs={"class": "form-select"}),
         )
-        self.fields["state"] = forms.ModelChoiceField(
-            queryset=State.objects.none(),
+        self.fields["state"] = LocationChoiceField(
+            "state",
             required=False,
             empty_label=_("Select a state"),
-            widget=forms.Select(attrs={"class": "form-select"}),
         )
-        self.fields["city"] = forms.ModelChoiceField(
-            queryset=City.objects.none(),
+        self.fields["city"] = LocationChoiceField(
+            "city",
             required=False,
             empty_label=_("Select a city"),
-            widget=forms.Select(attrs={"class": "form-select"}),
         )
 
         posted_country_key = self.add_prefix("country")
@@ -926,13 +830,7 @@ class BillingAddressForm(forms.ModelForm):
         else:
             country_id = None
 
-        if country_id:
-            try:
-                self.fields["state"].queryset = State.objects.filter(
-                    country_id=country_id
-                ).order_by("name")
-            except (ValueError, TypeError):
-                self.fields["state"].queryset = State.objects.none()
+        self.fields["state"].parent_id = country_id
 
         if posted_state_key in self.data:
             state_id = self.data.get(posted_state_key)
@@ -941,13 +839,7 @@ class BillingAddressForm(forms.ModelForm):
         else:
             state_id = None
 
-        if state_id:
-            try:
-                self.fields["city"].queryset = City.objects.filter(
-                    state_id=state_id
-                ).order_by("name")
-            except (ValueError, TypeError):
-                self.fields["city"].queryset = City.objects.none()
+        self.fields["city"].parent_id = state_id
 
 
 class UserCreateForm(UserCreationForm):
@@ -1132,57 +1024,39 @@ class TeamForm(forms.ModelForm):
         self.user = kwargs.pop("user", None)
         super().__init__(*args, **kwargs)
 
-        # Campos de ubicación con ModelChoiceField
-        self.fields["country"] = forms.ModelChoiceField(
-            queryset=Country.objects.filter(is_active=True).order_by("name"),
+        # Campos de ubicación (opciones cacheadas, ver apps.locations.choices)
+        self.fields["country"] = LocationChoiceField(
+            "country",
+            active_only=True,
             required=False,
             empty_label=_("Select a country"),
-            widget=forms.Select(attrs={"class": "form-select"}),
         )
 
-        self.fields["state"] = forms.ModelChoiceField(
-            queryset=State.objects.none(),
+        self.fields["state"] = LocationChoiceField(
+            "state",
+            active_only=True,
             required=False,
             empty_label=_("Select a state"),
-            widget=forms.Select(attrs={"class": "form-select"}),
         )
 
-        self.fields["city"] = forms.ModelChoiceField(
-            queryset=City.objects.none(),
+        self.fields["city"] = LocationChoiceField(
+            "city",
+            active_only=True,
             required=False,
             empty_label=_("Select a city"),
-            widget=forms.Select(attrs={"class": "form-select"}),
         )
 
         # Si hay una instancia (edición), cargar estados y ciudades
         if self.instance and self.instance.pk:
-            if self.instance.country:
-                self.fields["state"].queryset = State.objects.filter(
-                    country=self.instance.country, is_active=True
-                ).order_by("name")
-            if self.instance.state:
-                self.fields["city"].queryset = City.objects.filter(
-                    state=self.instance.state, is_active=True
-                ).order_by("name")
+            self.fields["state"].parent_id = self.instance.country_id
+            self.fields["city"].parent_id = self.instance.state_id
 
         # Si hay datos en POST, cargar dinámicamente
         if "country" in self.data:
-            try:
-                country_id = int(self.data.get("country"))
-                self.fields["state"].queryset = State.objects.filter(
-                    country_id=country_id, is_active=True
-                ).order_by("name")
-            except (ValueError, TypeError):
-                pass
+            self.fields["state"].parent_id = self.data.get("country")
 
         if "state" in self.data:
-            try:
-                state_id = int(self.data.get("state"))
-                self.fields["city"].queryset = City.objects.filter(
-                    state_id=state_id, is_active=True
-                ).order_by("name")
-            except (ValueError, TypeError):
-                pass
+            self.fields["city"].parent_id = self.data.get("state")
 
 
 class AdminTodoForm(forms.ModelForm):
@@ -1352,54 +1226,36 @@ class AdminTeamForm(forms.ModelForm):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
-        self.fields["country"] = forms.ModelChoiceField(
-            queryset=Country.objects.filter(is_active=True).order_by("name"),
+        self.fields["country"] = LocationChoiceField(
+            "country",
+            active_only=True,
             required=False,
             empty_label=_("Select a country"),
-            widget=forms.Select(attrs={"class": "form-select"}),
         )
 
-        self.fields["state"] = forms.ModelChoiceField(
-            queryset=State.objects.none(),
+        self.fields["state"] = LocationChoiceField(
+            "state",
+            active_only=True,
             required=False,
             empty_label=_("Select a state"),
-            widget=forms.Select(attrs={"class": "form-select"}),
         )
 
-        self.fields["city"] = forms.ModelChoiceField(
-            queryset=City.objects.none(),
+        self.fields["city"] = LocationChoiceField(
+            "city",
+            active_only=True,
             required=False,
             empty_label=_("Select a city"),
-            widget=forms.Select(attrs={"class": "form-select"}),
         )
 
         if self.instance and self.instance.pk:
-            if self.instance.country:
-                self.fields["state"].queryset = State.objects.filter(
-                    country=self.instance.country, is_active=True
-                ).order_by("name")
-            if self.instance.state:
-                self.fields["city"].queryset = City.objects.filter(
-                    state=self.instance.state, is_active=True
-                ).order_by("name")
+            self.fields["state"].parent_id = self.instance.country_id
+            self.fields["city"].parent_id = self.instance.state_id
 
         if "country" in self.data:
-            try:
-                country_id = int(self.data.get("country"))
-                self.fields["state"].queryset = State.objects.filter(
-                    country_id=country_id, is_active=True
-                ).order_by("name")
-            except (ValueError, TypeError):
-                pass
+            self.fields["state"].parent_id = self.data.get("country")
 
         if "state" in self.data:
-            try:
-                state_id = int(self.data.get("state"))
-                self.fields["city"].queryset = City.objects.filter(
-                    state_id=state_id, is_active=True
-                ).order_by("name")
-            except (ValueError, TypeError):
-                pass
+            self.fields["city"].parent_id = self.data.get("state")
 
 
 class PlayerRegistrationForm(forms.ModelForm):
@@ -1504,63 +1360,7 @@ class PlayerRegistrationForm(forms.ModelForm):
 
     def generate_username(self, first_name, last_name, last_name2=None):
         """Genera un username único basado en nombre y apellidos"""
-        first_name = re.sub(r"[^a-zA-ZáéíóúÁÉÍÓÚñÑ]", "", first_name.strip().lower())
-        last_name = re.sub(r"[^a-zA-ZáéíóúÁÉÍÓÚñÑ]", "", last_name.strip().lower())
-        last_name2 = (
-            re.sub(r"[^a-zA-ZáéíóúÁÉÍÓÚñÑ]", "", last_name2.strip().lower())
-            if last_name2 and last_name2.strip()
-            else None
-        )
-
-        replacements = {
-            "á": "a",
-            "é": "e",
-            "í": "i",
-            "ó": "o",
-            "ú": "u",
-            "Á": "a",
-            "É": "e",
-            "Í": "i",
-            "Ó": "o",
-            "Ú": "u",
-            "ñ": "n",
-            "Ñ": "n",
-        }
-        for old, new in replacements.items():
-            first_name = first_name.replace(old, new)
-            last_name = last_name.replace(old, new)
-            if last_name2:
-                last_name2 = last_name2.replace(old, new)
-
-        if first_name and last_name:
-            if last_name2:
-                base_username = f"{first_name}.{last_name}{last_name2[0]}"
-            else:
-                base_username = f"{first_name}.{last_name}"
-        elif first_name:
-            base_username = first_name
-        elif last_name:
-            base_username = last_name
-        else:
-            base_username = "usuario"
-
-        base_username = base_username[:25]
-        username = base_username
-        counter = 1
-        while User.objects.filter(username=username).exists():
-            suffix = str(counter)
-            max_base_len = 30 - len(suffix)
-            if max_base_len < 1:
-                max_base_len = 1
-            username = f"{base_username[:max_base_len]}{suffix}"
-            counter += 1
-            if counter > 9999:
-                import random
-
-                username = f"{base_username[:20]}{random.randint(1000, 9999)}"
-                break
-
-        return username
+        return allocate_usernames([username_base(first_name, last_name, last_name2)])[0]
 
     def clean_email(self):
         """Validar que el email sea único"""
@@ -1662,6 +1462,49 @@ class PlayerRegistrationForm(forms.ModelForm):
         return player
 
 
+class RosterImportForm(forms.Form):
+    """Importación masiva de jugadores (CSV/XLSX) al equipo de un manager"""
+
+    team = forms.ModelChoiceField(
+        queryset=Team.objects.none(),
+        widget=forms.Select(attrs={"class": "form-select"}),
+    )
+    file = forms.FileField(
+        widget=forms.ClearableFileInput(
+            attrs={"class": "form-control", "accept": ".csv,.xlsx"}
+        ),
+    )
+
+    def __init__(self, *args, **kwargs):
+        self.manager = kwargs.pop("manager", None)
+        super().__init__(*args, **kwargs)
+        if self.manager:
+            self.fields["team"].queryset = Team.objects.filter(manager=self.manager)
+        self.rows = []
+        self.row_errors = []
+
+    def clean_file(self):
+        uploaded_file = self.cleaned_data["file"]
+        try:
+            self.records = read_roster_file(uploaded_file)
+        except RosterImportError as exc:
+            raise forms.ValidationError(str(exc))
+        return uploaded_file
+
+    def clean(self):
+        cleaned_data = super().clean()
+        team = cleaned_data.get("team")
+        if team and not self.errors:
+            self.rows = validate_roster_rows(self.records, team)
+            self.row_errors = [row for row in self.rows if row.errors]
+            if self.row_errors:
+                raise forms.ValidationError(
+                    _("The file has errors in %(count)s rows. Nothing was imported.")
+                    % {"count": len(self.row_errors)}
+                )
+        return cleaned_data
+
+
 class ParentPlayerRegistrationForm(forms.ModelForm):
     """Formulario para que padres registren jugadores
 
@@ -1708,25 +1551,22 @@ class ParentPlayerRegistrationForm(forms.ModelForm):
         ),
         help_text=_("Upload a profile picture (optional)"),
     )
-    country = forms.ModelChoiceField(
-        queryset=Country.objects.all().order_by("name"),
+    country = LocationChoiceField(
+        "country",
         required=True,
         empty_label=_("Select a country"),
-        widget=forms.Select(attrs={"class": "form-select"}),
         label=_("Country"),
     )
-    state = forms.ModelChoiceField(
-        queryset=State.objects.none(),
+    state = LocationChoiceField(
+        "state",
         required=True,
         empty_label=_("Select a state"),
-        widget=forms.Select(attrs={"class": "form-select"}),
         label=_("State"),
     )
-    city = forms.ModelChoiceField(
-        queryset=City.objects.none(),
+    city = LocationChoiceField(
+        "city",
         required=True,
         empty_label=_("Select a city"),
-        widget=forms.Select(attrs={"class": "form-select"}),
         label=_("City"),
     )
     relationship = forms.ChoiceField(
@@ -1834,15 +1674,7 @@ class ParentPlayerRegistrationForm(forms.ModelForm):
             country_id = None
 
         # Poblar estados según el país
-        if country_id:
-            try:
-                self.fields["state"].queryset = State.objects.filter(
-                    country_id=country_id
-                ).order_by("name")
-            except (ValueError, TypeError):
-                self.fields["state"].queryset = State.objects.none()
-        else:
-            self.fields["state"].queryset = State.objects.none()
+        self.fields["state"].parent_id = country_id
 
         # Determinar el estado seleccionado
         state_id = None
@@ -1857,15 +1689,7 @@ class ParentPlayerRegistrationForm(forms.ModelForm):
                 state_id = self.instance.user.profile.state_id
 
         # Poblar ciudades según el estado
-        if state_id:
-            try:
-                self.fields["city"].queryset = City.objects.filter(
-                    state_id=state_id
-                ).order_by("name")
-            except (ValueError, TypeError):
-                self.fields["city"].queryset = City.objects.none()
-        else:
-            self.fields["city"].queryset = City.objects.none()
+        self.fields["city"].parent_id = state_id
 
         # Valores iniciales explícitos para edición
         if (
@@ -1943,63 +1767,7 @@ class ParentPlayerRegistrationForm(forms.ModelForm):
 
     def generate_username(self, first_name, last_name, last_name2=None):
         """Genera un username único basado en nombre y apellidos"""
-        first_name = re.sub(r"[^a-zA-ZáéíóúÁÉÍÓÚñÑ]", "", first_name.strip().lower())
-        last_name = re.sub(r"[^a-zA-ZáéíóúÁÉÍÓÚñÑ]", "", last_name.strip().lower())
-        last_name2 = (
-            re.sub(r"[^a-zA-ZáéíóúÁÉÍÓÚñÑ]", "", last_name2.strip().lower())
-            if last_name2 and last_name2.strip()
-            else None
-        )
-
-        replacements = {
-            "á": "a",
-            "é": "e",
-            "í": "i",
-            "ó": "o",
-            "ú": "u",
-            "Á": "a",
-            "É": "e",
-            "Í": "i",
-            "Ó": "o",
-            "Ú": "u",
-            "ñ": "n",
-            "Ñ": "n",
-        }
-        for old, new in replacements.items():
-            first_name = first_name.replace(old, new)
-            last_name = last_name.replace(old, new)
-            if last_name2:
-                last_name2 = last_name2.replace(old, new)
-
-        if first_name and last_name:
-            if last_name2:
-                base_username = f"{first_name}.{last_name}{last_name2[0]}"
-            else:
-                base_username = f"{first_name}.{last_name}"
-        elif first_name:
-            base_username = first_name
-        elif last_name:
-            base_username = last_name
-        else:
-            base_username = "jugador"
-
-        base_username = base_username[:25]
-        username = base_username
-        counter = 1
-        while User.objects.filter(username=username).exists():
-            suffix = str(counter)
-            max_base_len = 30 - len(suffix) - 1
-            if max_base_len < 1:
-                max_base_len = 1
-            username = f"{base_username[:max_base_len]}{suffix}"
-            counter += 1
-            if counter > 9999:
-                import random
-
-                username = f"{base_username[:20]}{random.randint(1000, 9999)}"
-                break
-
-        return username
+        return allocate_usernames([username_base(first_name, last_name, last_name2)])[0]
 
     def clean_email(self):
         """Validar que el email sea único si se proporciona"""
@@ -2263,25 +2031,22 @@ class PlayerUpdateForm(forms.ModelForm):
         required=False,
         widget=forms.DateInput(attrs={"class": "form-control", "type": "date"}),
     )
-    country = forms.ModelChoiceField(
-        queryset=Country.objects.all().order_by("name"),
+    country = LocationChoiceField(
+        "country",
         required=True,
         empty_label=_("Select a country"),
-        widget=forms.Select(attrs={"class": "form-select"}),
         label=_("Country"),
     )
-    state = forms.ModelChoiceField(
-        queryset=State.objects.none(),
+    state = LocationChoiceField(
+        "state",
         required=False,
         empty_label=_("Select a state"),
-        widget=forms.Select(attrs={"class": "form-select"}),
         label=_("State"),
     )
-    city = forms.ModelChoiceField(
-        queryset=City.objects.none(),
+    city = LocationChoiceField(
+        "city",
         required=False,
         empty_label=_("Select a city"),
-        widget=forms.Select(attrs={"class": "form-select"}),
         label=_("City"),
     )
 
@@ -2383,30 +2148,14 @@ class PlayerUpdateForm(forms.ModelForm):
         else:
             country_id = profile_country_id
 
-        if country_id:
-            try:
-                self.fields["state"].queryset = State.objects.filter(
-                    country_id=country_id
-                ).order_by("name")
-            except (ValueError, TypeError):
-                self.fields["state"].queryset = State.objects.none()
-        else:
-            self.fields["state"].queryset = State.objects.none()
+        self.fields["state"].parent_id = country_id
 
         if "state" in self.data:
             state_id = self.data.get("state")
         else:
             state_id = profile_state_id
 
-        if state_id:
-            try:
-                self.fields["city"].queryset = City.objects.filter(
-                    state_id=state_id
-                ).order_by("name")
-            except (ValueError, TypeError):
-                self.fields["city"].queryset = City.objects.none()
-        else:
-            self.fields["city"].queryset = City.objects.none()
+        self.fields["city"].parent_id = state_id
 
         # Establecer valores iniciales explícitos
         if profile_country_id:
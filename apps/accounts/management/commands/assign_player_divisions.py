@@ -0,0 +1,63 @@
+"""
+Comando para asignar a los jugadores la división que les corresponde por edad
+al 30 de abril. El cálculo se hace en SQL y los cambios se guardan con un solo
+bulk_update (ver apps.accounts.eligibility).
+"""
+
+from django.core.management.base import BaseCommand
+
+from apps.accounts.eligibility import assign_age_divisions
+from apps.accounts.models import Player
+
+
+class Command(BaseCommand):
+    help = "Asigna a los jugadores la división por edad al 30 de abril"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--year",
+            type=int,
+            help="Año de la fecha de corte (default: año actual)",
+        )
+        parser.add_argument(
+            "--only-missing",
+            action="store_true",
+            help="Solo jugadores sin división asignada",
+        )
+        parser.add_argument(
+            "--include-inactive",
+            action="store_true",
+            help="Incluye jugadores inactivos",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Solo muestra qué se haría sin hacer cambios",
+        )
+
+    def handle(self, *args, **options):
+        queryset = Player.objects.all()
+        if not options["include_inactive"]:
+            queryset = queryset.filter(is_active=True)
+
+        changes = assign_age_divisions(
+            queryset,
+            year=options["year"],
+            only_missing=options["only_missing"],
+            dry_run=options["dry_run"],
+        )
+
+        if options["verbosity"] > 1:
+            for player_id, old_id, new_id in changes:
+                self.stdout.write(f"Player {player_id}: división {old_id} -> {new_id}")
+
+        if options["dry_run"]:
+            self.stdout.write(
+                self.style.WARNING(
+                    f"MODO DRY-RUN: {len(changes)} jugadores cambiarían de división"
+                )
+            )
+        else:
+            self.stdout.write(
+                self.style.SUCCESS(f"Actualizados {len(changes)} jugadores")
+            )
@@ -0,0 +1,33 @@
+"""
+Comando para poblar OrderPlayer y CheckoutPlayer desde
+Order.registered_player_ids y StripeEventCheckout.player_ids (por ejemplo,
+después de cargar datos con queryset.update() o loaddata, que no disparan
+las señales de sincronización).
+"""
+
+from django.core.management.base import BaseCommand
+
+from apps.accounts.order_players import backfill_order_players
+
+
+class Command(BaseCommand):
+    help = "Crea los enlaces jugador-orden y jugador-checkout desde las listas JSON"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Enlaces por bulk_create (default: 1000)",
+        )
+
+    def handle(self, *args, **options):
+        order_links, checkout_links = backfill_order_players(
+            batch_size=options["batch_size"]
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Procesados {order_links} enlaces de órdenes y "
+                f"{checkout_links} de checkouts"
+            )
+        )
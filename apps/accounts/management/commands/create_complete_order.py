@@ -403,8 +403,7 @@ class Command(BaseCommand):
             # Verificar que se crearon las reservas
             from apps.locations.models import HotelReservation
             reservations_created = HotelReservation.objects.filter(
-                user=checkout.user,
-                notes__icontains=checkout.stripe_session_id
+                stripe_checkout=checkout
             ).count()
             self.stdout.write(self.style.SUCCESS(f"  - Reservas creadas: {reservations_created}"))
 
@@ -378,6 +378,8 @@ class Command(BaseCommand):
                         hotel=hotel1,
                         room=room1,
                         user=user,
+                        stripe_checkout=stripe_checkout,
+                        event=event,
                         guest_name=user.get_full_name() or user.username,
                         guest_email=user.email,
                         guest_phone=getattr(user.profile, "phone", "") if hasattr(user, "profile") else "",
@@ -403,6 +405,8 @@ class Command(BaseCommand):
                         hotel=hotel2,
                         room=room2,
                         user=user,
+                        stripe_checkout=stripe_checkout,
+                        event=event,
                         guest_name=user.get_full_name() or user.username,
                         guest_email=user.email,
                         guest_phone=getattr(user.profile, "phone", "") if hasattr(user, "profile") else "",
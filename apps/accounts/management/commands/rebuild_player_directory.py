@@ -0,0 +1,34 @@
+"""
+Comando para reconstruir el directorio público de jugadores
+(PlayerDirectoryEntry). Las señales lo mantienen al día; este comando sirve
+para reconciliarlo después de cargas masivas o cambios hechos fuera del ORM.
+"""
+
+from django.core.management.base import BaseCommand
+
+from apps.accounts.models import Player, PlayerDirectoryEntry
+from apps.accounts.player_directory import sync_player_directory
+
+
+class Command(BaseCommand):
+    help = "Reconstruye el directorio público de jugadores desde Player/UserProfile"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Número de jugadores por upsert (default: 500)",
+        )
+
+    def handle(self, *args, **options):
+        # Entradas huérfanas (no debería haber por el CASCADE, pero por si acaso)
+        orphans, _ = PlayerDirectoryEntry.objects.exclude(
+            player_id__in=Player.objects.values("pk")
+        ).delete()
+        written = sync_player_directory(batch_size=options["batch_size"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Directorio reconstruido: {written} jugadores, {orphans} entradas huérfanas eliminadas"
+            )
+        )
@@ -0,0 +1,121 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:28
+
+import django.db.models.deletion
+from django.db import migrations, models, transaction
+
+
+def backfill_player_directory(apps, schema_editor):
+    """Pobla el directorio con los jugadores existentes"""
+    from apps.accounts.player_directory import normalize_search_text
+
+    Player = apps.get_model("accounts", "Player")
+    UserProfile = apps.get_model("accounts", "UserProfile")
+    PlayerDirectoryEntry = apps.get_model("accounts", "PlayerDirectoryEntry")
+
+    profiles = {p.user_id: p for p in UserProfile.objects.all()}
+    entries = []
+    for player in Player.objects.select_related("user", "team", "division").iterator():
+        user = player.user
+        profile = profiles.get(user.pk)
+        team_name = player.team.name if player.team else ""
+        entries.append(
+            PlayerDirectoryEntry(
+                player_id=player.pk,
+                slug=player.slug or "",
+                first_name=user.first_name,
+                last_name=user.last_name,
+                full_name=f"{user.first_name} {user.last_name}".strip()
+                or user.username,
+                search_text=normalize_search_text(
+                    " ".join([user.first_name, user.last_name, user.email, team_name])
+                ),
+                jersey_number=player.jersey_number,
+                position=player.position,
+                height=player.height,
+                profile_picture=profile.profile_picture.name if profile else None,
+                birth_date=profile.birth_date if profile else None,
+                team_id=player.team_id,
+                team_name=team_name,
+                division_id=player.division_id,
+                division_name=player.division.name if player.division else "",
+                country_id=profile.country_id if profile else None,
+                state_id=profile.state_id if profile else None,
+                city_id=profile.city_id if profile else None,
+                is_active=player.is_active,
+            )
+        )
+    PlayerDirectoryEntry.objects.bulk_create(entries, batch_size=500)
+
+
+def create_search_text_trigram_index(apps, schema_editor):
+    """
+    En PostgreSQL, índice GIN de trigramas para search_text (LIKE '%...%').
+    Si no se puede crear la extensión pg_trgm, la búsqueda sigue funcionando
+    sobre la tabla desnormalizada sin el índice.
+    """
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    try:
+        with transaction.atomic(using=schema_editor.connection.alias):
+            with schema_editor.connection.cursor() as cursor:
+                cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+                cursor.execute(
+                    "CREATE INDEX IF NOT EXISTS accounts_playerdirectory_search_trgm "
+                    "ON accounts_playerdirectoryentry USING GIN (search_text gin_trgm_ops)"
+                )
+    except Exception:
+        pass
+
+
+def drop_search_text_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("DROP INDEX IF EXISTS accounts_playerdirectory_search_trgm")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0055_adminemailbroadcast_city_ids_and_more'),
+        ('events', '0041_event_search_index'),
+        ('locations', '0029_siteimage'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlayerDirectoryEntry',
+            fields=[
+                ('player', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='directory_entry', serialize=False, to='accounts.player', verbose_name='Jugador')),
+                ('slug', models.CharField(blank=True, max_length=200)),
+                ('first_name', models.CharField(blank=True, max_length=150)),
+                ('last_name', models.CharField(blank=True, max_length=150)),
+                ('full_name', models.CharField(blank=True, max_length=300)),
+                ('search_text', models.TextField(blank=True, help_text='Nombre, email y equipo en minúsculas y sin acentos')),
+                ('jersey_number', models.PositiveIntegerField(blank=True, null=True)),
+                ('position', models.CharField(blank=True, choices=[('pitcher', 'Pitcher'), ('catcher', 'Catcher'), ('first_base', 'First Base'), ('second_base', 'Second Base'), ('third_base', 'Third Base'), ('shortstop', 'Shortstop'), ('left_field', 'Left Field'), ('center_field', 'Center Field'), ('right_field', 'Right Field'), ('designated_hitter', 'Designated Hitter'), ('utility', 'Utility')], max_length=20)),
+                ('height', models.CharField(blank=True, max_length=10)),
+                ('profile_picture', models.ImageField(blank=True, null=True, upload_to='accounts/profile_pictures/')),
+                ('birth_date', models.DateField(blank=True, null=True)),
+                ('team_name', models.CharField(blank=True, max_length=200)),
+                ('division_name', models.CharField(blank=True, max_length=100)),
+                ('is_active', models.BooleanField(default=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('city', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='locations.city')),
+                ('country', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='locations.country')),
+                ('division', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='events.division')),
+                ('state', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='locations.state')),
+                ('team', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='accounts.team')),
+            ],
+            options={
+                'verbose_name': 'Entrada del Directorio de Jugadores',
+                'verbose_name_plural': 'Directorio de Jugadores',
+                'ordering': ['last_name', 'first_name'],
+                'indexes': [models.Index(fields=['is_active', 'last_name', 'first_name'], name='accounts_pl_is_acti_35ff08_idx'), models.Index(fields=['is_active', 'country', 'state', 'city'], name='accounts_pl_is_acti_aa6cc9_idx'), models.Index(fields=['is_active', 'division'], name='accounts_pl_is_acti_0654fb_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_player_directory, migrations.RunPython.noop),
+        migrations.RunPython(
+            create_search_text_trigram_index, drop_search_text_trigram_index
+        ),
+    ]
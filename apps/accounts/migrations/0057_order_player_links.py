@@ -0,0 +1,66 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:46
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_order_player_links(apps, schema_editor):
+    """Crea los enlaces a partir de las listas JSON existentes"""
+    from apps.accounts.order_players import clean_player_ids
+
+    Player = apps.get_model("accounts", "Player")
+    Order = apps.get_model("accounts", "Order")
+    OrderPlayer = apps.get_model("accounts", "OrderPlayer")
+    StripeEventCheckout = apps.get_model("accounts", "StripeEventCheckout")
+    CheckoutPlayer = apps.get_model("accounts", "CheckoutPlayer")
+
+    player_ids = set(Player.objects.values_list("pk", flat=True))
+    for owner_model, link_model, owner_field, json_field in (
+        (Order, OrderPlayer, "order_id", "registered_player_ids"),
+        (StripeEventCheckout, CheckoutPlayer, "checkout_id", "player_ids"),
+    ):
+        links = [
+            link_model(**{owner_field: owner_id, "player_id": player_id})
+            for owner_id, raw_ids in owner_model.objects.values_list("pk", json_field)
+            for player_id in clean_player_ids(raw_ids) & player_ids
+        ]
+        link_model.objects.bulk_create(links, batch_size=1000, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0056_player_directory'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CheckoutPlayer',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('checkout', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='player_links', to='accounts.stripeeventcheckout', verbose_name='Checkout')),
+                ('player', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='checkout_links', to='accounts.player', verbose_name='Jugador')),
+            ],
+            options={
+                'verbose_name': 'Jugador de Checkout',
+                'verbose_name_plural': 'Jugadores de Checkouts',
+                'constraints': [models.UniqueConstraint(fields=('checkout', 'player'), name='unique_checkout_player')],
+            },
+        ),
+        migrations.CreateModel(
+            name='OrderPlayer',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('order', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='player_links', to='accounts.order', verbose_name='Orden')),
+                ('player', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='order_links', to='accounts.player', verbose_name='Jugador')),
+            ],
+            options={
+                'verbose_name': 'Jugador de Orden',
+                'verbose_name_plural': 'Jugadores de Órdenes',
+                'constraints': [models.UniqueConstraint(fields=('order', 'player'), name='unique_order_player')],
+            },
+        ),
+        migrations.RunPython(
+            backfill_order_player_links, migrations.RunPython.noop
+        ),
+    ]
@@ -9,6 +9,13 @@ from django.urls import reverse
 from django.utils.text import slugify
 from django.utils.translation import gettext_lazy as _
 
+from .eligibility import (
+    GRADE_DIVISION_MAP,
+    age_division_for_age,
+    eligible_divisions,
+    evaluate_division_eligibility,
+)
+
 
 class UserProfile(models.Model):
     """Perfil extendido de usuario"""
@@ -356,6 +363,28 @@ class AdminEmailBroadcast(models.Model):
         return self.subject
 
 
+def calculate_age_as_of_april_30(birth_date, year=None):
+    """
+    Edad a la fecha de corte (30 de abril) del año especificado o del actual.
+    Retorna None si no hay fecha de nacimiento.
+    """
+    if not birth_date:
+        return None
+
+    if year is None:
+        year = date.today().year
+
+    # Fecha de corte: 30 de abril
+    cutoff_date = date(year, 4, 30)
+
+    # Calcular edad
+    age = cutoff_date.year - birth_date.year
+    if (cutoff_date.month, cutoff_date.day) < (birth_date.month, birth_date.day):
+        age -= 1
+
+    return age
+
+
 class Player(models.Model):
     """Modelo de Jugador"""
 
@@ -653,62 +682,16 @@ class Player(models.Model):
         Calcula la edad del jugador al 30 de abril del año especificado.
         Si no se especifica año, usa el año actual.
         """
-        birth_date = self.get_birth_date()
-        if not birth_date:
-            return None
-
-        if year is None:
-            year = date.today().year
-
-        # Fecha de corte: 30 de abril
-        cutoff_date = date(year, 4, 30)
-
-        # Calcular edad
-        age = cutoff_date.year - birth_date.year
-        if (cutoff_date.month, cutoff_date.day) < (birth_date.month, birth_date.day):
-            age -= 1
-
-        return age
+        return calculate_age_as_of_april_30(self.get_birth_date(), year)
 
     def get_age_based_division(self, year=None):
         """
         Calcula la división elegible basada en la edad al 30 de abril.
         Regla: La edad del jugador más viejo al 30 de abril determina elegibilidad.
         Un jugador de 10U no puede cumplir 11 años antes del 1 de mayo.
+        Para muchos jugadores a la vez usar apps.accounts.eligibility.
         """
-        age = self.calculate_age_as_of_april_30(year)
-        if age is None:
-            return None
-
-        # Mapeo de edad a división
-        # Un jugador de XU no puede cumplir X+1 años antes del 1 de mayo
-        # Es decir, si tiene X años al 30 de abril, puede jugar en XU
-        division_map = {
-            5: "05U",
-            6: "06U",
-            7: "07U",
-            8: "08U",
-            9: "09U",
-            10: "10U",
-            11: "11U",
-            12: "12U",
-            13: "13U",
-            14: "14U",
-            15: "15U",
-            16: "16U",
-            17: "17U",
-            18: "18U",
-        }
-
-        # Si tiene menos de 5 años, no es elegible
-        if age < 5:
-            return None
-
-        # Si tiene 18 o más años, puede jugar en 18U
-        if age >= 18:
-            return "18U"
-
-        return division_map.get(age)
+        return age_division_for_age(self.calculate_age_as_of_april_30(year))
 
     def get_grade_based_division(self):
         """
@@ -717,45 +700,16 @@ class Player(models.Model):
         """
         if not self.grade:
             return None
-
-        # Mapeo de grado a división según la tabla de Grade Exceptions
-        grade_division_map = {
-            "pre_k": "05U",
-            "kindergarten": "06U",
-            "1st": "07U",
-            "2nd": "08U",
-            "3rd": "09U",
-            "4th": "10U",
-            "5th": "11U",
-            "6th": "12U",
-            "7th": "13U",
-            "8th": "14U",
-            "9th": "15U",
-            "10th": "16U",
-            "11th": "17U",
-            "12th": "18U",
-        }
-
-        return grade_division_map.get(self.grade)
+        return GRADE_DIVISION_MAP.get(self.grade)
 
     def get_eligible_divisions(self):
         """
         Retorna las divisiones elegibles para el jugador.
         Incluye la división basada en edad y la división basada en grado.
         """
-        divisions = []
-
-        # División basada en edad
-        age_division = self.get_age_based_division()
-        if age_division:
-            divisions.append(age_division)
-
-        # División basada en grado (Grade Exception)
-        grade_division = self.get_grade_based_division()
-        if grade_division and grade_division not in divisions:
-            divisions.append(grade_division)
-
-        return sorted(set(divisions))
+        return eligible_divisions(
+            self.get_age_based_division(), self.get_grade_based_division()
+        )
 
     def can_play_in_division(self, target_division):
         """
@@ -767,61 +721,13 @@ class Player(models.Model):
         Args:
             target_division: Puede ser un objeto Division o un string con el nombre
         """
-        # Convertir a string si es un objeto Division
-        if hasattr(target_division, "name"):
-            target_division_name = target_division.name
-        else:
-            target_division_name = str(target_division)
-
-        # Extraer solo la parte de edad si tiene formato compuesto (ej: "10U D1" -> "10U")
-        target_division_name = (
-            target_division_name.split()[0]
-            if " " in target_division_name
-            else target_division_name
+        return evaluate_division_eligibility(
+            self.age_verification_status,
+            self.get_age_based_division(),
+            self.get_eligible_divisions(),
+            target_division,
         )
 
-        # Verificar que tenga verificación de edad aprobada
-        if self.age_verification_status != "approved":
-            return False, "El jugador no tiene verificación de edad aprobada"
-
-        eligible_divisions = self.get_eligible_divisions()
-        if not eligible_divisions:
-            return False, "No se puede determinar la elegibilidad del jugador"
-
-        # Obtener el número de la división objetivo
-        target_num = int(target_division_name.replace("U", ""))
-
-        # Obtener el número de la división más baja elegible (basada en edad)
-        age_division = self.get_age_based_division()
-        if not age_division:
-            return False, "No se puede determinar la división basada en edad"
-
-        age_division_num = int(age_division.replace("U", ""))
-
-        # No puede jugar "down" (en una división menor)
-        if target_num < age_division_num:
-            return (
-                False,
-                f"El jugador no puede jugar en una división menor ({target_division_name}). División mínima elegible: {age_division}",
-            )
-
-        # Puede jugar "up" máximo 2 divisiones
-        if target_num > age_division_num + 2:
-            return (
-                False,
-                f"El jugador solo puede jugar hasta 2 divisiones arriba de su división basada en edad ({age_division}). División solicitada: {target_division_name}",
-            )
-
-        # Si la división está en las elegibles o está dentro del rango permitido
-        if target_division_name in eligible_divisions:
-            return True, "Elegible"
-
-        # Verificar si está dentro del rango permitido (hasta 2 divisiones arriba)
-        if age_division_num <= target_num <= age_division_num + 2:
-            return True, "Elegible (jugando arriba)"
-
-        return False, "División no elegible"
-
     def is_eligible_to_play(self):
         """
         Verifica si el jugador es elegible para jugar.
@@ -890,6 +796,94 @@ class PlayerParent(models.Model):
         return f"{self.parent.get_full_name()} - {self.player.user.get_full_name()}"
 
 
+class PlayerDirectoryEntry(models.Model):
+    """
+    Proyección desnormalizada de un jugador para el directorio público.
+
+    Guarda los campos que muestra la lista pública y los ids de ubicación para
+    que cada página sea una sola consulta indexada sin joins. Se mantiene
+    sincronizada por señales de Player/User/UserProfile/Team/Division
+    (ver apps/accounts/player_directory.py).
+    """
+
+    player = models.OneToOneField(
+        Player,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="directory_entry",
+        verbose_name="Jugador",
+    )
+    slug = models.CharField(max_length=200, blank=True)
+    first_name = models.CharField(max_length=150, blank=True)
+    last_name = models.CharField(max_length=150, blank=True)
+    full_name = models.CharField(max_length=300, blank=True)
+    search_text = models.TextField(
+        blank=True,
+        help_text="Nombre, email y equipo en minúsculas y sin acentos",
+    )
+    jersey_number = models.PositiveIntegerField(null=True, blank=True)
+    position = models.CharField(
+        max_length=20, choices=Player.POSITION_CHOICES, blank=True
+    )
+    height = models.CharField(max_length=10, blank=True)
+    profile_picture = models.ImageField(
+        upload_to="accounts/profile_pictures/", blank=True, null=True
+    )
+    birth_date = models.DateField(null=True, blank=True)
+    team = models.ForeignKey(
+        Team, on_delete=models.SET_NULL, null=True, blank=True, related_name="+"
+    )
+    team_name = models.CharField(max_length=200, blank=True)
+    division = models.ForeignKey(
+        "events.Division",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+",
+    )
+    division_name = models.CharField(max_length=100, blank=True)
+    country = models.ForeignKey(
+        "locations.Country",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+",
+    )
+    state = models.ForeignKey(
+        "locations.State",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+",
+    )
+    city = models.ForeignKey(
+        "locations.City",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+",
+    )
+    is_active = models.BooleanField(default=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Entrada del Directorio de Jugadores"
+        verbose_name_plural = "Directorio de Jugadores"
+        ordering = ["last_name", "first_name"]
+        indexes = [
+            models.Index(fields=["is_active", "last_name", "first_name"]),
+            models.Index(fields=["is_active", "country", "state", "city"]),
+            models.Index(fields=["is_active", "division"]),
+        ]
+
+    def __str__(self):
+        return self.full_name
+
+    def calculate_age_as_of_april_30(self, year=None):
+        """Edad al 30 de abril (misma regla que Player)"""
+        return calculate_age_as_of_april_30(self.birth_date, year)
+
+
 class DashboardContent(models.Model):
     """Modelo para contenido del dashboard configurable por el admin"""
 
@@ -2212,6 +2206,8 @@ class Order(models.Model):
             models.Index(fields=["user", "-created_at"]),
             models.Index(fields=["status", "-created_at"]),
             models.Index(fields=["stripe_session_id"]),
+            # Paginación por cursor de la lista administrativa
+            models.Index(fields=["-created_at", "-id"], name="order_created_keyset_idx"),
         ]
 
     def __str__(self):
@@ -2232,7 +2228,9 @@ class Order(models.Model):
         """
         Obtiene las reservas de hotel relacionadas a esta orden.
         Prioriza la relación directa a través de la ForeignKey 'order',
-        con fallback a la búsqueda por stripe_session_id en notes (para compatibilidad con datos antiguos).
+        con fallback al checkout de Stripe de la orden (FK stripe_checkout de
+        la reserva, poblada para datos antiguos por la migración
+        locations.0032_backfill_reservation_links).
         """
         from apps.locations.models import HotelReservation
 
@@ -2241,17 +2239,14 @@ class Order(models.Model):
         if reservations.exists():
             return reservations
 
-        # Fallback: búsqueda por stripe_session_id en notes (para datos antiguos)
-        session_id = None
-        if self.stripe_checkout and self.stripe_checkout.stripe_session_id:
-            session_id = self.stripe_checkout.stripe_session_id
-        elif self.stripe_session_id:
-            session_id = self.stripe_session_id
-
-        if session_id:
+        if self.stripe_checkout_id:
+            return HotelReservation.objects.filter(
+                stripe_checkout_id=self.stripe_checkout_id
+            )
+        if self.stripe_session_id:
             return HotelReservation.objects.filter(
-                notes__icontains=session_id,
-                user=self.user,
+                stripe_checkout__stripe_session_id=self.stripe_session_id,
+                user_id=self.user_id,
             )
         return HotelReservation.objects.none()
 
@@ -2293,16 +2288,13 @@ class Order(models.Model):
     @property
     def registered_players(self):
         """Obtiene los jugadores registrados en el evento de esta orden"""
-        if not self.registered_player_ids:
+        if not self.pk or not self.registered_player_ids:
             return []
 
-        try:
-            # Player ya está definido en este mismo módulo (apps/accounts/models.py)
-            return Player.objects.filter(
-                id__in=self.registered_player_ids, is_active=True
-            ).select_related("user")
-        except Exception:
-            return []
+        # Join indexado sobre OrderPlayer (sincronizada desde registered_player_ids)
+        return Player.objects.filter(
+            order_links__order=self, is_active=True
+        ).select_related("user")
 
     @property
     def has_event_registration(self):
@@ -2352,6 +2344,74 @@ class Order(models.Model):
         self.save(update_fields=["status", "updated_at"])
 
 
+class OrderPlayer(models.Model):
+    """
+    Jugador incluido en una orden.
+
+    Tabla indexada que refleja Order.registered_player_ids para responder
+    "qué órdenes incluyen al jugador X" o "qué jugadores están registrados en
+    el evento Y" con joins en lugar de recorrer el JSON de cada orden. Se
+    sincroniza al guardar la orden (ver apps/accounts/order_players.py).
+    """
+
+    order = models.ForeignKey(
+        Order,
+        on_delete=models.CASCADE,
+        related_name="player_links",
+        verbose_name="Orden",
+    )
+    player = models.ForeignKey(
+        Player,
+        on_delete=models.CASCADE,
+        related_name="order_links",
+        verbose_name="Jugador",
+    )
+
+    class Meta:
+        verbose_name = "Jugador de Orden"
+        verbose_name_plural = "Jugadores de Órdenes"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["order", "player"], name="unique_order_player"
+            )
+        ]
+
+    def __str__(self):
+        return f"Order #{self.order_id} - Player #{self.player_id}"
+
+
+class CheckoutPlayer(models.Model):
+    """
+    Jugador incluido en un StripeEventCheckout (refleja
+    StripeEventCheckout.player_ids, igual que OrderPlayer).
+    """
+
+    checkout = models.ForeignKey(
+        StripeEventCheckout,
+        on_delete=models.CASCADE,
+        related_name="player_links",
+        verbose_name="Checkout",
+    )
+    player = models.ForeignKey(
+        Player,
+        on_delete=models.CASCADE,
+        related_name="checkout_links",
+        verbose_name="Jugador",
+    )
+
+    class Meta:
+        verbose_name = "Jugador de Checkout"
+        verbose_name_plural = "Jugadores de Checkouts"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["checkout", "player"], name="unique_checkout_player"
+            )
+        ]
+
+    def __str__(self):
+        return f"Checkout #{self.checkout_id} - Player #{self.player_id}"
+
+
 class Notification(models.Model):
     """Modelo de notificaciones para usuarios"""
 
@@ -2425,10 +2485,13 @@ class Notification(models.Model):
         """Marca la notificación como leída"""
         from django.utils import timezone
 
+        from .notifications import adjust_unread_count
+
         if not self.read:
             self.read = True
             self.read_at = timezone.now()
             self.save(update_fields=["read", "read_at"])
+            adjust_unread_count(self.user_id, -1)
 
     @classmethod
     def create_notification(
@@ -0,0 +1,360 @@
+"""
+Entrega de notificaciones del panel.
+
+- Contador de no leídas por usuario en la caché: se inicializa con un COUNT
+  la primera vez y después se ajusta con incr/decr al crear una notificación
+  (signals) y al marcarlas como leídas, sin volver a contar.
+- "Última notificación" por usuario en la caché: el stream SSE la compara con
+  su cursor y solo consulta la base de datos cuando hay algo nuevo, así que
+  una pestaña inactiva no genera consultas.
+- Las notificaciones se sirven por cursor (``since_id``) con la fecha en ISO
+  8601; el navegador calcula el tiempo relativo.
+- notify_users crea la misma notificación para toda una audiencia (staff,
+  registrados de un evento, una división) con bulk_create. Como bulk_create
+  no dispara señales, ajusta contadores y entrega push/email una vez por lote,
+  y descarta duplicados del mismo aviso a un usuario dentro de
+  DEDUPE_WINDOW.
+"""
+
+import hashlib
+import json
+import logging
+from collections import Counter
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.mail import EmailMultiAlternatives
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+UNREAD_COUNT_TIMEOUT = 60 * 60 * 24  # 1 día (se corrige solo al expirar)
+LATEST_ID_TIMEOUT = 60 * 60 * 24
+DEDUPE_WINDOW = 5 * 60  # segundos en los que se ignora el mismo aviso repetido
+FANOUT_BATCH_SIZE = 500
+
+
+def _unread_key(user_id):
+    return f"notifications:unread:{user_id}"
+
+
+def _latest_key(user_id):
+    return f"notifications:latest:{user_id}"
+
+
+def get_unread_count(user_id):
+    """No leídas del usuario (caché; COUNT solo si no está cacheado)"""
+    from .models import Notification
+
+    count = cache.get(_unread_key(user_id))
+    if count is None:
+        count = Notification.objects.filter(user_id=user_id, read=False).count()
+        cache.set(_unread_key(user_id), count, UNREAD_COUNT_TIMEOUT)
+    return max(count, 0)
+
+
+def adjust_unread_count(user_id, delta):
+    """
+    Suma ``delta`` al contador cacheado. Si no está en la caché no se hace
+    nada: la próxima lectura lo recalcula.
+    """
+    if not delta:
+        return
+    try:
+        if cache.incr(_unread_key(user_id), delta) < 0:
+            cache.delete(_unread_key(user_id))
+    except ValueError:
+        pass
+
+
+def reset_unread_count(user_id, count=0):
+    cache.set(_unread_key(user_id), count, UNREAD_COUNT_TIMEOUT)
+
+
+def forget_unread_count(user_id):
+    """Descarta el contador (se recalcula en la próxima lectura)"""
+    cache.delete(_unread_key(user_id))
+
+
+def publish_notification(notification):
+    """Registra la notificación nueva para los streams del usuario"""
+    latest = cache.get(_latest_key(notification.user_id)) or 0
+    if notification.pk > latest:
+        cache.set(
+            _latest_key(notification.user_id), notification.pk, LATEST_ID_TIMEOUT
+        )
+
+
+def get_latest_notification_id(user_id):
+    """Id de la última notificación publicada (None si no está en la caché)"""
+    return cache.get(_latest_key(user_id))
+
+
+async def aget_latest_notification_id(user_id):
+    """Versión async de get_latest_notification_id (para el stream SSE)"""
+    return await cache.aget(_latest_key(user_id))
+
+
+def serialize_notification(notification):
+    return {
+        "id": notification.id,
+        "type": notification.type,
+        "title": notification.title,
+        "message": notification.message,
+        "read": notification.read,
+        "created_at": notification.created_at.isoformat(),
+        "action_url": notification.action_url or "",
+        "order_id": notification.order_id,
+        "event_id": notification.event_id,
+    }
+
+
+def notifications_since(user_id, since_id, limit=50):
+    """Notificaciones con id mayor a ``since_id``, de la más antigua a la nueva"""
+    from .models import Notification
+
+    notifications = Notification.objects.filter(
+        user_id=user_id, pk__gt=since_id
+    ).order_by("pk")[:limit]
+    return [serialize_notification(n) for n in notifications]
+
+
+def latest_notification_id(user_id):
+    """Id de la notificación más reciente del usuario en la base de datos"""
+    from .models import Notification
+
+    return (
+        Notification.objects.filter(user_id=user_id)
+        .order_by("-pk")
+        .values_list("pk", flat=True)
+        .first()
+    ) or 0
+
+
+# ===== Audiencias =====
+
+
+def staff_audience():
+    """Ids de usuarios staff activos"""
+    return get_user_model().objects.filter(is_active=True, is_staff=True).values_list(
+        "pk", flat=True
+    )
+
+
+def event_audience(event):
+    """
+    Ids de usuarios registrados en el evento: asistentes activos (jugadores)
+    y quienes hicieron la orden (padres) de órdenes pagadas o por pagar.
+    """
+    from apps.events.models import EventAttendance
+
+    from .models import Order
+
+    user_ids = set(
+        EventAttendance.objects.filter(
+            event=event, status__in=["pending", "confirmed", "waiting"]
+        ).values_list("user_id", flat=True)
+    )
+    user_ids.update(
+        Order.objects.filter(
+            event=event, status__in=["paid", "pending_registration"]
+        ).values_list("user_id", flat=True)
+    )
+    return user_ids
+
+
+def division_audience(division):
+    """Ids de usuarios de los jugadores activos de la división y sus padres"""
+    from .models import Player, PlayerParent
+
+    players = Player.objects.filter(division=division, is_active=True)
+    user_ids = set(players.values_list("user_id", flat=True))
+    user_ids.update(
+        PlayerParent.objects.filter(player__in=players).values_list(
+            "parent_id", flat=True
+        )
+    )
+    return user_ids
+
+
+# ===== Fan-out =====
+
+
+def _dedupe_key(user_id, digest):
+    return f"notifications:dedupe:{user_id}:{digest}"
+
+
+def _skip_recent_duplicates(user_ids, digest):
+    """Usuarios que no recibieron el mismo aviso dentro de DEDUPE_WINDOW"""
+    keys = {_dedupe_key(user_id, digest): user_id for user_id in user_ids}
+    recent = cache.get_many(list(keys))
+    fresh = [user_id for key, user_id in keys.items() if key not in recent]
+    cache.set_many(
+        {_dedupe_key(user_id, digest): 1 for user_id in fresh}, DEDUPE_WINDOW
+    )
+    return fresh
+
+
+def _register_created(notifications):
+    """Lo que harían las señales post_save para un lote de bulk_create"""
+    for user_id, count in Counter(
+        n.user_id for n in notifications if not n.read
+    ).items():
+        adjust_unread_count(user_id, count)
+    latest = {}
+    for notification in notifications:
+        if notification.pk:
+            latest[notification.user_id] = max(
+                notification.pk, latest.get(notification.user_id, 0)
+            )
+    cache.set_many(
+        {_latest_key(user_id): pk for user_id, pk in latest.items()},
+        LATEST_ID_TIMEOUT,
+    )
+    # Sin pk (backends sin RETURNING): los streams consultan la base de datos
+    cache.delete_many(
+        [_latest_key(n.user_id) for n in notifications if n.user_id not in latest]
+    )
+
+
+def notify_users(
+    users,
+    title,
+    message,
+    notification_type="system",
+    order=None,
+    event=None,
+    action_url=None,
+    dedupe_key=None,
+    send_push=True,
+    send_email=False,
+    email_subject=None,
+    batch_size=FANOUT_BATCH_SIZE,
+):
+    """
+    Crea la misma notificación para cada usuario de ``users`` (queryset,
+    ids o instancias) con bulk_create por lotes.
+
+    Por lote: ajusta los contadores de no leídas, publica el id más reciente
+    para los streams, envía un push por suscripción (staff) y, con
+    ``send_email``, un solo email con los destinatarios en BCC. Si un usuario
+    ya recibió el mismo aviso (``dedupe_key`` o tipo+título+mensaje) dentro
+    de DEDUPE_WINDOW, se omite.
+
+    Returns:
+        list: notificaciones creadas
+    """
+    from .models import Notification
+
+    user_ids = list(
+        dict.fromkeys(getattr(user, "pk", user) for user in users if user is not None)
+    )
+    raw = dedupe_key or f"{notification_type}|{title}|{message}|{action_url or ''}"
+    digest = hashlib.md5(raw.encode("utf-8")).hexdigest()
+    user_ids = _skip_recent_duplicates(user_ids, digest)
+
+    created = []
+    for start in range(0, len(user_ids), batch_size):
+        batch = Notification.objects.bulk_create(
+            [
+                Notification(
+                    user_id=user_id,
+                    type=notification_type,
+                    title=title,
+                    message=message,
+                    order=order,
+                    event=event,
+                    action_url=action_url,
+                )
+                for user_id in user_ids[start : start + batch_size]
+            ]
+        )
+        _register_created(batch)
+        if send_push:
+            send_web_push(batch)
+        if send_email:
+            send_notification_email(batch, subject=email_subject)
+        created.extend(batch)
+    return created
+
+
+def send_web_push(notifications):
+    """
+    Web push a las suscripciones activas de los usuarios staff del lote: una
+    sola consulta de suscripciones y un push por suscripción (si un usuario
+    tiene varias notificaciones en el lote, recibe la más reciente).
+    """
+    vapid_private = getattr(settings, "VAPID_PRIVATE_KEY", "") or ""
+    vapid_sub = getattr(settings, "VAPID_ADMIN_EMAIL", "") or ""
+    if not notifications or not vapid_private or not vapid_sub:
+        return
+
+    try:
+        from pywebpush import webpush
+    except Exception:
+        return
+
+    from .models import PushSubscription
+
+    by_user = {n.user_id: n for n in notifications}
+    subscriptions = PushSubscription.objects.filter(
+        user_id__in=list(by_user), user__is_staff=True, is_active=True
+    )
+    failed = []
+    for sub in subscriptions.iterator():
+        notification = by_user[sub.user_id]
+        payload = {
+            "title": notification.title or "Notificación",
+            "body": notification.message or "",
+            "url": notification.action_url or "/panel/",
+        }
+        try:
+            webpush(
+                subscription_info={
+                    "endpoint": sub.endpoint,
+                    "keys": {"p256dh": sub.p256dh, "auth": sub.auth},
+                },
+                data=json.dumps(payload),
+                vapid_private_key=vapid_private,
+                vapid_claims={"sub": vapid_sub},
+            )
+        except Exception:
+            # No romper el flujo; la suscripción se desactiva si falla.
+            failed.append(sub.pk)
+    if failed:
+        PushSubscription.objects.filter(pk__in=failed).update(
+            is_active=False, updated_at=timezone.now()
+        )
+
+
+def send_notification_email(notifications, subject=None):
+    """Un email por lote con todos los destinatarios en BCC"""
+    if not notifications:
+        return
+    recipients = list(
+        get_user_model()
+        .objects.filter(pk__in={n.user_id for n in notifications}, is_active=True)
+        .exclude(email="")
+        .values_list("email", flat=True)
+    )
+    if not recipients:
+        return
+    notification = notifications[0]
+    site_url = (getattr(settings, "SITE_URL", "") or "").rstrip("/")
+    body = notification.message
+    if notification.action_url:
+        url = notification.action_url
+        if url.startswith("/") and site_url:
+            url = f"{site_url}{url}"
+        body = f"{body}\n\n{url}"
+    email = EmailMultiAlternatives(
+        subject=subject or notification.title,
+        body=body,
+        from_email=getattr(settings, "DEFAULT_FROM_EMAIL", None),
+        bcc=recipients,
+    )
+    try:
+        email.send(fail_silently=False)
+    except Exception:
+        logger.exception("Error sending notification email batch")
@@ -0,0 +1,138 @@
+"""
+Jugadores de órdenes y checkouts (OrderPlayer / CheckoutPlayer).
+
+Order.registered_player_ids y StripeEventCheckout.player_ids siguen siendo
+listas JSON que escriben los flujos de pago; al guardar se reflejan en las
+tablas de enlace (ver signals) y las consultas ("jugadores registrados en el
+evento", "órdenes de un jugador", duplicados al registrar) se hacen con joins
+indexados sobre ellas. El JSON queda como vista de compatibilidad: se
+muestra en solo lectura en el admin y no se usa para buscar.
+"""
+
+# Estados de orden que bloquean un nuevo registro del mismo jugador
+ACTIVE_ORDER_STATUSES = ("paid", "pending", "pending_registration")
+
+
+def clean_player_ids(raw_ids):
+    """Lista JSON de ids (int o str) -> set de ints, ignorando basura"""
+    player_ids = set()
+    for pid in raw_ids or []:
+        try:
+            player_ids.add(int(pid))
+        except (TypeError, ValueError):
+            continue
+    return player_ids
+
+
+def _sync_links(link_model, owner_field, owner_id, raw_ids):
+    from .models import Player
+
+    wanted = set(
+        Player.objects.filter(pk__in=clean_player_ids(raw_ids)).values_list(
+            "pk", flat=True
+        )
+    )
+    links = link_model.objects.filter(**{owner_field: owner_id})
+    current = set(links.values_list("player_id", flat=True))
+    if current - wanted:
+        links.filter(player_id__in=current - wanted).delete()
+    link_model.objects.bulk_create(
+        [
+            link_model(**{owner_field: owner_id, "player_id": player_id})
+            for player_id in wanted - current
+        ],
+        ignore_conflicts=True,
+    )
+
+
+def sync_order_players(order):
+    """Refleja order.registered_player_ids en OrderPlayer"""
+    from .models import OrderPlayer
+
+    _sync_links(OrderPlayer, "order_id", order.pk, order.registered_player_ids)
+
+
+def sync_checkout_players(checkout):
+    """Refleja checkout.player_ids en CheckoutPlayer"""
+    from .models import CheckoutPlayer
+
+    _sync_links(CheckoutPlayer, "checkout_id", checkout.pk, checkout.player_ids)
+
+
+def _backfill(owner_model, link_model, owner_field, json_field, batch_size):
+    from .models import Player
+
+    existing_players = set(Player.objects.values_list("pk", flat=True))
+    total = 0
+    batch = []
+    rows = owner_model.objects.order_by().values_list("pk", json_field)
+    for owner_id, raw_ids in rows.iterator(chunk_size=batch_size):
+        for player_id in clean_player_ids(raw_ids) & existing_players:
+            batch.append(link_model(**{owner_field: owner_id, "player_id": player_id}))
+        if len(batch) >= batch_size:
+            link_model.objects.bulk_create(batch, ignore_conflicts=True)
+            total += len(batch)
+            batch = []
+    link_model.objects.bulk_create(batch, ignore_conflicts=True)
+    return total + len(batch)
+
+
+def backfill_order_players(batch_size=1000):
+    """
+    Crea los enlaces de todas las órdenes y checkouts existentes.
+
+    Returns:
+        tuple: (enlaces de órdenes, enlaces de checkouts) procesados
+    """
+    from .models import CheckoutPlayer, Order, OrderPlayer, StripeEventCheckout
+
+    return (
+        _backfill(Order, OrderPlayer, "order_id", "registered_player_ids", batch_size),
+        _backfill(
+            StripeEventCheckout, CheckoutPlayer, "checkout_id", "player_ids", batch_size
+        ),
+    )
+
+
+def event_player_ids(event, order_statuses=("paid",), checkout_statuses=()):
+    """
+    Ids de jugadores incluidos en órdenes (y opcionalmente checkouts) del
+    evento con los estados indicados.
+    """
+    from .models import CheckoutPlayer, OrderPlayer
+
+    player_ids = set(
+        OrderPlayer.objects.filter(
+            order__event=event, order__status__in=order_statuses
+        ).values_list("player_id", flat=True)
+    )
+    if checkout_statuses:
+        player_ids.update(
+            CheckoutPlayer.objects.filter(
+                checkout__event=event, checkout__status__in=checkout_statuses
+            ).values_list("player_id", flat=True)
+        )
+    return player_ids
+
+
+def registered_player_ids(event, player_ids, order_statuses=ACTIVE_ORDER_STATUSES):
+    """
+    De ``player_ids``, los que ya tienen una orden del evento en
+    ``order_statuses`` (una consulta indexada por jugador y orden).
+    """
+    from .models import OrderPlayer
+
+    return set(
+        OrderPlayer.objects.filter(
+            player_id__in=list(player_ids),
+            order__event=event,
+            order__status__in=order_statuses,
+        ).values_list("player_id", flat=True)
+    )
+
+
+def orders_for_player(player):
+    """Órdenes que incluyen al jugador"""
+    from .models import Order
+
+    return Order.objects.filter(player_links__player=player)
@@ -0,0 +1,212 @@
+"""
+Directorio público de jugadores (PlayerDirectoryEntry).
+
+La tabla se reconstruye por jugador con un upsert en bloque cada vez que
+cambia algo que muestra el directorio (ver signals). Las listas de facetas
+(países, estados, ciudades y divisiones) se cachean con el tag
+"player_directory" y se invalidan en cada sincronización.
+
+El perfil público muestra los mismos datos, así que la sincronización también
+invalida el tag por jugador de su página cacheada (player_profile_tag).
+"""
+
+import unicodedata
+
+from django.db.models import Q
+from django.utils import timezone
+
+from apps.core.cache_tags import cached_fragment, invalidate_tags
+
+FACETS_TIMEOUT = 3600  # 1 hora (la invalidación es por señales)
+FACET_LIMIT = 100  # Limitar a 100 opciones por lista
+
+SYNCED_FIELDS = [
+    "slug",
+    "first_name",
+    "last_name",
+    "full_name",
+    "search_text",
+    "jersey_number",
+    "position",
+    "height",
+    "profile_picture",
+    "birth_date",
+    "team",
+    "team_name",
+    "division",
+    "division_name",
+    "country",
+    "state",
+    "city",
+    "is_active",
+    "updated_at",
+]
+
+
+def player_profile_tag(player_id):
+    """Tag de caché de la página pública de un jugador"""
+    return f"player_profile:{player_id}"
+
+
+def normalize_search_text(value):
+    """Minúsculas y sin acentos, para búsquedas con ``contains`` indexables"""
+    value = unicodedata.normalize("NFKD", value or "")
+    return "".join(ch for ch in value if not unicodedata.combining(ch)).lower()
+
+
+def _build_entry(player):
+    from .models import PlayerDirectoryEntry
+
+    user = player.user
+    profile = getattr(user, "profile", None)
+    team_name = player.team.name if player.team else ""
+    full_name = user.get_full_name() or user.username
+    return PlayerDirectoryEntry(
+        player=player,
+        slug=player.slug or "",
+        first_name=user.first_name,
+        last_name=user.last_name,
+        full_name=full_name,
+        search_text=normalize_search_text(
+            " ".join([user.first_name, user.last_name, user.email, team_name])
+        ),
+        jersey_number=player.jersey_number,
+        position=player.position,
+        height=player.height,
+        profile_picture=profile.profile_picture.name if profile else None,
+        birth_date=profile.birth_date if profile else None,
+        team_id=player.team_id,
+        team_name=team_name,
+        division_id=player.division_id,
+        division_name=player.division.name if player.division else "",
+        country_id=profile.country_id if profile else None,
+        state_id=profile.state_id if profile else None,
+        city_id=profile.city_id if profile else None,
+        is_active=player.is_active,
+        updated_at=timezone.now(),
+    )
+
+
+def sync_player_directory(player_ids=None, batch_size=500):
+    """
+    Reconstruye las entradas del directorio de ``player_ids`` (o de todos los
+    jugadores si es None) con un upsert en bloque.
+
+    Returns:
+        int: número de entradas escritas
+    """
+    from .models import Player
+
+    players = Player.objects.select_related("user", "user__profile", "team", "division")
+    if player_ids is not None:
+        player_ids = list(player_ids)
+        if not player_ids:
+            return 0
+        players = players.filter(pk__in=player_ids)
+
+    written = 0
+    batch = []
+    for player in players.iterator(chunk_size=batch_size):
+        batch.append(_build_entry(player))
+        if len(batch) >= batch_size:
+            written += _upsert(batch, batch_size)
+            batch = []
+    if batch:
+        written += _upsert(batch, batch_size)
+    return written
+
+
+def _upsert(entries, batch_size):
+    from .models import PlayerDirectoryEntry
+
+    PlayerDirectoryEntry.objects.bulk_create(
+        entries,
+        batch_size=batch_size,
+        update_conflicts=True,
+        unique_fields=["player"],
+        update_fields=SYNCED_FIELDS,
+    )
+    invalidate_tags(
+        "player_directory",
+        *(player_profile_tag(entry.player_id) for entry in entries),
+    )
+    return len(entries)
+
+
+def sync_player_directory_for(**lookup):
+    """Reconstruye las entradas de los jugadores que cumplan ``lookup``"""
+    from .models import Player
+
+    return sync_player_directory(
+        Player.objects.filter(**lookup).values_list("pk", flat=True)
+    )
+
+
+def search_player_directory(queryset, search):
+    """Filtra por nombre, email o equipo (``contains`` sobre texto normalizado)"""
+    terms = normalize_search_text(search).split()
+    condition = Q()
+    for term in terms[:5]:
+        condition &= Q(search_text__contains=term)
+    return queryset.filter(condition)
+
+
+def _build_location_facets():
+    from apps.events.models import Division
+    from apps.locations.models import City, Country, State
+
+    from .models import PlayerDirectoryEntry
+
+    rows = (
+        PlayerDirectoryEntry.objects.filter(is_active=True)
+        .exclude(country__isnull=True)
+        .values_list("country_id", "state_id", "city_id")
+        .distinct()
+    )
+    country_ids, states_by_country, cities_by_state = set(), {}, {}
+    for country_id, state_id, city_id in rows:
+        country_ids.add(country_id)
+        if state_id:
+            states_by_country.setdefault(country_id, set()).add(state_id)
+            if city_id:
+                cities_by_state.setdefault(state_id, set()).add(city_id)
+
+    state_ids = set().union(*states_by_country.values()) if states_by_country else set()
+    city_ids = set().union(*cities_by_state.values()) if cities_by_state else set()
+
+    def names(model, ids):
+        return list(
+            model.objects.filter(id__in=ids, is_active=True)
+            .order_by("name")
+            .values("id", "name")
+        )
+
+    state_names = names(State, state_ids)
+    city_names = names(City, city_ids)
+    return {
+        "countries": names(Country, country_ids)[:FACET_LIMIT],
+        "states": {
+            country_id: [s for s in state_names if s["id"] in ids][:FACET_LIMIT]
+            for country_id, ids in states_by_country.items()
+        },
+        "cities": {
+            state_id: [c for c in city_names if c["id"] in ids][:FACET_LIMIT]
+            for state_id, ids in cities_by_state.items()
+        },
+        "divisions": list(
+            Division.objects.filter(is_active=True).order_by("name").values("id", "name")
+        ),
+    }
+
+
+def get_directory_facets():
+    """
+    Listas {id, name} de países/estados/ciudades con jugadores activos y de
+    divisiones activas, cacheadas hasta el próximo cambio del directorio.
+    """
+    return cached_fragment(
+        "player_directory_facets",
+        ("player_directory", "division"),
+        _build_location_facets,
+        timeout=FACETS_TIMEOUT,
+    )
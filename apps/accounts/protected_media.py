@@ -0,0 +1,49 @@
+"""
+Archivos privados de cuentas servidos por apps.core.protected_media.
+"""
+
+from django.http import Http404
+from django.shortcuts import get_object_or_404
+from django.utils.translation import gettext_lazy as _
+
+from apps.core import protected_media
+
+from .models import Player, PlayerParent
+
+AGE_VERIFICATION = "age_verification"
+
+
+def can_view_age_verification_document(user, player):
+    """
+    Pueden verlo:
+    1. El dueño del jugador (padre o el propio jugador)
+    2. Staff / superusuario
+    3. El manager del equipo del jugador
+    """
+    if user.is_staff or user.is_superuser or player.user_id == user.pk:
+        return True
+    if player.team_id and player.team.manager_id == user.pk:
+        return True
+    return (
+        hasattr(user, "profile")
+        and user.profile.is_parent
+        and PlayerParent.objects.filter(parent=user, player=player).exists()
+    )
+
+
+def _get_player(player_id):
+    return get_object_or_404(Player.objects.select_related("team"), pk=player_id)
+
+
+def _get_document(player):
+    if not player.age_verification_document:
+        raise Http404(_("No document uploaded."))
+    return player.age_verification_document
+
+
+protected_media.register(
+    AGE_VERIFICATION,
+    get_object=_get_player,
+    get_file=_get_document,
+    has_permission=can_view_age_verification_document,
+)
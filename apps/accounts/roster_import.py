@@ -0,0 +1,494 @@
+"""
+Importación masiva del roster de un equipo (CSV o XLSX) por su manager.
+
+1. read_roster_file: filas del archivo como dicts con las columnas
+   normalizadas (acepta encabezados en español o inglés).
+2. validate_roster_rows: valida todas las filas antes de escribir nada
+   (campos requeridos, fechas, opciones, emails y números de jersey
+   duplicados contra la base y dentro del archivo). Los catálogos y los
+   existentes se leen con una consulta cada uno, no una por fila.
+3. import_roster: en una sola transacción asigna usernames y slugs únicos
+   (una consulta cada uno, ver usernames.py) y crea usuarios, perfiles,
+   jugadores, padres y vínculos padre-jugador con bulk_create.
+
+bulk_create no dispara señales: al terminar se sincroniza el directorio
+público, se invalidan los fragmentos cacheados y se envía una sola
+notificación de resumen al staff en lugar de una por jugador y usuario.
+"""
+
+import csv
+import io
+import re
+import unicodedata
+import zipfile
+from datetime import date, datetime, timedelta
+from xml.etree import ElementTree
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import transaction
+from django.db.models.functions import Lower
+from django.urls import reverse
+from django.utils.text import slugify
+
+from apps.core.cache_tags import invalidate_tags
+
+from .usernames import allocate_player_slugs, allocate_usernames, username_base
+
+MAX_ROWS = 500
+MAX_FILE_SIZE = 2 * 1024 * 1024
+REQUIRED_COLUMNS = ("first_name", "last_name")
+
+# Encabezado normalizado -> campo
+COLUMN_ALIASES = {
+    "first_name": "first_name",
+    "nombre": "first_name",
+    "last_name": "last_name",
+    "apellido": "last_name",
+    "apellido_paterno": "last_name",
+    "last_name2": "last_name2",
+    "segundo_apellido": "last_name2",
+    "apellido_materno": "last_name2",
+    "email": "email",
+    "correo": "email",
+    "birth_date": "birth_date",
+    "fecha_de_nacimiento": "birth_date",
+    "fecha_nacimiento": "birth_date",
+    "phone": "phone",
+    "telefono": "phone",
+    "jersey_number": "jersey_number",
+    "jersey": "jersey_number",
+    "numero": "jersey_number",
+    "position": "position",
+    "posicion": "position",
+    "grade": "grade",
+    "grado": "grade",
+    "division": "division",
+    "parent_email": "parent_email",
+    "email_padre": "parent_email",
+    "email_tutor": "parent_email",
+    "parent_first_name": "parent_first_name",
+    "nombre_padre": "parent_first_name",
+    "parent_last_name": "parent_last_name",
+    "apellido_padre": "parent_last_name",
+}
+
+DATE_FORMATS = ("%Y-%m-%d", "%d/%m/%Y", "%m/%d/%Y", "%d-%m-%Y")
+EXCEL_EPOCH = date(1899, 12, 30)
+
+
+class RosterImportError(Exception):
+    """El archivo no se puede leer (formato, tamaño, encabezados)"""
+
+
+def _normalize_header(header):
+    header = unicodedata.normalize("NFKD", str(header or "")).encode("ascii", "ignore")
+    header = re.sub(r"[^a-z0-9]+", "_", header.decode().strip().lower()).strip("_")
+    return COLUMN_ALIASES.get(header)
+
+
+# ===== Lectura =====
+
+
+def _csv_rows(data):
+    try:
+        text = data.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        text = data.decode("latin-1")
+    try:
+        dialect = csv.Sniffer().sniff(text[:4096], delimiters=",;\t")
+    except csv.Error:
+        dialect = csv.excel
+    return list(csv.reader(io.StringIO(text), dialect))
+
+
+_SHEET_NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+
+
+MAX_XLSX_COLUMNS = 16384  # XFD, la última columna de Excel
+
+
+def _column_index(reference):
+    """Índice (desde 0) de la columna de una referencia "B12" (ValueError si no)"""
+    match = re.match(r"[A-Z]{1,3}(?=\d)", reference)
+    if not match:
+        raise ValueError(reference)
+    index = 0
+    for char in match.group():
+        index = index * 26 + ord(char) - 64
+    if index > MAX_XLSX_COLUMNS:
+        raise ValueError(reference)
+    return index - 1
+
+
+def _shared_string(shared, raw):
+    index = int(raw)
+    if not 0 <= index < len(shared):
+        raise ValueError(raw)
+    return shared[index]
+
+
+def _xlsx_rows(data):
+    """Primera hoja de un XLSX (texto compartido, inline y números)"""
+    try:
+        archive = zipfile.ZipFile(io.BytesIO(data))
+        shared = []
+        if "xl/sharedStrings.xml" in archive.namelist():
+            root = ElementTree.fromstring(archive.read("xl/sharedStrings.xml"))
+            for item in root.iter(f"{_SHEET_NS}si"):
+                shared.append("".join(t.text or "" for t in item.iter(f"{_SHEET_NS}t")))
+        sheets = sorted(
+            name
+            for name in archive.namelist()
+            if name.startswith("xl/worksheets/sheet") and name.endswith(".xml")
+        )
+        sheet = ElementTree.fromstring(archive.read(sheets[0]))
+    except (zipfile.BadZipFile, KeyError, IndexError, ElementTree.ParseError):
+        raise RosterImportError("El archivo XLSX no es válido.")
+
+    rows = []
+    try:
+        for row in sheet.iter(f"{_SHEET_NS}row"):
+            values = []
+            for position, cell in enumerate(row.iter(f"{_SHEET_NS}c")):
+                reference = cell.get("r")
+                index = _column_index(reference) if reference else position
+                cell_type = cell.get("t")
+                if cell_type == "inlineStr":
+                    value = "".join(t.text or "" for t in cell.iter(f"{_SHEET_NS}t"))
+                else:
+                    raw = cell.findtext(f"{_SHEET_NS}v") or ""
+                    if cell_type == "s" and raw:
+                        value = _shared_string(shared, raw)
+                    else:
+                        value = raw
+                values.extend([""] * (index + 1 - len(values)))
+                values[index] = value
+            rows.append(values)
+    except ValueError:
+        # Referencia de celda o índice de texto compartido no válidos
+        raise RosterImportError("El archivo XLSX no es válido.")
+    return rows
+
+
+def read_roster_file(uploaded_file):
+    """
+    Filas del archivo como dicts {campo: texto}.
+
+    Raises:
+        RosterImportError: formato, tamaño o encabezados no válidos
+    """
+    if uploaded_file.size > MAX_FILE_SIZE:
+        raise RosterImportError("El archivo no puede superar 2 MB.")
+    data = uploaded_file.read()
+    name = (uploaded_file.name or "").lower()
+    if name.endswith(".xlsx"):
+        rows = _xlsx_rows(data)
+    elif name.endswith(".csv"):
+        rows = _csv_rows(data)
+    else:
+        raise RosterImportError("Sube un archivo .csv o .xlsx.")
+
+    rows = [row for row in rows if any(str(value).strip() for value in row)]
+    if not rows:
+        raise RosterImportError("El archivo está vacío.")
+    fields = [_normalize_header(header) for header in rows[0]]
+    missing = [column for column in REQUIRED_COLUMNS if column not in fields]
+    if missing:
+        raise RosterImportError(
+            "Faltan columnas requeridas: " + ", ".join(missing) + "."
+        )
+    if len(rows) - 1 > MAX_ROWS:
+        raise RosterImportError(f"Máximo {MAX_ROWS} jugadores por archivo.")
+
+    records = []
+    for row in rows[1:]:
+        record = {}
+        for field, value in zip(fields, row):
+            if field:
+                record[field] = str(value).strip()
+        records.append(record)
+    return records
+
+
+# ===== Validación =====
+
+
+def _parse_date(value):
+    if not value:
+        return None
+    if re.fullmatch(r"\d+(\.0+)?", value):
+        # Fecha serial de Excel (fuera de rango: ValueError como las demás)
+        try:
+            return EXCEL_EPOCH + timedelta(days=int(float(value)))
+        except OverflowError:
+            raise ValueError(value)
+    for date_format in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, date_format).date()
+        except ValueError:
+            continue
+    raise ValueError
+
+
+def _choice_lookup(choices):
+    """valor o etiqueta (sin mayúsculas) -> valor"""
+    lookup = {}
+    for value, label in choices:
+        lookup[str(value).lower()] = value
+        lookup[str(label).lower()] = value
+    return lookup
+
+
+class RosterRow:
+    def __init__(self, number, data):
+        self.number = number
+        self.data = data
+        self.errors = []
+        self.cleaned = {}
+
+
+def validate_roster_rows(records, team):
+    """
+    Valida todas las filas; retorna la lista de RosterRow (con ``errors``
+    por fila y ``cleaned`` listos para crear).
+    """
+    from apps.events.models import Division
+
+    from .models import Player
+
+    rows = [RosterRow(number, data) for number, data in enumerate(records, start=2)]
+    positions = _choice_lookup(Player.POSITION_CHOICES)
+    grades = _choice_lookup(Player.GRADE_CHOICES)
+    divisions = {
+        name.lower(): pk
+        for pk, name in Division.objects.filter(is_active=True).values_list("pk", "name")
+    }
+
+    emails = {row.data.get("email", "").lower() for row in rows} - {""}
+    parent_emails = {row.data.get("parent_email", "").lower() for row in rows} - {""}
+    existing_users = {
+        email: (pk, user_type)
+        for pk, email, user_type in User.objects.annotate(email_lower=Lower("email"))
+        .filter(email_lower__in=emails | parent_emails)
+        .values_list("pk", "email_lower", "profile__user_type")
+    }
+    taken_jerseys = set(
+        Player.objects.filter(team=team, jersey_number__isnull=False).values_list(
+            "jersey_number", flat=True
+        )
+    )
+
+    seen_emails = set()
+    for row in rows:
+        data, cleaned = row.data, row.cleaned
+        for field in REQUIRED_COLUMNS:
+            cleaned[field] = data.get(field, "")
+            if not cleaned[field]:
+                row.errors.append(f"{field}: campo requerido.")
+        cleaned["last_name2"] = data.get("last_name2", "")
+        cleaned["phone"] = data.get("phone", "")[:20]
+
+        email = data.get("email", "").lower()
+        if email:
+            try:
+                validate_email(email)
+            except ValidationError:
+                row.errors.append(f"email: '{email}' no es válido.")
+            if email in existing_users:
+                row.errors.append(f"email: '{email}' ya está registrado.")
+            if email in seen_emails:
+                row.errors.append(f"email: '{email}' está repetido en el archivo.")
+            seen_emails.add(email)
+        cleaned["email"] = email
+
+        try:
+            cleaned["birth_date"] = _parse_date(data.get("birth_date", ""))
+        except ValueError:
+            row.errors.append("birth_date: usa el formato AAAA-MM-DD.")
+
+        jersey = data.get("jersey_number", "")
+        cleaned["jersey_number"] = None
+        if jersey:
+            try:
+                cleaned["jersey_number"] = int(float(jersey))
+                if cleaned["jersey_number"] < 0:
+                    raise ValueError
+            except ValueError:
+                row.errors.append(f"jersey_number: '{jersey}' no es un número.")
+            else:
+                if cleaned["jersey_number"] in taken_jerseys:
+                    row.errors.append(
+                        f"jersey_number: el {cleaned['jersey_number']} ya está en uso en el equipo."
+                    )
+                taken_jerseys.add(cleaned["jersey_number"])
+
+        for field, lookup in (("position", positions), ("grade", grades)):
+            value = data.get(field, "")
+            cleaned[field] = lookup.get(value.lower(), "") if value else ""
+            if value and not cleaned[field]:
+                row.errors.append(f"{field}: '{value}' no es una opción válida.")
+
+        division = data.get("division", "")
+        cleaned["division_id"] = divisions.get(division.lower()) if division else None
+        if division and not cleaned["division_id"]:
+            row.errors.append(f"division: '{division}' no existe.")
+
+        parent_email = data.get("parent_email", "").lower()
+        cleaned["parent_email"] = parent_email
+        cleaned["parent_id"] = None
+        if parent_email:
+            try:
+                validate_email(parent_email)
+            except ValidationError:
+                row.errors.append(f"parent_email: '{parent_email}' no es válido.")
+            existing = existing_users.get(parent_email)
+            if existing:
+                # Solo se vinculan cuentas con perfil de padre/tutor
+                if existing[1] != "parent":
+                    row.errors.append(
+                        f"parent_email: '{parent_email}' no es una cuenta de padre/tutor."
+                    )
+                cleaned["parent_id"] = existing[0]
+        cleaned["parent_first_name"] = data.get("parent_first_name", "")
+        cleaned["parent_last_name"] = data.get("parent_last_name", "")
+    return rows
+
+
+# ===== Creación =====
+
+
+def _full_last_name(cleaned):
+    return " ".join(filter(None, [cleaned["last_name"], cleaned["last_name2"]]))
+
+
+@transaction.atomic
+def _create(rows, team):
+    from .models import Player, PlayerParent, UserProfile
+
+    unusable_password = make_password(None)
+    cleaned_rows = [row.cleaned for row in rows]
+
+    # Padres nuevos (uno por email, aunque tengan varios jugadores)
+    new_parents = {}
+    for cleaned in cleaned_rows:
+        email = cleaned["parent_email"]
+        if email and not cleaned["parent_id"] and email not in new_parents:
+            new_parents[email] = cleaned
+
+    usernames = allocate_usernames(
+        [
+            username_base(c["first_name"], c["last_name"], c["last_name2"])
+            for c in cleaned_rows
+        ]
+        + [
+            username_base(c["parent_first_name"] or email.split("@")[0], c["parent_last_name"])
+            for email, c in new_parents.items()
+        ]
+    )
+
+    users = [
+        User(
+            username=username,
+            email=cleaned["email"],
+            first_name=cleaned["first_name"][:150],
+            last_name=_full_last_name(cleaned)[:150],
+            password=unusable_password,
+        )
+        for username, cleaned in zip(usernames, cleaned_rows)
+    ]
+    parent_users = [
+        User(
+            username=username,
+            email=email,
+            first_name=cleaned["parent_first_name"][:150],
+            last_name=cleaned["parent_last_name"][:150],
+            password=unusable_password,
+        )
+        for username, (email, cleaned) in zip(
+            usernames[len(cleaned_rows) :], new_parents.items()
+        )
+    ]
+    User.objects.bulk_create(users + parent_users)
+
+    UserProfile.objects.bulk_create(
+        [
+            UserProfile(
+                user=user,
+                user_type="player",
+                phone=cleaned["phone"],
+                birth_date=cleaned["birth_date"],
+                last_name2=cleaned["last_name2"],
+            )
+            for user, cleaned in zip(users, cleaned_rows)
+        ]
+        + [UserProfile(user=user, user_type="parent") for user in parent_users]
+    )
+
+    slugs = allocate_player_slugs(
+        [slugify(f"{c['first_name']} {_full_last_name(c)}") for c in cleaned_rows]
+    )
+    players = Player.objects.bulk_create(
+        [
+            Player(
+                user=user,
+                team=team,
+                slug=slug,
+                jersey_number=cleaned["jersey_number"],
+                position=cleaned["position"],
+                grade=cleaned["grade"],
+                division_id=cleaned["division_id"],
+            )
+            for user, slug, cleaned in zip(users, slugs, cleaned_rows)
+        ]
+    )
+
+    parent_ids = {user.email: user.pk for user in parent_users}
+    PlayerParent.objects.bulk_create(
+        [
+            PlayerParent(
+                parent_id=cleaned["parent_id"] or parent_ids[cleaned["parent_email"]],
+                player=player,
+                is_primary=True,
+            )
+            for player, cleaned in zip(players, cleaned_rows)
+            if cleaned["parent_email"]
+        ],
+        ignore_conflicts=True,
+    )
+    return players, parent_users
+
+
+def _notify_staff(players, team, manager):
+    from .notifications import notify_users, staff_audience
+
+    manager_name = manager.get_full_name() or manager.username
+    notify_users(
+        staff_audience(),
+        title="Roster importado",
+        message=f"{manager_name} registró {len(players)} jugadores en {team.name}.",
+        notification_type="registration",
+        action_url=reverse("accounts:team_detail", args=[team.pk]),
+        dedupe_key=f"roster_import:{players[0].pk}",
+    )
+
+
+def import_roster(rows, team, manager):
+    """
+    Crea los jugadores de ``rows`` ya validadas (sin errores) en ``team``.
+
+    Returns:
+        dict: {"players": n, "parents": n}
+    """
+    from .player_directory import sync_player_directory
+
+    if not rows:
+        return {"players": 0, "parents": 0}
+    players, parent_users = _create(rows, team)
+    player_ids = [player.pk for player in players]
+    transaction.on_commit(lambda: sync_player_directory(player_ids))
+    invalidate_tags("player", "team")
+    _notify_staff(players, team, manager)
+    return {"players": len(players), "parents": len(parent_users)}
@@ -2,19 +2,46 @@
 Señales para generar notificaciones automáticas
 """
 
-import json
 import logging
 from email.utils import formataddr, parseaddr
 
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.core.mail import EmailMultiAlternatives
-from django.db.models.signals import post_save, pre_save
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
 from django.template.loader import render_to_string
 from django.urls import reverse
 
-from .models import Notification, Order, Player, PlayerParent, PushSubscription
+from apps.core.cache_tags import invalidate_tags
+from apps.core.protected_media import forget_permission, forget_user_permissions
+from apps.events.capacity import release_checkout_seats
+from apps.events.models import Division
+from apps.events.roster import invalidate_event_roster
+
+from .models import (
+    HomeBanner,
+    Notification,
+    Order,
+    Player,
+    PlayerDirectoryEntry,
+    PlayerParent,
+    SiteSettings,
+    Sponsor,
+    StripeEventCheckout,
+    Team,
+    UserProfile,
+)
+from .notifications import (
+    adjust_unread_count,
+    notify_users,
+    publish_notification,
+    send_web_push,
+    staff_audience,
+)
+from .order_players import sync_checkout_players, sync_order_players
+from .player_directory import sync_player_directory, sync_player_directory_for
+from .protected_media import AGE_VERIFICATION
 
 logger = logging.getLogger(__name__)
 
@@ -317,8 +344,6 @@ def create_player_created_staff_notification(sender, instance, created, **kwargs
     try:
         if not created:
             return
-        User = get_user_model()
-        staff_users = User.objects.filter(is_active=True, is_staff=True)
         player_user = getattr(instance, "user", None)
         player_name = ""
         if player_user:
@@ -331,14 +356,13 @@ def create_player_created_staff_notification(sender, instance, created, **kwargs
             action_url = reverse("accounts:player_detail", args=[instance.pk])
         except Exception:
             action_url = ""
-        for staff in staff_users.iterator():
-            Notification.create_notification(
-                user=staff,
-                title=title,
-                message=message,
-                notification_type="registration",
-                action_url=action_url or None,
-            )
+        notify_users(
+            staff_audience(),
+            title=title,
+            message=message,
+            notification_type="registration",
+            action_url=action_url or None,
+        )
     except Exception:
         logger.exception("Error creating staff notification for new player")
 
@@ -351,10 +375,13 @@ def track_player_age_verification_status_before_save(sender, instance, **kwargs)
             instance._previous_age_verification_status = (
                 old_instance.age_verification_status
             )
+            instance._previous_team_id = old_instance.team_id
         except Player.DoesNotExist:
             instance._previous_age_verification_status = None
+            instance._previous_team_id = None
     else:
         instance._previous_age_verification_status = None
+        instance._previous_team_id = None
 
 
 @receiver(post_save, sender=Player)
@@ -475,8 +502,6 @@ def create_user_registered_staff_notification(sender, instance, created, **kwarg
     try:
         if not created:
             return
-        User = get_user_model()
-        staff_users = User.objects.filter(is_active=True, is_staff=True)
         full_name = (instance.get_full_name() or instance.username or "").strip()
         email = (getattr(instance, "email", "") or "").strip()
         title = "Usuario nuevo registrado"
@@ -487,14 +512,13 @@ def create_user_registered_staff_notification(sender, instance, created, **kwarg
             action_url = reverse("accounts:user_list")
         except Exception:
             action_url = ""
-        for staff in staff_users.iterator():
-            Notification.create_notification(
-                user=staff,
-                title=title,
-                message=message,
-                notification_type="registration",
-                action_url=action_url or None,
-            )
+        notify_users(
+            staff_audience(),
+            title=title,
+            message=message,
+            notification_type="registration",
+            action_url=action_url or None,
+        )
     except Exception:
         logger.exception("Error creating staff notification for new user")
 
@@ -502,52 +526,214 @@ def create_user_registered_staff_notification(sender, instance, created, **kwarg
 @receiver(post_save, sender=Notification)
 def send_web_push_for_staff_notifications(sender, instance, created, **kwargs):
     try:
-        if not created:
-            return
-        user = getattr(instance, "user", None)
-        if not user or not getattr(user, "is_staff", False):
-            return
+        if created:
+            send_web_push([instance])
+    except Exception:
+        logger.exception("Error sending web push notification")
 
-        vapid_private = getattr(settings, "VAPID_PRIVATE_KEY", "") or ""
-        vapid_sub = getattr(settings, "VAPID_ADMIN_EMAIL", "") or ""
-        if not vapid_private or not vapid_sub:
-            return
 
-        try:
-            from pywebpush import webpush
-        except Exception:
-            return
+# Tags de caché (apps.core.cache_tags) que invalida cada modelo al guardarse
+CACHE_TAGS_BY_MODEL = {
+    Team: ("team",),
+    Player: ("player",),
+    HomeBanner: ("home_banner",),
+    SiteSettings: ("site_settings",),
+    Sponsor: ("sponsor",),
+}
 
-        url = instance.action_url or "/panel/"
-        payload = {
-            "title": instance.title or "Notificación",
-            "body": instance.message or "",
-            "url": url,
-        }
 
-        for sub in PushSubscription.objects.filter(
-            user=user, is_active=True
-        ).iterator():
-            subscription_info = {
-                "endpoint": sub.endpoint,
-                "keys": {
-                    "p256dh": sub.p256dh,
-                    "auth": sub.auth,
-                },
-            }
-            try:
-                webpush(
-                    subscription_info=subscription_info,
-                    data=json.dumps(payload),
-                    vapid_private_key=vapid_private,
-                    vapid_claims={"sub": vapid_sub},
-                )
-            except Exception:
-                # Do not break flow; mark subscription inactive if it fails.
-                try:
-                    sub.is_active = False
-                    sub.save(update_fields=["is_active", "updated_at"])
-                except Exception:
-                    pass
-    except Exception:
-        logger.exception("Error sending web push notification")
+@receiver(post_save, sender=Team)
+@receiver(post_delete, sender=Team)
+@receiver(post_save, sender=Player)
+@receiver(post_delete, sender=Player)
+@receiver(post_save, sender=HomeBanner)
+@receiver(post_delete, sender=HomeBanner)
+@receiver(post_save, sender=SiteSettings)
+@receiver(post_delete, sender=SiteSettings)
+@receiver(post_save, sender=Sponsor)
+@receiver(post_delete, sender=Sponsor)
+def invalidate_cache_tags(sender, instance, **kwargs):
+    """Invalida los fragmentos cacheados (home público, etc.) del modelo"""
+    invalidate_tags(*CACHE_TAGS_BY_MODEL[sender])
+
+
+# Directorio público de jugadores (PlayerDirectoryEntry)
+
+
+@receiver(post_save, sender=Player)
+def sync_player_directory_on_player_save(sender, instance, **kwargs):
+    sync_player_directory([instance.pk])
+
+
+@receiver(post_delete, sender=Player)
+def sync_player_directory_on_player_delete(sender, instance, **kwargs):
+    # La entrada se elimina en cascada; solo invalidar las facetas
+    invalidate_tags("player_directory")
+
+
+@receiver(post_save, sender=get_user_model())
+def sync_player_directory_on_user_save(sender, instance, created, **kwargs):
+    update_fields = kwargs.get("update_fields")
+    if created or (update_fields and set(update_fields) <= {"last_login"}):
+        return
+    sync_player_directory_for(user=instance)
+
+
+@receiver(post_save, sender=UserProfile)
+def sync_player_directory_on_profile_save(sender, instance, **kwargs):
+    sync_player_directory_for(user_id=instance.user_id)
+
+
+@receiver(post_save, sender=Team)
+def sync_player_directory_on_team_save(sender, instance, created, **kwargs):
+    if not created:
+        sync_player_directory_for(team=instance)
+
+
+@receiver(post_delete, sender=Team)
+def sync_player_directory_on_team_delete(sender, instance, **kwargs):
+    # Player.team y la entrada quedan en NULL; limpiar el nombre del equipo
+    sync_player_directory(
+        PlayerDirectoryEntry.objects.filter(team__isnull=True)
+        .exclude(team_name="")
+        .values_list("player_id", flat=True)
+    )
+
+
+@receiver(post_save, sender=Division)
+def sync_player_directory_on_division_save(sender, instance, created, **kwargs):
+    invalidate_tags("division")
+    if not created:
+        sync_player_directory_for(division=instance)
+
+
+@receiver(post_delete, sender=Division)
+def sync_player_directory_on_division_delete(sender, instance, **kwargs):
+    invalidate_tags("division")
+    sync_player_directory(
+        PlayerDirectoryEntry.objects.filter(division__isnull=True)
+        .exclude(division_name="")
+        .values_list("player_id", flat=True)
+    )
+
+
+@receiver(post_save, sender=StripeEventCheckout)
+def release_seats_on_checkout_cancel(sender, instance, **kwargs):
+    """Un checkout cancelado o expirado libera los cupos pending que reservó"""
+    update_fields = kwargs.get("update_fields")
+    if update_fields is not None and "status" not in update_fields:
+        return
+    if instance.status in ("cancelled", "expired") and instance.player_ids:
+        release_checkout_seats(instance)
+
+
+@receiver(post_save, sender=Order)
+def sync_order_players_on_save(sender, instance, **kwargs):
+    update_fields = kwargs.get("update_fields")
+    if update_fields is None or "registered_player_ids" in update_fields:
+        sync_order_players(instance)
+
+
+@receiver(post_save, sender=StripeEventCheckout)
+def sync_checkout_players_on_save(sender, instance, **kwargs):
+    update_fields = kwargs.get("update_fields")
+    if update_fields is None or "player_ids" in update_fields:
+        sync_checkout_players(instance)
+
+
+@receiver(post_save, sender=Notification)
+def publish_new_notification(sender, instance, created, **kwargs):
+    if created:
+        if not instance.read:
+            adjust_unread_count(instance.user_id, 1)
+        publish_notification(instance)
+
+
+@receiver(post_delete, sender=Notification)
+def update_unread_count_on_notification_delete(sender, instance, **kwargs):
+    if not instance.read:
+        adjust_unread_count(instance.user_id, -1)
+
+
+@receiver(post_save, sender=PlayerParent)
+@receiver(post_delete, sender=PlayerParent)
+def forget_document_permission_on_parent_change(sender, instance, **kwargs):
+    """El permiso cacheado del padre sobre los documentos del jugador cambia"""
+    forget_permission(AGE_VERIFICATION, instance.parent_id, instance.player_id)
+
+
+@receiver(post_save, sender=Player)
+def forget_document_permission_on_team_change(sender, instance, created, **kwargs):
+    """Los managers del equipo anterior y del nuevo cambian de permiso"""
+    previous_team_id = getattr(instance, "_previous_team_id", None)
+    if created or previous_team_id == instance.team_id:
+        return
+    team_ids = [pk for pk in (previous_team_id, instance.team_id) if pk]
+    for manager_id in Team.objects.filter(pk__in=team_ids).values_list(
+        "manager_id", flat=True
+    ):
+        forget_permission(AGE_VERIFICATION, manager_id, instance.pk)
+
+
+@receiver(pre_save, sender=Team)
+def track_team_manager_before_save(sender, instance, **kwargs):
+    instance._previous_manager_id = (
+        Team.objects.filter(pk=instance.pk).values_list("manager_id", flat=True).first()
+        if instance.pk
+        else None
+    )
+
+
+@receiver(post_save, sender=Team)
+def forget_document_permissions_on_manager_change(sender, instance, created, **kwargs):
+    """El manager anterior y el nuevo cambian de permiso sobre los jugadores"""
+    previous_manager_id = getattr(instance, "_previous_manager_id", None)
+    if not created and previous_manager_id != instance.manager_id:
+        forget_user_permissions(previous_manager_id, instance.manager_id)
+
+
+@receiver(post_delete, sender=Team)
+def forget_document_permissions_on_team_delete(sender, instance, **kwargs):
+    forget_user_permissions(instance.manager_id)
+
+
+@receiver(pre_save, sender=get_user_model())
+def track_user_staff_flags_before_save(sender, instance, **kwargs):
+    update_fields = kwargs.get("update_fields")
+    if not instance.pk or (update_fields and set(update_fields) <= {"last_login"}):
+        instance._previous_staff_flags = None
+        return
+    instance._previous_staff_flags = (
+        sender.objects.filter(pk=instance.pk)
+        .values_list("is_staff", "is_superuser")
+        .first()
+    )
+
+
+@receiver(post_save, sender=get_user_model())
+def forget_permissions_on_staff_change(sender, instance, created, **kwargs):
+    """Staff / superusuario ven todos los documentos: el permiso cacheado cambia"""
+    previous = getattr(instance, "_previous_staff_flags", None)
+    if previous is not None and previous != (instance.is_staff, instance.is_superuser):
+        forget_user_permissions(instance.pk)
+
+
+# Roster de eventos (apps.events.roster)
+
+
+@receiver(post_save, sender=Order)
+@receiver(post_delete, sender=Order)
+@receiver(post_save, sender=StripeEventCheckout)
+@receiver(post_delete, sender=StripeEventCheckout)
+def invalidate_roster_on_registration_change(sender, instance, **kwargs):
+    if instance.event_id:
+        invalidate_event_roster(instance.event_id)
+
+
+@receiver(post_save, sender=Player)
+@receiver(post_delete, sender=Player)
+@receiver(post_save, sender=PlayerParent)
+@receiver(post_delete, sender=PlayerParent)
+def invalidate_rosters_on_player_change(sender, instance, **kwargs):
+    """División, equipo o padre principal aparecen en todos los rosters"""
+    invalidate_event_roster()
@@ -0,0 +1,140 @@
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.accounts.models import Order
+from apps.core.admin_lists import KeysetPaginator, decode_cursor
+
+
+class KeysetPaginatorTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="buyer", password="pass")
+        now = timezone.now()
+        for i in range(7):
+            order = Order.objects.create(
+                user=self.user, order_number=f"ORD-{i}", total_amount=i
+            )
+            # Two orders per timestamp to exercise the pk tiebreaker
+            Order.objects.filter(pk=order.pk).update(
+                created_at=now - timedelta(hours=i // 2),
+                paid_at=now - timedelta(hours=i) if i % 3 else None,
+            )
+        self.expected = list(Order.objects.order_by("-created_at", "-pk"))
+
+    def _paginator(self, ordering=("-created_at",)):
+        return KeysetPaginator(Order.objects.all(), 3, ordering)
+
+    def test_walks_forward_and_back_through_cursors(self):
+        paginator = self._paginator()
+        first = paginator.page("1")
+        self.assertEqual(list(first), self.expected[:3])
+        self.assertFalse(first.has_previous())
+        self.assertTrue(first.has_next())
+
+        second = paginator.page(first.next_page_number())
+        self.assertEqual(list(second), self.expected[3:6])
+        self.assertEqual(second.number, 2)
+        self.assertEqual(second.start_index(), 4)
+
+        third = paginator.page(second.next_page_number())
+        self.assertEqual(list(third), self.expected[6:])
+        self.assertFalse(third.has_next())
+
+        back = paginator.page(third.previous_page_number())
+        self.assertEqual(list(back), self.expected[3:6])
+        self.assertTrue(back.has_previous())
+        self.assertEqual(list(paginator.page(back.previous_page_number())), self.expected[:3])
+
+    def test_last_page_and_legacy_page_numbers(self):
+        paginator = self._paginator()
+        last = paginator.page("last")
+        self.assertEqual(list(last), self.expected[-3:])
+        self.assertFalse(last.has_next())
+        self.assertEqual(paginator.num_pages, 3)
+        self.assertEqual(list(paginator.page("2")), self.expected[3:6])
+        self.assertEqual(list(paginator.page("garbage")), self.expected[:3])
+        self.assertIsNone(decode_cursor("a.not-base64!"))
+
+    def test_nullable_sort_field_keeps_nulls_last(self):
+        paginator = self._paginator(("-paid_at",))
+        rows = []
+        page = paginator.page("1")
+        rows.extend(page)
+        while page.has_next():
+            page = paginator.page(page.next_page_number())
+            rows.extend(page)
+        self.assertEqual(len(rows), 7)
+        self.assertEqual(len({row.pk for row in rows}), 7)
+        paid = [row.paid_at for row in rows if row.paid_at]
+        self.assertEqual(paid, sorted(paid, reverse=True))
+        self.assertTrue(all(row.paid_at is None for row in rows[len(paid):]))
+
+
+class AdminOrderListViewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.staff = User.objects.create_user(
+            username="staff", password="pass", is_staff=True
+        )
+        for i in range(30):
+            Order.objects.create(
+                user=self.staff,
+                order_number=f"ORD-{i:03d}",
+                status="paid" if i % 2 else "pending",
+                total_amount=i,
+            )
+        self.client.force_login(self.staff)
+        self.url = reverse("accounts:admin_order_list")
+
+    def test_unknown_sort_falls_back_to_default(self):
+        response = self.client.get(self.url, {"sort": "user__password"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["sort"], "-created_at")
+
+    def test_sort_and_status_filter(self):
+        response = self.client.get(self.url, {"sort": "total_amount", "status": "paid"})
+        orders = list(response.context["orders"])
+        self.assertEqual(len(orders), 15)
+        self.assertTrue(all(order.status == "paid" for order in orders))
+        amounts = [order.total_amount for order in orders]
+        self.assertEqual(amounts, sorted(amounts))
+
+    def test_stats_come_from_a_single_aggregate(self):
+        Order.objects.create(
+            user=self.staff,
+            order_number="ORD-PLAN",
+            status="pending_registration",
+            payment_mode="payment_plan",
+        )
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+        context = response.context
+        self.assertEqual(context["total_orders"], 31)
+        self.assertEqual(context["paid_orders"], 15)
+        self.assertEqual(context["total_revenue"], sum(range(1, 30, 2)))
+        self.assertEqual(context["payment_plans"], 1)
+        self.assertEqual(context["pending_registration_orders"], 1)
+        stats = [q["sql"] for q in queries.captured_queries if "SUM(" in q["sql"]]
+        self.assertEqual(len(stats), 1)
+
+    def test_deep_page_costs_the_same_queries(self):
+        first = self.client.get(self.url)
+        cursor = first.context["page_obj"].next_page_number()
+        with CaptureQueriesContext(connection) as shallow:
+            self.client.get(self.url)
+        with CaptureQueriesContext(connection) as deep:
+            response = self.client.get(self.url, {"page": cursor})
+        self.assertEqual(len(response.context["orders"]), 5)
+
+        def order_queries(context):
+            return [q["sql"] for q in context.captured_queries if "accounts_order" in q["sql"]]
+
+        self.assertEqual(len(order_queries(shallow)), len(order_queries(deep)))
+        self.assertFalse(any("OFFSET" in sql for sql in order_queries(deep)))
@@ -0,0 +1,37 @@
+from django.core.cache import cache
+from django.test import TestCase
+
+from apps.accounts.models import Order, Player
+from apps.core.benchmarks import runner
+from apps.core.benchmarks.factories import build_dataset
+from apps.events.models import EventCapacity
+
+
+class BenchmarkSuiteTests(TestCase):
+    """Keeps the benchmark factories and scenarios runnable at a tiny scale"""
+
+    def setUp(self):
+        cache.clear()
+
+    def test_dataset_and_scenarios_run(self):
+        data = build_dataset(scale=0.005)
+        self.assertEqual(Player.objects.count(), len(data.parents) * 2)
+        self.assertEqual(Order.objects.count(), data.counts["orders"])
+        self.assertTrue(EventCapacity.objects.filter(event=data.checkout_event).exists())
+
+        results = runner.run_benchmarks(data, iterations=2, warmup=0)
+        self.assertEqual(set(results), set(runner.SCENARIOS))
+        for name, result in results.items():
+            self.assertEqual(result["statuses"], [200], name)
+            self.assertGreater(result["p50_ms"], 0, name)
+
+    def test_compare_flags_latency_and_query_regressions(self):
+        baseline = {"panel": {"p50_ms": 100, "p95_ms": 200, "peak_kb": 500, "queries": 30}}
+        same = {"panel": {"p50_ms": 110, "p95_ms": 210, "peak_kb": 520, "queries": 30}}
+        worse = {"panel": {"p50_ms": 150, "p95_ms": 210, "peak_kb": 520, "queries": 31}}
+        self.assertEqual(runner.compare(same, baseline), [])
+        regressions = runner.compare(worse, baseline)
+        self.assertEqual(len(regressions), 2)
+        self.assertIn("p50_ms", regressions[0])
+        self.assertIn("queries", regressions[1])
+        self.assertEqual(runner.percentile([5, 1, 3, 2, 4], 0.5), 3)
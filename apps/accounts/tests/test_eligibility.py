@@ -0,0 +1,79 @@
+from datetime import date
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+
+from apps.accounts.eligibility import (
+    assign_age_divisions,
+    check_players_division,
+    get_players_eligibility,
+)
+from apps.accounts.models import Player, PlayerDirectoryEntry, UserProfile
+from apps.events.models import Division
+
+
+class DivisionEligibilityTests(TestCase):
+    def _player(self, username, birth_date, grade="", status="approved"):
+        user = User.objects.create_user(username=username, password="pass")
+        UserProfile.objects.create(user=user, user_type="player", birth_date=birth_date)
+        return Player.objects.create(
+            user=user, grade=grade, age_verification_status=status
+        )
+
+    def test_bulk_eligibility_matches_player_methods(self):
+        players = [
+            self._player("a", date(2014, 4, 30)),  # cumple el día de corte
+            self._player("b", date(2014, 5, 1), grade="5th"),  # después del corte
+            self._player("c", date(2000, 1, 1)),  # mayor de 18
+            self._player("d", date(2022, 1, 1)),  # menor de 5
+            self._player("e", None, grade="7th"),  # sin fecha de nacimiento
+        ]
+
+        with self.assertNumQueries(1):
+            eligibility = get_players_eligibility([p.pk for p in players], year=2025)
+
+        for player in players:
+            player = Player.objects.select_related("user__profile").get(pk=player.pk)
+            result = eligibility[player.pk]
+            self.assertEqual(result.age, player.calculate_age_as_of_april_30(2025))
+            self.assertEqual(result.age_division, player.get_age_based_division(2025))
+            self.assertEqual(result.grade_division, player.get_grade_based_division())
+
+        self.assertEqual(eligibility[players[0].pk].age_division, "11U")
+        self.assertEqual(eligibility[players[1].pk].eligible_divisions, ["10U", "11U"])
+        self.assertEqual(eligibility[players[2].pk].age_division, "18U")
+        self.assertIsNone(eligibility[players[3].pk].age_division)
+
+    def test_check_players_division_applies_play_up_rules(self):
+        young = self._player("young", date(2015, 1, 1))  # 10U en 2025
+        pending = self._player("pending", date(2015, 1, 1), status="pending")
+
+        results = check_players_division([young.pk, pending.pk], "12U D1", year=2025)
+        self.assertEqual(results[young.pk], (True, "Elegible (jugando arriba)"))
+        self.assertFalse(results[pending.pk][0])
+
+        results = check_players_division([young.pk], "13U", year=2025)
+        self.assertFalse(results[young.pk][0])
+        results = check_players_division([young.pk], "09U", year=2025)
+        self.assertFalse(results[young.pk][0])
+
+    def test_assign_age_divisions_uses_bulk_update(self):
+        div10 = Division.objects.create(name="10U")
+        div11 = Division.objects.create(name="11U")
+        first = self._player("first", date(2015, 1, 1))
+        second = self._player("second", date(2014, 1, 1))
+        unknown = self._player("unknown", None)
+        Player.objects.filter(pk=second.pk).update(division=div11)
+
+        changes = assign_age_divisions(year=2025, dry_run=True)
+        self.assertEqual(changes, [(first.pk, None, div10.pk)])
+        self.assertIsNone(Player.objects.get(pk=first.pk).division_id)
+
+        assign_age_divisions(year=2025)
+        self.assertEqual(Player.objects.get(pk=first.pk).division_id, div10.pk)
+        self.assertEqual(Player.objects.get(pk=second.pk).division_id, div11.pk)
+        self.assertIsNone(Player.objects.get(pk=unknown.pk).division_id)
+        # El directorio público se sincroniza aunque bulk_update no dispare señales
+        self.assertEqual(
+            PlayerDirectoryEntry.objects.get(player=first).division_name, "10U"
+        )
@@ -0,0 +1,148 @@
+import io
+import shutil
+import tempfile
+import zipfile
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.accounts.models import Notification, Order, UserProfile
+from apps.core import exports
+from apps.events.models import Event
+
+
+class StreamingExportTests(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.staff = User.objects.create_user(
+            username="staff", password="pass", is_staff=True
+        )
+        self.parent = User.objects.create_user(
+            username="parent", password="pass", email="parent@example.com"
+        )
+        UserProfile.objects.create(user=self.parent, user_type="parent")
+        self.event = Event.objects.create(
+            title="Torneo, Edición <1>",
+            start_date="2099-01-01",
+            organizer=self.staff,
+        )
+        for i in range(3):
+            Order.objects.create(
+                user=self.parent,
+                event=self.event,
+                status="paid",
+                order_number=f"ORD-{i}",
+                total_amount="100.50",
+            )
+        Order.objects.create(user=self.parent, status="pending", order_number="ORD-X")
+
+    def _url(self, fmt, **params):
+        return exports.export_url("orders", fmt, **params)
+
+    def test_csv_export_is_streamed_and_filtered(self):
+        self.client.force_login(self.staff)
+        response = self.client.get(self._url("csv", event=self.event.pk))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertIn("attachment;", response["Content-Disposition"])
+
+        lines = b"".join(response.streaming_content).decode("utf-8-sig").splitlines()
+        self.assertEqual(lines[0].split(",")[0], "Número de orden")
+        self.assertEqual(len(lines), 4)
+        self.assertIn('"Torneo, Edición <1>"', lines[1])
+
+    def test_xlsx_export_is_a_valid_workbook(self):
+        self.client.force_login(self.staff)
+        response = self.client.get(self._url("xlsx", status="paid"))
+        self.assertEqual(response.status_code, 200)
+
+        archive = zipfile.ZipFile(io.BytesIO(b"".join(response.streaming_content)))
+        self.assertIsNone(archive.testzip())
+        sheet = archive.read("xl/worksheets/sheet1.xml").decode("utf-8")
+        self.assertEqual(sheet.count("<row>"), 4)
+        self.assertIn("Torneo, Edición &lt;1&gt;", sheet)
+        self.assertIn("<v>100.50</v>", sheet)
+
+    def test_only_staff_can_export(self):
+        self.client.force_login(self.parent)
+        self.assertEqual(self.client.get(self._url("csv")).status_code, 302)
+        self.client.force_login(self.staff)
+        self.assertEqual(
+            self.client.get(exports.export_url("nope", "csv")).status_code, 404
+        )
+
+    @override_settings(EXPORT_BACKGROUND_ROWS=2)
+    def test_large_exports_run_in_background_and_notify(self):
+        self.client.force_login(self.staff)
+        with mock.patch.object(
+            exports, "_run_in_background", side_effect=lambda target, *args: target(*args)
+        ):
+            response = self.client.get(self._url("csv"))
+        self.assertEqual(response.status_code, 302)
+
+        notification = Notification.objects.get(user=self.staff)
+        response = self.client.get(notification.action_url)
+        self.assertEqual(response.status_code, 200)
+        content = b"".join(response.streaming_content).decode("utf-8-sig")
+        self.assertEqual(len(content.splitlines()), 5)
+
+        self.client.force_login(self.parent)
+        self.assertEqual(self.client.get(notification.action_url).status_code, 403)
+
+    @override_settings(EXPORT_BACKGROUND_ROWS=2)
+    def test_background_export_redirect_ignores_foreign_referer(self):
+        self.client.force_login(self.staff)
+        with mock.patch.object(exports, "_run_in_background"):
+            response = self.client.get(
+                self._url("csv"), HTTP_REFERER="https://evil.example.com/"
+            )
+            self.assertRedirects(
+                response, reverse("dashboard"), fetch_redirect_response=False
+            )
+
+            response = self.client.get(
+                self._url("csv"), HTTP_REFERER="http://testserver/events/"
+            )
+            self.assertEqual(response["Location"], "http://testserver/events/")
+
+    def test_formula_like_cells_are_escaped(self):
+        Order.objects.filter(order_number="ORD-0").update(order_number="=HYPERLINK(1)")
+        self.client.force_login(self.staff)
+
+        response = self.client.get(self._url("csv", event=self.event.pk))
+        content = b"".join(response.streaming_content).decode("utf-8-sig")
+        self.assertIn("'=HYPERLINK(1)", content)
+        self.assertIn("100.50", content)
+
+        response = self.client.get(self._url("xlsx", event=self.event.pk))
+        archive = zipfile.ZipFile(io.BytesIO(b"".join(response.streaming_content)))
+        sheet = archive.read("xl/worksheets/sheet1.xml").decode("utf-8")
+        self.assertIn("'=HYPERLINK(1)", sheet)
+        self.assertEqual(exports._cell_text(-5), "-5")
+
+    def test_purge_deletes_only_expired_exports(self):
+        old = default_storage.save("exports/1/aaa/viejo.csv", ContentFile(b"x"))
+        new = default_storage.save("exports/1/bbb/nuevo.csv", ContentFile(b"x"))
+        now = timezone.now()
+        later = now + timedelta(seconds=exports.download_ttl() + 60)
+        with mock.patch.object(
+            default_storage,
+            "get_modified_time",
+            side_effect=lambda name: later if name == new else now,
+        ):
+            with mock.patch.object(timezone, "now", return_value=later):
+                call_command("purge_exports", stdout=io.StringIO())
+        self.assertFalse(default_storage.exists(old))
+        self.assertTrue(default_storage.exists(new))
@@ -0,0 +1,142 @@
+import json
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from apps.accounts.models import Notification
+from apps.accounts.notifications import (
+    event_audience,
+    get_unread_count,
+    notify_users,
+    staff_audience,
+)
+
+
+class NotificationDeliveryTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="member", password="pass")
+        self.client.force_login(self.user)
+
+    def _notify(self, title="Hola"):
+        return Notification.create_notification(self.user, title, "Mensaje")
+
+    def test_unread_counter_is_cached_and_adjusted(self):
+        first = self._notify()
+        self.assertEqual(get_unread_count(self.user.pk), 1)
+        self._notify()
+        with self.assertNumQueries(0):
+            self.assertEqual(get_unread_count(self.user.pk), 2)
+
+        first.mark_as_read()
+        first.mark_as_read()  # ya leída: no vuelve a descontar
+        self.assertEqual(get_unread_count(self.user.pk), 1)
+
+        response = self.client.post(reverse("accounts:mark_all_notifications_read_api"))
+        self.assertEqual(response.json()["unread_count"], 0)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_unread_count(self.user.pk), 0)
+
+    def test_since_id_returns_only_newer_notifications(self):
+        first = self._notify("uno")
+        second = self._notify("dos")
+        third = self._notify("tres")
+
+        response = self.client.get(
+            reverse("accounts:notifications_api"), {"since_id": first.pk}
+        )
+        data = response.json()
+        self.assertEqual([n["id"] for n in data["notifications"]], [second.pk, third.pk])
+        self.assertIn("created_at", data["notifications"][0])
+        self.assertEqual(data["unread_count"], 3)
+
+    async def _consume(self, response):
+        return b"".join([chunk async for chunk in response.streaming_content]).decode()
+
+    @override_settings(NOTIFICATIONS_POLL_WAIT=0)
+    def test_poll_returns_cursor_then_newer_notifications(self):
+        first = self._notify("uno")
+        url = reverse("accounts:notifications_poll")
+
+        data = self.client.get(url).json()
+        self.assertEqual((data["cursor"], data["notifications"]), (first.pk, []))
+
+        data = self.client.get(url, {"since_id": first.pk}).json()
+        self.assertEqual((data["cursor"], data["notifications"]), (first.pk, []))
+
+        second = self._notify("dos")
+        data = self.client.get(url, {"since_id": first.pk}).json()
+        self.assertEqual(data["cursor"], second.pk)
+        self.assertEqual([n["title"] for n in data["notifications"]], ["dos"])
+        self.assertEqual(data["unread_count"], 2)
+
+    def test_stream_is_disabled_without_asgi_setting(self):
+        response = self.client.get(reverse("accounts:notifications_stream"))
+        self.assertEqual(response.status_code, 204)
+
+    @override_settings(NOTIFICATIONS_STREAMING=True)
+    def test_stream_pushes_notifications_after_cursor(self):
+        first = self._notify("uno")
+        second = self._notify("dos")
+
+        with mock.patch(
+            "apps.accounts.views_private.NOTIFICATION_STREAM_LIFETIME", 0.05
+        ), mock.patch(
+            "apps.accounts.views_private.NOTIFICATION_STREAM_CHECK_INTERVAL", 0.01
+        ):
+            response = self.client.get(
+                reverse("accounts:notifications_stream"),
+                HTTP_LAST_EVENT_ID=str(first.pk),
+            )
+            body = async_to_sync(self._consume)(response)
+
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        events = [chunk for chunk in body.split("\n\n") if "event: notification" in chunk]
+        self.assertEqual(len(events), 1)
+        self.assertIn(f"id: {second.pk}", events[0])
+        payload = json.loads(events[0].split("data: ", 1)[1])
+        self.assertEqual(payload["title"], "dos")
+
+
+class NotificationFanOutTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.staff = [
+            User.objects.create_user(username=f"staff{i}", password="pass", is_staff=True)
+            for i in range(3)
+        ]
+        # Crear usuarios staff genera avisos "Usuario nuevo registrado"
+        Notification.objects.all().delete()
+        cache.clear()
+
+    def test_notify_users_bulk_creates_and_dedupes(self):
+        with self.assertNumQueries(2):  # audiencia + un bulk_create
+            created = notify_users(staff_audience(), "Aviso", "Mensaje", send_push=False)
+        self.assertEqual(len(created), 3)
+        for user in self.staff:
+            self.assertEqual(get_unread_count(user.pk), 1)
+
+        # El mismo aviso dentro de la ventana se descarta
+        self.assertEqual(notify_users(self.staff, "Aviso", "Mensaje"), [])
+        self.assertEqual(Notification.objects.count(), 3)
+
+    def test_event_audience_includes_attendees_and_order_owners(self):
+        from apps.accounts.models import Order
+        from apps.events.models import Event, EventAttendance
+
+        parent, player, other = self.staff
+        event = Event.objects.create(
+            title="Torneo",
+            start_date="2099-01-01",
+            end_date="2099-01-02",
+            organizer=other,
+        )
+        EventAttendance.objects.create(event=event, user=player, status="confirmed")
+        Order.objects.create(user=parent, event=event, status="paid")
+
+        self.assertEqual(event_audience(event), {parent.pk, player.pk})
@@ -0,0 +1,89 @@
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+
+from apps.accounts.models import (
+    CheckoutPlayer,
+    Order,
+    OrderPlayer,
+    Player,
+    StripeEventCheckout,
+    UserProfile,
+)
+from apps.accounts.order_players import (
+    event_player_ids,
+    orders_for_player,
+    registered_player_ids,
+)
+from apps.events.models import Event
+
+
+class OrderPlayerLinkTests(TestCase):
+    def setUp(self):
+        self.parent = User.objects.create_user(username="parent", password="pass")
+        UserProfile.objects.create(user=self.parent, user_type="parent")
+        self.event = Event.objects.create(
+            title="Torneo",
+            start_date="2099-01-01",
+            end_date="2099-01-02",
+            organizer=self.parent,
+        )
+        self.players = []
+        for name in ("uno", "dos"):
+            user = User.objects.create_user(username=name, password="pass")
+            UserProfile.objects.create(user=user, user_type="player")
+            self.players.append(Player.objects.create(user=user))
+
+    def _order(self, player_ids, status="paid"):
+        return Order.objects.create(
+            user=self.parent,
+            event=self.event,
+            status=status,
+            registered_player_ids=player_ids,
+        )
+
+    def test_links_follow_registered_player_ids(self):
+        first, second = self.players
+        order = self._order([first.pk, str(second.pk), 999999, "x"])
+        self.assertEqual(
+            set(order.player_links.values_list("player_id", flat=True)),
+            {first.pk, second.pk},
+        )
+
+        order.registered_player_ids = [second.pk]
+        order.save(update_fields=["registered_player_ids"])
+        self.assertEqual(
+            list(order.player_links.values_list("player_id", flat=True)), [second.pk]
+        )
+        self.assertEqual(list(orders_for_player(second)), [order])
+        self.assertFalse(orders_for_player(first).exists())
+
+    def test_event_queries_use_links(self):
+        first, second = self.players
+        self._order([first.pk])
+        self._order([second.pk], status="cancelled")
+        StripeEventCheckout.objects.create(
+            user=self.parent,
+            event=self.event,
+            stripe_session_id="cs_test_links",
+            status="paid",
+            player_ids=[second.pk],
+        )
+
+        self.assertEqual(event_player_ids(self.event), {first.pk})
+        self.assertEqual(
+            event_player_ids(self.event, checkout_statuses=["paid"]),
+            {first.pk, second.pk},
+        )
+        self.assertEqual(
+            registered_player_ids(self.event, [first.pk, second.pk]), {first.pk}
+        )
+
+    def test_backfill_command_rebuilds_missing_links(self):
+        first, _ = self.players
+        order = self._order([first.pk])
+        OrderPlayer.objects.all().delete()
+        CheckoutPlayer.objects.all().delete()
+
+        call_command("backfill_order_players", verbosity=0)
+        self.assertEqual(list(orders_for_player(first)), [order])
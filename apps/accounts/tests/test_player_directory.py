@@ -0,0 +1,85 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from apps.accounts.models import Player, PlayerDirectoryEntry, Team, UserProfile
+from apps.accounts.player_directory import (
+    get_directory_facets,
+    search_player_directory,
+)
+from apps.locations.models import City, Country, State
+
+
+class PlayerDirectoryTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.country = Country.objects.create(name="México", code="MX", is_active=True)
+        self.state = State.objects.create(name="Jalisco", country=self.country)
+        self.city = City.objects.create(name="Guadalajara", state=self.state)
+        self.manager = User.objects.create_user(username="manager", password="pass")
+        self.team = Team.objects.create(name="Tigres", manager=self.manager)
+
+        self.user = User.objects.create_user(
+            username="jose",
+            password="pass",
+            first_name="José",
+            last_name="Núñez",
+        )
+        UserProfile.objects.create(
+            user=self.user,
+            user_type="player",
+            country=self.country,
+            state=self.state,
+            city=self.city,
+        )
+        self.player = Player.objects.create(user=self.user, team=self.team)
+
+    def test_entry_is_synced_on_save(self):
+        entry = PlayerDirectoryEntry.objects.get(player=self.player)
+        self.assertEqual(entry.full_name, "José Núñez")
+        self.assertEqual(entry.team_name, "Tigres")
+        self.assertEqual(entry.city_id, self.city.id)
+
+        self.team.name = "Leones"
+        self.team.save()
+        entry.refresh_from_db()
+        self.assertEqual(entry.team_name, "Leones")
+
+        self.player.is_active = False
+        self.player.save()
+        entry.refresh_from_db()
+        self.assertFalse(entry.is_active)
+
+    def test_search_ignores_accents_and_case(self):
+        queryset = PlayerDirectoryEntry.objects.all()
+        self.assertEqual(search_player_directory(queryset, "nunez").count(), 1)
+        self.assertEqual(search_player_directory(queryset, "JOSÉ tigres").count(), 1)
+        self.assertEqual(search_player_directory(queryset, "pedro").count(), 0)
+
+    def test_facets_are_cached_until_directory_changes(self):
+        facets = get_directory_facets()
+        self.assertEqual([c["name"] for c in facets["countries"]], ["México"])
+        self.assertEqual(facets["cities"][self.state.id][0]["id"], self.city.id)
+
+        with self.assertNumQueries(0):
+            get_directory_facets()
+
+        other = Country.objects.create(name="Colombia", code="CO", is_active=True)
+        profile = self.user.profile
+        profile.country = other
+        profile.state = None
+        profile.city = None
+        profile.save()
+        facets = get_directory_facets()
+        self.assertEqual([c["name"] for c in facets["countries"]], ["Colombia"])
+
+    def test_public_list_filters_by_location(self):
+        response = self.client.get(
+            reverse("public_player_list"), {"country": self.country.id}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "José Núñez")
+
+        response = self.client.get(reverse("public_player_list"), {"country": "abc"})
+        self.assertEqual(response.status_code, 200)
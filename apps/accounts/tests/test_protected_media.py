@@ -0,0 +1,120 @@
+import shutil
+import tempfile
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from apps.accounts.models import Player, PlayerParent, Team, UserProfile
+from apps.accounts.protected_media import AGE_VERIFICATION
+from apps.core.protected_media import check_permission, signed_url
+
+
+class ProtectedMediaTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.parent = User.objects.create_user(username="parent", password="pass")
+        UserProfile.objects.create(user=self.parent, user_type="parent")
+        player_user = User.objects.create_user(username="hijo", password="pass")
+        UserProfile.objects.create(user=player_user, user_type="player")
+        self.player = Player.objects.create(user=player_user)
+        self.player.age_verification_document.save(
+            "acta.pdf", ContentFile(b"%PDF-1.4 0123456789"), save=True
+        )
+        PlayerParent.objects.create(parent=self.parent, player=self.player)
+        self.url = reverse(
+            "accounts:serve_age_verification_document", args=[self.player.pk]
+        )
+
+    def test_parent_is_redirected_to_signed_url_with_range_support(self):
+        self.client.force_login(self.parent)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 302)
+
+        signed = response["Location"]
+        response = self.client.get(signed)
+        self.assertEqual(b"".join(response.streaming_content), b"%PDF-1.4 0123456789")
+        self.assertEqual(response["Accept-Ranges"], "bytes")
+
+        response = self.client.get(signed, HTTP_RANGE="bytes=9-12")
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response["Content-Range"], "bytes 9-12/19")
+        self.assertEqual(b"".join(response.streaming_content), b"0123")
+
+    def test_transfer_is_offloaded_to_nginx_when_configured(self):
+        self.client.force_login(self.parent)
+        url = signed_url(AGE_VERIFICATION, self.player.pk, self.parent)
+        with override_settings(
+            PROTECTED_MEDIA_ACCEL_LOCATIONS={self.media_root: "/protected-files/media/"}
+        ):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response["X-Accel-Redirect"],
+            f"/protected-files/media/{self.player.age_verification_document.name}",
+        )
+        self.assertEqual(response.content, b"")
+
+    def test_strangers_are_denied_and_signed_urls_are_per_user(self):
+        stranger = User.objects.create_user(username="otro", password="pass")
+        UserProfile.objects.create(user=stranger, user_type="parent")
+        self.client.force_login(stranger)
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+
+        parent_url = signed_url(AGE_VERIFICATION, self.player.pk, self.parent)
+        self.assertEqual(self.client.get(parent_url).status_code, 403)
+
+    def test_permission_is_cached_until_the_parent_link_changes(self):
+        self.assertTrue(check_permission(AGE_VERIFICATION, self.parent, self.player))
+        with self.assertNumQueries(0):
+            self.assertTrue(check_permission(AGE_VERIFICATION, self.parent, self.player))
+
+        PlayerParent.objects.filter(parent=self.parent).delete()
+        self.assertFalse(check_permission(AGE_VERIFICATION, self.parent, self.player))
+
+    def test_permission_is_forgotten_when_the_team_or_manager_changes(self):
+        manager = User.objects.create_user(username="manager", password="pass")
+        UserProfile.objects.create(user=manager, user_type="team_manager")
+        other_manager = User.objects.create_user(username="manager2", password="pass")
+        UserProfile.objects.create(user=other_manager, user_type="team_manager")
+        team = Team.objects.create(name="Tigres", manager=manager)
+        self.assertFalse(check_permission(AGE_VERIFICATION, manager, self.player))
+
+        self.player.team = team
+        self.player.save()
+        self.assertTrue(check_permission(AGE_VERIFICATION, manager, self.player))
+
+        self.assertFalse(check_permission(AGE_VERIFICATION, other_manager, self.player))
+        team.manager = other_manager
+        team.save()
+        self.assertFalse(check_permission(AGE_VERIFICATION, manager, self.player))
+        self.assertTrue(check_permission(AGE_VERIFICATION, other_manager, self.player))
+
+    def test_permission_is_forgotten_when_staff_flags_change(self):
+        stranger = User.objects.create_user(username="otro", password="pass")
+        self.assertFalse(check_permission(AGE_VERIFICATION, stranger, self.player))
+
+        stranger.is_staff = True
+        stranger.save()
+        self.assertTrue(check_permission(AGE_VERIFICATION, stranger, self.player))
+
+        stranger.is_staff = False
+        stranger.save()
+        self.assertFalse(check_permission(AGE_VERIFICATION, stranger, self.player))
+
+    def test_staff_detail_links_to_the_protected_document(self):
+        staff = User.objects.create_user(username="staff", password="pass", is_staff=True)
+        self.client.force_login(staff)
+        response = self.client.get(
+            reverse("accounts:admin_player_detail", args=[self.player.pk])
+        )
+        self.assertContains(response, f'href="{self.url}"')
+        self.assertNotContains(response, self.player.age_verification_document.url)
@@ -0,0 +1,91 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from apps.accounts.models import SiteSettings, Sponsor, Team
+from apps.accounts.views_public import PublicHomeView
+from apps.events.models import Division, Event, EventCategory
+
+
+class PublicHomeCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        SiteSettings.load()
+        self.organizer = User.objects.create_user(username="organizer", password="pass")
+        self.manager = User.objects.create_user(username="manager", password="pass")
+
+    def test_anonymous_page_is_cached_and_csrf_token_is_fresh(self):
+        first = self.client.get(reverse("home"))
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first["X-Page-Cache"], "miss")
+
+        with CaptureQueriesContext(connection) as queries:
+            second = self.client.get(reverse("home"))
+        # Solo consultas de sesión; nada de eventos, equipos ni configuración
+        self.assertTrue(
+            all("django_session" in q["sql"] or "SAVEPOINT" in q["sql"] for q in queries)
+        )
+        self.assertEqual(second["X-Page-Cache"], "hit")
+        content = second.content.decode()
+        self.assertNotIn(PublicHomeView.CSRF_PLACEHOLDER, content)
+        self.assertIn('name="csrfmiddlewaretoken"', content)
+
+    def test_event_save_invalidates_page(self):
+        self.client.get(reverse("home"))
+        Event.objects.create(
+            title="Copa Tigres",
+            description="Torneo",
+            status="published",
+            start_date="2099-01-01",
+            end_date="2099-01-02",
+            organizer=self.organizer,
+        )
+        response = self.client.get(reverse("home"))
+        self.assertEqual(response["X-Page-Cache"], "miss")
+        self.assertContains(response, "COPA TIGRES")
+
+    def test_category_and_division_edits_invalidate_page(self):
+        category = EventCategory.objects.create(name="Torneos")
+        event = Event.objects.create(
+            title="Copa Tigres",
+            status="published",
+            start_date="2099-01-01",
+            end_date="2099-01-02",
+            category=category,
+            organizer=self.organizer,
+        )
+        self.client.get(reverse("home"))
+        category.name = "Copas"
+        category.save()
+        self.assertEqual(self.client.get(reverse("home"))["X-Page-Cache"], "miss")
+
+        self.assertEqual(self.client.get(reverse("home"))["X-Page-Cache"], "hit")
+        event.divisions.add(Division.objects.create(name="12U"))
+        self.assertEqual(self.client.get(reverse("home"))["X-Page-Cache"], "miss")
+
+    def test_save_invalidates_only_dependent_fragments(self):
+        view = PublicHomeView()
+        stats = view._fragment("stats", view._build_stats_fragment)
+        sponsors = view._fragment("sponsors", view._build_sponsors_fragment)
+        self.assertEqual(stats["total_teams"], 0)
+
+        Team.objects.create(name="Tigres", manager=self.manager)
+
+        with self.assertNumQueries(0):
+            view._fragment("sponsors", view._build_sponsors_fragment)
+        stats = view._fragment("stats", view._build_stats_fragment)
+        self.assertEqual(stats["total_teams"], 1)
+        self.assertEqual(sponsors["sponsors"], [])
+
+        Sponsor.objects.create(name="Rawlings")
+        sponsors = view._fragment("sponsors", view._build_sponsors_fragment)
+        self.assertEqual(len(sponsors["sponsors"]), 1)
+
+    def test_authenticated_users_are_not_page_cached(self):
+        self.client.force_login(self.organizer)
+        response = self.client.get(reverse("home"))
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header("X-Page-Cache"))
@@ -0,0 +1,108 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from apps.accounts.models import Player, Team, UserProfile
+from apps.events.models import Event
+
+
+class PublicPlayerProfileCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.manager = User.objects.create_user(username="manager", password="pass")
+        self.team = Team.objects.create(name="Tigres", manager=self.manager)
+        self.user = User.objects.create_user(
+            username="jose", password="pass", first_name="José", last_name="Núñez"
+        )
+        UserProfile.objects.create(user=self.user, user_type="player")
+        self.player = Player.objects.create(user=self.user, team=self.team)
+        self.url = reverse("public_player_profile", kwargs={"slug": self.player.slug})
+
+    def test_profile_is_cached_and_revalidated_with_etag(self):
+        first = self.client.get(self.url)
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first["X-Page-Cache"], "miss")
+        self.assertIn("ETag", first)
+        self.assertIn("Last-Modified", first)
+
+        second = self.client.get(self.url)
+        self.assertEqual(second["X-Page-Cache"], "hit")
+        self.assertEqual(second["ETag"], first["ETag"])
+        self.assertNotIn(
+            "__public_player_profile_csrf_token__", second.content.decode()
+        )
+
+        not_modified = self.client.get(self.url, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(not_modified.status_code, 304)
+
+    def test_player_save_invalidates_only_that_profile(self):
+        other_user = User.objects.create_user(username="pedro", password="pass")
+        UserProfile.objects.create(user=other_user, user_type="player")
+        other = Player.objects.create(user=other_user)
+        other_url = reverse("public_player_profile", kwargs={"slug": other.slug})
+        first = self.client.get(self.url)
+        self.client.get(other_url)
+
+        self.user.first_name = "Joseph"
+        self.user.save()
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["X-Page-Cache"], "miss")
+        self.assertContains(response, "Joseph")
+        self.assertEqual(self.client.get(other_url)["X-Page-Cache"], "hit")
+
+    def test_authenticated_users_are_not_cached(self):
+        self.client.force_login(self.manager)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("X-Page-Cache", response)
+
+    def test_missing_player_returns_404(self):
+        response = self.client.get(
+            reverse("public_player_profile", kwargs={"slug": "no-existe"})
+        )
+        self.assertEqual(response.status_code, 404)
+
+
+class SitemapTests(TestCase):
+    def test_sitemap_lists_public_players_and_events(self):
+        organizer = User.objects.create_user(username="organizer", password="pass")
+        user = User.objects.create_user(
+            username="ana", password="pass", first_name="Ana", last_name="Ruiz"
+        )
+        player = Player.objects.create(user=user)
+        hidden = Player.objects.create(
+            user=User.objects.create_user(username="oculto", password="pass"),
+            is_active=False,
+        )
+        event = Event.objects.create(
+            title="Copa",
+            description="Torneo",
+            status="published",
+            start_date="2099-01-01",
+            end_date="2099-01-02",
+            organizer=organizer,
+        )
+
+        index = b"".join(self.client.get(reverse("sitemap_index")).streaming_content)
+        self.assertIn(b"sitemap-players-1.xml", index)
+        self.assertIn(b"sitemap-events-1.xml", index)
+
+        response = self.client.get(
+            reverse("sitemap_section", kwargs={"section": "players", "page": 1})
+        )
+        players = b"".join(response.streaming_content).decode()
+        self.assertIn(f"/players/{player.slug}/", players)
+        self.assertNotIn(f"/players/{hidden.slug}/", players)
+
+        response = self.client.get(
+            reverse("sitemap_section", kwargs={"section": "events", "page": 1})
+        )
+        self.assertIn(f"/events/{event.pk}/", b"".join(response.streaming_content).decode())
+
+        response = self.client.get(
+            reverse("sitemap_section", kwargs={"section": "teams", "page": 1})
+        )
+        self.assertEqual(response.status_code, 404)
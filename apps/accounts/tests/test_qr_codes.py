@@ -0,0 +1,66 @@
+import shutil
+import tempfile
+from unittest import mock
+
+from django.test import TestCase, override_settings
+
+from apps.core import qr_codes
+
+
+class QRCodeServiceTests(TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.cache_dir, ignore_errors=True)
+        settings_override = override_settings(QR_CODE_CACHE_DIR=self.cache_dir)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        qr_codes.clear_memory_cache()
+        self.addCleanup(qr_codes.clear_memory_cache)
+
+    def test_endpoint_serves_cacheable_svg_and_png(self):
+        url = qr_codes.qr_code_url("https://example.com/players/1/", size=200)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "image/svg+xml")
+        self.assertIn(b"<svg", response.content)
+        self.assertIn("immutable", response["Cache-Control"])
+        self.assertIn("max-age=31536000", response["Cache-Control"])
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(response.status_code, 304)
+
+        png_url = qr_codes.qr_code_url("https://example.com/players/1/", fmt="png")
+        response = self.client.get(png_url)
+        self.assertTrue(response.content.startswith(b"\x89PNG"))
+
+    def test_url_is_deterministic(self):
+        url = qr_codes.qr_code_url("https://example.com/players/1/")
+        with mock.patch("time.time", return_value=4102444800):
+            self.assertEqual(qr_codes.qr_code_url("https://example.com/players/1/"), url)
+
+    def test_timestamped_tokens_still_load(self):
+        from django.core import signing
+
+        token = signing.dumps(["https://example.com/", 256], salt=qr_codes.SIGNING_SALT)
+        self.assertEqual(qr_codes.load_token(token), ("https://example.com/", 256))
+
+    def test_tampered_token_is_rejected(self):
+        url = qr_codes.qr_code_url("https://example.com/")
+        self.assertEqual(self.client.get(url.replace(".svg", "x.svg")).status_code, 404)
+
+    def test_render_is_memoized_in_memory_and_on_disk(self):
+        with mock.patch.object(qr_codes, "_render", wraps=qr_codes._render) as render:
+            first = qr_codes.render_qr("https://example.com/a", 256, "png")
+            self.assertEqual(qr_codes.render_qr("https://example.com/a", 256, "png"), first)
+            self.assertEqual(render.call_count, 1)
+
+            # Otro worker (memoria vacía) lo lee del disco
+            qr_codes.clear_memory_cache()
+            self.assertEqual(qr_codes.render_qr("https://example.com/a", 256, "png"), first)
+            self.assertEqual(render.call_count, 1)
+
+    @override_settings(QR_CODE_MEMORY_ITEMS=2)
+    def test_memory_cache_is_bounded(self):
+        for i in range(3):
+            qr_codes.render_qr(f"https://example.com/{i}", 128, "svg")
+        self.assertEqual(len(qr_codes._memory), 2)
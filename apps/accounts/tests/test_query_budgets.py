@@ -0,0 +1,108 @@
+import json
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from apps.accounts.models import Order, Player, PlayerParent, UserProfile
+from apps.core.request_metrics import fingerprint, track_requests
+from apps.core.testing import QueryBudgetMixin
+
+METRICS_MIDDLEWARE = ["apps.core.middleware.QueryMetricsMiddleware", *settings.MIDDLEWARE]
+
+
+class FingerprintTests(TestCase):
+    def test_values_and_in_lists_are_normalized(self):
+        self.assertEqual(
+            fingerprint('SELECT * FROM "t" WHERE "id" IN (%s, %s, %s) AND "x" = \'a\''),
+            fingerprint('SELECT * FROM "t"  WHERE "id" IN (%s) AND "x" = \'bb\''),
+        )
+        self.assertNotEqual(
+            fingerprint('SELECT * FROM "t" WHERE "id" = %s'),
+            fingerprint('SELECT * FROM "u" WHERE "id" = %s'),
+        )
+
+    def test_detects_repeated_queries(self):
+        user = User.objects.create_user(username="u1", password="pass")
+        with track_requests() as metrics:
+            for _ in range(6):
+                User.objects.filter(pk=user.pk).exists()
+            list(Order.objects.all())
+        self.assertEqual(metrics.queries, 7)
+        self.assertEqual(metrics.max_repeats, 6)
+        self.assertEqual(metrics.duplicates, 5)
+        self.assertEqual(len(metrics.n_plus_one()), 1)
+
+    def test_nested_blocks_both_count(self):
+        from django.template import engines
+
+        template = engines["django"].from_string("{% for i in items %}{{ i }}{% endfor %}")
+        with track_requests() as outer:
+            User.objects.exists()
+            with track_requests() as inner:
+                User.objects.exists()
+                template.render({"items": range(100)})
+        self.assertEqual((outer.queries, inner.queries), (2, 1))
+        self.assertGreater(inner.template_time, 0)
+        self.assertEqual(outer.template_time, inner.template_time)
+
+
+@override_settings(MIDDLEWARE=METRICS_MIDDLEWARE)
+class QueryMetricsMiddlewareTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.staff = User.objects.create_user(
+            username="staff", password="pass", is_staff=True
+        )
+
+    def test_server_timing_and_log_line_for_staff(self):
+        self.client.force_login(self.staff)
+        with self.assertLogs("request_metrics", level="INFO") as logs:
+            response = self.client.get(reverse("accounts:admin_order_list"))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("db;dur=", response["Server-Timing"])
+        self.assertIn("tpl;dur=", response["Server-Timing"])
+        data = json.loads(logs.records[-1].getMessage())
+        self.assertEqual(data["path"], reverse("accounts:admin_order_list"))
+        self.assertEqual(data["queries"], response.wsgi_request.metrics.queries)
+        self.assertGreater(data["template_ms"], 0)
+
+    def test_no_server_timing_for_anonymous_users(self):
+        with self.assertLogs("request_metrics", level="INFO"):
+            response = self.client.get(reverse("accounts:admin_order_list"))
+        self.assertNotIn("Server-Timing", response)
+
+
+class PageQueryBudgetTests(QueryBudgetMixin, TestCase):
+    query_budgets = [
+        ("panel", 35, 3),
+        ("accounts:admin_order_list", 15, 2),
+        ("accounts:player_list", 15, 2),
+    ]
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username="staff", password="pass", is_staff=True
+        )
+        UserProfile.objects.create(user=self.user, user_type="parent")
+        for i in range(12):
+            child = User.objects.create_user(username=f"child{i}", password="pass")
+            UserProfile.objects.create(user=child, user_type="player")
+            player = Player.objects.create(user=child)
+            PlayerParent.objects.create(parent=self.user, player=player)
+            Order.objects.create(user=self.user, order_number=f"ORD-{i}")
+        self.client.force_login(self.user)
+
+    def test_pages_stay_within_budget(self):
+        self.check_query_budgets()
+
+    def test_budget_failure_lists_repeated_queries(self):
+        with self.assertRaises(AssertionError) as raised:
+            with self.assertQueryBudget(3, 2, label="loop"):
+                for player in Player.objects.all():
+                    player.user.username
+        self.assertIn("loop exceeded its query budget", str(raised.exception))
+        self.assertIn("12x", str(raised.exception))
@@ -0,0 +1,107 @@
+import json
+import shutil
+import tempfile
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from apps.accounts.models import UserProfile
+from apps.core import profiling
+
+PROFILING_MIDDLEWARE = "apps.core.middleware.RequestProfilingMiddleware"
+
+
+def _with_profiling_middleware():
+    middleware = list(settings.MIDDLEWARE)
+    # settings_simple already includes it; inserting it twice double-profiles
+    if PROFILING_MIDDLEWARE not in middleware:
+        index = middleware.index("django.contrib.auth.middleware.AuthenticationMiddleware")
+        middleware.insert(index + 1, PROFILING_MIDDLEWARE)
+    return middleware
+
+
+class RequestProfilingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.profile_dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.profile_dir, ignore_errors=True)
+        self.settings_override = override_settings(
+            MIDDLEWARE=_with_profiling_middleware(),
+            REQUEST_PROFILING_ENABLED=True,
+            REQUEST_PROFILING_SAMPLE_RATE=0,
+            REQUEST_PROFILING_DIR=self.profile_dir,
+            REQUEST_PROFILING_MAX_SAMPLES=3,
+        )
+        self.settings_override.enable()
+        self.addCleanup(self.settings_override.disable)
+
+        self.staff = User.objects.create_user(
+            username="staff", password="pass", is_staff=True
+        )
+        self.parent = User.objects.create_user(username="parent", password="pass")
+        UserProfile.objects.create(user=self.parent, user_type="parent")
+
+    def _files(self):
+        return sorted(self.profile_dir.glob("*.json"))
+
+    def test_staff_header_triggers_a_profile(self):
+        self.client.force_login(self.staff)
+        url = reverse("accounts:admin_order_list")
+        self.client.get(url)
+        self.assertEqual(self._files(), [])
+
+        self.client.get(url, HTTP_X_PROFILE_REQUEST="1")
+        files = self._files()
+        self.assertEqual(len(files), 1)
+        sample = json.loads(files[0].read_text())
+        self.assertEqual(sample["path"], url)
+        self.assertEqual(sample["role"], "staff")
+        self.assertEqual(sample["reason"], "header")
+        self.assertGreater(sample["queries"], 0)
+        self.assertTrue(sample["functions"])
+
+    def test_header_is_ignored_for_non_staff(self):
+        self.client.force_login(self.parent)
+        self.client.get(reverse("panel"), HTTP_X_PROFILE_REQUEST="1")
+        self.assertEqual(self._files(), [])
+
+    def test_sampling_keeps_a_bounded_ring_buffer(self):
+        self.client.force_login(self.parent)
+        with override_settings(REQUEST_PROFILING_SAMPLE_RATE=1):
+            for _ in range(5):
+                self.client.get(reverse("panel"))
+        samples = profiling.load_samples()
+        self.assertEqual(len(samples), 3)
+        self.assertTrue(all(s["role"] == "parent" and s["reason"] == "sample" for s in samples))
+
+    def test_disabled_profiling_records_nothing(self):
+        self.client.force_login(self.staff)
+        with override_settings(REQUEST_PROFILING_ENABLED=False):
+            self.client.get(reverse("panel"), HTTP_X_PROFILE_REQUEST="1")
+        self.assertEqual(self._files(), [])
+
+    def test_report_aggregates_samples_for_staff_only(self):
+        self.client.force_login(self.staff)
+        for _ in range(2):
+            self.client.get(reverse("panel"), HTTP_X_PROFILE_REQUEST="1")
+
+        response = self.client.get(reverse("profiling_report"), {"path": "/panel/"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context["samples"]), 2)
+        hot = response.context["hot_functions"]
+        self.assertTrue(hot)
+        self.assertEqual(hot[0]["samples"], 2)
+        self.assertGreaterEqual(hot[0]["tottime_ms"], hot[-1]["tottime_ms"])
+
+        sample_id = response.context["samples"][0]["id"]
+        detail = self.client.get(reverse("profiling_report"), {"sample": sample_id})
+        self.assertEqual(detail.context["selected"]["id"], sample_id)
+        self.assertEqual(self.client.get(reverse("profiling_report"), {"sample": "x"}).status_code, 404)
+
+        self.client.force_login(self.parent)
+        response = self.client.get(reverse("profiling_report"))
+        self.assertRedirects(response, reverse("panel"), fetch_redirect_response=False)
@@ -0,0 +1,183 @@
+import io
+import zipfile
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from apps.accounts.models import (
+    Notification,
+    Player,
+    PlayerDirectoryEntry,
+    PlayerParent,
+    Team,
+    UserProfile,
+)
+from apps.accounts.roster_import import (
+    RosterImportError,
+    import_roster,
+    read_roster_file,
+    validate_roster_rows,
+)
+from apps.accounts.usernames import allocate_usernames
+from apps.core.exports import iter_xlsx
+from apps.events.models import Division
+
+HEADER = "nombre,apellido,email,fecha_nacimiento,jersey,posicion,grado,division,email_padre\n"
+
+
+def csv_file(*lines, name="roster.csv"):
+    return SimpleUploadedFile(name, (HEADER + "\n".join(lines)).encode("utf-8"))
+
+
+def xlsx_file(cells, shared=("first_name", "last_name")):
+    """Minimal XLSX whose single row holds the given <c> elements"""
+    ns = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+    strings = "".join(f"<si><t>{text}</t></si>" for text in shared)
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        archive.writestr("xl/sharedStrings.xml", f'<sst xmlns="{ns}">{strings}</sst>')
+        archive.writestr(
+            "xl/worksheets/sheet1.xml",
+            f'<worksheet xmlns="{ns}"><sheetData><row>{cells}</row></sheetData></worksheet>',
+        )
+    return SimpleUploadedFile("roster.xlsx", buffer.getvalue())
+
+
+class RosterImportTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.manager = User.objects.create_user(
+            username="manager", password="pass", first_name="Mario"
+        )
+        UserProfile.objects.create(user=self.manager, user_type="team_manager")
+        self.team = Team.objects.create(name="Tigres", manager=self.manager)
+        self.staff = User.objects.create_user(
+            username="staff", password="pass", is_staff=True
+        )
+        self.division = Division.objects.create(name="12U")
+        User.objects.create_user(username="ana.lopez", password="pass")
+        Notification.objects.all().delete()
+
+    def _post(self, uploaded_file):
+        self.client.force_login(self.manager)
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(
+                reverse("accounts:player_import"),
+                {"team": self.team.pk, "file": uploaded_file},
+            )
+
+    def test_valid_file_creates_players_parents_and_one_notification(self):
+        response = self._post(
+            csv_file(
+                "Ana,López,ana@example.com,2012-05-01,7,Pitcher,7th,12u,mama@example.com",
+                "Luis,Pérez,,01/02/2013,8,catcher,,,mama@example.com",
+            )
+        )
+        self.assertRedirects(
+            response, reverse("accounts:player_list"), fetch_redirect_response=False
+        )
+
+        players = Player.objects.filter(team=self.team).order_by("jersey_number")
+        self.assertEqual(players.count(), 2)
+        ana, luis = players
+        self.assertEqual(ana.user.username, "ana.lopez1")
+        self.assertEqual(ana.user.profile.user_type, "player")
+        self.assertEqual(str(ana.user.profile.birth_date), "2012-05-01")
+        self.assertEqual(ana.position, "pitcher")
+        self.assertEqual(ana.grade, "7th")
+        self.assertEqual(ana.division, self.division)
+        self.assertTrue(ana.slug)
+        self.assertNotEqual(ana.slug, luis.slug)
+        self.assertFalse(ana.user.has_usable_password())
+
+        parent = User.objects.get(email="mama@example.com")
+        self.assertEqual(parent.profile.user_type, "parent")
+        self.assertEqual(
+            PlayerParent.objects.filter(parent=parent, is_primary=True).count(), 2
+        )
+        self.assertEqual(
+            PlayerDirectoryEntry.objects.filter(team_id=self.team.pk).count(), 2
+        )
+        notifications = Notification.objects.filter(user=self.staff)
+        self.assertEqual(
+            list(notifications.values_list("title", flat=True)), ["Roster importado"]
+        )
+
+    def test_errors_are_reported_per_row_and_nothing_is_created(self):
+        response = self._post(
+            csv_file(
+                "Ana,López,ana@example.com,2012-05-01,7,,,,",
+                ",Pérez,ana@example.com,ayer,7,shortstop_x,,Senior,",
+            )
+        )
+        self.assertEqual(response.status_code, 200)
+        row_errors = response.context["form"].row_errors
+        self.assertEqual([row.number for row in row_errors], [3])
+        errors = " ".join(row_errors[0].errors)
+        for field in ("first_name", "email", "birth_date", "jersey_number", "position", "division"):
+            self.assertIn(field, errors)
+        self.assertFalse(Player.objects.exists())
+        self.assertFalse(User.objects.filter(email="ana@example.com").exists())
+
+    def test_query_count_does_not_grow_with_rows(self):
+        def run(count, offset):
+            lines = [
+                f"Jugador{offset + i},Apellido,j{offset + i}@example.com,,{offset + i},,,,p{offset + i}@example.com"
+                for i in range(count)
+            ]
+            records = read_roster_file(csv_file(*lines))
+            rows = validate_roster_rows(records, self.team)
+            with CaptureQueriesContext(connection) as queries:
+                import_roster(rows, self.team, self.manager)
+            return len(queries)
+
+        # Small batches: SQLite splits large INSERTs at its parameter limit
+        self.assertEqual(run(2, 0), run(8, 100))
+
+    def test_xlsx_file_is_read(self):
+        columns = ["first_name", "last_name", "jersey_number"]
+        data = b"".join(iter_xlsx(columns, [("Eva", "Ruiz", 10)]))
+        records = read_roster_file(SimpleUploadedFile("roster.xlsx", data))
+        self.assertEqual(
+            records, [{"first_name": "Eva", "last_name": "Ruiz", "jersey_number": "10"}]
+        )
+
+    def test_usernames_are_allocated_without_collisions(self):
+        User.objects.create_user(username="ana.lopez1", password="pass")
+        with self.assertNumQueries(1):
+            usernames = allocate_usernames(["ana.lopez", "ana.lopez", "luis.perez"])
+        self.assertEqual(usernames, ["ana.lopez2", "ana.lopez3", "luis.perez"])
+
+    def test_malformed_xlsx_cells_are_rejected(self):
+        valid = '<c r="A1" t="s"><v>0</v></c><c r="B1" t="s"><v>1</v></c>'
+        self.assertEqual(read_roster_file(xlsx_file(valid)), [])
+        for cells in (
+            '<c r="1A" t="s"><v>0</v></c>',
+            '<c r="ZZZZ1" t="s"><v>0</v></c>',
+            '<c r="A1" t="s"><v>7</v></c>',
+            '<c r="A1" t="s"><v>-1</v></c>',
+            '<c r="A1" t="s"><v>abc</v></c>',
+        ):
+            with self.subTest(cells=cells):
+                with self.assertRaisesMessage(RosterImportError, "XLSX"):
+                    read_roster_file(xlsx_file(cells))
+
+    def test_out_of_range_serial_date_is_a_row_error(self):
+        records = read_roster_file(csv_file("Ana,López,,99999999999,,,,,"))
+        (row,) = validate_roster_rows(records, self.team)
+        self.assertIn("birth_date", " ".join(row.errors))
+
+    def test_parent_email_must_belong_to_a_parent_account(self):
+        User.objects.create_user(
+            username="sinperfil", password="pass", email="sinperfil@example.com"
+        )
+        records = read_roster_file(
+            csv_file("Ana,López,,,,,,,sinperfil@example.com")
+        )
+        (row,) = validate_roster_rows(records, self.team)
+        self.assertIn("parent_email", " ".join(row.errors))
@@ -0,0 +1,138 @@
+import json
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from apps.accounts.models import UserProfile
+from apps.events.models import Event
+from apps.locations import cart_store
+from apps.locations.models import Hotel, HotelRoom
+
+
+def _session_queries(queries):
+    return [q["sql"] for q in queries if "django_session" in q["sql"]]
+
+
+@override_settings(SESSION_ENGINE="apps.core.session_backend", SESSION_SAVE_EVERY_REQUEST=True)
+class CachedSessionBackendTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="parent", password="pass")
+        UserProfile.objects.create(user=self.user, user_type="parent")
+        self.client.force_login(self.user)
+        # First request stores the language in the session
+        self.client.get(reverse("panel"))
+
+    def test_unchanged_session_is_not_written(self):
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(reverse("panel"))
+            self.client.get(reverse("panel"))
+        self.assertEqual(_session_queries(ctx.captured_queries), [])
+
+    def test_changed_session_is_persisted(self):
+        session = self.client.session
+        session["flag"] = "on"
+        session.save()
+        row = Session.objects.get(session_key=session.session_key)
+        self.assertEqual(row.get_decoded()["flag"], "on")
+
+    @override_settings(SESSION_DB_TOUCH_INTERVAL=0)
+    def test_expiry_is_extended_without_rewriting_data(self):
+        # Without slack the row is saved with the exact expiry
+        session = self.client.session
+        session["flag"] = "on"
+        session.save()
+        session_key = session.session_key
+        before = Session.objects.get(session_key=session_key)
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(reverse("panel"))
+        writes = [
+            sql
+            for sql in _session_queries(ctx.captured_queries)
+            if sql.startswith("UPDATE")
+        ]
+        self.assertEqual(len(writes), 1)
+        self.assertNotIn("session_data", writes[0])
+        after = Session.objects.get(session_key=session_key)
+        self.assertGreater(after.expire_date, before.expire_date)
+        self.assertEqual(after.session_data, before.session_data)
+
+    def test_session_survives_cache_loss(self):
+        cache.clear()
+        response = self.client.get(reverse("panel"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.wsgi_request.user, self.user)
+
+
+class HotelCartStoreTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="guest", password="pass")
+        UserProfile.objects.create(user=self.user, user_type="parent")
+        hotel = Hotel.objects.create(hotel_name="Hotel Test", address="Street 1")
+        self.room = HotelRoom.objects.create(
+            hotel=hotel,
+            room_number="101",
+            price_per_night=Decimal("100.00"),
+            capacity=2,
+        )
+        self.client.force_login(self.user)
+
+    def test_cart_lives_outside_the_session(self):
+        check_in = date.today() + timedelta(days=10)
+        response = self.client.post(
+            reverse("locations:add_to_cart"),
+            data=json.dumps(
+                {
+                    "room_id": self.room.pk,
+                    "check_in": str(check_in),
+                    "check_out": str(check_in + timedelta(days=2)),
+                }
+            ),
+            content_type="application/json",
+        )
+        self.assertEqual(response.json()["cart_count"], 1)
+        self.assertNotIn("hotel_cart", self.client.session)
+
+        response = self.client.get(reverse("locations:get_cart_json"))
+        self.assertEqual(response.json()["count"], 1)
+
+        self.client.post(reverse("locations:clear_cart"))
+        response = self.client.get(reverse("locations:get_cart_json"))
+        self.assertEqual(response.json()["count"], 0)
+
+    def test_legacy_session_cart_is_moved_to_the_store(self):
+        session = self.client.session
+        session["hotel_cart"] = {"room_1": {"type": "room", "room_id": self.room.pk}}
+        session.save()
+
+        response = self.client.get(reverse("locations:get_cart_json"))
+        self.assertEqual(response.json()["count"], 1)
+        self.assertNotIn("hotel_cart", self.client.session)
+        self.assertEqual(
+            list(cache.get(cart_store._cart_key(self.user))), ["room_1"]
+        )
+
+    def test_event_detail_sees_the_stored_cart(self):
+        event = Event.objects.create(
+            title="Torneo",
+            start_date="2099-01-01",
+            status="published",
+            organizer=self.user,
+        )
+        url = reverse("accounts:panel_event_detail", kwargs={"pk": event.pk})
+        response = self.client.get(url)
+        self.assertFalse(response.context["has_hotel_cart"])
+
+        session = self.client.session
+        session["hotel_cart"] = {"room_1": {"type": "room", "room_id": self.room.pk}}
+        session.save()
+        response = self.client.get(url)
+        self.assertTrue(response.context["has_hotel_cart"])
@@ -1,6 +1,7 @@
 import json
 import sys
 import types
+from unittest import mock
 from decimal import Decimal, ROUND_HALF_UP
 
 from django.contrib.auth.models import User
@@ -8,8 +9,8 @@ from django.test import TestCase, override_settings
 from django.urls import reverse
 from django.utils import timezone
 
-from apps.accounts.models import Player, PlayerParent, UserProfile
-from apps.events.models import Event
+from apps.accounts.models import Player, PlayerParent, StripeEventCheckout, UserProfile
+from apps.events.models import Event, EventAttendance
 from apps.locations.models import Hotel, HotelRoom
 
 
@@ -288,4 +289,95 @@ class StripeCheckoutTotalsTests(TestCase):
         self.assertIn("Event registration", name)
         self.assertEqual(items[0]["price_data"]["unit_amount"], _to_cents(Decimal("1500.00")))
 
+    @override_settings(STRIPE_SECRET_KEY="sk_test_123", STRIPE_CURRENCY="usd")
+    def test_abandoned_checkout_can_be_resumed(self):
+        """
+        An abandoned checkout keeps the players' pending seats; retrying
+        asks to resume it instead of reporting them as already registered.
+        """
+        self.client.force_login(self.parent_user)
+        url = reverse(
+            "accounts:create_stripe_event_checkout_session", kwargs={"pk": self.event.pk}
+        )
+        data = {"payment_mode": "now", "players": [str(self.player.pk)]}
+
+        first = self.client.post(url, data=data)
+        self.assertEqual(first.status_code, 200)
+
+        retry = self.client.post(url, data=data)
+        self.assertEqual(retry.status_code, 400)
+        self.assertEqual(
+            retry.json().get("resume_checkout_id"),
+            StripeEventCheckout.objects.get(user=self.parent_user, event=self.event).pk,
+        )
+        self.assertEqual(
+            EventAttendance.objects.filter(
+                event=self.event, user=self.player_user, status="pending"
+            ).count(),
+            1,
+        )
+
+    @override_settings(STRIPE_SECRET_KEY="sk_test_123", STRIPE_CURRENCY="usd")
+    def test_unpaid_seat_hold_does_not_lock_the_player(self):
+        """A pending hold from an abandoned checkout keeps the player editable"""
+        self.client.force_login(self.parent_user)
+        self.client.post(
+            reverse(
+                "accounts:create_stripe_event_checkout_session",
+                kwargs={"pk": self.event.pk},
+            ),
+            data={"payment_mode": "now", "players": [str(self.player.pk)]},
+        )
+        self.event.status = "published"
+        self.event.save()
+
+        response = self.client.get(
+            reverse("accounts:panel_event_detail", kwargs={"pk": self.event.pk})
+        )
+        self.assertEqual(response.context["registered_players"], [])
+
+    @override_settings(STRIPE_SECRET_KEY="sk_test_123", STRIPE_CURRENCY="usd")
+    def test_failed_checkout_creation_releases_claimed_seats(self):
+        self.client.force_login(self.parent_user)
+        url = reverse(
+            "accounts:create_stripe_event_checkout_session", kwargs={"pk": self.event.pk}
+        )
+        with mock.patch.object(
+            StripeEventCheckout.objects, "create", side_effect=RuntimeError
+        ):
+            with self.assertRaises(RuntimeError):
+                self.client.post(
+                    url, data={"payment_mode": "now", "players": [str(self.player.pk)]}
+                )
+        self.assertFalse(
+            EventAttendance.objects.filter(event=self.event, status="pending").exists()
+        )
+
+    @override_settings(STRIPE_SECRET_KEY="sk_test_123", STRIPE_CURRENCY="usd")
+    def test_cancelled_checkout_keeps_holds_of_other_live_checkouts(self):
+        self.client.force_login(self.parent_user)
+        self.client.post(
+            reverse(
+                "accounts:create_stripe_event_checkout_session",
+                kwargs={"pk": self.event.pk},
+            ),
+            data={"payment_mode": "now", "players": [str(self.player.pk)]},
+        )
+        abandoned = StripeEventCheckout.objects.get(event=self.event)
+        live = StripeEventCheckout.objects.create(
+            user=self.parent_user,
+            event=self.event,
+            stripe_session_id="sess_live",
+            player_ids=[self.player.pk],
+        )
+        pending = EventAttendance.objects.filter(
+            event=self.event, user=self.player_user, status="pending"
+        )
+
+        abandoned.status = "cancelled"
+        abandoned.save()
+        self.assertTrue(pending.exists())
 
+        live.status = "expired"
+        live.save()
+        self.assertFalse(pending.exists())
@@ -119,6 +119,11 @@ urlpatterns = [
         views_private.PlayerRegistrationView.as_view(),
         name="player_register",
     ),
+    path(
+        "players/import/",
+        views_private.PlayerRosterImportView.as_view(),
+        name="player_import",
+    ),
     path(
         "players/<int:pk>/edit/",
         views_private.PlayerUpdateView.as_view(),
@@ -605,6 +610,16 @@ urlpatterns = [
         views_private.get_notification_count_api,
         name="notifications_count_api",
     ),
+    path(
+        "api/notifications/poll/",
+        views_private.notifications_poll,
+        name="notifications_poll",
+    ),
+    path(
+        "api/notifications/stream/",
+        views_private.notifications_stream,
+        name="notifications_stream",
+    ),
     path(
         "api/notifications/<int:notification_id>/mark-read/",
         views_private.mark_notification_read_api,
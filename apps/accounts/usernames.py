@@ -0,0 +1,84 @@
+"""
+Usernames y slugs únicos generados a partir del nombre.
+
+En lugar de probar ``username``, ``username1``, ``username2``... con una
+consulta cada uno, se leen de una vez todos los existentes que empiezan por
+cada base y los sufijos se asignan en memoria (sirve igual para 1 o 500
+jugadores).
+"""
+
+import re
+from functools import reduce
+from operator import or_
+
+from django.db.models import Q
+
+MAX_USERNAME_LENGTH = 30
+MAX_BASE_LENGTH = 25
+
+_ACCENTS = str.maketrans("áéíóúÁÉÍÓÚñÑ", "aeiouaeiounn")
+
+
+def _clean(value):
+    value = re.sub(r"[^a-zA-ZáéíóúÁÉÍÓÚñÑ]", "", (value or "").strip().lower())
+    return value.translate(_ACCENTS)
+
+
+def username_base(first_name, last_name, last_name2=None):
+    """nombre.apellido (+ inicial del segundo apellido), sin acentos"""
+    first_name = _clean(first_name)
+    last_name = _clean(last_name)
+    last_name2 = _clean(last_name2)
+
+    if first_name and last_name:
+        if last_name2:
+            base = f"{first_name}.{last_name}{last_name2[0]}"
+        else:
+            base = f"{first_name}.{last_name}"
+    else:
+        base = first_name or last_name or "usuario"
+    return base[:MAX_BASE_LENGTH]
+
+
+def _existing(queryset, field, bases):
+    if not bases:
+        return set()
+    condition = reduce(or_, (Q(**{f"{field}__startswith": base}) for base in bases))
+    return set(queryset.filter(condition).values_list(field, flat=True))
+
+
+def _allocate(bases, taken, make_candidate):
+    allocated = []
+    for base in bases:
+        candidate = base
+        counter = 1
+        while candidate in taken:
+            candidate = make_candidate(base, counter)
+            counter += 1
+        taken.add(candidate)
+        allocated.append(candidate)
+    return allocated
+
+
+def allocate_usernames(bases):
+    """
+    Usernames únicos para ``bases`` (en orden, sin repetir entre sí) con una
+    sola consulta a la base de datos.
+    """
+    from django.contrib.auth.models import User
+
+    def make_candidate(base, counter):
+        suffix = str(counter)
+        return f"{base[: max(MAX_USERNAME_LENGTH - len(suffix), 1)]}{suffix}"
+
+    taken = _existing(User.objects.all(), "username", set(bases))
+    return _allocate(bases, taken, make_candidate)
+
+
+def allocate_player_slugs(bases):
+    """Slugs únicos de Player para ``bases`` con una sola consulta"""
+    from .models import Player
+
+    bases = [base or "jugador" for base in bases]
+    taken = _existing(Player.objects.all(), "slug", set(bases))
+    return _allocate(bases, taken, lambda base, counter: f"{base}-{counter}")
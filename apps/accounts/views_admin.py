@@ -12,7 +12,7 @@ from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth.models import User
 from django.core.mail import EmailMultiAlternatives
-from django.db.models import Avg, Q, Sum
+from django.db.models import Avg, Count, Q, Sum
 from django.db.models.functions import Lower
 from django.http import JsonResponse
 from django.shortcuts import get_object_or_404, redirect
@@ -29,10 +29,12 @@ from django.views.generic import (
     UpdateView,
 )
 
+from apps.core.admin_lists import FilteredListMixin
 from apps.core.mixins import StaffRequiredMixin
 from apps.events.models import Division, EventAttendance
 from apps.locations.models import City, Country, State
 
+from .filters import OrderFilterSet
 from .forms import AdminEmailBroadcastForm, AdminTeamForm, AdminTodoForm
 from .models import (
     AdminEmailBroadcast,
@@ -620,64 +622,28 @@ def _send_todo_completed_email(request, todo_obj, completed_by_user):
         )
 
 
-class AdminOrderListView(StaffRequiredMixin, ListView):
+class AdminOrderListView(StaffRequiredMixin, FilteredListMixin, ListView):
     """Lista administrativa de órdenes"""
 
     model = Order
     template_name = "accounts/admin/order_list.html"
     context_object_name = "orders"
     paginate_by = 25
-
-    def get_queryset(self):
-        queryset = Order.objects.select_related(
-            "user", "event", "stripe_checkout"
-        ).all()
-
-        # Filtros
-        search = self.request.GET.get("search", "")
-        status_filter = self.request.GET.get("status", "")
-        payment_mode_filter = self.request.GET.get("payment_mode", "")
-        payment_method_filter = self.request.GET.get("payment_method", "")
-        date_from = self.request.GET.get("date_from", "")
-        date_to = self.request.GET.get("date_to", "")
-
-        if search:
-            queryset = queryset.filter(
-                Q(order_number__icontains=search)
-                | Q(user__username__icontains=search)
-                | Q(user__first_name__icontains=search)
-                | Q(user__last_name__icontains=search)
-                | Q(user__email__icontains=search)
-                | Q(stripe_session_id__icontains=search)
-            )
-
-        if status_filter:
-            queryset = queryset.filter(status=status_filter)
-
-        if payment_mode_filter:
-            queryset = queryset.filter(payment_mode=payment_mode_filter)
-
-        if payment_method_filter:
-            queryset = queryset.filter(payment_method=payment_method_filter)
-
-        if date_from:
-            try:
-                queryset = queryset.filter(created_at__date__gte=date_from)
-            except Exception:
-                pass
-
-        if date_to:
-            try:
-                queryset = queryset.filter(created_at__date__lte=date_to)
-            except Exception:
-                pass
-
-        # Ordenamiento (por defecto: más recientes primero)
-        sort = self.request.GET.get("sort", "-created_at")
-        if sort:
-            queryset = queryset.order_by(sort)
-
-        return queryset
+    filterset_class = OrderFilterSet
+    sort_options = {
+        "-created_at": ("-created_at",),
+        "created_at": ("created_at",),
+        "-paid_at": ("-paid_at",),
+        "paid_at": ("paid_at",),
+        "-total_amount": ("-total_amount",),
+        "total_amount": ("total_amount",),
+        "order_number": ("order_number",),
+        "-order_number": ("-order_number",),
+    }
+    default_sort = "-created_at"
+
+    def get_base_queryset(self):
+        return Order.objects.select_related("user", "event", "stripe_checkout")
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -689,7 +655,7 @@ class AdminOrderListView(StaffRequiredMixin, ListView):
         context["payment_method_filter"] = self.request.GET.get("payment_method", "")
         context["date_from"] = self.request.GET.get("date_from", "")
         context["date_to"] = self.request.GET.get("date_to", "")
-        context["sort"] = self.request.GET.get("sort", "-created_at")
+        context["sort"] = self.get_sort()
 
         # Opciones para los filtros
         context["status_choices"] = Order.ORDER_STATUS_CHOICES
@@ -701,19 +667,19 @@ class AdminOrderListView(StaffRequiredMixin, ListView):
         ]
         context["payment_method_choices"] = Order.PAYMENT_METHOD_CHOICES
 
-        # Estadísticas
-        all_orders = Order.objects.all()
-        context["total_orders"] = all_orders.count()
-        context["total_revenue"] = all_orders.filter(status="paid").aggregate(
-            Sum("total_amount")
-        )["total_amount__sum"] or Decimal("0.00")
-        context["paid_orders"] = all_orders.filter(status="paid").count()
-        context["payment_plans"] = all_orders.filter(
-            payment_mode="payment_plan"
-        ).count()
-        context["pending_registration_orders"] = all_orders.filter(
-            status="pending_registration"
-        ).count()
+        # Estadísticas (una sola consulta)
+        paid = Q(status="paid")
+        stats = Order.objects.aggregate(
+            total_orders=Count("pk"),
+            total_revenue=Sum("total_amount", filter=paid),
+            paid_orders=Count("pk", filter=paid),
+            payment_plans=Count("pk", filter=Q(payment_mode="payment_plan")),
+            pending_registration_orders=Count(
+                "pk", filter=Q(status="pending_registration")
+            ),
+        )
+        stats["total_revenue"] = stats["total_revenue"] or Decimal("0.00")
+        context.update(stats)
 
         context["is_admin"] = True
         return context
@@ -2,9 +2,13 @@
 Vistas privadas - Requieren autenticación
 """
 
+import asyncio
 import json
+import time
 from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
 
+from asgiref.sync import sync_to_async
+
 from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
@@ -13,8 +17,7 @@ from django.contrib.auth.models import User
 from django.core.exceptions import PermissionDenied
 from django.db import transaction
 from django.db.models import Q, Sum
-from django.db.utils import NotSupportedError
-from django.http import FileResponse, Http404, HttpResponse, JsonResponse
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse, reverse_lazy
 from django.utils import timezone, translation
@@ -28,23 +31,30 @@ from django.views.generic import (
     CreateView,
     DeleteView,
     DetailView,
+    FormView,
     ListView,
     TemplateView,
     UpdateView,
     View,
 )
 
+from apps.core import protected_media
+from apps.core.admin_lists import FilteredListMixin
 from apps.core.mixins import (
     ManagerRequiredMixin,
     OwnerOrStaffRequiredMixin,
     StaffRequiredMixin,
     SuperuserRequiredMixin,
 )
+from apps.core.qr_codes import qr_code_url
+from apps.locations.cart_store import clear_cart, get_cart
 
+from .filters import PlayerFilterSet, UserFilterSet
 from .forms import (
     ParentPlayerRegistrationForm,
     PlayerRegistrationForm,
     PlayerUpdateForm,
+    RosterImportForm,
     TeamForm,
     UserProfileForm,
     UserUpdateForm,
@@ -61,6 +71,18 @@ from .models import (
     Team,
     UserProfile,
 )
+from .notifications import (
+    aget_latest_notification_id,
+    get_latest_notification_id,
+    get_unread_count,
+    latest_notification_id,
+    notifications_since,
+    reset_unread_count,
+    serialize_notification,
+)
+from .order_players import event_player_ids, orders_for_player, registered_player_ids
+from .protected_media import AGE_VERIFICATION
+from .roster_import import import_roster
 
 
 class UserDashboardView(LoginRequiredMixin, TemplateView):
@@ -577,7 +599,7 @@ class UserDashboardView(LoginRequiredMixin, TemplateView):
         )
 
         # Obtener información del carrito de hoteles
-        cart = self.request.session.get("hotel_cart", {})
+        cart = get_cart(self.request)
         context["cart_count"] = len(cart)
 
         # Obtener número de reservas de hoteles del usuario
@@ -841,7 +863,7 @@ class UserDashboardView(LoginRequiredMixin, TemplateView):
             # Reservas para el dashboard (últimas 5)
             context["user_reservations"] = (
                 HotelReservation.objects.filter(user=user)
-                .select_related("hotel", "room")
+                .select_related("hotel", "room", "event", "stripe_checkout__event")
                 .order_by("-created_at")[:5]
             )
             context["total_reservations"] = HotelReservation.objects.filter(
@@ -854,7 +876,7 @@ class UserDashboardView(LoginRequiredMixin, TemplateView):
             # Reservas para la tab de reservas (con paginación)
             reservations_queryset = (
                 HotelReservation.objects.filter(user=user)
-                .select_related("hotel", "room")
+                .select_related("hotel", "room", "event", "stripe_checkout__event")
                 .order_by("-created_at")
             )
 
@@ -1259,15 +1281,17 @@ class TeamUpdateView(OwnerOrStaffRequiredMixin, UpdateView):
 # ===== VISTAS DE JUGADORES =====
 
 
-class PlayerListView(StaffRequiredMixin, ListView):
+class PlayerListView(StaffRequiredMixin, FilteredListMixin, ListView):
     """Lista de jugadores"""
 
     model = Player
     template_name = "accounts/player_list.html"
     context_object_name = "players"
     paginate_by = 20
+    filterset_class = PlayerFilterSet
+    ordering = ("user__last_name", "user__first_name")
 
-    def get_queryset(self):
+    def get_base_queryset(self):
         queryset = Player.objects.filter(is_active=True).select_related(
             "user",
             "team",
@@ -1283,41 +1307,7 @@ class PlayerListView(StaffRequiredMixin, ListView):
             and self.request.user.profile.is_team_manager
         ):
             queryset = queryset.filter(team__manager=self.request.user)
-
-        # Búsqueda por nombre
-        search = self.request.GET.get("search")
-        if search:
-            queryset = queryset.filter(
-                Q(user__first_name__icontains=search)
-                | Q(user__last_name__icontains=search)
-                | Q(user__username__icontains=search)
-                | Q(user__email__icontains=search)
-            )
-
-        # Filtros
-        country_filter = self.request.GET.get("country")
-        state_filter = self.request.GET.get("state")
-        city_filter = self.request.GET.get("city")
-        division_filter = self.request.GET.get("division")
-        is_active_filter = self.request.GET.get("is_active")
-
-        if country_filter:
-            queryset = queryset.filter(user__profile__country_id=country_filter)
-
-        if state_filter:
-            queryset = queryset.filter(user__profile__state_id=state_filter)
-
-        if city_filter:
-            queryset = queryset.filter(user__profile__city_id=city_filter)
-
-        if division_filter:
-            queryset = queryset.filter(division_id=division_filter)
-
-        if is_active_filter:
-            is_active = is_active_filter.lower() == "true"
-            queryset = queryset.filter(is_active=is_active)
-
-        return queryset.order_by("user__last_name", "user__first_name")
+        return queryset
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -1435,92 +1425,35 @@ class AdminPlayerDetailView(StaffRequiredMixin, DetailView):
             .order_by("-created_at")
         )
 
-        try:
-            related_orders = list(
-                Order.objects.filter(registered_player_ids__contains=[player_obj.pk])
-                .select_related("event", "stripe_checkout", "user")
-                .order_by("-created_at")[:50]
-            )
-
-            related_payment_plan_orders = list(
-                Order.objects.filter(
-                    registered_player_ids__contains=[player_obj.pk], payment_mode="plan"
-                )
-                .select_related("event", "stripe_checkout", "user")
-                .order_by("-created_at")[:50]
-            )
-
-            related_active_payment_plan_orders = list(
-                Order.objects.filter(
-                    registered_player_ids__contains=[player_obj.pk], payment_mode="plan"
-                )
-                .filter(
-                    Q(plan_payments_remaining__gt=0) | ~Q(stripe_subscription_id="")
-                )
-                .select_related("event", "stripe_checkout", "user")
-                .order_by("-created_at")[:50]
-            )
-        except NotSupportedError:
-            recent_orders = Order.objects.select_related(
-                "event", "stripe_checkout", "user"
-            ).order_by("-created_at")[:1000]
-            related_orders = [
-                o
-                for o in recent_orders
-                if player_obj.pk in (getattr(o, "registered_player_ids", None) or [])
-            ][:50]
-            related_payment_plan_orders = [
-                o for o in related_orders if getattr(o, "payment_mode", "") == "plan"
-            ]
-            related_active_payment_plan_orders = [
-                o
-                for o in related_payment_plan_orders
-                if (getattr(o, "plan_payments_remaining", 0) or 0) > 0
-                or bool(getattr(o, "stripe_subscription_id", ""))
-            ]
-
-        try:
-            related_checkouts = list(
-                StripeEventCheckout.objects.filter(player_ids__contains=[player_obj.pk])
-                .select_related("event", "user")
-                .order_by("-created_at")[:50]
-            )
-
-            related_plan_checkouts = list(
-                StripeEventCheckout.objects.filter(
-                    player_ids__contains=[player_obj.pk], payment_mode="plan"
-                )
-                .select_related("event", "user")
-                .order_by("-created_at")[:50]
-            )
+        player_orders = (
+            orders_for_player(player_obj)
+            .select_related("event", "stripe_checkout", "user")
+            .order_by("-created_at")
+        )
+        related_orders = list(player_orders[:50])
+        related_payment_plan_orders = list(
+            player_orders.filter(payment_mode="plan")[:50]
+        )
+        related_active_payment_plan_orders = list(
+            player_orders.filter(payment_mode="plan").filter(
+                Q(plan_payments_remaining__gt=0) | ~Q(stripe_subscription_id="")
+            )[:50]
+        )
 
-            related_active_plan_checkouts = list(
-                StripeEventCheckout.objects.filter(
-                    player_ids__contains=[player_obj.pk], payment_mode="plan"
-                )
-                .filter(~Q(stripe_subscription_id=""))
-                .select_related("event", "user")
-                .order_by("-created_at")[:50]
-            )
-        except NotSupportedError:
-            recent_checkouts = StripeEventCheckout.objects.select_related(
-                "event", "user"
-            ).order_by("-created_at")[:1000]
-            related_checkouts = [
-                co
-                for co in recent_checkouts
-                if player_obj.pk in (getattr(co, "player_ids", None) or [])
-            ][:50]
-            related_plan_checkouts = [
-                co
-                for co in related_checkouts
-                if getattr(co, "payment_mode", "") == "plan"
-            ]
-            related_active_plan_checkouts = [
-                co
-                for co in related_plan_checkouts
-                if bool(getattr(co, "stripe_subscription_id", ""))
-            ]
+        player_checkouts = (
+            StripeEventCheckout.objects.filter(player_links__player=player_obj)
+            .select_related("event", "user")
+            .order_by("-created_at")
+        )
+        related_checkouts = list(player_checkouts[:50])
+        related_plan_checkouts = list(
+            player_checkouts.filter(payment_mode="plan")[:50]
+        )
+        related_active_plan_checkouts = list(
+            player_checkouts.filter(payment_mode="plan").filter(
+                ~Q(stripe_subscription_id="")
+            )[:50]
+        )
 
         from apps.events.models import EventAttendance
 
@@ -1615,6 +1548,26 @@ class PlayerRegistrationView(ManagerRequiredMixin, CreateView):
         return super().form_invalid(form)
 
 
+class PlayerRosterImportView(ManagerRequiredMixin, FormView):
+    """Importación masiva del roster de un equipo desde CSV/XLSX"""
+
+    form_class = RosterImportForm
+    template_name = "accounts/player_import.html"
+
+    def get_form_kwargs(self):
+        kwargs = super().get_form_kwargs()
+        kwargs["manager"] = self.request.user
+        return kwargs
+
+    def form_valid(self, form):
+        result = import_roster(form.rows, form.cleaned_data["team"], self.request.user)
+        messages.success(
+            self.request,
+            _("%(count)s players imported successfully.") % {"count": result["players"]},
+        )
+        return redirect("accounts:player_list")
+
+
 class PlayerDeleteView(UserPassesTestMixin, DeleteView):
     model = Player
     template_name = "accounts/player_confirm_delete.html"
@@ -1971,40 +1924,18 @@ class AgeVerificationListView(UserPassesTestMixin, LoginRequiredMixin, ListView)
         return context
 
 
-class UserListView(SuperuserRequiredMixin, ListView):
+class UserListView(SuperuserRequiredMixin, FilteredListMixin, ListView):
     """Lista de usuarios (solo admin/superuser)"""
 
     model = User
     template_name = "accounts/user_list.html"
     context_object_name = "users"
     paginate_by = 20
+    filterset_class = UserFilterSet
+    ordering = ("-date_joined",)
 
-    def get_queryset(self):
-        queryset = User.objects.select_related("profile").all()
-
-        # Filtros de búsqueda
-        search = self.request.GET.get("search")
-        if search:
-            queryset = queryset.filter(
-                Q(username__icontains=search)
-                | Q(first_name__icontains=search)
-                | Q(last_name__icontains=search)
-                | Q(email__icontains=search)
-            )
-
-        # Filtro por tipo de usuario
-        user_type = self.request.GET.get("user_type")
-        if user_type:
-            queryset = queryset.filter(profile__user_type=user_type)
-
-        # Filtro por estado activo
-        is_active_filter = self.request.GET.get("is_active")
-        if is_active_filter == "true":
-            queryset = queryset.filter(is_active=True)
-        elif is_active_filter == "false":
-            queryset = queryset.filter(is_active=False)
-
-        return queryset.order_by("-date_joined")
+    def get_base_queryset(self):
+        return User.objects.select_related("profile")
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -2333,36 +2264,17 @@ class PanelEventDetailView(UserDashboardView):
             try:
                 from apps.events.models import EventAttendance
 
-                paid_player_ids = set()
-
-                # 1) Paid Orders (source of truth for panel payment state)
-                for o in (
-                    Order.objects.filter(event=event, status="paid")
-                    .only("registered_player_ids")
-                    .iterator()
-                ):
-                    for pid in o.registered_player_ids or []:
-                        try:
-                            paid_player_ids.add(int(pid))
-                        except Exception:
-                            continue
-
-                # 2) Paid Stripe checkouts (fallback)
-                for co in (
-                    StripeEventCheckout.objects.filter(event=event, status="paid")
-                    .only("player_ids")
-                    .iterator()
-                ):
-                    for pid in co.player_ids or []:
-                        try:
-                            paid_player_ids.add(int(pid))
-                        except Exception:
-                            continue
+                # Paid Orders (source of truth for panel payment state) and
+                # paid Stripe checkouts (fallback)
+                paid_player_ids = event_player_ids(
+                    event, order_statuses=["paid"], checkout_statuses=["paid"]
+                )
 
+                # Solo asistencias confirmadas: las pending/waiting también son
+                # cupos reservados por checkouts sin pagar (claim_event_seats)
                 attendance_user_ids = set(
                     EventAttendance.objects.filter(
-                        event=event,
-                        status__in=["pending", "confirmed", "waiting"],
+                        event=event, status="confirmed"
                     ).values_list("user_id", flat=True)
                 )
 
@@ -2376,6 +2288,8 @@ class PanelEventDetailView(UserDashboardView):
                 registered_players = []
 
             context["registered_players"] = registered_players
+            # El carrito de hoteles vive en cart_store, no en la sesión
+            context["has_hotel_cart"] = bool(get_cart(self.request))
 
         except Event.DoesNotExist:
             context["event"] = None
@@ -2803,10 +2717,72 @@ def _plan_months_until_deadline(payment_deadline):
         return 1
 
 
+def _resumed_checkout_player_ids(request, user, event):
+    """Jugadores del checkout pendiente que se está reanudando (ya tienen cupo)"""
+    resume_checkout_id = (
+        request.POST.get("resume_checkout_id")
+        or request.POST.get("resume_checkout")
+        or request.GET.get("resume_checkout")
+    )
+    try:
+        resume_checkout_id = int(resume_checkout_id)
+    except (TypeError, ValueError):
+        return set()
+    checkout = (
+        StripeEventCheckout.objects.filter(
+            pk=resume_checkout_id,
+            user=user,
+            event=event,
+            status__in=["created", "registered"],
+        )
+        .only("id", "player_ids")
+        .first()
+    )
+    player_ids = set()
+    for pid in (checkout.player_ids if checkout else None) or []:
+        try:
+            player_ids.add(int(pid))
+        except (TypeError, ValueError):
+            continue
+    return player_ids
+
+
+def _release_removed_checkout_players(checkout, valid_players):
+    """Libera el cupo de los jugadores que se quitaron al reanudar un checkout"""
+    from apps.events.capacity import release_checkout_seats
+
+    removed = set()
+    for pid in checkout.player_ids or []:
+        try:
+            removed.add(int(pid))
+        except (TypeError, ValueError):
+            continue
+    removed -= {int(p.pk) for p in valid_players}
+    if removed:
+        release_checkout_seats(checkout, removed)
+
+
 @login_required
 @require_POST
 @csrf_exempt
 def create_stripe_event_checkout_session(request, pk):
+    # Los cupos se reservan antes de crear el checkout: si algo falla entre la
+    # reserva y el guardado se liberan aquí, sin esperar a que caduquen
+    seat_holds = []
+    try:
+        return _create_stripe_event_checkout_session(request, pk, seat_holds)
+    except Exception:
+        for release in seat_holds:
+            release()
+        raise
+
+
+def _create_stripe_event_checkout_session(request, pk, seat_holds):
+    from apps.events.capacity import (
+        CapacityExceeded,
+        claim_event_seats,
+        release_event_seats,
+    )
     from apps.events.models import Event, EventAttendance
 
     event = get_object_or_404(Event, pk=pk)
@@ -2852,36 +2828,10 @@ def create_stripe_event_checkout_session(request, pk):
                 status=400,
             )
 
-        # Bloquear duplicados si el jugador ya tiene asistencia registrada (cualquier estado activo).
-        # Esto cubre órdenes legacy sin registered_player_ids.
-        player_users = [p.user for p in valid_players if getattr(p, "user", None)]
-        if player_users:
-            existing_attendance_users = set(
-                EventAttendance.objects.filter(
-                    event=event,
-                    user__in=player_users,
-                    status__in=["pending", "confirmed", "waiting"],
-                ).values_list("user_id", flat=True)
-            )
-            if existing_attendance_users:
-                already_names = []
-                for p in valid_players:
-                    if getattr(p, "user_id", None) in existing_attendance_users:
-                        already_names.append(p.user.get_full_name() or p.user.username)
-                if already_names:
-                    return JsonResponse(
-                        {
-                            "success": False,
-                            "error": _(
-                                "The following players are already registered for this event: %(players)s"
-                            )
-                            % {"players": ", ".join(already_names)},
-                        },
-                        status=400,
-                    )
-
         # Si existe un checkout pendiente (created/registered) para este mismo usuario/evento que ya incluye
         # alguno de los jugadores seleccionados, forzar reanudar en vez de crear otro checkout.
+        # Va antes de la comprobación de asistencias: el checkout abandonado mantiene
+        # sus cupos pending y el padre debe poder reanudarlo.
         resume_checkout_id = request.POST.get("resume_checkout_id") or request.POST.get(
             "resume_checkout"
         )
@@ -2921,25 +2871,46 @@ def create_stripe_event_checkout_session(request, pk):
                         status=400,
                     )
 
+        # Bloquear duplicados si el jugador ya tiene asistencia registrada (cualquier estado activo).
+        # Esto cubre órdenes legacy sin registered_player_ids.
+        # Los jugadores del checkout que se reanuda ya tienen su cupo reservado (pending).
+        resumed_player_ids = _resumed_checkout_player_ids(request, user, event)
+        player_users = [
+            p.user
+            for p in valid_players
+            if getattr(p, "user", None) and p.pk not in resumed_player_ids
+        ]
+        if player_users:
+            existing_attendance_users = set(
+                EventAttendance.objects.filter(
+                    event=event,
+                    user__in=player_users,
+                    status__in=["pending", "confirmed", "waiting"],
+                ).values_list("user_id", flat=True)
+            )
+            if existing_attendance_users:
+                already_names = []
+                for p in valid_players:
+                    if getattr(p, "user_id", None) in existing_attendance_users:
+                        already_names.append(p.user.get_full_name() or p.user.username)
+                if already_names:
+                    return JsonResponse(
+                        {
+                            "success": False,
+                            "error": _(
+                                "The following players are already registered for this event: %(players)s"
+                            )
+                            % {"players": ", ".join(already_names)},
+                        },
+                        status=400,
+                    )
+
         # Bloquear duplicados si ya existe una orden (incluye pending/pending_registration además de paid)
         # que ya contiene alguno de los jugadores.
         if requested_player_ids:
             try:
-                order_player_ids = set()
-                for o in (
-                    Order.objects.filter(
-                        event=event,
-                        status__in=["paid", "pending", "pending_registration"],
-                    )
-                    .only("registered_player_ids")
-                    .iterator()
-                ):
-                    for pid in o.registered_player_ids or []:
-                        try:
-                            order_player_ids.add(int(pid))
-                        except Exception:
-                            continue
-                if order_player_ids & requested_player_ids:
+                order_player_ids = registered_player_ids(event, requested_player_ids)
+                if order_player_ids:
                     dup_names = []
                     for p in valid_players:
                         if p.pk in order_player_ids:
@@ -2962,29 +2933,9 @@ def create_stripe_event_checkout_session(request, pk):
         # Si existe un checkout/orden pendiente, debe poder editarse y pagarse (resume flow).
         already_registered = []
         try:
-            paid_player_ids = set()
-
-            for o in (
-                Order.objects.filter(event=event, status="paid")
-                .only("registered_player_ids")
-                .iterator()
-            ):
-                for pid in o.registered_player_ids or []:
-                    try:
-                        paid_player_ids.add(int(pid))
-                    except Exception:
-                        continue
-
-            for co in (
-                StripeEventCheckout.objects.filter(event=event, status="paid")
-                .only("player_ids")
-                .iterator()
-            ):
-                for pid in co.player_ids or []:
-                    try:
-                        paid_player_ids.add(int(pid))
-                    except Exception:
-                        continue
+            paid_player_ids = event_player_ids(
+                event, order_statuses=["paid"], checkout_statuses=["paid"]
+            )
         except Exception:
             paid_player_ids = set()
 
@@ -3009,7 +2960,7 @@ def create_stripe_event_checkout_session(request, pk):
     # Si es espectador y no hay jugadores ni hotel/adicionales, requerir al menos hotel
     if is_spectator and not player_ids:
         hotel_payload_raw = request.POST.get("hotel_reservation_json") or ""
-        cart = request.session.get("hotel_cart", {}) or {}
+        cart = get_cart(request)
         if not hotel_payload_raw and not cart:
             return JsonResponse(
                 {
@@ -3048,7 +2999,7 @@ def create_stripe_event_checkout_session(request, pk):
             hotel_payload = None
 
     # Legacy cart (server-side) fallback
-    cart = request.session.get("hotel_cart", {}) or {}
+    cart = get_cart(request)
 
     if (
         hotel_payload
@@ -3360,6 +3311,20 @@ def create_stripe_event_checkout_session(request, pk):
         Decimal("0.01"), rounding=ROUND_HALF_UP
     )
 
+    # Reservar cupos (UPDATE condicional sobre los contadores del evento y de
+    # cada división): dos checkouts concurrentes no pueden sobrevender.
+    try:
+        claimed_user_ids = claim_event_seats(
+            event, valid_players, note=f"Cupo reservado por checkout de {user.username}"
+        )
+    except CapacityExceeded as e:
+        return JsonResponse({"success": False, "error": str(e)}, status=400)
+
+    def release_claimed_seats():
+        release_event_seats(event, claimed_user_ids)
+
+    seat_holds.append(release_claimed_seats)
+
     # Wallet payment handling
     use_wallet = request.POST.get("use_wallet") == "1"
     wallet_amount_used = Decimal("0.00")
@@ -3471,6 +3436,7 @@ def create_stripe_event_checkout_session(request, pk):
             Decimal("0.01"), rounding=ROUND_HALF_UP
         )
         if plan_monthly_amount <= 0:
+            release_claimed_seats()
             return JsonResponse(
                 {"success": False, "error": _("There is nothing to charge.")},
                 status=400,
@@ -3514,6 +3480,7 @@ def create_stripe_event_checkout_session(request, pk):
                 StripeEventCheckout, pk=resume_checkout_id, user=user, event=event
             )
             if checkout.status == "paid":
+                release_claimed_seats()
                 return JsonResponse(
                     {
                         "success": False,
@@ -3521,6 +3488,7 @@ def create_stripe_event_checkout_session(request, pk):
                     },
                     status=400,
                 )
+            _release_removed_checkout_players(checkout, valid_players)
             checkout.stripe_session_id = placeholder_session_id
             checkout.payment_mode = "register_only"
             checkout.discount_percent = 0
@@ -3802,6 +3770,7 @@ def create_stripe_event_checkout_session(request, pk):
                 )
 
         if not line_items:
+            release_claimed_seats()
             return JsonResponse(
                 {"success": False, "error": _("There is nothing to charge.")},
                 status=400,
@@ -3809,6 +3778,7 @@ def create_stripe_event_checkout_session(request, pk):
 
     # From here on we need Stripe configured (plan / now)
     if not settings.STRIPE_SECRET_KEY:
+        release_claimed_seats()
         return JsonResponse(
             {
                 "success": False,
@@ -3820,6 +3790,7 @@ def create_stripe_event_checkout_session(request, pk):
     try:
         import stripe  # type: ignore
     except Exception:
+        release_claimed_seats()
         return JsonResponse(
             {"success": False, "error": _("Stripe SDK is not installed.")}, status=500
         )
@@ -3873,6 +3844,7 @@ def create_stripe_event_checkout_session(request, pk):
         checkout = get_object_or_404(
             StripeEventCheckout, pk=resume_checkout_id, user=user, event=event
         )
+        _release_removed_checkout_players(checkout, valid_players)
         checkout.stripe_session_id = session.id
         checkout.payment_mode = payment_mode
         checkout.discount_percent = discount_percent
@@ -4672,6 +4644,8 @@ def _finalize_stripe_event_checkout(checkout: StripeEventCheckout) -> None:
                 hotel=room.hotel,
                 room=room,
                 user=user,
+                stripe_checkout=checkout,
+                event_id=checkout.event_id,
                 guest_name=user.get_full_name() or user.username,
                 guest_email=user.email,
                 guest_phone=getattr(getattr(user, "profile", None), "phone", "") or "",
@@ -4907,8 +4881,7 @@ def stripe_event_checkout_success(request, pk):
     _finalize_stripe_event_checkout(checkout)
 
     # Clear live session cart (UX)
-    request.session["hotel_cart"] = {}
-    request.session.modified = True
+    clear_cart(request)
 
     messages.success(request, _("Payment completed. Registration confirmed."))
     # Redirigir a la página de confirmación
@@ -5631,8 +5604,7 @@ class StripeInvoiceView(LoginRequiredMixin, DetailView):
         from apps.locations.models import HotelReservation
 
         reservations = HotelReservation.objects.filter(
-            user=checkout.user,
-            notes__icontains=checkout.stripe_session_id,
+            stripe_checkout=checkout
         ).select_related("hotel", "room")
 
         # Parsear breakdown para mostrar detalles
@@ -5710,8 +5682,7 @@ class PaymentConfirmationView(LoginRequiredMixin, DetailView):
         from apps.locations.models import HotelReservation
 
         reservations = HotelReservation.objects.filter(
-            user=checkout.user,
-            notes__icontains=checkout.stripe_session_id,
+            stripe_checkout=checkout
         ).select_related("hotel", "room")
 
         # Parsear breakdown para mostrar detalles
@@ -5730,32 +5701,18 @@ class PaymentConfirmationView(LoginRequiredMixin, DetailView):
 
 @login_required
 def serve_age_verification_document(request, player_id):
-    """Serve age verification documents privately, checking permissions."""
-    player = get_object_or_404(Player, pk=player_id)
-    user = request.user
+    """
+    Serve age verification documents privately, checking permissions.
 
-    # Permissions:
-    # 1. Owner of the player (parent or self)
-    # 2. Staff / Superuser
-    # 3. Team Manager of the player's team
-    is_owner = (player.user == user) or (
-        hasattr(user, "profile")
-        and user.profile.is_parent
-        and PlayerParent.objects.filter(parent=user, player=player).exists()
+    The permission check is cached per user/player; the file itself is sent
+    through a short-lived signed URL (see apps.core.protected_media).
+    """
+    return protected_media.serve(
+        request,
+        AGE_VERIFICATION,
+        player_id,
+        denied_message=_("You do not have permission to view this document."),
     )
-    is_staff = user.is_staff or user.is_superuser
-    is_manager = player.team and player.team.manager == user
-
-    if not (is_owner or is_staff or is_manager):
-        raise PermissionDenied(_("You do not have permission to view this document."))
-
-    if not player.age_verification_document:
-        raise Http404(_("No document uploaded."))
-
-    try:
-        return FileResponse(player.age_verification_document.open())
-    except Exception as e:
-        raise Http404(_("Error opening document: %(error)s") % {"error": str(e)})
 
 
 @login_required
@@ -6002,9 +5959,20 @@ def registration_confirmation(request, pk):
         and Decimal(str(breakdown.get("hotel_total", "0") or "0")) > Decimal("0.00")
     )
 
+    # Código de confirmación: el staff lo escanea en el check-in
+    order_qr_code = None
+    if order:
+        order_qr_code = qr_code_url(
+            request.build_absolute_uri(
+                reverse("accounts:admin_order_detail", args=[order.pk])
+            ),
+            size=192,
+        )
+
     context = {
         "checkout": checkout,
         "order": order,
+        "order_qr_code": order_qr_code,
         "event": checkout.event,
         "registered_players": registered_players,
         "has_hotel": has_hotel,
@@ -6340,55 +6308,63 @@ def start_pending_payment(request, checkout_id):
 
 
 # ===== NOTIFICATION API VIEWS =====
-@login_required
-def get_notifications_api(request):
-    """API para obtener notificaciones del usuario"""
-    try:
-        # Obtener parámetros opcionales
-        limit = int(request.GET.get("limit", 50))
-        unread_only = request.GET.get("unread_only", "false").lower() == "true"
+NOTIFICATION_STREAM_LIFETIME = 300  # segundos; después el navegador reconecta
+NOTIFICATION_STREAM_CHECK_INTERVAL = 2
+NOTIFICATION_STREAM_HEARTBEAT = 25
+NOTIFICATION_STREAM_RETRY_MS = 5000
+NOTIFICATION_POLL_CHECK_INTERVAL = 1
 
-        # Construir query
-        notifications_query = Notification.objects.filter(user=request.user)
 
-        if unread_only:
-            notifications_query = notifications_query.filter(read=False)
+def notifications_streaming_enabled():
+    """SSE solo bajo ASGI: con workers WSGI síncronos ocupa uno por pestaña"""
+    return getattr(settings, "NOTIFICATIONS_STREAMING", False)
 
-        # Obtener notificaciones
-        notifications = notifications_query.select_related("order", "event").order_by(
-            "-created_at"
-        )[:limit]
 
-        # Formatear respuesta
-        notifications_data = []
-        for notification in notifications:
-            # Calcular tiempo relativo
-            time_ago = _get_time_ago(notification.created_at)
+def notification_poll_wait():
+    return getattr(settings, "NOTIFICATIONS_POLL_WAIT", 5)
 
-            notifications_data.append(
-                {
-                    "id": notification.id,
-                    "type": notification.type,
-                    "title": notification.title,
-                    "message": notification.message,
-                    "read": notification.read,
-                    "time": time_ago,
-                    "action_url": notification.action_url or "",
-                    "order_id": notification.order_id,
-                    "event_id": notification.event_id,
-                }
-            )
 
-        # Contar no leídas
-        unread_count = Notification.objects.filter(
-            user=request.user, read=False
-        ).count()
+def _parse_notification_cursor(value):
+    try:
+        return max(int(value), 0)
+    except (TypeError, ValueError):
+        return None
+
+
+@login_required
+def get_notifications_api(request):
+    """
+    API para obtener notificaciones del usuario.
+
+    Con ``since_id`` retorna solo las posteriores a ese id (de la más antigua
+    a la más nueva), para que el cliente pida únicamente lo que le falta.
+    """
+    try:
+        # Obtener parámetros opcionales
+        limit = min(int(request.GET.get("limit", 50)), 100)
+        unread_only = request.GET.get("unread_only", "false").lower() == "true"
+        since_id = _parse_notification_cursor(request.GET.get("since_id"))
+
+        if since_id is not None:
+            notifications_data = notifications_since(request.user.pk, since_id, limit)
+        else:
+            notifications_query = Notification.objects.filter(user=request.user)
+            if unread_only:
+                notifications_query = notifications_query.filter(read=False)
+            notifications_data = [
+                serialize_notification(notification)
+                for notification in notifications_query.order_by("-created_at")[
+                    :limit
+                ]
+            ]
+        if unread_only and since_id is not None:
+            notifications_data = [n for n in notifications_data if not n["read"]]
 
         return JsonResponse(
             {
                 "success": True,
                 "notifications": notifications_data,
-                "unread_count": unread_count,
+                "unread_count": get_unread_count(request.user.pk),
             }
         )
     except Exception as e:
@@ -6403,12 +6379,11 @@ def get_notifications_api(request):
 
 @login_required
 def get_notification_count_api(request):
-    """API para obtener solo el conteo de notificaciones no leídas"""
+    """API para obtener solo el conteo de notificaciones no leídas (cacheado)"""
     try:
-        unread_count = Notification.objects.filter(
-            user=request.user, read=False
-        ).count()
-        return JsonResponse({"success": True, "count": unread_count})
+        return JsonResponse(
+            {"success": True, "count": get_unread_count(request.user.pk)}
+        )
     except Exception as e:
         import logging
 
@@ -6417,6 +6392,108 @@ def get_notification_count_api(request):
         return JsonResponse({"success": False, "count": 0})
 
 
+@login_required
+@never_cache
+@require_GET
+def notifications_poll(request):
+    """
+    Long-poll corto para despliegues WSGI (alternativa al stream SSE).
+
+    Sin ``since_id`` retorna solo el cursor actual (las no leídas existentes
+    no se notifican). Con ``since_id`` espera hasta NOTIFICATIONS_POLL_WAIT
+    segundos a que la caché publique una notificación posterior; mientras
+    tanto no consulta la base de datos. Si la caché no tiene el último id se
+    consulta una vez y se responde sin esperar.
+    """
+    user_id = request.user.pk
+    cursor = _parse_notification_cursor(request.GET.get("since_id"))
+    items = []
+    if cursor is None:
+        cursor = latest_notification_id(user_id)
+    else:
+        deadline = time.monotonic() + notification_poll_wait()
+        while True:
+            latest = get_latest_notification_id(user_id)
+            if latest is None or latest > cursor:
+                items = notifications_since(user_id, cursor)
+                if items or latest is None:
+                    break
+            if time.monotonic() >= deadline:
+                break
+            time.sleep(NOTIFICATION_POLL_CHECK_INTERVAL)
+        if items:
+            cursor = items[-1]["id"]
+
+    return JsonResponse(
+        {
+            "success": True,
+            "notifications": items,
+            "cursor": cursor,
+            "unread_count": get_unread_count(user_id),
+        }
+    )
+
+
+@login_required
+@never_cache
+@require_GET
+async def notifications_stream(request):
+    """
+    Server-Sent Events con las notificaciones nuevas del usuario.
+
+    El cursor es el último id entregado (``Last-Event-ID`` al reconectar o
+    ``since_id``). Mientras no haya notificaciones nuevas el stream solo lee
+    de la caché el id de la última publicada; la base de datos se consulta
+    cuando ese id supera al cursor (o si la caché no lo tiene). La conexión
+    se cierra tras NOTIFICATION_STREAM_LIFETIME y EventSource reconecta.
+
+    Requiere ASGI: bajo WSGI Django consume el generador completo antes de
+    enviar nada. Con NOTIFICATIONS_STREAMING desactivado responde 204, que
+    hace que EventSource deje de reconectar (el panel usa notifications_poll).
+    """
+    if not notifications_streaming_enabled():
+        return HttpResponse(status=204)
+
+    user = await request.auser()
+    user_id = user.pk
+    cursor = _parse_notification_cursor(
+        request.headers.get("Last-Event-ID") or request.GET.get("since_id")
+    )
+    if cursor is None:
+        cursor = await sync_to_async(latest_notification_id)(user_id)
+
+    async def event_stream():
+        nonlocal cursor
+        yield f"retry: {NOTIFICATION_STREAM_RETRY_MS}\n\n"
+        count = await sync_to_async(get_unread_count)(user_id)
+        yield f"event: count\ndata: {json.dumps({'count': count})}\n\n"
+
+        started = last_beat = time.monotonic()
+        while time.monotonic() - started < NOTIFICATION_STREAM_LIFETIME:
+            now = time.monotonic()
+            beat = now - last_beat >= NOTIFICATION_STREAM_HEARTBEAT
+            latest = await aget_latest_notification_id(user_id)
+            if (latest is not None and latest > cursor) or (latest is None and beat):
+                items = await sync_to_async(notifications_since)(user_id, cursor)
+                if items:
+                    cursor = items[-1]["id"]
+                    for item in items:
+                        yield (
+                            f"id: {item['id']}\nevent: notification\n"
+                            f"data: {json.dumps(item)}\n\n"
+                        )
+                    count = await sync_to_async(get_unread_count)(user_id)
+                    yield f"event: count\ndata: {json.dumps({'count': count})}\n\n"
+            if beat:
+                last_beat = now
+                yield ": heartbeat\n\n"
+            await asyncio.sleep(NOTIFICATION_STREAM_CHECK_INTERVAL)
+
+    response = StreamingHttpResponse(event_stream(), content_type="text/event-stream")
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
 @login_required
 @require_POST
 def mark_notification_read_api(request, notification_id):
@@ -6427,12 +6504,9 @@ def mark_notification_read_api(request, notification_id):
         )
         notification.mark_as_read()
 
-        # Obtener nuevo conteo
-        unread_count = Notification.objects.filter(
-            user=request.user, read=False
-        ).count()
-
-        return JsonResponse({"success": True, "unread_count": unread_count})
+        return JsonResponse(
+            {"success": True, "unread_count": get_unread_count(request.user.pk)}
+        )
     except Exception as e:
         import logging
 
@@ -6454,6 +6528,7 @@ def mark_all_notifications_read_api(request):
         updated = Notification.objects.filter(user=request.user, read=False).update(
             read=True, read_at=timezone.now()
         )
+        reset_unread_count(request.user.pk)
 
         return JsonResponse(
             {"success": True, "updated_count": updated, "unread_count": 0}
@@ -6529,35 +6604,6 @@ def push_unsubscribe_api(request):
     return JsonResponse({"success": True})
 
 
-def _get_time_ago(created_at):
-    """Helper para calcular tiempo relativo"""
-    now = timezone.now()
-    diff = now - created_at
-
-    if diff.days > 0:
-        if diff.days == 1:
-            return "Hace 1 día"
-        elif diff.days < 7:
-            return f"Hace {diff.days} días"
-        elif diff.days < 30:
-            weeks = diff.days // 7
-            return f"Hace {weeks} semana{'s' if weeks > 1 else ''}"
-        elif diff.days < 365:
-            months = diff.days // 30
-            return f"Hace {months} mes{'es' if months > 1 else ''}"
-        else:
-            years = diff.days // 365
-            return f"Hace {years} año{'s' if years > 1 else ''}"
-    elif diff.seconds >= 3600:
-        hours = diff.seconds // 3600
-        return f"Hace {hours} hora{'s' if hours > 1 else ''}"
-    elif diff.seconds >= 60:
-        minutes = diff.seconds // 60
-        return f"Hace {minutes} minuto{'s' if minutes > 1 else ''}"
-    else:
-        return "Hace unos segundos"
-
-
 def _get_stripe_api_key():
     """Helper to get Stripe API key and validate configuration"""
     if not settings.STRIPE_SECRET_KEY:
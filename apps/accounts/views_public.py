@@ -18,8 +18,11 @@ from django.utils import timezone
 from django.utils.translation import gettext as _
 from django.views.generic import CreateView, DetailView, ListView, TemplateView
 
+from apps.core.qr_codes import qr_code_url
+
 from .forms import EmailAuthenticationForm, PublicRegistrationForm
-from .models import Player, PlayerParent, Team
+from .models import Player, PlayerDirectoryEntry, PlayerParent, Team
+from .player_directory import get_directory_facets, search_player_directory
 
 logger = logging.getLogger(__name__)
 
@@ -92,130 +95,272 @@ def confirm_email(request, uidb64, token):
     )
 
 
-class PublicHomeView(TemplateView):
-    """Vista pública del home"""
+class AnonymousPageCacheMixin:
+    """
+    Caché de página completa para visitantes anónimos.
+
+    La página se renderiza una vez con CSRF_PLACEHOLDER en lugar del token
+    CSRF (las vistas deben poner ``context["csrf_token"]`` cuando
+    ``_render_for_page_cache`` es True) y el token real se sustituye en cada
+    respuesta.
+    """
+
+    PAGE_TIMEOUT = 600  # 10 minutos
+    CSRF_PLACEHOLDER = "__page_cache_csrf_token__"
+
+    def _is_page_cacheable(self, request):
+        """Solo GET anónimo sin parámetros, errores de login ni mensajes pendientes"""
+        if request.method != "GET" or request.GET:
+            return False
+        if request.user.is_authenticated:
+            return False
+        if "messages" in request.COOKIES:
+            return False
+        session = request.session
+        return not any(
+            key in session for key in ("_messages", "login_error", "login_form_data")
+        )
+
+    def _cached_page_response(self, request, cache_key, *args, **kwargs):
+        """
+        Sirve la página desde ``cache_key`` o la renderiza y la guarda.
+        Las respuestas que no son 200 se devuelven sin cachear.
+        """
+        from django.core.cache import cache
+        from django.middleware.csrf import get_token
+
+        content = cache.get(cache_key)
+        cache_status = "hit"
+        if content is None:
+            cache_status = "miss"
+            self._render_for_page_cache = True
+            response = super().get(request, *args, **kwargs)
+            response.render()
+            if response.status_code != 200:
+                return response
+            content = response.content.decode(response.charset)
+            cache.set(cache_key, content, self.PAGE_TIMEOUT)
+
+        response = HttpResponse(
+            content.replace(self.CSRF_PLACEHOLDER, get_token(request))
+        )
+        response["X-Page-Cache"] = cache_status
+        return response
+
+
+class PublicHomeView(AnonymousPageCacheMixin, TemplateView):
+    """
+    Vista pública del home
+
+    Caché:
+    - Anónimos: página completa por idioma (sin query string ni mensajes
+      pendientes). El token CSRF del modal de login se guarda como marcador y
+      se sustituye en cada respuesta.
+    - Autenticados: cada bloque de datos se cachea como fragmento.
+    Cada fragmento depende de tags que se invalidan al guardar Event, EventType,
+    Team, Player, HomeBanner, SiteSettings o Sponsor (ver signals).
+    """
 
     template_name = "accounts/public_home.html"
 
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
+    FRAGMENT_TAGS = {
+        "events": ("event",),
+        "stats": ("team", "player"),
+        "event_types": ("event_type",),
+        "banners": ("home_banner",),
+        "site_settings": ("site_settings",),
+        "sponsors": ("sponsor",),
+    }
+    FRAGMENT_TIMEOUT = 3600  # 1 hora (la invalidación es por eventos)
+    PAGE_TIMEOUT = 600  # 10 minutos
+    CSRF_PLACEHOLDER = "__public_home_csrf_token__"
 
-        # Obtener eventos próximos (si existe la app events)
-        try:
-            from apps.events.models import Event
+    def get(self, request, *args, **kwargs):
+        if not self._is_page_cacheable(request):
+            return super().get(request, *args, **kwargs)
 
-            now = timezone.now()
-            # Mostrar solo eventos futuros publicados
-            upcoming_events = (
-                Event.objects.filter(status="published", start_date__gte=now.date())
-                .select_related("category")
-                .prefetch_related("divisions")
-                .order_by("start_date")[:6]  # Ordenar por fecha más próxima primero
-            )
+        from django.utils.translation import get_language
 
-            # Eventos de hoy (solo publicados)
-            today_events = Event.objects.filter(
-                status="published", start_date=now.date()
-            ).order_by("start_date")[
-                :3
-            ]  # Ordenar por fecha/hora más próxima primero
+        from apps.core.cache_tags import tagged_cache_key
 
-            context["upcoming_events"] = upcoming_events
-            context["today_events"] = today_events
-
-            # Evento de Mérida (para el bloque promocional del home)
-            # Buscar en título, ciudad, estado y campo location
-            merida_q = (
-                Q(title__icontains="merida")
-                | Q(title__icontains="mérida")
-                | Q(city__name__icontains="merida")
-                | Q(city__name__icontains="mérida")
-                | Q(state__name__icontains="yucatan")
-                | Q(state__name__icontains="yucatán")
-                | Q(location__icontains="merida")
-                | Q(location__icontains="mérida")
-            )
-            # Priorizar eventos futuros, luego los más recientes (solo publicados)
-            merida_event = (
-                Event.objects.filter(status="published")
-                .filter(merida_q)
+        page_tags = sorted(
+            {tag for tags in self.FRAGMENT_TAGS.values() for tag in tags}
+        )
+        cache_key = tagged_cache_key(
+            "public_home_page",
+            page_tags,
+            get_language() or "en",
+            timezone.now().date(),
+        )
+        return self._cached_page_response(request, cache_key, *args, **kwargs)
+
+    def _fragment(self, name, builder, *parts):
+        from apps.core.cache_tags import cached_fragment
+
+        return cached_fragment(
+            f"public_home_{name}",
+            self.FRAGMENT_TAGS[name],
+            builder,
+            timeout=self.FRAGMENT_TIMEOUT,
+            parts=parts,
+        )
+
+    def _build_events_fragment(self, today):
+        from apps.events.models import Event
+
+        # Mostrar solo eventos futuros publicados
+        upcoming_events = list(
+            Event.objects.filter(status="published", start_date__gte=today)
+            .select_related("category", "event_type", "city", "state")
+            .prefetch_related("divisions")
+            .order_by("start_date")[:6]  # Ordenar por fecha más próxima primero
+        )
+
+        # Eventos de hoy (solo publicados)
+        today_events = list(
+            Event.objects.filter(status="published", start_date=today)
+            .select_related("category", "event_type", "city", "state")
+            .order_by("start_date")[:3]
+        )  # Ordenar por fecha/hora más próxima primero
+
+        # Evento de Mérida (para el bloque promocional del home)
+        # Buscar en título, ciudad, estado y campo location
+        merida_q = (
+            Q(title__icontains="merida")
+            | Q(title__icontains="mérida")
+            | Q(city__name__icontains="merida")
+            | Q(city__name__icontains="mérida")
+            | Q(state__name__icontains="yucatan")
+            | Q(state__name__icontains="yucatán")
+            | Q(location__icontains="merida")
+            | Q(location__icontains="mérida")
+        )
+        # Priorizar eventos futuros, luego los más recientes (solo publicados)
+        merida_event = (
+            Event.objects.filter(status="published")
+            .filter(merida_q)
+            .select_related("category", "event_type", "city", "state")
+            .prefetch_related("divisions")
+        )
+        # Primero intentar eventos futuros
+        future_merida = (
+            merida_event.filter(start_date__gte=today).order_by("start_date").first()
+        )
+        # Si no hay futuros, tomar el más reciente
+        if not future_merida:
+            future_merida = merida_event.order_by("-start_date").first()
+
+        # Si aún no hay evento de Mérida, usar el primer evento próximo como fallback (solo publicados)
+        if not future_merida:
+            future_merida = (
+                Event.objects.filter(status="published", start_date__gte=today)
                 .select_related("category", "event_type", "city", "state")
                 .prefetch_related("divisions")
-            )
-            # Primero intentar eventos futuros
-            future_merida = (
-                merida_event.filter(start_date__gte=now.date())
                 .order_by("start_date")
                 .first()
             )
-            # Si no hay futuros, tomar el más reciente
-            if not future_merida:
-                future_merida = merida_event.order_by("-start_date").first()
-
-            # Si aún no hay evento de Mérida, usar el primer evento próximo como fallback (solo publicados)
-            if not future_merida:
-                future_merida = (
-                    Event.objects.filter(status="published", start_date__gte=now.date())
-                    .select_related("category", "event_type", "city", "state")
-                    .prefetch_related("divisions")
-                    .order_by("start_date")
-                    .first()
-                )
 
-            context["merida_event"] = future_merida
+        # Obtener eventos con videos promocionales para el carrusel de videos
+        # Priorizar eventos futuros con video_url, luego los más recientes (solo publicados)
+        promo_events = (
+            Event.objects.filter(status="published")
+            .exclude(video_url__isnull=True)
+            .exclude(video_url="")
+            .select_related("category", "event_type", "city", "state", "country")
+            .prefetch_related("divisions")
+            .order_by("start_date")
+        )
+        # Si hay eventos futuros, priorizarlos (máximo 10 eventos)
+        future_promo_events = list(promo_events.filter(start_date__gte=today)[:10])
+        if not future_promo_events:
+            # Si no hay futuros, tomar los más recientes
+            future_promo_events = list(promo_events.order_by("-start_date")[:10])
+
+        return {
+            "upcoming_events": upcoming_events,
+            "today_events": today_events,
+            "merida_event": future_merida,
+            "promo_events": future_promo_events,
+        }
 
-            # Obtener eventos con videos promocionales para el carrusel de videos
-            # Priorizar eventos futuros con video_url, luego los más recientes (solo publicados)
-            promo_events = (
-                Event.objects.filter(status="published")
-                .exclude(video_url__isnull=True)
-                .exclude(video_url="")
-                .select_related("category", "event_type", "city", "state", "country")
-                .prefetch_related("divisions")
-                .order_by("start_date")
-            )
+    def _build_stats_fragment(self):
+        return {
+            "total_teams": Team.objects.filter(is_active=True).count(),
+            "total_players": Player.objects.filter(is_active=True).count(),
+        }
 
-            # Si hay eventos futuros, priorizarlos
-            future_promo_events = promo_events.filter(start_date__gte=now.date())
-            if future_promo_events.exists():
-                context["promo_events"] = list(
-                    future_promo_events[:10]
-                )  # Máximo 10 eventos
-            else:
-                # Si no hay futuros, tomar los más recientes
-                context["promo_events"] = list(
-                    promo_events.order_by("-start_date")[:10]
+    def _build_event_types_fragment(self):
+        from apps.events.models import EventType
+
+        event_types = list(EventType.objects.filter(is_active=True).order_by("name"))
+        # Buscar tipos específicos para los botones de showcase y prospect games
+        return {
+            "event_types": event_types,
+            "showcase_event_type": next(
+                (et for et in event_types if "showcase" in et.name.lower()), None
+            ),
+            "prospect_event_type": next(
+                (et for et in event_types if "prospect" in et.name.lower()), None
+            ),
+        }
+
+    def _build_banners_fragment(self):
+        from .models import HomeBanner
+
+        return {
+            "home_banners": list(
+                HomeBanner.objects.filter(is_active=True).order_by(
+                    "order", "-created_at"
                 )
-        except ImportError:
-            context["upcoming_events"] = []
-            context["today_events"] = []
-            context["merida_event"] = None
-            context["promo_events"] = []
+            )
+        }
 
-        # Estadísticas públicas
-        context["total_teams"] = Team.objects.filter(is_active=True).count()
-        context["total_players"] = Player.objects.filter(is_active=True).count()
+    def _build_site_settings_fragment(self, current_lang):
+        from .models import SiteSettings
 
-        # Obtener tipos de eventos activos
-        try:
-            from apps.events.models import EventType
+        site_settings = SiteSettings.load()
+        # Valores directos por idioma para facilitar el acceso en templates
+        return {
+            "site_settings": site_settings,
+            # Pasar traducciones al JavaScript
+            "site_settings_translations": site_settings.get_translations_dict(),
+            "schedule_title": site_settings.get_schedule_title(current_lang),
+            "schedule_subtitle": site_settings.get_schedule_subtitle(current_lang),
+            "schedule_description": site_settings.get_schedule_description(
+                current_lang
+            ),
+            "showcase_title": site_settings.get_showcase_title(current_lang),
+            "showcase_subtitle": site_settings.get_showcase_subtitle(current_lang),
+            "showcase_description": site_settings.get_showcase_description(
+                current_lang
+            ),
+        }
 
-            context["event_types"] = EventType.objects.filter(is_active=True).order_by(
-                "name"
+    def _build_sponsors_fragment(self):
+        from .models import Sponsor
+
+        return {
+            "sponsors": list(
+                Sponsor.objects.filter(is_active=True).order_by("order", "name")
             )
-            # Buscar tipos específicos para los botones de showcase y prospect games
-            showcase_type = EventType.objects.filter(
-                is_active=True, name__icontains="showcase"
-            ).first()
-            prospect_type = EventType.objects.filter(
-                is_active=True, name__icontains="prospect"
-            ).first()
-            context["showcase_event_type"] = showcase_type
-            context["prospect_event_type"] = prospect_type
-        except ImportError:
-            context["event_types"] = []
-            context["showcase_event_type"] = None
-            context["prospect_event_type"] = None
+        }
+
+    def get_context_data(self, **kwargs):
+        from django.utils.translation import get_language
+
+        context = super().get_context_data(**kwargs)
+        today = timezone.now().date()
+        # Obtener el idioma actual del request
+        current_lang = get_language() or "en"
+
+        # Eventos próximos, de hoy, Mérida y videos promocionales
+        context.update(
+            self._fragment("events", lambda: self._build_events_fragment(today), today)
+        )
+        # Estadísticas públicas
+        context.update(self._fragment("stats", self._build_stats_fragment))
+        # Tipos de eventos activos
+        context.update(self._fragment("event_types", self._build_event_types_fragment))
 
         # Instagram username y perfil
         instagram_username = getattr(
@@ -231,65 +376,23 @@ class PublicHomeView(TemplateView):
         context["instagram_followers_count"] = 0
         context["instagram_following_count"] = 0
 
-        # Obtener banners activos del home
-        try:
-            from .models import HomeBanner
-
-            context["home_banners"] = HomeBanner.objects.filter(
-                is_active=True
-            ).order_by("order", "-created_at")
-        except ImportError:
-            context["home_banners"] = []
-
-        # Obtener configuraciones del sitio
-        try:
-            from django.utils.translation import get_language
-
-            from .models import SiteSettings
-
-            site_settings = SiteSettings.load()
-            context["site_settings"] = site_settings
-            # Pasar traducciones al JavaScript
-            context["site_settings_translations"] = (
-                site_settings.get_translations_dict()
-            )
-            # Obtener el idioma actual del request
-            current_lang = get_language() or "en"
-            # Pasar valores directamente para facilitar el acceso en templates
-            # Usar el idioma actual del request para obtener los valores correctos
-            context["schedule_title"] = site_settings.get_schedule_title(current_lang)
-            context["schedule_subtitle"] = site_settings.get_schedule_subtitle(
-                current_lang
-            )
-            context["schedule_description"] = site_settings.get_schedule_description(
-                current_lang
-            )
-            context["showcase_title"] = site_settings.get_showcase_title(current_lang)
-            context["showcase_subtitle"] = site_settings.get_showcase_subtitle(
-                current_lang
+        # Banners activos del home
+        context.update(self._fragment("banners", self._build_banners_fragment))
+        # Configuraciones del sitio (según el idioma actual)
+        context.update(
+            self._fragment(
+                "site_settings",
+                lambda: self._build_site_settings_fragment(current_lang),
+                current_lang,
             )
-            context["showcase_description"] = site_settings.get_showcase_description(
-                current_lang
-            )
-        except ImportError:
-            context["site_settings"] = None
-            context["site_settings_translations"] = None
-            context["schedule_title"] = None
-            context["schedule_subtitle"] = None
-            context["schedule_description"] = None
-            context["showcase_title"] = None
-            context["showcase_subtitle"] = None
-            context["showcase_description"] = None
-
-        # Obtener sponsors activos
-        try:
-            from .models import Sponsor
+        )
+        # Sponsors activos
+        context.update(self._fragment("sponsors", self._build_sponsors_fragment))
 
-            context["sponsors"] = Sponsor.objects.filter(is_active=True).order_by(
-                "order", "name"
-            )
-        except ImportError:
-            context["sponsors"] = []
+        if getattr(self, "_render_for_page_cache", False):
+            # La página se cachea: el token real se inserta en cada respuesta
+            context["csrf_token"] = self.CSRF_PLACEHOLDER
+            return context
 
         # Si hay un error de login en la sesión, pasar el formulario con errores
         login_error = self.request.session.pop("login_error", None)
@@ -330,135 +433,61 @@ class PublicTeamListView(ListView):
 
 
 class PublicPlayerListView(ListView):
-    """Vista pública de lista de jugadores - No requiere autenticación"""
+    """
+    Vista pública de lista de jugadores - No requiere autenticación
 
-    model = Player
+    Lee de PlayerDirectoryEntry (tabla desnormalizada sincronizada por
+    señales): una sola consulta indexada por página y facetas cacheadas.
+    """
+
+    model = PlayerDirectoryEntry
     template_name = "accounts/public_player_list.html"
     context_object_name = "players"
     paginate_by = 12
 
     def get_queryset(self):
-        queryset = (
-            Player.objects.filter(is_active=True)
-            .select_related(
-                "user",
-                "user__profile",
-                "team",
-                "user__profile__country",
-                "user__profile__state",
-                "user__profile__city",
-            )
-            .only(
-                "id",
-                "jersey_number",
-                "position",
-                "division",
-                "height",
-                "user__first_name",
-                "user__last_name",
-                "user__email",
-                "user__profile__profile_picture",
-                "user__profile__birth_date",
-                "user__profile__country__name",
-                "user__profile__state__name",
-                "user__profile__city__name",
-                "team__name",
-            )
-            .order_by("user__last_name", "user__first_name")
+        queryset = PlayerDirectoryEntry.objects.filter(is_active=True).order_by(
+            "last_name", "first_name"
         )
 
-        # Búsqueda por nombre
+        # Búsqueda por nombre, email o equipo
         search = self.request.GET.get("search")
         if search:
-            queryset = queryset.filter(
-                Q(user__first_name__icontains=search)
-                | Q(user__last_name__icontains=search)
-                | Q(user__email__icontains=search)
-                | Q(team__name__icontains=search)
-            )
-
-        # Filtro por país
-        country_filter = self.request.GET.get("country")
-        if country_filter:
-            queryset = queryset.filter(user__profile__country_id=country_filter)
-
-        # Filtro por estado
-        state_filter = self.request.GET.get("state")
-        if state_filter:
-            queryset = queryset.filter(user__profile__state_id=state_filter)
-
-        # Filtro por ciudad
-        city_filter = self.request.GET.get("city")
-        if city_filter:
-            queryset = queryset.filter(user__profile__city_id=city_filter)
-
-        # Filtro por división
-        division_filter = self.request.GET.get("division")
-        if division_filter:
-            queryset = queryset.filter(division_id=division_filter)
+            queryset = search_player_directory(queryset, search)
+
+        # Filtros por ubicación y división (ids validados)
+        for param, field in (
+            ("country", "country_id"),
+            ("state", "state_id"),
+            ("city", "city_id"),
+            ("division", "division_id"),
+        ):
+            value = self.request.GET.get(param)
+            if value:
+                try:
+                    queryset = queryset.filter(**{field: int(value)})
+                except (TypeError, ValueError):
+                    return queryset.none()
 
         return queryset
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
 
-        # Importar modelos de locations
-        from django.db.models import Count
-
-        from apps.locations.models import City, Country, State
-
-        # Optimizar: Solo cargar países/estados/ciudades que tienen jugadores activos
-        # Esto reduce significativamente la carga si hay muchos países/estados/ciudades
-        active_players = Player.objects.filter(is_active=True).select_related(
-            "user__profile__country", "user__profile__state", "user__profile__city"
-        )
-
-        # Países que tienen jugadores activos
-        country_ids = (
-            active_players.exclude(user__profile__country__isnull=True)
-            .values_list("user__profile__country_id", flat=True)
-            .distinct()
-        )
-        context["countries"] = Country.objects.filter(
-            id__in=country_ids, is_active=True
-        ).order_by("name")[
-            :100
-        ]  # Limitar a 100 para evitar cargar demasiados
-
-        # Estados que tienen jugadores activos (solo si hay filtro de país)
-        country_filter = self.request.GET.get("country")
-        if country_filter:
-            state_ids = (
-                active_players.filter(user__profile__country_id=country_filter)
-                .exclude(user__profile__state__isnull=True)
-                .values_list("user__profile__state_id", flat=True)
-                .distinct()
-            )
-            context["states"] = State.objects.filter(
-                id__in=state_ids, is_active=True
-            ).order_by("name")[:100]
-        else:
-            context["states"] = State.objects.none()
-
-        # Ciudades que tienen jugadores activos (solo si hay filtro de estado)
-        state_filter = self.request.GET.get("state")
-        if state_filter:
-            city_ids = (
-                active_players.filter(user__profile__state_id=state_filter)
-                .exclude(user__profile__city__isnull=True)
-                .values_list("user__profile__city_id", flat=True)
-                .distinct()
-            )
-            context["cities"] = City.objects.filter(
-                id__in=city_ids, is_active=True
-            ).order_by("name")[:100]
-        else:
-            context["cities"] = City.objects.none()
+        # Solo países/estados/ciudades que tienen jugadores activos (cacheado)
+        facets = get_directory_facets()
+        context["countries"] = facets["countries"]
 
-        # Divisiones desde el modelo Player
-        from apps.events.models import Division
+        # Estados (solo si hay filtro de país) y ciudades (solo si hay filtro de estado)
+        def _selected_id(param):
+            try:
+                return int(self.request.GET.get(param) or 0)
+            except (TypeError, ValueError):
+                return 0
 
-        context["divisions"] = Division.objects.filter(is_active=True).order_by("name")
+        context["states"] = facets["states"].get(_selected_id("country"), [])
+        context["cities"] = facets["cities"].get(_selected_id("state"), [])
+        context["divisions"] = facets["divisions"]
 
         # Filtros actuales
         context["current_filters"] = {
@@ -843,8 +872,16 @@ class EmailConfirmationSentView(TemplateView):
     template_name = "registration/email_confirmation_sent.html"
 
 
-class PublicPlayerProfileView(DetailView):
-    """Vista pública del perfil de jugador - No requiere autenticación"""
+class PublicPlayerProfileView(AnonymousPageCacheMixin, DetailView):
+    """
+    Vista pública del perfil de jugador - No requiere autenticación
+
+    Para anónimos la página se cachea por (jugador, idioma, host, día) y se
+    responde con ETag/Last-Modified, así que los crawlers que revalidan
+    reciben 304 sin renderizar. Se invalida con el tag del jugador (ver
+    player_profile_tag, al sincronizar el directorio) y con "event" por la
+    lista de próximos eventos.
+    """
 
     model = Player
     template_name = "accounts/public_player_profile.html"
@@ -852,6 +889,66 @@ class PublicPlayerProfileView(DetailView):
     slug_field = "slug"
     slug_url_kwarg = "slug"
 
+    PAGE_TIMEOUT = 3600  # 1 hora (la invalidación es por señales)
+    CSRF_PLACEHOLDER = "__public_player_profile_csrf_token__"
+
+    def get(self, request, *args, **kwargs):
+        if not self._is_page_cacheable(request):
+            return super().get(request, *args, **kwargs)
+        stamp = self._get_cache_stamp()
+        if stamp is None:
+            # No existe (404) o aún no tiene slug: flujo normal sin caché
+            return super().get(request, *args, **kwargs)
+
+        from django.utils.cache import get_conditional_response, quote_etag
+        from django.utils.http import http_date
+        from django.utils.translation import get_language
+
+        from apps.core.cache_tags import tagged_cache_key
+
+        from .player_directory import player_profile_tag
+
+        player_id, last_modified = stamp
+        cache_key = tagged_cache_key(
+            "public_player_profile",
+            (player_profile_tag(player_id), "event"),
+            get_language() or "en",
+            request.get_host(),
+            timezone.now().date(),
+        )
+        # La clave ya depende de todo lo que cambia el contenido
+        etag = quote_etag(cache_key.rsplit(":", 1)[1])
+        last_modified = int(last_modified.timestamp())
+
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = self._cached_page_response(request, cache_key, *args, **kwargs)
+        if response.status_code in (200, 304):
+            response["ETag"] = etag
+            response["Last-Modified"] = http_date(last_modified)
+        return response
+
+    def _get_cache_stamp(self):
+        """
+        Retorna (player_id, última modificación) con una consulta ligera, o
+        None si el jugador no existe o no tiene slug todavía.
+        """
+        queryset = Player.objects.filter(is_active=True)
+        pk = self.kwargs.get("pk")
+        if pk is not None:
+            queryset = queryset.filter(pk=pk)
+        else:
+            queryset = queryset.filter(slug=self.kwargs.get(self.slug_url_kwarg))
+        row = queryset.values(
+            "pk", "slug", "updated_at", "user__profile__updated_at"
+        ).first()
+        if row is None or not row["slug"]:
+            return None
+        stamps = [row["updated_at"], row["user__profile__updated_at"]]
+        return row["pk"], max(stamp for stamp in stamps if stamp)
+
     def get_queryset(self):
         # Solo mostrar jugadores activos públicamente
         return Player.objects.filter(is_active=True).select_related(
@@ -907,52 +1004,13 @@ class PublicPlayerProfileView(DetailView):
                 current_age -= 1
         context["current_age"] = current_age
 
-        # Generar código QR para el perfil del jugador
-        context["player_qr_code"] = None
-        try:
-            import base64
-            from io import BytesIO
-
-            import qrcode
-
-            player_url = player.get_absolute_url()
-            if player_url and player_url != "#":
-                qr_url = self.request.build_absolute_uri(player_url)
-            else:
-                qr_url = self.request.build_absolute_uri(self.request.path)
-
-            # Crear código QR
-            qr = qrcode.QRCode(
-                version=1,
-                error_correction=qrcode.constants.ERROR_CORRECT_L,
-                box_size=10,
-                border=1,
-            )
-            qr.add_data(qr_url)
-            qr.make(fit=True)
-
-            # Crear imagen del QR
-            img = qr.make_image(fill_color="black", back_color="white")
-
-            # Convertir a base64 para incluir en el HTML
-            buffer = BytesIO()
-            img.save(buffer, format="PNG")
-            img_str = base64.b64encode(buffer.getvalue()).decode()
-            context["player_qr_code"] = f"data:image/png;base64,{img_str}"
-        except ImportError as e:
-            # Si no está instalada la librería, usar fallback
-            import logging
-
-            logger = logging.getLogger(__name__)
-            logger.warning(f"qrcode library not installed: {e}")
-            context["player_qr_code"] = None
-        except Exception as e:
-            # Log del error pero continuar
-            import logging
-
-            logger = logging.getLogger(__name__)
-            logger.error(f"Error generating QR code: {e}")
-            context["player_qr_code"] = None
+        # Código QR del perfil: URL firmada servida (y cacheada) aparte
+        player_url = player.get_absolute_url()
+        if player_url and player_url != "#":
+            qr_url = self.request.build_absolute_uri(player_url)
+        else:
+            qr_url = self.request.build_absolute_uri(self.request.path)
+        context["player_qr_code"] = qr_code_url(qr_url, size=256, fmt="svg")
 
         # Obtener eventos relacionados si existe la app events
         try:
@@ -977,6 +1035,9 @@ class PublicPlayerProfileView(DetailView):
         except ImportError:
             context["upcoming_events"] = []
 
+        if getattr(self, "_render_for_page_cache", False):
+            # La página se cachea: el token real se inserta en cada respuesta
+            context["csrf_token"] = self.CSRF_PLACEHOLDER
         return context
 
 
@@ -0,0 +1,372 @@
+"""
+Listas administrativas: filtros, orden permitido y paginación por cursor.
+
+Las vistas de lista del staff comparten tres piezas:
+
+- SearchFilterSet: FilterSet de django_filters con un parámetro ``search``
+  que hace OR de ``icontains`` sobre ``search_fields``; cada app declara sus
+  filtros en su ``filters.py``.
+- Orden permitido: ``?sort=`` solo acepta las claves de ``sort_options``
+  (nunca se pasa directo a ``order_by``); a cada orden se le agrega la llave
+  primaria para que sea total.
+- KeysetPaginator: en lugar de OFFSET, cada página se pide "después de" o
+  "antes de" los valores de orden de la última/primera fila, así que el
+  costo no depende de la profundidad. El cursor viaja en el mismo parámetro
+  ``page`` que usan las plantillas (``page_obj.next_page_number`` devuelve el
+  cursor); ``page=last`` pide la última página y un número entero sigue
+  funcionando como antes (enlaces guardados). El total es aproximado:
+  pg_class.reltuples para tablas grandes sin filtros en PostgreSQL o un
+  COUNT exacto cacheado COUNT_CACHE_TIMEOUT segundos.
+
+Uso:
+
+    class AdminOrderListView(FilteredListMixin, StaffRequiredMixin, ListView):
+        filterset_class = OrderFilterSet
+        sort_options = {"-created_at": ("-created_at",), ...}
+        default_sort = "-created_at"
+"""
+
+import base64
+import binascii
+import hashlib
+import json
+import math
+from datetime import date, datetime
+from decimal import Decimal
+from functools import reduce
+from operator import or_
+from uuid import UUID
+
+import django_filters
+
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet, FieldDoesNotExist
+from django.db import connections
+from django.db.models import F, Q
+from django.utils.functional import cached_property
+
+LAST_PAGE = "last"
+COUNT_CACHE_TIMEOUT = 60
+APPROXIMATE_COUNT_THRESHOLD = 10_000
+
+
+# ===== Filtros =====
+
+
+class SearchFilterSet(django_filters.FilterSet):
+    """FilterSet base con ``search`` (OR de icontains sobre ``search_fields``)"""
+
+    search_fields = ()
+
+    search = django_filters.CharFilter(method="filter_search")
+
+    def filter_search(self, queryset, name, value):
+        value = value.strip()
+        if not value or not self.search_fields:
+            return queryset
+        return queryset.filter(
+            reduce(or_, (Q(**{f"{field}__icontains": value}) for field in self.search_fields))
+        )
+
+
+def filter_active_status(queryset, name, value):
+    """Filtro ``active``/``inactive`` (o ``true``/``false``) sobre is_active"""
+    value = value.lower()
+    if value in ("active", "true"):
+        return queryset.filter(**{name: True})
+    if value in ("inactive", "false"):
+        return queryset.filter(**{name: False})
+    return queryset
+
+
+# ===== Conteo =====
+
+
+def approximate_count(queryset):
+    """
+    Número de filas de ``queryset``: la estimación del planificador para
+    tablas grandes sin filtros (PostgreSQL) o un COUNT exacto cacheado.
+    """
+    queryset = queryset.order_by()
+    connection = connections[queryset.db]
+    if connection.vendor == "postgresql" and not queryset.query.where:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                [queryset.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+        if row and row[0] >= APPROXIMATE_COUNT_THRESHOLD:
+            return row[0]
+
+    try:
+        sql, params = queryset.query.sql_with_params()
+    except EmptyResultSet:
+        return 0
+    key = "admin_list_count:" + hashlib.md5(f"{sql}|{params!r}".encode("utf-8")).hexdigest()
+    count = cache.get(key)
+    if count is None:
+        count = queryset.count()
+        cache.set(key, count, COUNT_CACHE_TIMEOUT)
+    return count
+
+
+# ===== Cursor =====
+
+
+def _dump_value(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (Decimal, UUID)):
+        return str(value)
+    return value
+
+
+def encode_cursor(direction, values, offset):
+    payload = json.dumps([[_dump_value(value) for value in values], offset])
+    token = base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+    return f"{direction}.{token}"
+
+
+def decode_cursor(token):
+    """(dirección, valores, desplazamiento) o None si el cursor no es válido"""
+    direction, _, data = (token or "").partition(".")
+    if direction not in ("a", "b") or not data:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+        values, offset = json.loads(raw)
+    except (binascii.Error, ValueError, TypeError):
+        return None
+    if not isinstance(values, list) or not isinstance(offset, int):
+        return None
+    return direction, values, max(offset, 0)
+
+
+# ===== Paginación =====
+
+
+def _is_nullable(queryset, path):
+    if path in queryset.query.annotations:
+        return False
+    model = queryset.model
+    for part in path.split("__"):
+        if part == "pk":
+            return False
+        try:
+            field = model._meta.get_field(part)
+        except FieldDoesNotExist:
+            return False
+        if field.null:
+            return True
+        if field.is_relation:
+            model = field.related_model
+    return False
+
+
+def _row_value(obj, path):
+    for part in path.split("__"):
+        obj = getattr(obj, part, None)
+        if obj is None:
+            return None
+    return getattr(obj, "pk", obj)
+
+
+class KeysetPage:
+    """Página compatible con las plantillas de Page de Django"""
+
+    def __init__(self, object_list, paginator, offset, has_previous, has_next):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.offset = offset
+        self._has_previous = has_previous
+        self._has_next = has_next
+
+    def __repr__(self):
+        return f"<KeysetPage {self.number}>"
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    @property
+    def number(self):
+        return self.offset // self.paginator.per_page + 1
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self._has_next or self._has_previous
+
+    def next_page_number(self):
+        values = self.paginator.row_values(self.object_list[-1])
+        return encode_cursor("a", values, self.offset + len(self.object_list))
+
+    def previous_page_number(self):
+        if not self.object_list:
+            return LAST_PAGE
+        values = self.paginator.row_values(self.object_list[0])
+        return encode_cursor("b", values, self.offset)
+
+    def start_index(self):
+        return self.offset + 1 if self.object_list else 0
+
+    def end_index(self):
+        return self.offset + len(self.object_list)
+
+
+class KeysetPaginator:
+    """
+    Paginación por cursor sobre ``ordering`` (lista de campos con ``-`` para
+    orden descendente). Los campos que admiten NULL se ordenan con los nulos
+    al final en ambas direcciones.
+    """
+
+    def __init__(self, queryset, per_page, ordering):
+        self.queryset = queryset
+        self.per_page = int(per_page)
+        fields = list(ordering)
+        if not fields or fields[-1].lstrip("-") not in ("pk", "id"):
+            fields.append("-pk" if fields and fields[-1].startswith("-") else "pk")
+        self.fields = [field.lstrip("-") for field in fields]
+        self.descending = [field.startswith("-") for field in fields]
+        self.nullable = [_is_nullable(queryset, field) for field in self.fields]
+
+    @cached_property
+    def count(self):
+        return approximate_count(self.queryset)
+
+    @property
+    def num_pages(self):
+        return max(math.ceil(self.count / self.per_page), 1)
+
+    def row_values(self, obj):
+        return [_row_value(obj, field) for field in self.fields]
+
+    def _order_by(self, reverse=False):
+        expressions = []
+        for field, descending, nullable in zip(self.fields, self.descending, self.nullable):
+            descending = descending != reverse
+            if nullable:
+                expression = F(field).desc if descending else F(field).asc
+                # Nulos al final en el orden normal, al principio al invertirlo
+                expressions.append(
+                    expression(nulls_first=True) if reverse else expression(nulls_last=True)
+                )
+            else:
+                expressions.append(f"-{field}" if descending else field)
+        return self.queryset.order_by(*expressions)
+
+    def _equal(self, field, value):
+        return Q(**{f"{field}__isnull": True}) if value is None else Q(**{field: value})
+
+    def _seek(self, values, after):
+        """Filtro de las filas después (o antes) de ``values`` en el orden normal"""
+        conditions = []
+        prefix = Q()
+        for field, descending, nullable, value in zip(
+            self.fields, self.descending, self.nullable, values
+        ):
+            if after:
+                if value is not None:
+                    lookup = "lt" if descending else "gt"
+                    step = Q(**{f"{field}__{lookup}": value})
+                    if nullable:
+                        step |= Q(**{f"{field}__isnull": True})
+                    conditions.append(prefix & step)
+            else:
+                if value is None:
+                    conditions.append(prefix & Q(**{f"{field}__isnull": False}))
+                else:
+                    lookup = "gt" if descending else "lt"
+                    conditions.append(prefix & Q(**{f"{field}__{lookup}": value}))
+            prefix &= self._equal(field, value)
+        if not conditions:
+            return Q(pk__in=[])
+        return reduce(or_, conditions)
+
+    def page(self, number):
+        size = self.per_page
+        number = str(number or "1")
+
+        if number == LAST_PAGE:
+            rows = list(self._order_by(reverse=True)[: size + 1])
+            has_previous = len(rows) > size
+            rows = rows[:size][::-1]
+            offset = max(self.count - len(rows), 0) if has_previous else 0
+            return KeysetPage(rows, self, offset, has_previous, False)
+
+        cursor = decode_cursor(number)
+        if cursor and len(cursor[1]) == len(self.fields):
+            direction, values, offset = cursor
+            if direction == "a":
+                rows = list(self._order_by().filter(self._seek(values, after=True))[: size + 1])
+                return KeysetPage(rows[:size], self, offset, True, len(rows) > size)
+            rows = list(
+                self._order_by(reverse=True).filter(self._seek(values, after=False))[: size + 1]
+            )
+            has_previous = len(rows) > size
+            rows = rows[:size][::-1]
+            offset = max(offset - len(rows), 0) if has_previous else 0
+            return KeysetPage(rows, self, offset, has_previous, True)
+
+        # Número de página clásico (enlaces guardados) o valor inválido
+        try:
+            offset = (max(int(number), 1) - 1) * size
+        except ValueError:
+            offset = 0
+        rows = list(self._order_by()[offset : offset + size + 1])
+        return KeysetPage(rows[:size], self, offset, offset > 0, len(rows) > size)
+
+
+class FilteredListMixin:
+    """
+    Mixin para ListView: aplica ``filterset_class`` a ``get_base_queryset``,
+    ordena según ``sort_options`` (o ``ordering``) y pagina por cursor.
+    """
+
+    filterset_class = None
+    sort_options = {}
+    default_sort = None
+    sort_kwarg = "sort"
+
+    def get_base_queryset(self):
+        return super().get_queryset()
+
+    def get_filterset(self, queryset):
+        return self.filterset_class(self.request.GET, queryset=queryset, request=self.request)
+
+    def get_sort(self):
+        sort = self.request.GET.get(self.sort_kwarg)
+        return sort if sort in self.sort_options else self.default_sort
+
+    def get_sort_fields(self):
+        return self.sort_options.get(self.get_sort()) or self.get_ordering() or ("-pk",)
+
+    def get_queryset(self):
+        queryset = self.get_base_queryset()
+        self.filterset = None
+        if self.filterset_class:
+            self.filterset = self.get_filterset(queryset)
+            queryset = self.filterset.qs
+        return queryset
+
+    def paginate_queryset(self, queryset, page_size):
+        paginator = KeysetPaginator(queryset, page_size, self.get_sort_fields())
+        page = paginator.page(self.request.GET.get(self.page_kwarg))
+        return paginator, page, page.object_list, page.has_other_pages()
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["filterset"] = self.filterset
+        context["current_sort"] = self.get_sort()
+        return context
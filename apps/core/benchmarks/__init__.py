@@ -0,0 +1,11 @@
+"""
+Benchmarks de las rutas más usadas (checkout, panel, home público, API de
+habitaciones y de ubicaciones).
+
+- factories.build_dataset(scale): datos de volumen realista con bulk_create
+- runner: escenarios, medición (percentiles de latencia, consultas,
+  memoria asignada) y comparación contra una línea base en JSON
+
+Se ejecutan con ``python manage.py run_benchmarks`` sobre una base de datos
+de prueba desechable (nunca sobre la base configurada).
+"""
@@ -0,0 +1,244 @@
+"""
+Datos de volumen realista para los benchmarks.
+
+Todo se crea con bulk_create (sin señales ni save() por fila), así que lo
+que dependa de señales se completa aquí a mano: filas de EventCapacity,
+slugs de jugadores y el directorio público de jugadores. Con scale=1 se
+crean unos 2.000 eventos, 2.500 padres con 5.000 jugadores, 10.000 órdenes,
+3.000 reservas y 4.000 ciudades.
+"""
+
+from datetime import timedelta
+from decimal import Decimal
+from types import SimpleNamespace
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.utils import timezone
+
+BASE_COUNTS = {
+    "countries": 20,
+    "states_per_country": 20,
+    "cities_per_state": 10,
+    "events": 2000,
+    "parents": 2500,
+    "players_per_parent": 2,
+    "orders": 10000,
+    "rooms": 40,
+    "reservations": 3000,
+}
+
+PASSWORD = "benchmark"
+
+
+def _scaled(scale):
+    counts = {key: max(int(value * scale), 1) for key, value in BASE_COUNTS.items()}
+    # Estructura por padre y geografía fija: solo escalan los volúmenes
+    counts["players_per_parent"] = BASE_COUNTS["players_per_parent"]
+    counts["states_per_country"] = BASE_COUNTS["states_per_country"]
+    counts["cities_per_state"] = BASE_COUNTS["cities_per_state"]
+    return counts
+
+
+def _locations(counts):
+    from apps.locations.models import City, Country, State
+
+    countries = Country.objects.bulk_create(
+        [
+            Country(name=f"Bench Country {i:02d}", code=f"Z{i:02d}", is_active=True)
+            for i in range(counts["countries"])
+        ]
+    )
+    states = State.objects.bulk_create(
+        [
+            State(country=country, name=f"Bench State {i:02d}", code=f"ZS{i:02d}")
+            for country in countries
+            for i in range(counts["states_per_country"])
+        ]
+    )
+    City.objects.bulk_create(
+        [
+            City(state=state, name=f"Bench City {i:02d}")
+            for state in states
+            for i in range(counts["cities_per_state"])
+        ],
+        batch_size=1000,
+    )
+    return countries, states
+
+
+def _users(prefix, count, password):
+    users = User.objects.bulk_create(
+        [
+            User(
+                username=f"{prefix}{i}",
+                email=f"{prefix}{i}@bench.test",
+                first_name=prefix.capitalize(),
+                last_name=f"{i}",
+                password=password,
+            )
+            for i in range(count)
+        ],
+        batch_size=1000,
+    )
+    return users
+
+
+def _people(counts, password):
+    from apps.accounts.models import Player, PlayerParent, UserProfile
+    from apps.accounts.player_directory import sync_player_directory
+
+    parents = _users("parent", counts["parents"], password)
+    kids = _users("player", counts["parents"] * counts["players_per_parent"], password)
+    UserProfile.objects.bulk_create(
+        [UserProfile(user=user, user_type="parent") for user in parents]
+        + [UserProfile(user=user, user_type="player") for user in kids],
+        batch_size=1000,
+    )
+    players = Player.objects.bulk_create(
+        [Player(user=user, slug=f"bench-{user.username}") for user in kids],
+        batch_size=1000,
+    )
+    per_parent = counts["players_per_parent"]
+    PlayerParent.objects.bulk_create(
+        [
+            PlayerParent(parent=parent, player=player)
+            for index, parent in enumerate(parents)
+            for player in players[index * per_parent : (index + 1) * per_parent]
+        ],
+        batch_size=1000,
+    )
+    sync_player_directory()
+    return parents, players
+
+
+def _events(counts, organizer, countries, states, hotel):
+    from apps.events.models import Event, EventCapacity
+
+    now = timezone.now()
+    events = []
+    for i in range(counts["events"]):
+        start = now + timedelta(days=i % 365 - 120)
+        state = states[i % len(states)]
+        events.append(
+            Event(
+                title=f"Bench Event {i}",
+                description="Benchmark event",
+                organizer=organizer,
+                status="published" if i % 5 else "draft",
+                start_date=start,
+                end_date=start + timedelta(days=2),
+                default_entry_fee=Decimal("150.00"),
+                country_id=state.country_id,
+                state=state,
+                hotel=hotel if i % 10 == 0 else None,
+            )
+        )
+    events = Event.objects.bulk_create(events, batch_size=500)
+    EventCapacity.objects.bulk_create(
+        [EventCapacity(event=event, max_attendees=event.max_attendees) for event in events],
+        batch_size=1000,
+    )
+    return events
+
+
+def _hotel(counts):
+    from apps.locations.models import Hotel, HotelRoom
+
+    hotel = Hotel.objects.create(
+        hotel_name="Bench Hotel", address="1 Benchmark Ave", is_active=True
+    )
+    rooms = HotelRoom.objects.bulk_create(
+        [
+            HotelRoom(
+                hotel=hotel,
+                room_number=f"{100 + i}",
+                name=f"Room {100 + i}",
+                capacity=4,
+                price_per_night=Decimal("120.00"),
+                stock=5,
+                is_available=True,
+            )
+            for i in range(counts["rooms"])
+        ]
+    )
+    return hotel, rooms
+
+
+def _orders(counts, parents, events):
+    from apps.accounts.models import Order
+
+    statuses = ("paid", "paid", "pending", "cancelled")
+    Order.objects.bulk_create(
+        [
+            Order(
+                user=parents[i % len(parents)],
+                event=events[i % len(events)],
+                order_number=f"BENCH-{i:07d}",
+                status=statuses[i % len(statuses)],
+                total_amount=Decimal("150.00"),
+            )
+            for i in range(counts["orders"])
+        ],
+        batch_size=1000,
+    )
+
+
+def _reservations(counts, hotel, rooms, parents):
+    from apps.locations.models import HotelReservation
+
+    today = timezone.localdate()
+    HotelReservation.objects.bulk_create(
+        [
+            HotelReservation(
+                hotel=hotel,
+                room=rooms[i % len(rooms)],
+                user=parents[i % len(parents)],
+                guest_name=f"Guest {i}",
+                guest_email=f"guest{i}@bench.test",
+                guest_phone="5550000000",
+                number_of_guests=2,
+                check_in=today + timedelta(days=i % 90),
+                check_out=today + timedelta(days=i % 90 + 3),
+                status="confirmed" if i % 3 else "pending",
+            )
+            for i in range(counts["reservations"])
+        ],
+        batch_size=1000,
+    )
+
+
+def build_dataset(scale=1.0):
+    """
+    Crea el conjunto de datos y devuelve un namespace con lo que necesitan los
+    escenarios (padres, jugadores, evento de checkout, hotel, país/estado).
+    """
+    counts = _scaled(scale)
+    # Un solo hash para todos los usuarios (hashear miles de contraseñas
+    # dominaría el tiempo de preparación)
+    password = make_password(PASSWORD)
+
+    countries, states = _locations(counts)
+    parents, players = _people(counts, password)
+    hotel, rooms = _hotel(counts)
+    organizer = User.objects.create_user(
+        username="bench_staff", password=PASSWORD, is_staff=True
+    )
+    events = _events(counts, organizer, countries, states, hotel)
+    _orders(counts, parents, events)
+    _reservations(counts, hotel, rooms, parents)
+
+    per_parent = counts["players_per_parent"]
+    return SimpleNamespace(
+        counts=counts,
+        staff=organizer,
+        parents=parents,
+        players_by_parent=[
+            players[index * per_parent : (index + 1) * per_parent]
+            for index in range(len(parents))
+        ],
+        checkout_event=next(event for event in events if event.status == "published"),
+        hotel=hotel,
+        country=countries[0],
+        state=states[0],
+    )
@@ -0,0 +1,229 @@
+"""
+Escenarios de benchmark, medición y comparación con la línea base.
+
+Cada escenario recibe (client, data, i): ``data`` es el namespace de
+factories.build_dataset e ``i`` el número de iteración, para que cada
+petición use un usuario distinto cuando la ruta tiene efectos (el checkout
+reserva cupo). El login se hace fuera de la medición.
+
+Por escenario se registran: percentiles de latencia (p50/p95/p99), mediana
+y máximo de consultas (request_metrics.track_requests) y el pico de memoria
+asignada durante la petición (tracemalloc).
+"""
+
+import json
+import math
+import statistics
+import time
+import tracemalloc
+from contextlib import ExitStack
+from types import SimpleNamespace
+from unittest import mock
+
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from apps.core.request_metrics import track_requests
+
+# Tolerancia por defecto antes de considerar una métrica como regresión
+DEFAULT_TOLERANCE = 0.25
+
+SCENARIOS = {}
+
+
+def scenario(name, user=None):
+    """
+    Registra un escenario. ``user(data, i)`` devuelve el usuario con el que se
+    inicia sesión antes de la iteración (None para anónimo).
+    """
+
+    def decorator(func):
+        SCENARIOS[name] = SimpleNamespace(name=name, run=func, user=user)
+        return func
+
+    return decorator
+
+
+def _parent(data, i):
+    return data.parents[i % len(data.parents)]
+
+
+@scenario("checkout", user=_parent)
+def checkout(client, data, i):
+    players = data.players_by_parent[i % len(data.parents)]
+    return client.post(
+        reverse(
+            "accounts:create_stripe_event_checkout_session",
+            kwargs={"pk": data.checkout_event.pk},
+        ),
+        {"payment_mode": "now", "players": [str(players[0].pk)]},
+    )
+
+
+@scenario("panel", user=_parent)
+def panel(client, data, i):
+    return client.get(reverse("panel"))
+
+
+@scenario("public_home")
+def public_home(client, data, i):
+    return client.get(reverse("home"))
+
+
+@scenario("public_home_authenticated", user=_parent)
+def public_home_authenticated(client, data, i):
+    return client.get(reverse("home"))
+
+
+@scenario("hotel_rooms", user=_parent)
+def hotel_rooms(client, data, i):
+    return client.get(
+        reverse("locations:get_hotel_rooms", kwargs={"hotel_id": data.hotel.pk}),
+        {"check_in": "2030-01-10", "check_out": "2030-01-14"},
+    )
+
+
+def _client_ip(i):
+    # La API pública limita por IP: una IP por iteración
+    return f"10.{i // 65536 % 256}.{i // 256 % 256}.{i % 256}"
+
+
+@scenario("countries_api")
+def countries_api(client, data, i):
+    return client.get(reverse("locations:countries_api"), REMOTE_ADDR=_client_ip(i))
+
+
+@scenario("states_api")
+def states_api(client, data, i):
+    return client.get(
+        reverse("locations:states_api"),
+        {"country": data.country.pk},
+        REMOTE_ADDR=_client_ip(i),
+    )
+
+
+@scenario("cities_api")
+def cities_api(client, data, i):
+    return client.get(
+        reverse("locations:cities_api"),
+        {"state": data.state.pk},
+        REMOTE_ADDR=_client_ip(i),
+    )
+
+
+def _stub_stripe():
+    """Parches para que el checkout no salga a la red"""
+    counter = iter(range(10**9))
+
+    def create(**kwargs):
+        return SimpleNamespace(
+            id=f"cs_bench_{next(counter)}", url="https://checkout.stripe.test/bench"
+        )
+
+    stack = ExitStack()
+    stack.enter_context(override_settings(STRIPE_SECRET_KEY="sk_test_benchmark"))
+    stack.enter_context(mock.patch("stripe.checkout.Session.create", side_effect=create))
+    return stack
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    index = max(math.ceil(fraction * len(ordered)) - 1, 0)
+    return ordered[index]
+
+
+def run_scenario(item, data, iterations, warmup=2):
+    client = Client()
+    timings, queries, peaks, statuses = [], [], [], set()
+    for i in range(warmup + iterations):
+        user = item.user(data, i) if item.user else None
+        if user is not None:
+            client.force_login(user)
+        else:
+            client.logout()
+
+        tracemalloc.reset_peak()
+        baseline_memory = tracemalloc.get_traced_memory()[0]
+        started = time.perf_counter()
+        with track_requests() as metrics:
+            response = item.run(client, data, i)
+        elapsed = time.perf_counter() - started
+        peak = tracemalloc.get_traced_memory()[1] - baseline_memory
+
+        if i < warmup:
+            continue
+        timings.append(elapsed * 1000)
+        queries.append(metrics.queries)
+        peaks.append(peak / 1024)
+        statuses.add(response.status_code)
+
+    return {
+        "iterations": iterations,
+        "p50_ms": round(percentile(timings, 0.50), 2),
+        "p95_ms": round(percentile(timings, 0.95), 2),
+        "p99_ms": round(percentile(timings, 0.99), 2),
+        "mean_ms": round(statistics.fmean(timings), 2),
+        "queries": int(statistics.median(queries)),
+        "max_queries": max(queries),
+        "peak_kb": round(statistics.median(peaks), 1),
+        "statuses": sorted(statuses),
+    }
+
+
+def run_benchmarks(data, names=None, iterations=30, warmup=2, log=None):
+    """Ejecuta los escenarios ``names`` (todos por defecto); {nombre: resultado}"""
+    names = names or list(SCENARIOS)
+    results = {}
+    was_tracing = tracemalloc.is_tracing()
+    if not was_tracing:
+        tracemalloc.start()
+    try:
+        with _stub_stripe():
+            for name in names:
+                results[name] = run_scenario(SCENARIOS[name], data, iterations, warmup)
+                if log:
+                    log(name, results[name])
+    finally:
+        if not was_tracing:
+            tracemalloc.stop()
+    return results
+
+
+def compare(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    """
+    Lista de regresiones respecto a ``baseline``: latencia p50/p95 o memoria
+    por encima de la tolerancia, o cualquier consulta adicional.
+    """
+    regressions = []
+    for name, result in results.items():
+        previous = baseline.get(name)
+        if not previous:
+            continue
+        for key in ("p50_ms", "p95_ms", "peak_kb"):
+            limit = previous[key] * (1 + tolerance)
+            if result[key] > limit:
+                regressions.append(
+                    f"{name}: {key} {result[key]} > {previous[key]} (+{tolerance:.0%})"
+                )
+        if result["queries"] > previous["queries"]:
+            regressions.append(
+                f"{name}: queries {result['queries']} > {previous['queries']}"
+            )
+    return regressions
+
+
+def load_baseline(path):
+    try:
+        with open(path, encoding="utf-8") as handle:
+            return json.load(handle).get("results", {})
+    except FileNotFoundError:
+        return None
+
+
+def save_baseline(path, results, meta):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as handle:
+        json.dump({"meta": meta, "results": results}, handle, indent=2, sort_keys=True)
+        handle.write("\n")
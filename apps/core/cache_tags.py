@@ -0,0 +1,73 @@
+"""
+Caché con etiquetas de dependencia (tags) basada en versiones.
+
+Cada tag ("event", "team", ...) tiene un número de versión en la caché. Las
+claves de los fragmentos incluyen las versiones de los tags de los que
+dependen, de modo que invalidar un tag (subir su versión) hace que solo esos
+fragmentos dejen de encontrarse; el resto sigue sirviéndose desde caché y las
+entradas huérfanas expiran solas.
+"""
+
+import hashlib
+import time
+
+from django.core.cache import cache
+
+TAG_VERSION_PREFIX = "cache_tag_version"
+
+
+def _tag_key(tag):
+    return f"{TAG_VERSION_PREFIX}:{tag}"
+
+
+def get_tag_versions(tags):
+    """
+    Retorna {tag: versión} con una sola lectura a la caché (get_many).
+    Las versiones que no existen se inicializan con un valor basado en tiempo
+    para no colisionar con entradas antiguas que sigan en la caché.
+    """
+    keys = {_tag_key(tag): tag for tag in tags}
+    found = cache.get_many(list(keys))
+    versions = {}
+    missing = {}
+    for key, tag in keys.items():
+        if key in found:
+            versions[tag] = found[key]
+        else:
+            missing[key] = versions[tag] = time.time_ns()
+    if missing:
+        cache.set_many(missing, None)
+    return versions
+
+
+def invalidate_tags(*tags):
+    """Invalida todos los fragmentos que dependen de alguno de los tags"""
+    cache.set_many({_tag_key(tag): time.time_ns() for tag in tags}, None)
+
+
+def tagged_cache_key(name, tags, *parts):
+    """
+    Construye la clave de caché de ``name`` para las versiones actuales de
+    ``tags`` y las partes variables (idioma, fecha, ...).
+    """
+    versions = get_tag_versions(tags)
+    raw = "|".join(
+        [f"{tag}={versions[tag]}" for tag in sorted(tags)]
+        + [str(part) for part in parts]
+    )
+    return f"tagged:{name}:{hashlib.md5(raw.encode('utf-8')).hexdigest()}"
+
+
+def cached_fragment(name, tags, builder, timeout=3600, parts=()):
+    """
+    Retorna el resultado cacheado de ``builder()`` para (name, tags, parts).
+
+    ``builder`` debe devolver datos serializables (listas en lugar de
+    querysets) para que la caché no guarde consultas perezosas.
+    """
+    key = tagged_cache_key(name, tags, *parts)
+    value = cache.get(key)
+    if value is None:
+        value = builder()
+        cache.set(key, value, timeout)
+    return value
@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.urls import Resolver404, resolve
 
 
@@ -400,15 +401,29 @@ def sidebar_context(request):
 
 def site_settings(request):
     """
-    Context processor para hacer disponible site_settings en todos los templates
+    Context processor para hacer disponible site_settings en todos los templates.
+    También indica si el panel puede abrir el stream SSE de notificaciones
+    (NOTIFICATIONS_STREAMING, solo bajo ASGI).
     """
+    streaming = {
+        "notifications_streaming": getattr(settings, "NOTIFICATIONS_STREAMING", False)
+    }
     try:
         from apps.accounts.models import SiteSettings
 
+        from .cache_tags import cached_fragment
+
+        # Cacheado hasta que se guarde SiteSettings (tag "site_settings")
         return {
-            "site_settings": SiteSettings.load(),
+            **cached_fragment(
+                "site_settings",
+                ("site_settings",),
+                lambda: {"site_settings": SiteSettings.load()},
+            ),
+            **streaming,
         }
     except Exception:
         return {
             "site_settings": None,
+            **streaming,
         }
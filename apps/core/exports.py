@@ -0,0 +1,382 @@
+"""
+Exportaciones CSV/XLSX en streaming (rosters, órdenes, hoteles, billeteras).
+
+Cada conjunto de datos se registra con ``register(kind, ...)`` desde el
+``exports.py`` de su app: encabezados, un generador de filas y un conteo.
+Las filas salen de ``values_list(...).iterator(chunk_size=...)`` (cursor del
+lado del servidor en PostgreSQL), así que la memoria no crece con el número
+de filas y la descarga empieza con el primer lote:
+
+- CSV: csv.writer sobre un buffer que se vacía por fila (con BOM para Excel).
+- XLSX: ZIP escrito sobre un stream no buscable (zipfile usa descriptores de
+  datos) con la hoja en modo solo escritura (celdas inline, sin estilos).
+
+Si el conteo supera EXPORT_BACKGROUND_ROWS, el archivo se genera en un hilo
+en segundo plano (como el procesamiento de multimedia), se guarda en
+``exports/`` del storage y se avisa al usuario con una notificación que
+lleva una URL firmada de descarga (EXPORT_DOWNLOAD_TTL). Pasado ese plazo
+el archivo ya no se puede descargar; ``manage.py purge_exports`` lo borra.
+
+Los textos que empiezan con ``=``, ``+``, ``-`` o ``@`` se escriben con un
+apóstrofo delante para que Excel no los evalúe como fórmulas.
+"""
+
+import csv
+import logging
+import os
+import re
+import tempfile
+import threading
+import uuid
+import zipfile
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from urllib.parse import quote
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from django.core import signing
+from django.core.exceptions import PermissionDenied
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.db import close_old_connections
+from django.db.models.fields.files import FieldFile, FileField
+from django.http import Http404, StreamingHttpResponse
+from django.urls import reverse
+from django.utils import timezone
+
+from . import protected_media
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 2000
+BACKGROUND_ROWS = 50_000
+DOWNLOAD_TTL = 7 * 24 * 60 * 60
+SIGNING_SALT = "exports"
+FORMATS = {
+    "csv": "text/csv; charset=utf-8",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+_registry = {}
+
+
+class ExportKind:
+    def __init__(self, kind, title, columns, get_rows, count):
+        self.kind = kind
+        self.title = title
+        self.columns = columns
+        self.get_rows = get_rows
+        self.count = count
+
+
+def register(kind, title, columns, get_rows, count):
+    """
+    Registra un conjunto de datos exportable.
+
+    Args:
+        kind: nombre corto usado en la URL (``exports/<kind>.<fmt>``)
+        title: título de la hoja y base del nombre de archivo
+        columns: encabezados
+        get_rows: función(params) -> iterable de tuplas (mismo orden que columns)
+        count: función(params) -> número de filas (decide el segundo plano)
+    """
+    _registry[kind] = ExportKind(kind, title, columns, get_rows, count)
+
+
+def get_kind(kind):
+    try:
+        return _registry[kind]
+    except KeyError:
+        raise Http404
+
+
+def export_url(kind, fmt="csv", **params):
+    url = reverse("export", kwargs={"kind": kind, "fmt": fmt})
+    query = "&".join(f"{key}={quote(str(value))}" for key, value in params.items())
+    return f"{url}?{query}" if query else url
+
+
+def int_param(params, name):
+    """Parámetro entero opcional de la exportación (404 si no es válido)"""
+    value = params.get(name)
+    if value in (None, ""):
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise Http404
+
+
+def chunk_size():
+    return getattr(settings, "EXPORT_CHUNK_SIZE", CHUNK_SIZE)
+
+
+def filename_for(export_kind, fmt):
+    slug = re.sub(r"[^\w-]+", "-", export_kind.title.lower()).strip("-")
+    return f"{slug}-{timezone.localdate():%Y%m%d}.{fmt}"
+
+
+_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+def _cell_text(value):
+    if value is None:
+        return ""
+    if isinstance(value, str):
+        # Evita inyección de fórmulas al abrir el archivo en una hoja de cálculo
+        return f"'{value}" if value.startswith(_FORMULA_PREFIXES) else value
+    if isinstance(value, datetime):
+        if timezone.is_aware(value):
+            value = timezone.localtime(value)
+        return value.strftime("%Y-%m-%d %H:%M")
+    if isinstance(value, date):
+        return value.isoformat()
+    return str(value)
+
+
+# ===== CSV =====
+
+
+class _Echo:
+    """Buffer de una línea para csv.writer"""
+
+    def write(self, value):
+        return value
+
+
+def iter_csv(columns, rows):
+    writer = csv.writer(_Echo())
+    yield "\ufeff" + writer.writerow(columns)
+    for row in rows:
+        yield writer.writerow([_cell_text(value) for value in row])
+
+
+# ===== XLSX =====
+
+
+class _StreamBuffer:
+    """Destino no buscable de zipfile; ``drain()`` entrega lo escrito"""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+_ILLEGAL_XML = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+_XLSX_STATIC = {
+    "[Content_Types].xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        "</Types>"
+    ),
+    "_rels/.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>'
+        "</Relationships>"
+    ),
+    "xl/_rels/workbook.xml.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" Target="worksheets/sheet1.xml"/>'
+        "</Relationships>"
+    ),
+}
+
+
+def _workbook_xml(sheet_title):
+    # Excel limita el nombre de la hoja a 31 caracteres y prohíbe []:*?/\
+    name = re.sub(r"[\[\]:*?/\\]", " ", sheet_title)[:31] or "Hoja1"
+    return (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        f'<sheets><sheet name="{escape(name, {chr(34): "&quot;"})}" sheetId="1" r:id="rId1"/></sheets>'
+        "</workbook>"
+    )
+
+
+def _xlsx_row(values):
+    cells = []
+    for value in values:
+        if isinstance(value, bool):
+            text = "Sí" if value else "No"
+        elif isinstance(value, (int, float, Decimal)):
+            cells.append(f"<c><v>{value}</v></c>")
+            continue
+        else:
+            text = _cell_text(value)
+        text = escape(_ILLEGAL_XML.sub("", text))
+        cells.append(f'<c t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>')
+    return "<row>" + "".join(cells) + "</row>"
+
+
+def iter_xlsx(columns, rows, sheet_title="Export", rows_per_chunk=500):
+    buffer = _StreamBuffer()
+    with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, content in _XLSX_STATIC.items():
+            archive.writestr(name, content)
+        archive.writestr("xl/workbook.xml", _workbook_xml(sheet_title))
+        yield buffer.drain()
+
+        with archive.open("xl/worksheets/sheet1.xml", "w", force_zip64=True) as sheet:
+            sheet.write(
+                b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+                b"<sheetData>"
+            )
+            sheet.write(_xlsx_row(columns).encode("utf-8"))
+            pending = 0
+            for row in rows:
+                sheet.write(_xlsx_row(row).encode("utf-8"))
+                pending += 1
+                if pending >= rows_per_chunk:
+                    pending = 0
+                    data = buffer.drain()
+                    if data:
+                        yield data
+            sheet.write(b"</sheetData></worksheet>")
+    yield buffer.drain()
+
+
+def iter_export(export_kind, fmt, params):
+    rows = export_kind.get_rows(params)
+    if fmt == "xlsx":
+        return iter_xlsx(export_kind.columns, rows, export_kind.title)
+    return (line.encode("utf-8") for line in iter_csv(export_kind.columns, rows))
+
+
+def stream_response(export_kind, fmt, params):
+    response = StreamingHttpResponse(
+        iter_export(export_kind, fmt, params), content_type=FORMATS[fmt]
+    )
+    filename = filename_for(export_kind, fmt)
+    response["Content-Disposition"] = f"attachment; filename*=UTF-8''{quote(filename)}"
+    response["Cache-Control"] = "private, no-store"
+    return response
+
+
+# ===== Segundo plano =====
+
+
+def background_threshold():
+    return getattr(settings, "EXPORT_BACKGROUND_ROWS", BACKGROUND_ROWS)
+
+
+def download_ttl():
+    return getattr(settings, "EXPORT_DOWNLOAD_TTL", DOWNLOAD_TTL)
+
+
+def download_url(name, user):
+    token = signing.dumps([name, user.pk], salt=SIGNING_SALT)
+    return reverse("export_download", args=[token])
+
+
+def build_export_file(export_kind, fmt, params, user):
+    """Genera el archivo en el storage y avisa al usuario (hilo de fondo)"""
+    from apps.accounts.notifications import notify_users
+
+    filename = filename_for(export_kind, fmt)
+    with tempfile.TemporaryFile() as handle:
+        for chunk in iter_export(export_kind, fmt, params):
+            handle.write(chunk)
+        handle.seek(0)
+        name = default_storage.save(
+            f"exports/{user.pk}/{uuid.uuid4().hex}/{filename}", File(handle)
+        )
+    notify_users(
+        [user.pk],
+        title=f"Exportación lista: {export_kind.title}",
+        message=f"El archivo {filename} está listo para descargar.",
+        action_url=download_url(name, user),
+        send_push=False,
+    )
+    return name
+
+
+def _run_in_background(target, *args):
+    def run():
+        try:
+            target(*args)
+        except Exception:
+            logger.exception("Error generating background export")
+        finally:
+            close_old_connections()
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    return thread
+
+
+def start_background_export(export_kind, fmt, params, user):
+    return _run_in_background(build_export_file, export_kind, fmt, dict(params), user)
+
+
+def serve_download(request, token):
+    """Entrega un archivo generado en segundo plano (URL firmada por usuario)"""
+    try:
+        name, user_id = signing.loads(
+            token,
+            salt=SIGNING_SALT,
+            max_age=download_ttl(),
+        )
+    except (signing.BadSignature, ValueError):
+        raise Http404
+    if user_id != request.user.pk:
+        raise PermissionDenied
+    if not name.startswith("exports/") or not default_storage.exists(name):
+        raise Http404
+    field_file = FieldFile(None, FileField(storage=default_storage), name)
+    response = protected_media.file_response(request, field_file)
+    response["Content-Disposition"] = (
+        f"attachment; filename*=UTF-8''{quote(os.path.basename(name))}"
+    )
+    return response
+
+
+def purge_expired_exports(now=None):
+    """
+    Borra del storage los archivos de ``exports/<usuario>/<uuid>/`` cuyo
+    enlace firmado ya venció. Devuelve cuántos archivos se borraron.
+    """
+    cutoff = (now or timezone.now()) - timedelta(seconds=download_ttl())
+    deleted = 0
+    for name in _export_files():
+        try:
+            modified = default_storage.get_modified_time(name)
+        except (NotImplementedError, OSError):
+            continue
+        if modified < cutoff:
+            default_storage.delete(name)
+            deleted += 1
+    return deleted
+
+
+def _export_files():
+    try:
+        user_dirs, _ = default_storage.listdir("exports")
+    except FileNotFoundError:
+        return
+    for user_dir in user_dirs:
+        export_dirs, _ = default_storage.listdir(f"exports/{user_dir}")
+        for export_dir in export_dirs:
+            prefix = f"exports/{user_dir}/{export_dir}"
+            for filename in default_storage.listdir(prefix)[1]:
+                yield f"{prefix}/{filename}"
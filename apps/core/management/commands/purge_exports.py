@@ -0,0 +1,22 @@
+"""
+Comando para borrar las exportaciones en segundo plano ya vencidas.
+
+Los archivos de ``exports/`` solo se pueden descargar durante
+EXPORT_DOWNLOAD_TTL (ver apps.core.exports); conviene correrlo a diario:
+
+    python manage.py purge_exports
+"""
+
+from django.core.management.base import BaseCommand
+
+from apps.core.exports import purge_expired_exports
+
+
+class Command(BaseCommand):
+    help = "Borra los archivos de exportaciones cuyo enlace de descarga ya venció"
+
+    def handle(self, *args, **options):
+        deleted = purge_expired_exports()
+        self.stdout.write(
+            self.style.SUCCESS(f"Exportaciones vencidas borradas: {deleted}")
+        )
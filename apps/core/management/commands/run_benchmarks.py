@@ -0,0 +1,148 @@
+"""
+Comando para ejecutar los benchmarks de rutas críticas (apps.core.benchmarks).
+
+Crea una base de datos de prueba desechable (como el test runner), la llena
+con factories.build_dataset y recorre los escenarios con el cliente de
+pruebas, Stripe simulado y una caché en memoria propia. Compara contra la
+línea base guardada y termina con error si hay regresiones:
+
+    python manage.py run_benchmarks                     # comparar
+    python manage.py run_benchmarks --update-baseline   # guardar nueva base
+    python manage.py run_benchmarks --only panel,checkout --scale 0.2
+"""
+
+import platform
+from pathlib import Path
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.runner import DiscoverRunner
+from django.test.utils import (
+    override_settings,
+    setup_test_environment,
+    teardown_test_environment,
+)
+from django.utils import timezone
+
+from apps.core.benchmarks import runner
+from apps.core.benchmarks.factories import build_dataset
+
+DEFAULT_BASELINE = Path(settings.BASE_DIR) / "reports" / "benchmarks" / "baseline.json"
+
+BENCHMARK_CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "benchmarks",
+    }
+}
+
+
+class Command(BaseCommand):
+    help = "Ejecuta los benchmarks de checkout, panel, home y APIs y los compara con la línea base"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--scale",
+            type=float,
+            default=1.0,
+            help="Multiplicador del volumen de datos (default: 1.0)",
+        )
+        parser.add_argument(
+            "--iterations",
+            type=int,
+            default=30,
+            help="Peticiones medidas por escenario (default: 30)",
+        )
+        parser.add_argument(
+            "--warmup",
+            type=int,
+            default=2,
+            help="Peticiones previas sin medir por escenario (default: 2)",
+        )
+        parser.add_argument(
+            "--only",
+            default="",
+            help=f"Escenarios separados por coma ({', '.join(runner.SCENARIOS)})",
+        )
+        parser.add_argument(
+            "--baseline",
+            default=str(DEFAULT_BASELINE),
+            help="Archivo JSON de la línea base",
+        )
+        parser.add_argument(
+            "--tolerance",
+            type=float,
+            default=runner.DEFAULT_TOLERANCE,
+            help="Margen permitido sobre la línea base (default: 0.25 = 25%%)",
+        )
+        parser.add_argument(
+            "--update-baseline",
+            action="store_true",
+            help="Guarda los resultados como nueva línea base",
+        )
+
+    def handle(self, *args, **options):
+        names = [name.strip() for name in options["only"].split(",") if name.strip()]
+        unknown = set(names) - set(runner.SCENARIOS)
+        if unknown:
+            raise CommandError(f"Escenarios desconocidos: {', '.join(sorted(unknown))}")
+
+        setup_test_environment()
+        test_runner = DiscoverRunner(verbosity=0, interactive=False)
+        old_config = test_runner.setup_databases()
+        try:
+            with override_settings(CACHES=BENCHMARK_CACHES):
+                self.stdout.write(f"Creando datos (scale={options['scale']})...")
+                data = build_dataset(options["scale"])
+                results = runner.run_benchmarks(
+                    data,
+                    names=names,
+                    iterations=options["iterations"],
+                    warmup=options["warmup"],
+                    log=self._write_result,
+                )
+        finally:
+            test_runner.teardown_databases(old_config)
+            teardown_test_environment()
+
+        baseline_path = Path(options["baseline"])
+        if options["update_baseline"]:
+            runner.save_baseline(
+                baseline_path,
+                results,
+                {
+                    "created": timezone.now().isoformat(),
+                    "scale": options["scale"],
+                    "iterations": options["iterations"],
+                    "database": connection.vendor,
+                    "python": platform.python_version(),
+                    "django": django.get_version(),
+                },
+            )
+            self.stdout.write(self.style.SUCCESS(f"Línea base guardada en {baseline_path}"))
+            return
+
+        baseline = runner.load_baseline(baseline_path)
+        if baseline is None:
+            self.stdout.write(
+                self.style.WARNING(
+                    f"Sin línea base en {baseline_path}; usa --update-baseline para crearla"
+                )
+            )
+            return
+
+        regressions = runner.compare(results, baseline, options["tolerance"])
+        if regressions:
+            for line in regressions:
+                self.stderr.write(self.style.ERROR(line))
+            raise CommandError(f"{len(regressions)} regresiones respecto a la línea base")
+        self.stdout.write(self.style.SUCCESS("Sin regresiones respecto a la línea base"))
+
+    def _write_result(self, name, result):
+        self.stdout.write(
+            f"{name:<28} p50={result['p50_ms']:>8}ms p95={result['p95_ms']:>8}ms "
+            f"p99={result['p99_ms']:>8}ms queries={result['queries']:>4} "
+            f"peak={result['peak_kb']:>8}KB status={result['statuses']}"
+        )
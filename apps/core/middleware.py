@@ -1,8 +1,10 @@
 """
-Middleware para establecer inglés como idioma predeterminado
-y manejar errores de sesión
+Middleware para establecer inglés como idioma predeterminado,
+manejar errores de sesión, medir consultas por petición y perfilar
+peticiones de muestra
 """
 
+import json
 import logging
 
 from django.conf import settings
@@ -10,7 +12,11 @@ from django.contrib.sessions.exceptions import SessionInterrupted
 from django.http import JsonResponse
 from django.utils import translation
 
+from . import profiling
+from .request_metrics import track_requests
+
 logger = logging.getLogger(__name__)
+metrics_logger = logging.getLogger("request_metrics")
 
 
 class DefaultLanguageMiddleware:
@@ -50,17 +56,15 @@ class DefaultLanguageMiddleware:
                         ):
                             preferred_language = request.user.profile.preferred_language
                             # Establecer el idioma en la sesión basado en la preferencia del usuario
-                            request.session[language_key] = preferred_language
-                            if hasattr(request.session, "modified"):
-                                request.session.modified = True
+                            # (solo si cambia, para no reescribir la sesión en cada petición)
+                            if session_language != preferred_language:
+                                request.session[language_key] = preferred_language
                     except Exception:
                         pass  # Si hay algún error, usar el predeterminado
 
                 # Si no hay idioma en sesión ni preferencia del usuario, usar inglés
                 if not session_language and not preferred_language:
                     request.session[language_key] = settings.LANGUAGE_CODE
-                    if hasattr(request.session, "modified"):
-                        request.session.modified = True
 
                 # Activar el idioma (preferencia del usuario, sesión, o inglés por defecto)
                 language_to_activate = (
@@ -156,3 +160,75 @@ class XFrameOptionsMiddleware:
                 del response["X-Frame-Options"]
 
         return response
+
+
+class QueryMetricsMiddleware:
+    """
+    Mide cada petición con apps.core.request_metrics: número de consultas,
+    consultas repetidas (N+1), tiempo en base de datos y en plantillas.
+
+    - Cabecera ``Server-Timing`` (visible en las herramientas del navegador)
+      con DEBUG o para usuarios staff.
+    - Una línea JSON en el logger ``request_metrics`` por petición; sube a
+      WARNING si se pasa de REQUEST_METRICS_WARN_QUERIES consultas o alguna
+      consulta se repite N_PLUS_ONE_THRESHOLD veces o más.
+
+    Debe ir al principio de MIDDLEWARE para incluir sesión y autenticación.
+    Se desactiva con REQUEST_METRICS_ENABLED = False.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = getattr(settings, "REQUEST_METRICS_ENABLED", True)
+        self.warn_queries = getattr(settings, "REQUEST_METRICS_WARN_QUERIES", 50)
+
+    def __call__(self, request):
+        if not self.enabled:
+            return self.get_response(request)
+
+        with track_requests() as metrics:
+            response = self.get_response(request)
+        request.metrics = metrics
+
+        user = getattr(request, "user", None)
+        if settings.DEBUG or (user is not None and user.is_staff):
+            response["Server-Timing"] = metrics.server_timing()
+
+        n_plus_one = metrics.n_plus_one()
+        data = {
+            "method": request.method,
+            "path": request.path,
+            "status": response.status_code,
+            **metrics.as_dict(),
+        }
+        if n_plus_one:
+            data["n_plus_one"] = [
+                {"sql": sql[:300], "count": count} for sql, count in n_plus_one[:3]
+            ]
+        level = (
+            logging.WARNING
+            if n_plus_one or metrics.queries > self.warn_queries
+            else logging.INFO
+        )
+        metrics_logger.log(level, json.dumps(data, ensure_ascii=False))
+        return response
+
+
+class RequestProfilingMiddleware:
+    """
+    Perfila con cProfile una muestra de las peticiones y las que el staff
+    marque con la cabecera REQUEST_PROFILING_HEADER (ver apps.core.profiling).
+    Opt-in: no hace nada sin REQUEST_PROFILING_ENABLED = True.
+
+    Debe ir DESPUÉS de AuthenticationMiddleware (usa request.user).
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if profiling.profiling_enabled():
+            reason = profiling.should_profile(request)
+            if reason:
+                return profiling.profile_request(request, self.get_response, reason)
+        return self.get_response(request)
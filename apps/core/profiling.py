@@ -0,0 +1,196 @@
+"""
+Perfiles de peticiones en producción (cProfile) con muestreo.
+
+RequestProfilingMiddleware perfila una fracción de las peticiones
+(REQUEST_PROFILING_SAMPLE_RATE) y las que un usuario staff marque con la
+cabecera REQUEST_PROFILING_HEADER. Solo actúa con REQUEST_PROFILING_ENABLED.
+
+Cada muestra se guarda como JSON en REQUEST_PROFILING_DIR con la URL, el
+rol del usuario, la duración, las métricas de consultas (request_metrics) y
+las funciones con más tiempo propio. El directorio funciona como un buffer
+circular: al pasar de REQUEST_PROFILING_MAX_SAMPLES se borran las más
+antiguas. aggregate_samples() suma las funciones de varias muestras para el
+visor del staff (ProfilingReportView).
+"""
+
+import cProfile
+import json
+import logging
+import os
+import pstats
+import random
+import time
+import uuid
+from pathlib import Path
+
+from django.conf import settings
+from django.utils import timezone
+
+from .request_metrics import track_requests
+
+logger = logging.getLogger(__name__)
+
+# Funciones guardadas por muestra (ordenadas por tiempo propio)
+FUNCTIONS_PER_SAMPLE = 200
+
+
+def profiling_enabled():
+    return getattr(settings, "REQUEST_PROFILING_ENABLED", False)
+
+
+def sample_rate():
+    return getattr(settings, "REQUEST_PROFILING_SAMPLE_RATE", 0.01)
+
+
+def max_samples():
+    return getattr(settings, "REQUEST_PROFILING_MAX_SAMPLES", 200)
+
+
+def profile_dir():
+    default = Path(settings.BASE_DIR) / "logs" / "profiles"
+    return Path(getattr(settings, "REQUEST_PROFILING_DIR", default))
+
+
+def header_name():
+    return getattr(settings, "REQUEST_PROFILING_HEADER", "X-Profile-Request")
+
+
+def user_role(user):
+    if user is None or not user.is_authenticated:
+        return "anonymous"
+    if user.is_superuser:
+        return "superuser"
+    if user.is_staff:
+        return "staff"
+    profile = getattr(user, "profile", None)
+    return getattr(profile, "user_type", None) or "user"
+
+
+def should_profile(request):
+    """None si no se perfila; si no, el motivo ("header" o "sample")"""
+    if request.headers.get(header_name()):
+        user = getattr(request, "user", None)
+        if user is not None and user.is_staff:
+            return "header"
+    if random.random() < sample_rate():
+        return "sample"
+    return None
+
+
+def _function_label(func):
+    filename, lineno, name = func
+    if filename == "~":
+        return name  # funciones built-in: "<built-in method ...>"
+    for prefix in ("site-packages/", str(settings.BASE_DIR) + "/"):
+        if prefix in filename:
+            filename = filename.split(prefix, 1)[1]
+            break
+    return f"{filename}:{lineno}({name})"
+
+
+def _top_functions(profiler):
+    stats = pstats.Stats(profiler)
+    rows = [
+        [_function_label(func), calls, round(tottime * 1000, 3), round(cumtime * 1000, 3)]
+        for func, (_, calls, tottime, cumtime, _) in stats.stats.items()
+    ]
+    rows.sort(key=lambda row: row[2], reverse=True)
+    return rows[:FUNCTIONS_PER_SAMPLE]
+
+
+def _write_sample(sample):
+    directory = profile_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"{sample['id']}.json"
+    tmp_path = path.with_suffix(".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as handle:
+        json.dump(sample, handle)
+    os.replace(tmp_path, path)
+
+    # Buffer circular: los nombres empiezan por el timestamp
+    files = sorted(directory.glob("*.json"))
+    for old in files[: max(len(files) - max_samples(), 0)]:
+        old.unlink(missing_ok=True)
+
+
+def profile_request(request, get_response, reason):
+    """Ejecuta la petición bajo cProfile y guarda la muestra"""
+    profiler = cProfile.Profile()
+    started = time.perf_counter()
+    with track_requests() as metrics:
+        try:
+            profiler.enable()
+        except ValueError:
+            # Otro perfilador activo en este hilo
+            return get_response(request)
+        try:
+            response = get_response(request)
+        finally:
+            profiler.disable()
+    duration = time.perf_counter() - started
+
+    sample = {
+        "id": f"{time.time_ns()}-{uuid.uuid4().hex[:8]}",
+        "created": timezone.now().isoformat(),
+        "method": request.method,
+        "path": request.path,
+        "status": response.status_code,
+        "role": user_role(getattr(request, "user", None)),
+        "reason": reason,
+        "duration_ms": round(duration * 1000, 1),
+        **metrics.as_dict(),
+        "functions": _top_functions(profiler),
+    }
+    try:
+        _write_sample(sample)
+    except OSError:
+        logger.exception("No se pudo guardar el perfil de %s", request.path)
+    return response
+
+
+def load_samples():
+    """Muestras guardadas, de la más reciente a la más antigua"""
+    directory = profile_dir()
+    if not directory.is_dir():
+        return []
+    samples = []
+    for path in sorted(directory.glob("*.json"), reverse=True):
+        try:
+            with open(path, encoding="utf-8") as handle:
+                sample = json.load(handle)
+        except (OSError, ValueError):
+            continue
+        samples.append(sample)
+    return samples
+
+
+def aggregate_samples(samples, limit=50):
+    """
+    Funciones más costosas sumando todas las muestras: en cuántas aparece,
+    llamadas, tiempo propio y acumulado (ms) y % del tiempo perfilado.
+    """
+    totals = {}
+    for sample in samples:
+        for label, calls, tottime, cumtime in sample["functions"]:
+            entry = totals.setdefault(
+                label,
+                {
+                    "function": label,
+                    "samples": 0,
+                    "calls": 0,
+                    "tottime_ms": 0.0,
+                    "cumtime_ms": 0.0,
+                },
+            )
+            entry["samples"] += 1
+            entry["calls"] += calls
+            entry["tottime_ms"] += tottime
+            entry["cumtime_ms"] += cumtime
+    profiled_ms = sum(sample["duration_ms"] for sample in samples) or 1
+    rows = sorted(totals.values(), key=lambda entry: entry["tottime_ms"], reverse=True)
+    rows = rows[:limit]
+    for entry in rows:
+        entry["tottime_ms"] = round(entry["tottime_ms"], 1)
+        entry["cumtime_ms"] = round(entry["cumtime_ms"], 1)
+        entry["percent"] = round(entry["tottime_ms"] * 100 / profiled_ms, 1)
+    return rows
@@ -0,0 +1,226 @@
+"""
+Entrega de archivos privados (documentos de verificación de edad).
+
+Django solo decide si el usuario puede ver el archivo; la transferencia la
+hace nginx:
+
+- Con ``PROTECTED_MEDIA_ACCEL_LOCATIONS`` (raíz en disco -> location
+  ``internal`` de nginx) la respuesta lleva ``X-Accel-Redirect`` y nginx
+  envía el archivo con sendfile y soporte de Range, sin ocupar un worker.
+- Sin esa configuración (desarrollo) se sirve desde Django, también con
+  Range (un solo rango ``bytes=inicio-fin``).
+
+Cada tipo de archivo se registra con ``register(kind, ...)``: cómo cargar el
+objeto, qué FileField servir y quién puede verlo. El resultado del permiso se
+cachea por usuario/objeto (PROTECTED_MEDIA_PERMISSION_TIMEOUT); las claves
+llevan la versión de un tag por usuario (apps.core.cache_tags) para poder
+descartar todos los permisos de un usuario de una vez. Tras
+verificarlo, ``serve`` redirige a una URL firmada de vida corta
+(PROTECTED_MEDIA_URL_TTL, ligada al usuario): las vistas repetidas y las
+peticiones Range de los visores de PDF/video van directo a esa URL sin volver
+a cargar permisos.
+"""
+
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache
+from django.core.exceptions import PermissionDenied
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
+from django.shortcuts import redirect
+from django.urls import reverse
+
+from apps.core.cache_tags import get_tag_versions, invalidate_tags
+
+PERMISSION_TIMEOUT = 5 * 60
+SIGNED_URL_TTL = 5 * 60
+SIGNING_SALT = "protected-media"
+RANGE_CHUNK_SIZE = 64 * 1024
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+_registry = {}
+
+
+class ProtectedMediaKind:
+    def __init__(self, kind, get_object, get_file, has_permission):
+        self.kind = kind
+        self.get_object = get_object
+        self.get_file = get_file
+        self.has_permission = has_permission
+
+
+def register(kind, get_object, get_file, has_permission):
+    """
+    Registra un tipo de archivo privado.
+
+    Args:
+        kind: nombre corto usado en la caché y en las URLs firmadas
+        get_object: función(pk) -> instancia (o Http404)
+        get_file: función(instancia) -> FieldFile
+        has_permission: función(user, instancia) -> bool
+    """
+    _registry[kind] = ProtectedMediaKind(kind, get_object, get_file, has_permission)
+
+
+def get_kind(kind):
+    try:
+        return _registry[kind]
+    except KeyError:
+        raise Http404
+
+
+def _user_tag(user_id):
+    return f"protected_media:user:{user_id}"
+
+
+def _permission_key(kind, user_id, object_id):
+    tag = _user_tag(user_id)
+    version = get_tag_versions([tag])[tag]
+    return f"protected_media:perm:{kind}:{user_id}:{version}:{object_id}"
+
+
+def forget_permission(kind, user_id, object_id):
+    """Descarta el permiso cacheado (p. ej. al cambiar la relación padre-jugador)"""
+    cache.delete(_permission_key(kind, user_id, object_id))
+
+
+def forget_user_permissions(*user_ids):
+    """
+    Descarta todos los permisos cacheados de los usuarios (p. ej. al cambiar
+    is_staff o el manager de un equipo)
+    """
+    tags = [_user_tag(user_id) for user_id in user_ids if user_id]
+    if tags:
+        invalidate_tags(*tags)
+
+
+def check_permission(kind, user, obj):
+    """has_permission del tipo, cacheado por usuario/objeto"""
+    if not user.is_authenticated:
+        return False
+    key = _permission_key(kind, user.pk, obj.pk)
+    allowed = cache.get(key)
+    if allowed is None:
+        allowed = bool(get_kind(kind).has_permission(user, obj))
+        cache.set(
+            key,
+            allowed,
+            getattr(settings, "PROTECTED_MEDIA_PERMISSION_TIMEOUT", PERMISSION_TIMEOUT),
+        )
+    return allowed
+
+
+def signed_url(kind, object_id, user):
+    """URL firmada para ``user`` (válida PROTECTED_MEDIA_URL_TTL segundos)"""
+    token = signing.dumps([kind, object_id, user.pk], salt=SIGNING_SALT)
+    return reverse("protected_media", args=[token])
+
+
+def serve(request, kind, object_id, denied_message=None):
+    """Verifica el permiso (cacheado) y redirige a la URL firmada del archivo"""
+    media_kind = get_kind(kind)
+    obj = media_kind.get_object(object_id)
+    if not check_permission(kind, request.user, obj):
+        raise PermissionDenied(denied_message)
+    media_kind.get_file(obj)  # 404 si no hay archivo
+    return redirect(signed_url(kind, obj.pk, request.user))
+
+
+def serve_signed(request, token):
+    """Entrega el archivo de una URL firmada (sin volver a verificar permisos)"""
+    try:
+        kind, object_id, user_id = signing.loads(
+            token,
+            salt=SIGNING_SALT,
+            max_age=getattr(settings, "PROTECTED_MEDIA_URL_TTL", SIGNED_URL_TTL),
+        )
+    except (signing.BadSignature, ValueError):
+        raise Http404
+    if user_id != request.user.pk:
+        raise PermissionDenied
+    media_kind = get_kind(kind)
+    return file_response(request, media_kind.get_file(media_kind.get_object(object_id)))
+
+
+def _accel_path(path):
+    """Ruta interna de nginx para ``path`` (None si no hay location configurada)"""
+    locations = getattr(settings, "PROTECTED_MEDIA_ACCEL_LOCATIONS", None) or {}
+    for root, prefix in locations.items():
+        root = os.path.join(os.path.abspath(str(root)), "")
+        if path.startswith(root):
+            relative = path[len(root) :].replace(os.sep, "/")
+            return prefix.rstrip("/") + "/" + quote(relative)
+    return None
+
+
+def file_response(request, field_file):
+    """Respuesta para un FieldFile: X-Accel-Redirect o Django con Range"""
+    if not field_file:
+        raise Http404
+    try:
+        path = os.path.abspath(field_file.path)
+    except NotImplementedError:
+        path = None
+
+    filename = os.path.basename(field_file.name)
+    content_type = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+
+    accel_path = _accel_path(path) if path else None
+    if accel_path:
+        response = HttpResponse(content_type=content_type)
+        response["X-Accel-Redirect"] = accel_path
+    else:
+        try:
+            response = _django_file_response(request, field_file, content_type)
+        except OSError:
+            raise Http404
+
+    response["Content-Disposition"] = f"inline; filename*=UTF-8''{quote(filename)}"
+    response["Cache-Control"] = "private, max-age=300"
+    return response
+
+
+def _django_file_response(request, field_file, content_type):
+    size = field_file.size
+    match = RANGE_RE.match(request.headers.get("Range", "").strip())
+    if not match or not any(match.groups()):
+        response = FileResponse(field_file.open("rb"), content_type=content_type)
+        response["Accept-Ranges"] = "bytes"
+        return response
+
+    start, end = match.groups()
+    if start:
+        start = int(start)
+        end = min(int(end), size - 1) if end else size - 1
+    else:
+        # bytes=-N: los últimos N bytes
+        start = max(size - int(end), 0)
+        end = size - 1
+    if start > end or start >= size:
+        response = HttpResponse(status=416)
+        response["Content-Range"] = f"bytes */{size}"
+        return response
+
+    handle = field_file.open("rb")
+    handle.seek(start)
+
+    def stream(remaining=end - start + 1):
+        try:
+            while remaining > 0:
+                chunk = handle.read(min(RANGE_CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
+        finally:
+            handle.close()
+
+    response = StreamingHttpResponse(stream(), status=206, content_type=content_type)
+    response["Content-Range"] = f"bytes {start}-{end}/{size}"
+    response["Content-Length"] = str(end - start + 1)
+    response["Accept-Ranges"] = "bytes"
+    return response
@@ -0,0 +1,145 @@
+"""
+Códigos QR servidos como imágenes cacheables (perfiles públicos, órdenes).
+
+En lugar de incrustar un PNG en base64 en cada página, las vistas usan
+``qr_code_url(data, size, fmt)``: una URL firmada (el contenido y el tamaño
+van en el token, así que nadie puede usar el endpoint para generar QR
+arbitrarios) que el navegador cachea por un año.
+
+El render se memoiza por (contenido, tamaño, formato) en dos niveles:
+- LRU en memoria del proceso (QR_CODE_MEMORY_ITEMS entradas)
+- Disco (QR_CODE_CACHE_DIR), compartido entre workers y reinicios
+"""
+
+import hashlib
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from io import BytesIO
+
+from django.conf import settings
+from django.core import signing
+from django.urls import reverse
+
+SIGNING_SALT = "qr-code"
+FORMATS = {"svg": "image/svg+xml", "png": "image/png"}
+MIN_SIZE = 64
+MAX_SIZE = 1024
+SIZE_STEP = 32
+MEMORY_ITEMS = 256
+BORDER = 1
+
+_memory = OrderedDict()
+_memory_lock = threading.Lock()
+
+
+def normalize_size(size):
+    """Tamaño en px acotado y redondeado (limita las variantes cacheadas)"""
+    try:
+        size = int(size)
+    except (TypeError, ValueError):
+        size = 256
+    size = min(max(size, MIN_SIZE), MAX_SIZE)
+    return size - size % SIZE_STEP
+
+
+def qr_code_url(data, size=256, fmt="svg"):
+    """URL firmada del QR de ``data``"""
+    if fmt not in FORMATS:
+        raise ValueError(f"Formato de QR no soportado: {fmt}")
+    # Sin marca de tiempo: la misma (data, size) da siempre la misma URL y
+    # la caché del navegador y el ETag funcionan entre páginas y visitas
+    token = signing.Signer(salt=SIGNING_SALT).sign_object([data, normalize_size(size)])
+    return reverse("qr_code", kwargs={"token": token, "fmt": fmt})
+
+
+def load_token(token):
+    """(data, size) del token; lanza signing.BadSignature si no es válido"""
+    try:
+        data, size = signing.Signer(salt=SIGNING_SALT).unsign_object(token)
+    except (signing.BadSignature, ValueError):
+        # Tokens con marca de tiempo (signing.dumps) de páginas ya cacheadas
+        data, size = signing.loads(token, salt=SIGNING_SALT)
+    return data, normalize_size(size)
+
+
+def _cache_dir():
+    cache_dir = getattr(settings, "QR_CODE_CACHE_DIR", None)
+    if cache_dir is None:
+        cache_dir = os.path.join(settings.MEDIA_ROOT, "cache", "qr")
+    return str(cache_dir)
+
+
+def _cache_key(data, size, fmt):
+    return hashlib.sha256(f"{fmt}|{size}|{data}".encode("utf-8")).hexdigest()
+
+
+def _remember(key, content):
+    with _memory_lock:
+        _memory[key] = content
+        _memory.move_to_end(key)
+        while len(_memory) > getattr(settings, "QR_CODE_MEMORY_ITEMS", MEMORY_ITEMS):
+            _memory.popitem(last=False)
+
+
+def clear_memory_cache():
+    with _memory_lock:
+        _memory.clear()
+
+
+def render_qr(data, size=256, fmt="svg"):
+    """Bytes del QR (memoria -> disco -> render)"""
+    size = normalize_size(size)
+    key = _cache_key(data, size, fmt)
+
+    with _memory_lock:
+        content = _memory.get(key)
+        if content is not None:
+            _memory.move_to_end(key)
+            return content
+
+    path = os.path.join(_cache_dir(), key[:2], f"{key}.{fmt}")
+    try:
+        with open(path, "rb") as handle:
+            content = handle.read()
+    except OSError:
+        content = _render(data, size, fmt)
+        _write_atomic(path, content)
+
+    _remember(key, content)
+    return content
+
+
+def _write_atomic(path, content):
+    """Escribe en un temporal y lo renombra: otro worker nunca lee a medias"""
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+        with os.fdopen(fd, "wb") as handle:
+            handle.write(content)
+        os.replace(tmp_path, path)
+    except OSError:
+        pass  # Sin caché en disco se sigue sirviendo desde memoria
+
+
+def _render(data, size, fmt):
+    import qrcode
+    import qrcode.image.svg
+
+    qr = qrcode.QRCode(
+        error_correction=qrcode.constants.ERROR_CORRECT_L,
+        border=BORDER,
+    )
+    qr.add_data(data)
+    qr.make(fit=True)
+    # Tamaño de cada módulo para aproximarse a ``size`` px
+    modules = qr.modules_count + 2 * BORDER
+    qr.box_size = max(1, size // modules)
+
+    buffer = BytesIO()
+    if fmt == "svg":
+        qr.make_image(image_factory=qrcode.image.svg.SvgPathImage).save(buffer)
+    else:
+        qr.make_image(fill_color="black", back_color="white").save(buffer, format="PNG")
+    return buffer.getvalue()
@@ -0,0 +1,160 @@
+"""
+Métricas de consultas y render por petición.
+
+track_requests() registra, para todo lo que se ejecute dentro del bloque:
+
+- número de consultas y tiempo total en base de datos (execute_wrapper en
+  todas las conexiones, funciona con DEBUG=False)
+- huella de cada consulta (SQL con los literales y listas IN normalizados):
+  la misma huella repetida muchas veces en una petición es casi siempre un
+  N+1
+- tiempo de render de plantillas (solo la plantilla más externa, los
+  include no se cuentan dos veces)
+
+Lo usan QueryMetricsMiddleware (cabecera Server-Timing y una línea de log
+JSON por petición), apps.core.profiling (métricas de cada perfil) y
+apps.core.testing.QueryBudgetMixin (presupuestos de consultas por URL en
+los tests).
+"""
+
+import contextvars
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+
+from django.db import connections
+from django.template.base import Template
+
+# Veces que puede repetirse una misma huella antes de considerarla N+1
+N_PLUS_ONE_THRESHOLD = 5
+
+_current = contextvars.ContextVar("request_metrics", default=None)
+
+_IN_LIST_RE = re.compile(r"\bIN\s*\((?:\s*%s\s*,?)+\)", re.IGNORECASE)
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r"\b\d+(?:\.\d+)?\b")
+_SPACE_RE = re.compile(r"\s+")
+_SAVEPOINT_RE = re.compile(r"^(?:SAVEPOINT|RELEASE SAVEPOINT|ROLLBACK TO SAVEPOINT)\b")
+
+
+def fingerprint(sql):
+    """SQL sin valores concretos: dos consultas con la misma forma coinciden"""
+    sql = _IN_LIST_RE.sub("IN (...)", sql)
+    sql = _STRING_RE.sub("?", sql)
+    sql = _NUMBER_RE.sub("?", sql)
+    return _SPACE_RE.sub(" ", sql).strip()
+
+
+class RequestMetrics:
+    def __init__(self, parent=None):
+        # Bloque exterior (p. ej. el middleware) cuando se anidan mediciones
+        self.parent = parent
+        self.queries = 0
+        self.db_time = 0.0
+        self.template_time = 0.0
+        self.fingerprints = Counter()
+        self._started = time.perf_counter()
+        self._template_depth = 0
+
+    @property
+    def total_time(self):
+        return time.perf_counter() - self._started
+
+    @property
+    def duplicates(self):
+        """Consultas que repitieron una huella ya vista"""
+        return sum(count - 1 for count in self.fingerprints.values())
+
+    @property
+    def max_repeats(self):
+        return max(self.fingerprints.values(), default=0)
+
+    def repeated(self, threshold=2):
+        """[(huella, veces)] de las huellas ejecutadas al menos ``threshold`` veces"""
+        return [
+            (sql, count)
+            for sql, count in self.fingerprints.most_common()
+            if count >= threshold
+        ]
+
+    def n_plus_one(self):
+        return self.repeated(N_PLUS_ONE_THRESHOLD)
+
+    def __call__(self, execute, sql, params, many, context):
+        # execute_wrapper: cuenta y mide cada consulta
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - started
+            if not _SAVEPOINT_RE.match(sql):
+                self.queries += 1
+                self.fingerprints[fingerprint(sql)] += 1
+
+    def as_dict(self):
+        return {
+            "queries": self.queries,
+            "duplicates": self.duplicates,
+            "max_repeats": self.max_repeats,
+            "db_ms": round(self.db_time * 1000, 1),
+            "template_ms": round(self.template_time * 1000, 1),
+            "total_ms": round(self.total_time * 1000, 1),
+        }
+
+    def server_timing(self):
+        return ", ".join(
+            [
+                f'db;dur={self.db_time * 1000:.1f};desc="{self.queries} queries"',
+                f"tpl;dur={self.template_time * 1000:.1f}",
+                f"total;dur={self.total_time * 1000:.1f}",
+            ]
+        )
+
+
+_original_render = Template.render
+
+
+def _timed_render(self, context):
+    active = []
+    metrics = _current.get()
+    while metrics is not None:
+        active.append(metrics)
+        metrics = metrics.parent
+    if not active:
+        return _original_render(self, context)
+    for metrics in active:
+        metrics._template_depth += 1
+    started = time.perf_counter()
+    try:
+        return _original_render(self, context)
+    finally:
+        elapsed = time.perf_counter() - started
+        for metrics in active:
+            metrics._template_depth -= 1
+            if not metrics._template_depth:
+                metrics.template_time += elapsed
+
+
+def _install_template_timer():
+    if Template.render is not _timed_render:
+        Template.render = _timed_render
+
+
+@contextmanager
+def track_requests():
+    """
+    Bloque que registra consultas y render de plantillas; devuelve el
+    RequestMetrics con los totales. Se puede anidar: cada bloque cuenta lo
+    que se ejecuta dentro de él.
+    """
+    _install_template_timer()
+    metrics = RequestMetrics(parent=_current.get())
+    token = _current.set(metrics)
+    try:
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(metrics))
+            yield metrics
+    finally:
+        _current.reset(token)
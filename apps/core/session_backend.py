@@ -0,0 +1,136 @@
+"""
+Sesiones en caché con escritura perezosa en base de datos.
+
+SESSION_ENGINE = "apps.core.session_backend"
+
+Variante de django.contrib.sessions.backends.cached_db pensada para
+SESSION_SAVE_EVERY_REQUEST = True:
+
+- la caché es la copia de lectura y se actualiza en cada guardado
+- la fila de django_session solo se reescribe cuando el contenido cambia
+  (se compara una huella de los datos, no el flag ``modified``)
+- la expiración deslizante se extiende con un UPDATE de expire_date, como
+  mucho una vez cada SESSION_DB_TOUCH_INTERVAL segundos. Para que la fila
+  nunca caduque antes que la sesión, en BD se guarda la expiración más ese
+  intervalo de margen
+
+Al igual que cached_db, la caché (SESSION_CACHE_ALIAS) debe ser compartida
+entre procesos.
+"""
+
+import hashlib
+import json
+import logging
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+
+from django.conf import settings
+from django.contrib.sessions.backends.base import UpdateError
+from django.contrib.sessions.backends.cached_db import SessionStore as CachedDBStore
+from django.db import router
+
+logger = logging.getLogger("django.contrib.sessions")
+
+KEY_PREFIX = "apps.core.session_backend"
+
+
+def touch_interval():
+    return getattr(settings, "SESSION_DB_TOUCH_INTERVAL", 300)
+
+
+def session_digest(data):
+    """Huella estable del contenido de la sesión"""
+    try:
+        payload = json.dumps(data, sort_keys=True, default=str)
+    except TypeError:
+        # Claves de tipos mezclados: no se pueden ordenar
+        payload = json.dumps(data, default=str)
+    return hashlib.sha1(payload.encode()).hexdigest()
+
+
+class SessionStore(CachedDBStore):
+    cache_key_prefix = KEY_PREFIX
+
+    def __init__(self, session_key=None):
+        super().__init__(session_key)
+        # (huella, expiración en BD como timestamp) de la fila guardada
+        self._persisted = None
+
+    def load(self):
+        try:
+            entry = self._cache.get(self.cache_key)
+        except Exception:
+            # Igual que cached_db: claves inválidas en algunos backends
+            entry = None
+
+        if entry is not None:
+            self._persisted = (entry["digest"], entry["db_expiry"])
+            return entry["data"]
+
+        s = self._get_session_from_db()
+        if not s:
+            self._persisted = None
+            return {}
+        data = self.decode(s.session_data)
+        self._persisted = (session_digest(data), s.expire_date.timestamp())
+        self._cache_set(data)
+        return data
+
+    async def aload(self):
+        return await sync_to_async(self.load)()
+
+    def create_model_instance(self, data):
+        obj = super().create_model_instance(data)
+        obj.expire_date += timedelta(seconds=touch_interval())
+        self._persisted = (session_digest(data), obj.expire_date.timestamp())
+        return obj
+
+    def save(self, must_create=False):
+        if self.session_key is None:
+            return self.create()
+        data = self._get_session(no_load=must_create)
+        persisted = self._persisted
+        if must_create or persisted is None or persisted[0] != session_digest(data):
+            # Contenido nuevo: se escribe la fila completa (DBStore.save)
+            super(CachedDBStore, self).save(must_create)
+        elif persisted[1] < self.get_expiry_date().timestamp():
+            self._touch()
+        elif self._cache_touch():
+            return
+        self._cache_set(data)
+
+    async def asave(self, must_create=False):
+        return await sync_to_async(self.save)(must_create)
+
+    def _touch(self):
+        """Extiende expire_date en BD sin reescribir los datos"""
+        expire_date = self.get_expiry_date() + timedelta(seconds=touch_interval())
+        using = router.db_for_write(self.model)
+        updated = (
+            self.model._default_manager.db_manager(using)
+            .filter(session_key=self.session_key)
+            .update(expire_date=expire_date)
+        )
+        if not updated:
+            # La fila se borró (logout en otra petición): igual que DBStore
+            raise UpdateError
+        self._persisted = (self._persisted[0], expire_date.timestamp())
+
+    def _cache_set(self, data):
+        entry = {
+            "data": data,
+            "digest": self._persisted[0],
+            "db_expiry": self._persisted[1],
+        }
+        try:
+            self._cache.set(self.cache_key, entry, self.get_expiry_age())
+        except Exception:
+            logger.exception("Error saving to cache (%s)", self._cache)
+
+    def _cache_touch(self):
+        """Solo renueva el TTL de la entrada en caché; False si no existe"""
+        try:
+            return self._cache.touch(self.cache_key, self.get_expiry_age())
+        except Exception:
+            return False
@@ -0,0 +1,119 @@
+"""
+Sitemap XML de las páginas públicas (perfiles de jugadores y eventos).
+
+Las respuestas se generan en streaming: cada sección se recorre con
+``values_list().iterator()`` y se escribe fila por fila, así que la memoria
+no crece con el número de jugadores o eventos. Cada archivo de sección tiene
+como máximo SITEMAP_PAGE_SIZE URLs (límite del protocolo) y /sitemap.xml es
+el índice que los enumera.
+"""
+
+from django.http import Http404, StreamingHttpResponse
+from django.urls import reverse
+from django.utils.html import escape
+from django.views.decorators.http import require_GET
+
+SITEMAP_PAGE_SIZE = 50000
+SITEMAP_CHUNK_SIZE = 2000
+SITEMAP_CONTENT_TYPE = "application/xml; charset=utf-8"
+
+_URL_PLACEHOLDER = "00000000"
+
+
+def _url_builder(url_name, kwarg):
+    """
+    Retorna una función valor -> ruta que resuelve la URL una sola vez y
+    luego solo sustituye el valor (reverse() por fila es costoso).
+    """
+    template = reverse(url_name, kwargs={kwarg: _URL_PLACEHOLDER})
+    return lambda value: template.replace(_URL_PLACEHOLDER, str(value), 1)
+
+
+def _player_rows():
+    from apps.accounts.models import Player
+
+    return Player.objects.filter(is_active=True).order_by("pk").values_list(
+        "pk", "slug", "updated_at"
+    )
+
+
+def _player_urls(rows):
+    by_slug = _url_builder("public_player_profile", "slug")
+    by_pk = _url_builder("public_player_profile_pk", "pk")
+    for pk, slug, updated_at in rows:
+        yield (by_slug(slug) if slug else by_pk(pk)), updated_at
+
+
+def _event_rows():
+    from apps.events.models import Event
+
+    return Event.objects.filter(status="published").order_by("pk").values_list(
+        "pk", "updated_at"
+    )
+
+
+def _event_urls(rows):
+    by_pk = _url_builder("events:public_detail", "pk")
+    for pk, updated_at in rows:
+        yield by_pk(pk), updated_at
+
+
+# sección -> (consulta de filas, generador de (ruta, lastmod))
+SITEMAP_SECTIONS = {
+    "players": (_player_rows, _player_urls),
+    "events": (_event_rows, _event_urls),
+}
+
+
+def _lastmod(value):
+    return f"<lastmod>{value.date().isoformat()}</lastmod>" if value else ""
+
+
+def _stream_urlset(base_url, urls):
+    yield '<?xml version="1.0" encoding="UTF-8"?>\n'
+    yield '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+    for path, updated_at in urls:
+        yield f"<url><loc>{escape(base_url + path)}</loc>{_lastmod(updated_at)}</url>\n"
+    yield "</urlset>\n"
+
+
+def _stream_index(base_url, pages):
+    yield '<?xml version="1.0" encoding="UTF-8"?>\n'
+    yield '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+    for section, page in pages:
+        path = reverse("sitemap_section", kwargs={"section": section, "page": page})
+        yield f"<sitemap><loc>{escape(base_url + path)}</loc></sitemap>\n"
+    yield "</sitemapindex>\n"
+
+
+def _base_url(request):
+    return request.build_absolute_uri("/").rstrip("/")
+
+
+@require_GET
+def sitemap_index(request):
+    """Índice con una entrada por cada página de cada sección"""
+    pages = []
+    for section, (rows, _) in SITEMAP_SECTIONS.items():
+        total = rows().count()
+        page_count = max(1, -(-total // SITEMAP_PAGE_SIZE))
+        pages.extend((section, page) for page in range(1, page_count + 1))
+    return StreamingHttpResponse(
+        _stream_index(_base_url(request), pages), content_type=SITEMAP_CONTENT_TYPE
+    )
+
+
+@require_GET
+def sitemap_section(request, section, page=1):
+    """Una página (hasta SITEMAP_PAGE_SIZE URLs) de una sección del sitemap"""
+    if section not in SITEMAP_SECTIONS or page < 1:
+        raise Http404("Sección de sitemap no encontrada")
+    rows, to_urls = SITEMAP_SECTIONS[section]
+    offset = (page - 1) * SITEMAP_PAGE_SIZE
+    queryset = rows()[offset : offset + SITEMAP_PAGE_SIZE]
+    if page > 1 and not queryset.exists():
+        raise Http404("Página de sitemap no encontrada")
+    urls = to_urls(queryset.iterator(chunk_size=SITEMAP_CHUNK_SIZE))
+    return StreamingHttpResponse(
+        _stream_urlset(_base_url(request), urls), content_type=SITEMAP_CONTENT_TYPE
+    )
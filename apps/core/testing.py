@@ -0,0 +1,60 @@
+"""
+Utilidades para tests: presupuestos de consultas por URL.
+
+    class PanelBudgetTests(QueryBudgetMixin, TestCase):
+        query_budgets = [
+            # (url o nombre de URL, máximo de consultas, máximo de repeticiones)
+            ("panel", 40, 4),
+            ("accounts:admin_order_list", 20, 2),
+        ]
+
+        def test_query_budgets(self):
+            self.client.force_login(self.user)
+            self.check_query_budgets()
+
+El test falla si una URL pasa de su presupuesto de consultas o si una misma
+consulta (misma huella, ver request_metrics.fingerprint) se ejecuta más
+veces de las permitidas; el mensaje lista las consultas más repetidas.
+"""
+
+from contextlib import contextmanager
+
+from django.urls import NoReverseMatch, reverse
+
+from .request_metrics import track_requests
+
+
+class QueryBudgetMixin:
+    query_budgets = []
+
+    @contextmanager
+    def assertQueryBudget(self, max_queries, max_repeats=None, label=""):
+        with track_requests() as metrics:
+            yield metrics
+        problems = []
+        if metrics.queries > max_queries:
+            problems.append(f"{metrics.queries} queries (budget {max_queries})")
+        if max_repeats is not None and metrics.max_repeats > max_repeats:
+            problems.append(
+                f"a query ran {metrics.max_repeats} times (budget {max_repeats})"
+            )
+        if problems:
+            repeated = "\n".join(
+                f"  {count}x {sql[:200]}" for sql, count in metrics.repeated()[:5]
+            )
+            self.fail(
+                f"{label or 'block'} exceeded its query budget: "
+                + "; ".join(problems)
+                + (f"\nMost repeated:\n{repeated}" if repeated else "")
+            )
+
+    def check_query_budgets(self, budgets=None, **get_kwargs):
+        for url, max_queries, max_repeats in budgets or self.query_budgets:
+            try:
+                path = reverse(url)
+            except NoReverseMatch:
+                path = url
+            with self.subTest(url=url):
+                with self.assertQueryBudget(max_queries, max_repeats, label=path):
+                    response = self.client.get(path, **get_kwargs)
+                self.assertLess(response.status_code, 400, path)
@@ -2,13 +2,25 @@
 Vistas core de la aplicación
 """
 
+import hashlib
+
+from django.contrib import messages
+from django.contrib.auth.decorators import login_required
+from django.core import signing
 from django.core.cache import cache
-from django.http import HttpResponse
+from django.http import Http404, HttpResponse
 from django.shortcuts import redirect
 from django.utils import translation
-from django.views.decorators.http import require_http_methods
+from django.utils.http import url_has_allowed_host_and_scheme
+from django.views import View
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import etag, require_http_methods
+from django.views.generic import TemplateView
 from django.views.i18n import JavaScriptCatalog
 
+from . import exports, profiling, protected_media, qr_codes
+from .mixins import StaffRequiredMixin
+
 
 @require_http_methods(["GET", "POST"])
 def set_language(request):
@@ -160,3 +172,111 @@ self.addEventListener('notificationclick', function(event) {
     response = HttpResponse(js, content_type="application/javascript; charset=utf-8")
     response["Cache-Control"] = "no-cache"
     return response
+
+
+@login_required
+def protected_media_object(request, kind, object_id):
+    """Archivo privado registrado en apps.core.protected_media"""
+    return protected_media.serve(request, kind, object_id)
+
+
+@login_required
+def protected_media_signed(request, token):
+    """Archivo privado por URL firmada (X-Accel-Redirect o Range desde Django)"""
+    return protected_media.serve_signed(request, token)
+
+
+def _qr_code_etag(request, token, fmt):
+    return hashlib.md5(f"{token}.{fmt}".encode("utf-8")).hexdigest()
+
+
+@require_http_methods(["GET", "HEAD"])
+@cache_control(public=True, max_age=60 * 60 * 24 * 365, immutable=True)
+@etag(_qr_code_etag)
+def qr_code(request, token, fmt):
+    """QR de una URL firmada (ver apps.core.qr_codes.qr_code_url)"""
+    try:
+        data, size = qr_codes.load_token(token)
+    except (signing.BadSignature, ValueError):
+        raise Http404
+    content = qr_codes.render_qr(data, size, fmt)
+    return HttpResponse(content, content_type=qr_codes.FORMATS[fmt])
+
+
+class ExportView(StaffRequiredMixin, View):
+    """
+    Exportación CSV/XLSX en streaming (ver apps.core.exports); las muy
+    grandes se generan en segundo plano y se avisan por notificación.
+    """
+
+    def get(self, request, kind, fmt):
+        export_kind = exports.get_kind(kind)
+        params = request.GET.dict()
+        if export_kind.count(params) > exports.background_threshold():
+            exports.start_background_export(export_kind, fmt, params, request.user)
+            messages.info(
+                request,
+                "La exportación es grande: se está generando y te avisaremos "
+                "con una notificación cuando esté lista.",
+            )
+            referer = request.META.get("HTTP_REFERER")
+            if not url_has_allowed_host_and_scheme(
+                referer,
+                allowed_hosts={request.get_host()},
+                require_https=request.is_secure(),
+            ):
+                referer = "dashboard"
+            return redirect(referer)
+        return exports.stream_response(export_kind, fmt, params)
+
+
+@login_required
+def export_download(request, token):
+    """Archivo de una exportación generada en segundo plano"""
+    return exports.serve_download(request, token)
+
+
+class ProfilingReportView(StaffRequiredMixin, TemplateView):
+    """
+    Visor de los perfiles de peticiones (apps.core.profiling): funciones más
+    costosas sumando las muestras filtradas (?path=, ?role=) o el detalle de
+    una muestra (?sample=).
+    """
+
+    template_name = "core/profiling_report.html"
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        path_prefix = self.request.GET.get("path", "").strip()
+        role = self.request.GET.get("role", "").strip()
+        all_samples = profiling.load_samples()
+        samples = [
+            sample
+            for sample in all_samples
+            if sample["path"].startswith(path_prefix)
+            and (not role or sample["role"] == role)
+        ]
+
+        selected = None
+        sample_id = self.request.GET.get("sample")
+        if sample_id:
+            selected = next((s for s in all_samples if s["id"] == sample_id), None)
+            if selected is None:
+                raise Http404
+
+        context.update(
+            {
+                "samples": samples,
+                "selected": selected,
+                "hot_functions": (
+                    profiling.aggregate_samples([selected] if selected else samples)
+                ),
+                "path_filter": path_prefix,
+                "role_filter": role,
+                "roles": sorted({sample["role"] for sample in all_samples}),
+                "profiling_enabled": profiling.profiling_enabled(),
+                "sample_rate": profiling.sample_rate(),
+                "header_name": profiling.header_name(),
+            }
+        )
+        return context
@@ -8,6 +8,7 @@ from .models import (
     EventCategory,
     EventComment,
     EventContact,
+    EventDivisionCapacity,
     EventReminder,
     EventType,
 )
@@ -17,7 +18,20 @@ class EventAttendanceInline(admin.TabularInline):
     model = EventAttendance
     extra = 0
     readonly_fields = ["registered_at"]
-    fields = ["user", "status", "registered_at", "notes"]
+    fields = ["user", "division", "status", "registered_at", "notes"]
+
+
+class EventDivisionCapacityInline(admin.TabularInline):
+    model = EventDivisionCapacity
+    extra = 0
+    readonly_fields = ["confirmed_count", "pending_count", "waiting_count"]
+    fields = [
+        "division",
+        "max_attendees",
+        "confirmed_count",
+        "pending_count",
+        "waiting_count",
+    ]
 
 
 class EventCommentInline(admin.TabularInline):
@@ -125,7 +139,8 @@ class EventAdmin(admin.ModelAdmin):
         "is_upcoming",
         "is_full",
     ]
-    inlines = [EventAttendanceInline, EventCommentInline]
+    list_select_related = ["category", "organizer", "capacity"]
+    inlines = [EventDivisionCapacityInline, EventAttendanceInline, EventCommentInline]
 
     fieldsets = (
         (
@@ -246,12 +261,14 @@ class EventReminderAdmin(admin.ModelAdmin):
         "user",
         "reminder_type",
         "minutes_before",
+        "due_at",
         "sent",
         "sent_at",
     ]
     list_filter = ["reminder_type", "sent", "created_at"]
     search_fields = ["event__title", "user__username"]
-    readonly_fields = ["created_at", "sent_at"]
+    readonly_fields = ["created_at", "due_at", "sent_at"]
+    list_select_related = ["event", "user"]
 
 
 # EventContact no se registra en el admin de Django
@@ -5,3 +5,8 @@ class EventsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.events"
     verbose_name = "Eventos"
+
+    def ready(self):
+        """Importar señales cuando la app esté lista"""
+        import apps.events.exports  # noqa
+        import apps.events.signals  # noqa
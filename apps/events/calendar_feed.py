@@ -0,0 +1,208 @@
+"""
+Datos del calendario de eventos (feed JSON por ventana e iCalendar).
+
+- calendar_events(start, end, statuses): eventos que se cruzan con la
+  ventana [start, end] en formato compacto para FullCalendar. El filtro
+  (status, start_date, end_date) usa el índice events_event_calendar_idx y
+  el resultado se cachea por (ventana, visibilidad) con los tags "event",
+  "event_category" y "event_attendance" (cupos), que se invalidan en
+  signals.py al guardar o borrar el modelo correspondiente.
+- ics_token / load_ics_token: URL firmada por usuario (y temporada
+  opcional) para que un cliente de calendario se suscriba sin sesión.
+- user_ics_events + ics_etag + iter_ics: exportación .ics en streaming; el
+  ETag sale de un COUNT/MAX(updated_at), así que un sondeo sin cambios
+  responde 304 sin generar el archivo.
+"""
+
+import datetime
+import hashlib
+
+from django.core import signing
+from django.db.models import Count, Max, Q
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.text import Truncator
+
+from apps.core.cache_tags import cached_fragment
+
+MAX_WINDOW_DAYS = 400
+FEED_CACHE_TIMEOUT = 60 * 60
+ICS_SIGNING_SALT = "events-calendar-ics"
+
+
+class InvalidWindow(ValueError):
+    pass
+
+
+def parse_window(start, end):
+    """
+    Fechas de la ventana desde los parámetros de FullCalendar (ISO 8601,
+    con o sin hora). ``end`` es exclusivo, como en FullCalendar.
+    """
+    try:
+        start = datetime.date.fromisoformat((start or "")[:10])
+        end = datetime.date.fromisoformat((end or "")[:10])
+    except ValueError:
+        raise InvalidWindow("start y end deben ser fechas ISO 8601")
+    if end <= start:
+        raise InvalidWindow("end debe ser posterior a start")
+    if (end - start).days > MAX_WINDOW_DAYS:
+        raise InvalidWindow(f"La ventana máxima es de {MAX_WINDOW_DAYS} días")
+    return start, end
+
+
+def _window_queryset(start, end, statuses):
+    from .models import Event
+
+    # Se cruza con la ventana: empieza antes del fin y termina después del inicio
+    return Event.objects.filter(
+        Q(end_date__gte=start) | Q(end_date__isnull=True, start_date__gte=start),
+        status__in=statuses,
+        start_date__lt=end,
+    )
+
+
+def calendar_events(start, end, statuses, detail_url_name):
+    """Eventos de la ventana para FullCalendar (lista de dicts, cacheada)"""
+    statuses = sorted(statuses)
+
+    def build():
+        rows = (
+            _window_queryset(start, end, statuses)
+            .order_by("start_date", "pk")
+            .values(
+                "pk",
+                "title",
+                "start_date",
+                "end_date",
+                "description",
+                "status",
+                "priority",
+                "location",
+                "category__color",
+                "organizer__first_name",
+                "organizer__last_name",
+                "organizer__username",
+                "capacity__confirmed_count",
+            )
+        )
+        events = []
+        for row in rows:
+            item = {
+                "id": row["pk"],
+                "title": row["title"],
+                "start": row["start_date"].isoformat(),
+                "allDay": True,  # Los eventos solo tienen fecha, sin hora
+                "url": reverse(detail_url_name, args=[row["pk"]]),
+                "extendedProps": {
+                    "description": Truncator(row["description"]).chars(100),
+                    "location": row["location"],
+                    "organizer": " ".join(
+                        filter(None, [row["organizer__first_name"], row["organizer__last_name"]])
+                    )
+                    or row["organizer__username"]
+                    or "",
+                    "status": row["status"],
+                    "priority": row["priority"],
+                    "attendees": row["capacity__confirmed_count"] or 0,
+                },
+            }
+            if row["end_date"]:
+                # FullCalendar usa fin exclusivo en eventos de día completo
+                item["end"] = (row["end_date"] + datetime.timedelta(days=1)).isoformat()
+            if row["category__color"]:
+                item["color"] = row["category__color"]
+            events.append(item)
+        return events
+
+    return cached_fragment(
+        "events:calendar_feed",
+        ["event", "event_category", "event_attendance"],
+        build,
+        timeout=FEED_CACHE_TIMEOUT,
+        parts=(start, end, ",".join(statuses), detail_url_name),
+    )
+
+
+# ===== iCalendar =====
+
+
+def ics_token(user, season_id=None):
+    return signing.dumps([user.pk, season_id], salt=ICS_SIGNING_SALT)
+
+
+def load_ics_token(token):
+    """(user_id, season_id); lanza signing.BadSignature si no es válido"""
+    user_id, season_id = signing.loads(token, salt=ICS_SIGNING_SALT)
+    return user_id, season_id
+
+
+def user_ics_events(user_id, season_id=None):
+    """Eventos publicados en los que el usuario (o sus jugadores) está registrado"""
+    from apps.accounts.models import Order
+
+    from .models import Event, EventAttendance
+
+    event_ids = EventAttendance.objects.filter(
+        user_id=user_id, status__in=["pending", "confirmed", "waiting"]
+    ).values("event_id")
+    order_event_ids = Order.objects.filter(
+        user_id=user_id, status__in=["paid", "pending_registration"]
+    ).values("event_id")
+    events = Event.objects.filter(
+        Q(pk__in=event_ids) | Q(pk__in=order_event_ids),
+        status="published",
+        start_date__isnull=False,
+    )
+    if season_id:
+        events = events.filter(season_id=season_id)
+    return events
+
+
+def ics_etag(events):
+    stats = events.aggregate(total=Count("pk"), last=Max("updated_at"))
+    last = stats["last"].isoformat() if stats["last"] else ""
+    return hashlib.md5(f"{stats['total']}|{last}".encode("utf-8")).hexdigest()
+
+
+def _ics_escape(value):
+    return (
+        str(value or "")
+        .replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\r\n", "\\n")
+        .replace("\n", "\\n")
+    )
+
+
+def iter_ics(events, request, calendar_name="NCS Eventos"):
+    """Genera el .ics línea por línea (para StreamingHttpResponse)"""
+    host = request.get_host().split(":")[0]
+    stamp = timezone.now().strftime("%Y%m%dT%H%M%SZ")
+    yield "BEGIN:VCALENDAR\r\n"
+    yield "VERSION:2.0\r\n"
+    yield "PRODID:-//NCS//Eventos//ES\r\n"
+    yield "CALSCALE:GREGORIAN\r\n"
+    yield f"X-WR-CALNAME:{_ics_escape(calendar_name)}\r\n"
+    rows = events.order_by("start_date", "pk").values_list(
+        "pk", "title", "start_date", "end_date", "location", "updated_at"
+    )
+    for pk, title, start_date, end_date, location, updated_at in rows.iterator():
+        end = (end_date or start_date) + datetime.timedelta(days=1)
+        url = request.build_absolute_uri(reverse("events:public_detail", args=[pk]))
+        lines = [
+            "BEGIN:VEVENT",
+            f"UID:event-{pk}@{host}",
+            f"DTSTAMP:{stamp}",
+            f"LAST-MODIFIED:{updated_at.astimezone(datetime.timezone.utc):%Y%m%dT%H%M%SZ}",
+            f"DTSTART;VALUE=DATE:{start_date:%Y%m%d}",
+            f"DTEND;VALUE=DATE:{end:%Y%m%d}",
+            f"SUMMARY:{_ics_escape(title)}",
+            f"URL:{url}",
+        ]
+        if location:
+            lines.append(f"LOCATION:{_ics_escape(location)}")
+        lines.append("END:VEVENT")
+        yield "\r\n".join(lines) + "\r\n"
+    yield "END:VCALENDAR\r\n"
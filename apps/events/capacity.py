@@ -0,0 +1,383 @@
+"""
+Cupos de eventos: contadores desnormalizados de asistencia.
+
+EventCapacity (totales por evento) y EventDivisionCapacity (por división)
+guardan cuántas asistencias hay en estado confirmed, pending y waiting.
+
+- Cada save/delete de un EventAttendance aplica la transición con UPDATEs de
+  expresiones F() (ver signals), sin leer los contadores.
+- claim_event_seats reserva cupos con un UPDATE condicional
+  (``... WHERE confirmed + pending + n <= max_attendees``): si otra compra
+  concurrente tomó los últimos cupos, el UPDATE no afecta filas y se lanza
+  CapacityExceeded, por lo que no puede haber sobreventa.
+- Las operaciones en bloque (bulk_create, queryset.update) no disparan
+  señales, así que las funciones de este módulo ajustan los contadores
+  explícitamente. reconcile_event_capacity los recalcula desde cero.
+"""
+
+from collections import Counter, defaultdict
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q, Value
+from django.db.models.functions import Greatest
+from django.utils.translation import gettext as _
+
+COUNTED_STATUSES = ("confirmed", "pending", "waiting")
+
+# Estados de StripeEventCheckout que mantienen sus cupos reservados
+LIVE_CHECKOUT_STATUSES = ("created", "registered", "paid")
+
+
+class CapacityExceeded(ValueError):
+    """No hay cupos suficientes en el evento o en la división"""
+
+
+def _counter_field(status):
+    return f"{status}_count" if status in COUNTED_STATUSES else None
+
+
+def _has_room(seats):
+    return Q(max_attendees__isnull=True) | Q(
+        max_attendees__gte=F("confirmed_count") + F("pending_count") + seats
+    )
+
+
+def ensure_event_capacity(event):
+    """Crea la fila de contadores del evento si no existe"""
+    from .models import EventCapacity
+
+    try:
+        with transaction.atomic():
+            EventCapacity.objects.get_or_create(
+                event_id=event.pk, defaults={"max_attendees": event.max_attendees}
+            )
+    except IntegrityError:
+        # Creada en paralelo por otra petición
+        pass
+
+
+def _ensure_division_capacity(event_id, division_id):
+    from .models import EventDivisionCapacity
+
+    try:
+        with transaction.atomic():
+            EventDivisionCapacity.objects.get_or_create(
+                event_id=event_id, division_id=division_id
+            )
+    except IntegrityError:
+        pass
+
+
+def _add(field, delta):
+    """F(field) + delta sin bajar de 0 (si los contadores se desviaron)"""
+    if delta < 0:
+        return Greatest(F(field) + delta, Value(0))
+    return F(field) + delta
+
+
+def _bump(queryset, deltas):
+    """UPDATE con F() de los contadores; retorna filas afectadas"""
+    updates = {field: _add(field, delta) for field, delta in deltas.items() if delta}
+    if not updates:
+        return 1
+    return queryset.update(**updates)
+
+
+def apply_attendance_transition(old_state, new_state):
+    """
+    Ajusta los contadores para el paso de ``old_state`` a ``new_state``.
+    Cada estado es (event_id, division_id, status) o None (no existía).
+    """
+    from .models import EventCapacity, EventDivisionCapacity
+
+    if old_state == new_state:
+        return
+    event_deltas = defaultdict(Counter)
+    division_deltas = defaultdict(Counter)
+    for state, sign in ((old_state, -1), (new_state, 1)):
+        if not state:
+            continue
+        event_id, division_id, status = state
+        field = _counter_field(status)
+        if not event_id or not field:
+            continue
+        event_deltas[event_id][field] += sign
+        if division_id:
+            division_deltas[(event_id, division_id)][field] += sign
+
+    # Si falta alguna fila se recalcula el evento completo desde
+    # EventAttendance; al eliminar (p. ej. en cascada con el evento) no.
+    missing = set()
+    for event_id, deltas in event_deltas.items():
+        if not _bump(EventCapacity.objects.filter(event_id=event_id), deltas):
+            missing.add(event_id)
+    for (event_id, division_id), deltas in division_deltas.items():
+        queryset = EventDivisionCapacity.objects.filter(
+            event_id=event_id, division_id=division_id
+        )
+        if not _bump(queryset, deltas):
+            missing.add(event_id)
+    if missing and new_state is not None:
+        reconcile_event_capacity(missing)
+
+
+def claim_event_seats(event, players, note=""):
+    """
+    Reserva un cupo ``pending`` para cada jugador que aún no tenga una
+    asistencia activa en el evento.
+
+    Args:
+        event: Event
+        players: jugadores (Player) con ``user_id`` y ``division_id``
+
+    Returns:
+        list: user_id de los jugadores a los que se les reservó cupo
+
+    Raises:
+        CapacityExceeded: si el evento o alguna división no tiene cupos; en
+        ese caso no se reserva nada.
+    """
+    from .models import EventAttendance, EventCapacity, EventDivisionCapacity
+
+    players = [p for p in players if getattr(p, "user_id", None)]
+    if not players:
+        return []
+
+    with transaction.atomic():
+        existing = {
+            attendance.user_id: attendance
+            for attendance in EventAttendance.objects.select_for_update().filter(
+                event=event, user_id__in=[p.user_id for p in players]
+            )
+        }
+        to_claim = [
+            p
+            for p in players
+            if p.user_id not in existing
+            or existing[p.user_id].status not in COUNTED_STATUSES
+        ]
+        if not to_claim:
+            return []
+
+        seats = len(to_claim)
+        ensure_event_capacity(event)
+        claimed = (
+            EventCapacity.objects.filter(event_id=event.pk)
+            .filter(_has_room(seats))
+            .update(pending_count=F("pending_count") + seats)
+        )
+        if not claimed:
+            raise CapacityExceeded(
+                _("There are not enough spots available for this event.")
+            )
+
+        by_division = Counter(p.division_id for p in to_claim if p.division_id)
+        for division_id, division_seats in by_division.items():
+            _ensure_division_capacity(event.pk, division_id)
+            claimed = (
+                EventDivisionCapacity.objects.filter(
+                    event_id=event.pk, division_id=division_id
+                )
+                .filter(_has_room(division_seats))
+                .update(pending_count=F("pending_count") + division_seats)
+            )
+            if not claimed:
+                # El rollback de la transacción devuelve los cupos ya tomados
+                raise CapacityExceeded(
+                    _("There are not enough spots available in this division.")
+                )
+
+        new_rows = []
+        for player in to_claim:
+            attendance = existing.get(player.user_id)
+            if attendance is None:
+                new_rows.append(
+                    EventAttendance(
+                        event=event,
+                        user_id=player.user_id,
+                        division_id=player.division_id,
+                        status="pending",
+                        notes=note,
+                    )
+                )
+            else:
+                # Asistencia cancelada que se reactiva (sin señales: los
+                # contadores ya se ajustaron arriba)
+                EventAttendance.objects.filter(pk=attendance.pk).update(
+                    status="pending", division_id=player.division_id
+                )
+        EventAttendance.objects.bulk_create(new_rows)
+
+    return [p.user_id for p in to_claim]
+
+
+def release_event_seats(event, user_ids):
+    """
+    Libera los cupos ``pending`` de ``user_ids`` (pasan a cancelled).
+
+    Returns:
+        int: número de cupos liberados
+    """
+    from .models import EventAttendance, EventCapacity, EventDivisionCapacity
+
+    user_ids = list(user_ids)
+    if not user_ids:
+        return 0
+    event_id = getattr(event, "pk", event)
+
+    with transaction.atomic():
+        rows = list(
+            EventAttendance.objects.select_for_update()
+            .filter(event_id=event_id, user_id__in=user_ids, status="pending")
+            .values_list("pk", "division_id")
+        )
+        if not rows:
+            return 0
+        EventAttendance.objects.filter(
+            pk__in=[pk for pk, division_id in rows]
+        ).update(status="cancelled")
+        EventCapacity.objects.filter(event_id=event_id).update(
+            pending_count=_add("pending_count", -len(rows))
+        )
+        by_division = Counter(division_id for pk, division_id in rows if division_id)
+        for division_id, seats in by_division.items():
+            EventDivisionCapacity.objects.filter(
+                event_id=event_id, division_id=division_id
+            ).update(pending_count=_add("pending_count", -seats))
+    return len(rows)
+
+
+def release_player_seats(event, player_ids):
+    """release_event_seats a partir de ids de Player"""
+    from apps.accounts.models import Player
+
+    user_ids = Player.objects.filter(pk__in=list(player_ids)).values_list(
+        "user_id", flat=True
+    )
+    return release_event_seats(event, user_ids)
+
+
+def _int_ids(values):
+    ids = set()
+    for value in values or []:
+        try:
+            ids.add(int(value))
+        except (TypeError, ValueError):
+            continue
+    return ids
+
+
+def release_checkout_seats(checkout, player_ids=None):
+    """
+    Libera los cupos ``pending`` de los jugadores de un checkout (o solo de
+    ``player_ids``). El cupo de un jugador es uno por evento: los que otro
+    checkout vivo del mismo evento también incluye (p. ej. uno nuevo tras
+    abandonar este) siguen reservados para ese checkout.
+
+    Returns:
+        int: número de cupos liberados
+    """
+    from apps.accounts.models import StripeEventCheckout
+
+    player_ids = _int_ids(checkout.player_ids if player_ids is None else player_ids)
+    if not player_ids:
+        return 0
+    others = (
+        StripeEventCheckout.objects.filter(
+            event_id=checkout.event_id, status__in=LIVE_CHECKOUT_STATUSES
+        )
+        .exclude(pk=checkout.pk)
+        .values_list("player_ids", flat=True)
+    )
+    for other_player_ids in others:
+        player_ids -= _int_ids(other_player_ids)
+    return release_player_seats(checkout.event_id, player_ids)
+
+
+def sync_event_capacity_limit(event):
+    """Copia Event.max_attendees a su fila de contadores"""
+    from .models import EventCapacity
+
+    if not EventCapacity.objects.filter(event_id=event.pk).update(
+        max_attendees=event.max_attendees
+    ):
+        ensure_event_capacity(event)
+
+
+def reconcile_event_capacity(event_ids=None):
+    """
+    Recalcula los contadores desde EventAttendance con una consulta agrupada
+    y los escribe en bloque.
+
+    Returns:
+        tuple: (filas de evento corregidas, filas de división corregidas)
+    """
+    from .models import Event, EventAttendance, EventCapacity, EventDivisionCapacity
+
+    events = Event.objects.all()
+    if event_ids is not None:
+        events = events.filter(pk__in=list(event_ids))
+
+    event_totals = defaultdict(Counter)
+    division_totals = defaultdict(Counter)
+    rows = (
+        EventAttendance.objects.filter(
+            event__in=events, status__in=COUNTED_STATUSES
+        )
+        .values_list("event_id", "division_id", "status")
+        .annotate(total=Count("pk"))
+        .order_by()
+    )
+    for event_id, division_id, status, total in rows:
+        field = _counter_field(status)
+        event_totals[event_id][field] += total
+        if division_id:
+            division_totals[(event_id, division_id)][field] += total
+
+    fields = [_counter_field(status) for status in COUNTED_STATUSES]
+
+    current = {
+        row.event_id: row for row in EventCapacity.objects.filter(event__in=events)
+    }
+    event_rows = []
+    for event_id, max_attendees in events.values_list("pk", "max_attendees"):
+        totals = event_totals.get(event_id, Counter())
+        row = current.get(event_id)
+        expected = {field: totals[field] for field in fields}
+        if (
+            row
+            and row.max_attendees == max_attendees
+            and all(getattr(row, f) == v for f, v in expected.items())
+        ):
+            continue
+        event_rows.append(
+            EventCapacity(event_id=event_id, max_attendees=max_attendees, **expected)
+        )
+    EventCapacity.objects.bulk_create(
+        event_rows,
+        update_conflicts=True,
+        unique_fields=["event"],
+        update_fields=["max_attendees", *fields],
+    )
+
+    current = {
+        (row.event_id, row.division_id): row
+        for row in EventDivisionCapacity.objects.filter(event__in=events)
+    }
+    division_rows = []
+    for key in set(current) | set(division_totals):
+        totals = division_totals.get(key, Counter())
+        expected = {field: totals[field] for field in fields}
+        row = current.get(key)
+        if row and all(getattr(row, f) == v for f, v in expected.items()):
+            continue
+        division_rows.append(
+            EventDivisionCapacity(event_id=key[0], division_id=key[1], **expected)
+        )
+    EventDivisionCapacity.objects.bulk_create(
+        division_rows,
+        update_conflicts=True,
+        unique_fields=["event", "division"],
+        update_fields=fields,
+    )
+    return len(event_rows), len(division_rows)
@@ -0,0 +1,59 @@
+"""
+Exportaciones de eventos registradas en apps.core.exports.
+"""
+
+from django.shortcuts import get_object_or_404
+
+from apps.core import exports
+
+from .models import Event
+from .roster import get_event_roster
+
+EVENT_ROSTER = "event-roster"
+
+ROSTER_COLUMNS = [
+    "ID Jugador",
+    "Nombre",
+    "Apellido",
+    "Email",
+    "Fecha de nacimiento",
+    "Grado",
+    "División",
+    "Equipo",
+    "Padre/Tutor",
+    "Email Padre/Tutor",
+    "Estado de pago",
+    "Hotel",
+]
+
+
+def _roster(params):
+    event = get_object_or_404(Event, pk=exports.int_param(params, "event"))
+    return get_event_roster(event)
+
+
+def roster_rows(params):
+    for entry in _roster(params):
+        yield (
+            entry.player_id,
+            entry.first_name,
+            entry.last_name,
+            entry.email,
+            entry.birth_date,
+            entry.grade_display,
+            entry.division_name,
+            entry.team_name,
+            entry.parent_name,
+            entry.parent_email,
+            entry.payment_status,
+            entry.hotel_name,
+        )
+
+
+exports.register(
+    EVENT_ROSTER,
+    title="Roster del evento",
+    columns=ROSTER_COLUMNS,
+    get_rows=roster_rows,
+    count=lambda params: _roster(params).count(),
+)
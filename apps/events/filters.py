@@ -0,0 +1,47 @@
+"""
+Filtros de la lista administrativa de eventos (ver apps.core.admin_lists)
+"""
+
+from datetime import timedelta
+
+import django_filters
+
+from django.utils import timezone
+
+from apps.core.admin_lists import SearchFilterSet
+
+
+class EventFilterSet(SearchFilterSet):
+    search_fields = ("title", "description", "location")
+
+    category = django_filters.NumberFilter(field_name="category_id")
+    event_type = django_filters.NumberFilter(field_name="event_type_id")
+    status = django_filters.CharFilter(method="filter_status")
+    time_filter = django_filters.CharFilter(method="filter_time")
+
+    def filter_status(self, queryset, name, value):
+        # "all" muestra todos los estados
+        if value == "all":
+            return queryset
+        return queryset.filter(status=value)
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        # Sin parámetro status se muestran solo los publicados
+        if not self.data.get("status"):
+            queryset = queryset.filter(status="published")
+        return queryset
+
+    def filter_time(self, queryset, name, value):
+        now = timezone.now()
+        if value == "upcoming":
+            return queryset.filter(start_date__gt=now)
+        if value == "ongoing":
+            return queryset.filter(start_date__lte=now, end_date__gte=now)
+        if value == "past":
+            return queryset.filter(end_date__lt=now)
+        if value == "today":
+            today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+            today_end = today_start + timedelta(days=1)
+            return queryset.filter(start_date__gte=today_start, start_date__lt=today_end)
+        return queryset
@@ -0,0 +1,31 @@
+"""
+Comando para recalcular los contadores de cupos (EventCapacity y
+EventDivisionCapacity) desde EventAttendance. Corrige desviaciones por
+cambios hechos con queryset.update() o directamente en la base de datos.
+"""
+
+from django.core.management.base import BaseCommand
+
+from apps.events.capacity import reconcile_event_capacity
+
+
+class Command(BaseCommand):
+    help = "Recalcula los contadores de cupos de los eventos"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--event-id",
+            type=int,
+            action="append",
+            dest="event_ids",
+            help="Solo este evento (se puede repetir)",
+        )
+
+    def handle(self, *args, **options):
+        events_fixed, divisions_fixed = reconcile_event_capacity(options["event_ids"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Corregidos {events_fixed} contadores de evento y "
+                f"{divisions_fixed} de división"
+            )
+        )
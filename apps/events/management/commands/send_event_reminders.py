@@ -0,0 +1,51 @@
+"""
+Comando para enviar los recordatorios de eventos (EventReminder) vencidos.
+
+Pensado para cron cada minuto, o como worker con ``--loop``. Es seguro
+ejecutarlo en paralelo o dos veces: cada lote se reclama y marca como
+enviado antes de entregarlo (ver apps/events/reminders.py).
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.events.reminders import REMINDER_BATCH_SIZE, dispatch_due_reminders
+
+
+class Command(BaseCommand):
+    help = "Envía los recordatorios de eventos vencidos por lotes"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=REMINDER_BATCH_SIZE,
+            help=f"Recordatorios por lote (default: {REMINDER_BATCH_SIZE})",
+        )
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Seguir ejecutando (worker) en lugar de terminar",
+        )
+        parser.add_argument(
+            "--interval",
+            type=int,
+            default=60,
+            help="Segundos entre pasadas con --loop (default: 60)",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            stats = dispatch_due_reminders(batch_size=options["batch_size"])
+            if stats["batches"] or options["verbosity"] > 1:
+                self.stdout.write(
+                    self.style.SUCCESS(
+                        f"{stats['sent']} recordatorios enviados, "
+                        f"{stats['expired']} vencidos sin enviar "
+                        f"({stats['batches']} lotes)"
+                    )
+                )
+            if not options["loop"]:
+                break
+            time.sleep(options["interval"])
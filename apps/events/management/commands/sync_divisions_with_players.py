@@ -51,18 +51,19 @@ class Command(BaseCommand):
 
         # 2. Obtener divisiones usadas por eventos
         self.stdout.write('2. DIVISIONES ACTUALES EN EVENTOS:')
-        all_events = Event.objects.all()
+        # Una consulta sobre la tabla intermedia en lugar de recorrer cada evento
+        event_division_rows = Event.divisions.through.objects.values_list(
+            'division_id', 'division__name', 'event__title'
+        ).order_by('division_id', 'event__title')
         event_division_stats = {}
 
-        for event in all_events:
-            event_divs = event.divisions.all()
-            for div in event_divs:
-                if div.id not in event_division_stats:
-                    event_division_stats[div.id] = {
-                        'name': div.name,
-                        'events': []
-                    }
-                event_division_stats[div.id]['events'].append(event.title)
+        for div_id, div_name, event_title in event_division_rows:
+            if div_id not in event_division_stats:
+                event_division_stats[div_id] = {
+                    'name': div_name,
+                    'events': []
+                }
+            event_division_stats[div_id]['events'].append(event_title)
 
         for div_id, stats in sorted(event_division_stats.items()):
             events_count = len(stats['events'])
@@ -89,13 +90,12 @@ class Command(BaseCommand):
             self.stdout.write(self.style.SUCCESS('   [OK] Todas las divisiones en eventos tienen jugadores\n'))
 
         # 4. Divisiones sin usar
-        all_divisions = Division.objects.all()
-        unused_divisions = []
-        for div in all_divisions:
-            player_count = Player.objects.filter(division_id=div.id).count()
-            event_count = Event.objects.filter(divisions__id=div.id).count()
-            if player_count == 0 and event_count == 0:
-                unused_divisions.append(div)
+        unused_divisions = list(
+            Division.objects.annotate(
+                player_count=Count('players', distinct=True),
+                event_count=Count('events', distinct=True),
+            ).filter(player_count=0, event_count=0)
+        )
 
         if unused_divisions:
             self.stdout.write(f'\n   Divisiones sin usar (sin jugadores ni eventos): {len(unused_divisions)}')
@@ -113,17 +113,21 @@ class Command(BaseCommand):
 
         # Remover divisiones de eventos que no tienen jugadores
         if divisions_to_remove_from_events:
-            for event in all_events:
-                event_divs = list(event.divisions.all())
-                removed_divs = [d for d in event_divs if d.id in divisions_to_remove_from_events]
-                if removed_divs:
-                    for div in removed_divs:
-                        event.divisions.remove(div)
-                    self.stdout.write(
-                        self.style.WARNING(
-                            f'   Evento "{event.title}": Removidas divisiones {[d.name for d in removed_divs]}'
-                        )
+            removed = self._group_by_event(
+                Event.divisions.through.objects.filter(
+                    division_id__in=divisions_to_remove_from_events
+                )
+            )
+            events = Event.objects.in_bulk(list(removed))
+            for event_id, (event_title, divs) in removed.items():
+                # remove() dispara m2m_changed (facetas, tag "event", rosters)
+                events[event_id].divisions.remove(*[div_id for div_id, _ in divs])
+                self.stdout.write(
+                    self.style.WARNING(
+                        f'   Evento "{event_title}": Removidas divisiones '
+                        f'{[div_name for _, div_name in divs]}'
                     )
+                )
 
         # Remover divisiones completamente sin usar
         if remove_unused and unused_divisions:
@@ -138,10 +142,9 @@ class Command(BaseCommand):
 
         # 6. Verificación final
         self.stdout.write('VERIFICACIÓN FINAL:')
-        remaining_event_divisions = set()
-        for event in Event.objects.all():
-            for div in event.divisions.all():
-                remaining_event_divisions.add(div.id)
+        remaining_event_divisions = set(
+            Event.divisions.through.objects.values_list('division_id', flat=True)
+        )
 
         only_player_divisions = remaining_event_divisions - player_division_ids
         if only_player_divisions:
@@ -156,3 +159,15 @@ class Command(BaseCommand):
                     '   [OK] Todas las divisiones en eventos tienen jugadores asignados'
                 )
             )
+
+    def _group_by_event(self, event_divisions):
+        """
+        {id del evento: (título, [(id, nombre) de divisiones])} de filas de la
+        tabla intermedia
+        """
+        grouped = {}
+        for event_id, event_title, div_id, div_name in event_divisions.values_list(
+            'event_id', 'event__title', 'division_id', 'division__name'
+        ).order_by('event__title', 'division__name'):
+            grouped.setdefault(event_id, (event_title, []))[1].append((div_id, div_name))
+        return grouped
@@ -2,9 +2,14 @@
 Script para actualizar las divisiones de los jugadores a divisiones simples
 """
 
+import re
+
 from django.core.management.base import BaseCommand
-from apps.events.models import Division
+
+from apps.accounts.eligibility import AGE_DIVISIONS, annotate_eligibility
 from apps.accounts.models import Player
+from apps.accounts.player_directory import sync_player_directory
+from apps.events.models import Division
 
 
 class Command(BaseCommand):
@@ -12,59 +17,53 @@ class Command(BaseCommand):
 
     def handle(self, *args, **options):
         # Asegurar que existen las divisiones simples
-        simple_divisions = ['05U', '06U', '07U', '08U', '09U', '10U', '11U', '12U', '13U', '14U', '15U', '16U', '17U', '18U']
+        simple_divisions = list(AGE_DIVISIONS.values())
 
-        for div_name in simple_divisions:
-            Division.objects.get_or_create(
-                name=div_name,
-                defaults={
-                    'is_active': True,
-                    'description': f'Division {div_name}'
-                }
-            )
-
-        # Actualizar jugadores
-        players_updated = 0
-        players_with_division = Player.objects.exclude(division__isnull=True)
-
-        for player in players_with_division:
-            if not player.division:
-                continue
+        existing = set(
+            Division.objects.filter(name__in=simple_divisions).values_list('name', flat=True)
+        )
+        Division.objects.bulk_create(
+            [
+                Division(name=div_name, is_active=True, description=f'Division {div_name}')
+                for div_name in simple_divisions
+                if div_name not in existing
+            ]
+        )
+        division_ids = dict(
+            Division.objects.filter(name__in=simple_divisions).values_list('name', 'id')
+        )
 
-            current_division = player.division
-            current_name = current_division.name
+        # Una sola consulta: división actual y división por edad calculada en SQL
+        rows = (
+            annotate_eligibility(Player.objects.exclude(division__isnull=True))
+            .order_by()
+            .values_list(
+                'pk',
+                'division__name',
+                'age_division_name',
+                'user__first_name',
+                'user__last_name',
+            )
+        )
 
-            # Si ya es una división simple (formato "10U" o solo números como "141"), verificar
-            # Si el nombre es solo números, necesitamos buscar la división correcta basada en edad
-            if current_name in simple_divisions:
+        players_to_update = []
+        for player_id, current_name, age_division, first_name, last_name in rows.iterator():
+            # Si ya es una división simple, no hay nada que hacer
+            if current_name in division_ids:
                 continue
 
-            # Si el nombre es solo números (ej: "141", "119"), buscar la división basada en la edad del jugador
+            # Si el nombre es solo números (ej: "141", "119"), usar la división por edad
             if current_name.isdigit():
-                # Obtener la edad del jugador y determinar la división
-                if hasattr(player, 'user') and hasattr(player.user, 'profile') and player.user.profile.birth_date:
-                    from datetime import date
-                    today = date.today()
-                    age = today.year - player.user.profile.birth_date.year - ((today.month, today.day) < (player.user.profile.birth_date.month, player.user.profile.birth_date.day))
-                    # Mapear edad a división (aproximado)
-                    age_to_division = {
-                        5: '05U', 6: '06U', 7: '07U', 8: '08U', 9: '09U',
-                        10: '10U', 11: '11U', 12: '12U', 13: '13U', 14: '14U',
-                        15: '15U', 16: '16U', 17: '17U', 18: '18U'
-                    }
-                    base_name = age_to_division.get(age, None)
-                    if not base_name:
-                        continue
-                else:
+                if not age_division:
                     # No podemos determinar la edad, saltar este jugador
                     continue
+                base_name = age_division
             else:
                 # Extraer la parte de edad (ej: "10U OPEN" -> "10U")
                 base_name = current_name.split()[0] if ' ' in current_name else current_name
                 # Si no termina en "U", puede que sea un formato diferente
                 if not base_name.endswith('U') and len(base_name) > 2:
                     # Intentar extraer número seguido de U
-                    import re
                     match = re.search(r'(\d+)U', base_name)
                     if match:
                         base_name = match.group(0)
@@ -72,23 +71,24 @@ class Command(BaseCommand):
                         continue
 
             # Buscar la división simple correspondiente
-            if base_name in simple_divisions:
-                try:
-                    simple_division = Division.objects.get(name=base_name)
-                    player.division = simple_division
-                    player.save(update_fields=['division'])
-                    players_updated += 1
-                    self.stdout.write(
-                        self.style.SUCCESS(
-                            f'Player {player.id} ({player.user.get_full_name()}): {current_name} -> {base_name}'
-                        )
-                    )
-                except Division.DoesNotExist:
-                    self.stdout.write(
-                        self.style.WARNING(
-                            f'Player {player.id}: No se encontro division simple para {base_name}'
-                        )
+            if base_name not in division_ids:
+                self.stdout.write(
+                    self.style.WARNING(
+                        f'Player {player_id}: No se encontro division simple para {base_name}'
                     )
+                )
+                continue
+
+            players_to_update.append(Player(pk=player_id, division_id=division_ids[base_name]))
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f'Player {player_id} ({first_name} {last_name}): {current_name} -> {base_name}'
+                )
+            )
+
+        Player.objects.bulk_update(players_to_update, ['division'], batch_size=500)
+        # bulk_update no dispara señales: actualizar el directorio público
+        sync_player_directory([player.pk for player in players_to_update])
 
-        self.stdout.write(self.style.SUCCESS(f'\nActualizados {players_updated} jugadores'))
+        self.stdout.write(self.style.SUCCESS(f'\nActualizados {len(players_to_update)} jugadores'))
         self.stdout.write(self.style.SUCCESS('Migracion completada'))
@@ -0,0 +1,27 @@
+# Generated manually: índice de búsqueda full-text para eventos
+
+from django.db import migrations
+
+
+def install_search_index(apps, schema_editor):
+    """GIN sobre tsvector en PostgreSQL, tabla FTS5 + triggers en SQLite"""
+    from apps.events.search import install_search_index as install
+
+    install(schema_editor)
+
+
+def uninstall_search_index(apps, schema_editor):
+    from apps.events.search import uninstall_search_index as uninstall
+
+    uninstall(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("events", "0040_alter_event_video_url"),
+    ]
+
+    operations = [
+        migrations.RunPython(install_search_index, uninstall_search_index),
+    ]
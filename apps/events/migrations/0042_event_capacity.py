@@ -0,0 +1,88 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:41
+
+import django.db.models.deletion
+from collections import Counter, defaultdict
+
+from django.db import migrations, models
+
+
+def backfill_event_capacity(apps, schema_editor):
+    """Crea los contadores de cupos a partir de las asistencias existentes"""
+    Event = apps.get_model("events", "Event")
+    EventAttendance = apps.get_model("events", "EventAttendance")
+    EventCapacity = apps.get_model("events", "EventCapacity")
+
+    totals = defaultdict(Counter)
+    rows = (
+        EventAttendance.objects.filter(status__in=["confirmed", "pending", "waiting"])
+        .values_list("event_id", "status")
+        .annotate(total=models.Count("pk"))
+        .order_by()
+    )
+    for event_id, status, total in rows:
+        totals[event_id][f"{status}_count"] += total
+
+    EventCapacity.objects.bulk_create(
+        [
+            EventCapacity(
+                event_id=event_id,
+                max_attendees=max_attendees,
+                confirmed_count=totals[event_id]["confirmed_count"],
+                pending_count=totals[event_id]["pending_count"],
+                waiting_count=totals[event_id]["waiting_count"],
+            )
+            for event_id, max_attendees in Event.objects.values_list(
+                "pk", "max_attendees"
+            )
+        ],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0041_event_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventCapacity',
+            fields=[
+                ('event', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='capacity', serialize=False, to='events.event')),
+                ('max_attendees', models.PositiveIntegerField(blank=True, null=True)),
+                ('confirmed_count', models.PositiveIntegerField(default=0)),
+                ('pending_count', models.PositiveIntegerField(default=0)),
+                ('waiting_count', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Cupo de Evento',
+                'verbose_name_plural': 'Cupos de Eventos',
+            },
+        ),
+        migrations.AddField(
+            model_name='eventattendance',
+            name='division',
+            field=models.ForeignKey(blank=True, help_text='División en la que el jugador ocupa cupo', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='attendances', to='events.division', verbose_name='División'),
+        ),
+        migrations.CreateModel(
+            name='EventDivisionCapacity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('max_attendees', models.PositiveIntegerField(blank=True, help_text='Límite de jugadores en esta división (opcional)', null=True, verbose_name='Límite de asistentes')),
+                ('confirmed_count', models.PositiveIntegerField(default=0)),
+                ('pending_count', models.PositiveIntegerField(default=0)),
+                ('waiting_count', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('division', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='event_capacities', to='events.division')),
+                ('event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='division_capacities', to='events.event')),
+            ],
+            options={
+                'verbose_name': 'Cupo por División',
+                'verbose_name_plural': 'Cupos por División',
+                'unique_together': {('event', 'division')},
+            },
+        ),
+        migrations.RunPython(backfill_event_capacity, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:09
+
+import datetime
+
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def backfill_due_at(apps, schema_editor):
+    """Calcula due_at de los recordatorios pendientes existentes"""
+    EventReminder = apps.get_model("events", "EventReminder")
+    start_time = getattr(settings, "EVENT_REMINDER_START_TIME", datetime.time(8, 0))
+    tz = timezone.get_current_timezone()
+
+    pending = (
+        EventReminder.objects.filter(sent=False, event__start_date__isnull=False)
+        .select_related("event")
+        .only("pk", "minutes_before", "event__start_date")
+    )
+    batch = []
+    for reminder in pending.iterator(chunk_size=1000):
+        start = timezone.make_aware(
+            datetime.datetime.combine(reminder.event.start_date, start_time), tz
+        )
+        reminder.due_at = start - datetime.timedelta(minutes=reminder.minutes_before)
+        batch.append(reminder)
+        if len(batch) >= 1000:
+            EventReminder.objects.bulk_update(batch, ["due_at"])
+            batch = []
+    EventReminder.objects.bulk_update(batch, ["due_at"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0042_event_capacity'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='eventreminder',
+            name='due_at',
+            field=models.DateTimeField(blank=True, help_text='Momento de envío (inicio del evento - minutos antes)', null=True),
+        ),
+        migrations.AddIndex(
+            model_name='eventreminder',
+            index=models.Index(condition=models.Q(('sent', False)), fields=['due_at'], name='events_reminder_due_idx'),
+        ),
+        migrations.RunPython(backfill_due_at, migrations.RunPython.noop),
+    ]
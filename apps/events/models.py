@@ -551,6 +551,13 @@ class Event(models.Model):
         verbose_name = "Evento"
         verbose_name_plural = "Eventos"
         ordering = ["-start_date"]
+        indexes = [
+            # Feed del calendario: filtro por estado + cruce con la ventana
+            models.Index(
+                fields=["status", "start_date", "end_date"],
+                name="events_event_calendar_idx",
+            ),
+        ]
 
     def __str__(self):
         return self.title
@@ -583,17 +590,27 @@ class Event(models.Model):
             return False
         return self.start_date > timezone.now().date()
 
+    def _get_capacity(self):
+        """Contadores desnormalizados (usar select_related("capacity") en listas)"""
+        try:
+            return self.capacity
+        except EventCapacity.DoesNotExist:
+            return None
+
     @property
     def attendees_count(self):
-        """Cuenta el número de asistentes confirmados"""
-        return self.attendees.filter(eventattendance__status="confirmed").count()
+        """Número de asistentes confirmados (contador de EventCapacity)"""
+        capacity = self._get_capacity()
+        return capacity.confirmed_count if capacity else 0
 
     @property
     def is_full(self):
-        """Verifica si el evento está lleno"""
+        """Verifica si el evento está lleno (confirmados + pendientes con cupo)"""
         if not self.max_attendees:
             return False
-        return self.attendees_count >= self.max_attendees
+        capacity = self._get_capacity()
+        seats_taken = capacity.seats_taken if capacity else 0
+        return seats_taken >= self.max_attendees
 
     @property
     def duration(self):
@@ -686,6 +703,15 @@ class EventAttendance(models.Model):
 
     event = models.ForeignKey(Event, on_delete=models.CASCADE)
     user = models.ForeignKey(User, on_delete=models.CASCADE)
+    division = models.ForeignKey(
+        Division,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="attendances",
+        verbose_name="División",
+        help_text="División en la que el jugador ocupa cupo",
+    )
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="pending")
     registered_at = models.DateTimeField(auto_now_add=True)
     notes = models.TextField(blank=True)
@@ -699,6 +725,96 @@ class EventAttendance(models.Model):
     def __str__(self):
         return f"{self.user.get_full_name()} - {self.event.title}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Estado cargado de la BD, para calcular la transición de contadores
+        # al guardar (ver apps.events.capacity)
+        instance._capacity_state = instance.capacity_state()
+        return instance
+
+    def capacity_state(self):
+        """(event_id, division_id, status) tal como cuenta en los contadores"""
+        return (
+            self.__dict__.get("event_id"),
+            self.__dict__.get("division_id"),
+            self.__dict__.get("status"),
+        )
+
+
+class EventCapacity(models.Model):
+    """
+    Contadores de asistencia por evento (desnormalizados).
+
+    Se actualizan con expresiones F() en cada transición de EventAttendance y
+    se reconcilian con el comando reconcile_event_capacity. max_attendees es
+    una copia del límite del evento para que el UPDATE condicional que reserva
+    cupos se evalúe sobre una sola fila.
+    """
+
+    event = models.OneToOneField(
+        Event,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="capacity",
+    )
+    max_attendees = models.PositiveIntegerField(null=True, blank=True)
+    confirmed_count = models.PositiveIntegerField(default=0)
+    pending_count = models.PositiveIntegerField(default=0)
+    waiting_count = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Cupo de Evento"
+        verbose_name_plural = "Cupos de Eventos"
+
+    def __str__(self):
+        return f"{self.event_id}: {self.seats_taken}/{self.max_attendees or '∞'}"
+
+    @property
+    def seats_taken(self):
+        """Cupos ocupados: confirmados + pendientes de pago"""
+        return self.confirmed_count + self.pending_count
+
+    @property
+    def seats_available(self):
+        if self.max_attendees is None:
+            return None
+        return max(0, self.max_attendees - self.seats_taken)
+
+
+class EventDivisionCapacity(models.Model):
+    """Contadores y límite opcional de asistencia por división de un evento"""
+
+    event = models.ForeignKey(
+        Event, on_delete=models.CASCADE, related_name="division_capacities"
+    )
+    division = models.ForeignKey(
+        Division, on_delete=models.CASCADE, related_name="event_capacities"
+    )
+    max_attendees = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        verbose_name="Límite de asistentes",
+        help_text="Límite de jugadores en esta división (opcional)",
+    )
+    confirmed_count = models.PositiveIntegerField(default=0)
+    pending_count = models.PositiveIntegerField(default=0)
+    waiting_count = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Cupo por División"
+        verbose_name_plural = "Cupos por División"
+        unique_together = ["event", "division"]
+
+    def __str__(self):
+        return f"{self.event_id} - {self.division}: {self.seats_taken}/{self.max_attendees or '∞'}"
+
+    @property
+    def seats_taken(self):
+        return self.confirmed_count + self.pending_count
+
 
 class EventComment(models.Model):
     """Comentarios en eventos"""
@@ -855,6 +971,11 @@ class EventReminder(models.Model):
         max_length=20, choices=REMINDER_TYPES, default="notification"
     )
     minutes_before = models.PositiveIntegerField(help_text="Minutos antes del evento")
+    due_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="Momento de envío (inicio del evento - minutos antes)",
+    )
     sent = models.BooleanField(default=False)
     sent_at = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
@@ -863,10 +984,27 @@ class EventReminder(models.Model):
         verbose_name = "Recordatorio de Evento"
         verbose_name_plural = "Recordatorios de Eventos"
         unique_together = ["event", "user", "minutes_before"]
+        indexes = [
+            # Solo los pendientes: el despachador recorre este índice por due_at
+            models.Index(
+                fields=["due_at"],
+                condition=models.Q(sent=False),
+                name="events_reminder_due_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"Recordatorio para {self.user.get_full_name()} - {self.event.title}"
 
+    def save(self, *args, **kwargs):
+        from .reminders import reminder_due_at
+
+        self.due_at = reminder_due_at(self.event, self.minutes_before)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "minutes_before" in update_fields:
+            kwargs["update_fields"] = {*update_fields, "due_at"}
+        super().save(*args, **kwargs)
+
 
 class EventContact(models.Model):
     """Contacto para eventos"""
@@ -0,0 +1,156 @@
+"""
+Envío de EventReminder.
+
+Cada recordatorio guarda ``due_at`` (inicio del evento - minutes_before),
+indexado solo para los no enviados, así que buscar los vencidos es un rango
+sobre el índice aunque haya decenas de miles pendientes.
+
+dispatch_due_reminders procesa los vencidos por lotes:
+1. Reclama el lote en una transacción (SELECT ... FOR UPDATE SKIP LOCKED en
+   PostgreSQL, para poder correr varios workers) y lo marca como enviado
+   con un solo UPDATE ``sent=False -> True``. Un lote reclamado no se vuelve
+   a enviar aunque el comando se ejecute dos veces o se interrumpa.
+2. Agrupa por (evento, minutos, tipo) y entrega cada grupo con notify_users:
+   notificaciones en bulk_create, un push por suscripción y, para los de
+   tipo email, un email por lote con los destinatarios en BCC.
+
+Los eventos no tienen hora de inicio; se usa EVENT_REMINDER_START_TIME
+(hora local, 08:00 por defecto) del día de inicio.
+"""
+
+import datetime
+import logging
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.formats import date_format
+
+logger = logging.getLogger(__name__)
+
+REMINDER_BATCH_SIZE = 1000
+DEFAULT_START_TIME = datetime.time(8, 0)
+
+
+def event_start_datetime(event):
+    """Inicio del evento como datetime con zona horaria (None sin fecha)"""
+    if not event or not event.start_date:
+        return None
+    start_time = getattr(settings, "EVENT_REMINDER_START_TIME", DEFAULT_START_TIME)
+    return timezone.make_aware(
+        datetime.datetime.combine(event.start_date, start_time),
+        timezone.get_current_timezone(),
+    )
+
+
+def reminder_due_at(event, minutes_before):
+    start = event_start_datetime(event)
+    if start is None:
+        return None
+    return start - datetime.timedelta(minutes=minutes_before or 0)
+
+
+def sync_event_reminders(event, batch_size=REMINDER_BATCH_SIZE):
+    """Recalcula due_at de los recordatorios pendientes del evento"""
+    from .models import EventReminder
+
+    pending = EventReminder.objects.filter(event=event, sent=False).only(
+        "pk", "minutes_before", "due_at"
+    )
+    changed = []
+    for reminder in pending.iterator(chunk_size=batch_size):
+        due_at = reminder_due_at(event, reminder.minutes_before)
+        if due_at != reminder.due_at:
+            reminder.due_at = due_at
+            changed.append(reminder)
+    EventReminder.objects.bulk_update(changed, ["due_at"], batch_size=batch_size)
+    return len(changed)
+
+
+def _claim_batch(now, batch_size):
+    """Marca como enviado el siguiente lote vencido y lo retorna"""
+    from .models import EventReminder
+
+    with transaction.atomic():
+        batch = list(
+            EventReminder.objects.select_for_update(skip_locked=True)
+            .filter(sent=False, due_at__lte=now)
+            .order_by("due_at")
+            .values("pk", "event_id", "user_id", "reminder_type", "minutes_before")[
+                :batch_size
+            ]
+        )
+        if batch:
+            EventReminder.objects.filter(
+                pk__in=[r["pk"] for r in batch], sent=False
+            ).update(sent=True, sent_at=now)
+    return batch
+
+
+def _reminder_message(event, start):
+    when = date_format(timezone.localtime(start), "DATETIME_FORMAT")
+    location = f" en {event.location}" if getattr(event, "location", None) else ""
+    return f"Recordatorio: {event.title}", f"{event.title} comienza el {when}{location}."
+
+
+def _deliver(batch, now):
+    from apps.accounts.notifications import notify_users
+
+    from .models import Event
+
+    groups = defaultdict(list)
+    for reminder in batch:
+        key = (reminder["event_id"], reminder["minutes_before"], reminder["reminder_type"])
+        groups[key].append(reminder["user_id"])
+
+    events = Event.objects.in_bulk({event_id for event_id, _, _ in groups})
+    sent = expired = 0
+    for (event_id, minutes_before, reminder_type), user_ids in groups.items():
+        event = events.get(event_id)
+        start = event_start_datetime(event)
+        if start is None or start <= now:
+            # El evento ya empezó (el despachador estuvo detenido): no avisar tarde
+            expired += len(user_ids)
+            continue
+
+        title, message = _reminder_message(event, start)
+        # SMS no tiene proveedor configurado: se entrega como notificación
+        notify_users(
+            user_ids,
+            title=title,
+            message=message,
+            notification_type="reminder",
+            event=event,
+            action_url=reverse("accounts:panel_event_detail", args=[event.pk]),
+            dedupe_key=f"event-reminder:{event.pk}:{minutes_before}",
+            send_email=reminder_type == "email",
+        )
+        sent += len(user_ids)
+    return sent, expired
+
+
+def dispatch_due_reminders(now=None, batch_size=REMINDER_BATCH_SIZE, max_batches=None):
+    """
+    Envía los recordatorios vencidos hasta ``now``.
+
+    Returns:
+        dict: {"sent": n, "expired": n, "batches": n}
+    """
+    now = now or timezone.now()
+    stats = {"sent": 0, "expired": 0, "batches": 0}
+    while max_batches is None or stats["batches"] < max_batches:
+        batch = _claim_batch(now, batch_size)
+        if not batch:
+            break
+        stats["batches"] += 1
+        try:
+            sent, expired = _deliver(batch, now)
+        except Exception:
+            # Ya quedaron marcados: se registra y se sigue con el próximo lote
+            logger.exception("Error sending event reminder batch")
+            continue
+        stats["sent"] += sent
+        stats["expired"] += expired
+    return stats
@@ -0,0 +1,324 @@
+"""
+Roster de un evento: quién está registrado y con qué datos.
+
+Un jugador está en el roster si aparece en una orden o checkout del evento
+(OrderPlayer / CheckoutPlayer) o si su usuario tiene una asistencia
+confirmada. Cada fila (RosterEntry) trae jugador, división, equipo, padre
+principal, estado de pago y hotel. El roster se arma en un número fijo de
+consultas (no depende del número de jugadores) y se cachea por evento:
+
+- event_roster:<id>: órdenes, checkouts y asistencias del evento
+- event_roster: jugadores, padres y reservas de hotel (cualquier evento)
+
+Las vistas lo consumen como un queryset sencillo:
+
+    roster = get_event_roster(event)
+    roster.filter(division_id=3).exclude(payment_status="pending")
+    roster.parents()   # padres únicos con sus jugadores (para emails)
+"""
+
+from collections import namedtuple
+from datetime import date
+
+from apps.core.cache_tags import cached_fragment, invalidate_tags
+
+ROSTER_CACHE_TIMEOUT = 15 * 60
+
+ORDER_STATUSES = ("paid", "pending", "pending_registration")
+CHECKOUT_STATUSES = ("paid", "registered")
+HOTEL_RESERVATION_STATUSES = ("confirmed", "checked_in", "checked_out")
+
+# Estado de pago de la fila: orden/checkout pagado, pendiente, o solo asistencia
+PAID = "paid"
+PENDING = "pending"
+NO_PAYMENT = "none"
+
+ROSTER_FIELDS = [
+    "player_id",
+    "user_id",
+    "first_name",
+    "last_name",
+    "email",
+    "birth_date",
+    "grade",
+    "grade_display",
+    "division_id",
+    "division_name",
+    "team_id",
+    "team_name",
+    "parent_id",
+    "parent_name",
+    "parent_email",
+    "payment_status",
+    "hotel_name",
+]
+
+
+class RosterEntry(namedtuple("RosterEntry", ROSTER_FIELDS)):
+    __slots__ = ()
+
+    @property
+    def name(self):
+        return f"{self.first_name} {self.last_name}".strip()
+
+    @property
+    def age(self):
+        """Edad actual (se calcula al leer: el roster cacheado no envejece)"""
+        if not self.birth_date:
+            return None
+        today = date.today()
+        age = today.year - self.birth_date.year
+        if (today.month, today.day) < (self.birth_date.month, self.birth_date.day):
+            age -= 1
+        return age
+
+
+class EventRoster:
+    """Lista inmutable de RosterEntry con filtros al estilo queryset"""
+
+    def __init__(self, entries):
+        self._entries = list(entries)
+
+    def __iter__(self):
+        return iter(self._entries)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __bool__(self):
+        return bool(self._entries)
+
+    def __getitem__(self, index):
+        return self._entries[index]
+
+    def count(self):
+        return len(self._entries)
+
+    def exists(self):
+        return bool(self._entries)
+
+    @staticmethod
+    def _matches(entry, lookups):
+        for field, value in lookups.items():
+            if field.endswith("__in"):
+                if getattr(entry, field[:-4]) not in value:
+                    return False
+            elif getattr(entry, field) != value:
+                return False
+        return True
+
+    def filter(self, **lookups):
+        """Filtra por igualdad (``campo=valor``) o pertenencia (``campo__in``)"""
+        return EventRoster(e for e in self._entries if self._matches(e, lookups))
+
+    def exclude(self, **lookups):
+        return EventRoster(e for e in self._entries if not self._matches(e, lookups))
+
+    def player_ids(self):
+        return [entry.player_id for entry in self._entries]
+
+    def division_counts(self):
+        """{division_id: jugadores}"""
+        counts = {}
+        for entry in self._entries:
+            counts[entry.division_id] = counts.get(entry.division_id, 0) + 1
+        return counts
+
+    def parents(self):
+        """
+        Padres principales únicos (por email) con sus jugadores:
+        [{"id", "name", "email", "players_count", "players"}]
+        """
+        parents = {}
+        for entry in self._entries:
+            if not entry.parent_id or not entry.parent_email:
+                continue
+            parent = parents.setdefault(
+                entry.parent_email,
+                {
+                    "id": entry.parent_id,
+                    "name": entry.parent_name,
+                    "email": entry.parent_email,
+                    "players_count": 0,
+                    "players": [],
+                },
+            )
+            parent["players_count"] += 1
+            parent["players"].append(entry.name or "Jugador")
+        return list(parents.values())
+
+
+def _registrations(event_id):
+    """{player_id: (estado de pago, id del usuario que registró)}"""
+    from apps.accounts.models import CheckoutPlayer, OrderPlayer, Player
+
+    from .models import EventAttendance
+
+    registrations = {}
+
+    def add(player_id, status, user_id):
+        current = registrations.get(player_id)
+        if current is None or (status == PAID and current[0] != PAID):
+            registrations[player_id] = (status, user_id)
+
+    for player_id, status, user_id in OrderPlayer.objects.filter(
+        order__event_id=event_id, order__status__in=ORDER_STATUSES
+    ).values_list("player_id", "order__status", "order__user_id"):
+        add(player_id, PAID if status == "paid" else PENDING, user_id)
+
+    for player_id, status, user_id in CheckoutPlayer.objects.filter(
+        checkout__event_id=event_id, checkout__status__in=CHECKOUT_STATUSES
+    ).values_list("player_id", "checkout__status", "checkout__user_id"):
+        add(player_id, PAID if status == "paid" else PENDING, user_id)
+
+    for player_id, user_id in Player.objects.filter(
+        user__in=EventAttendance.objects.filter(
+            event_id=event_id, status="confirmed"
+        ).values("user")
+    ).values_list("pk", "user_id"):
+        current = registrations.get(player_id)
+        if current is None:
+            registrations[player_id] = (NO_PAYMENT, user_id)
+        elif current[0] == PENDING:
+            # La asistencia confirmada manda sobre una orden pendiente vieja
+            registrations[player_id] = (NO_PAYMENT, current[1])
+
+    return registrations
+
+
+def _primary_parents(player_ids):
+    """{player_id: (id, nombre, email)} del padre principal (o el primero)"""
+    from apps.accounts.models import PlayerParent
+
+    parents = {}
+    rows = (
+        PlayerParent.objects.filter(player_id__in=player_ids)
+        .order_by("player_id", "-is_primary", "pk")
+        .values_list(
+            "player_id",
+            "parent_id",
+            "parent__first_name",
+            "parent__last_name",
+            "parent__username",
+            "parent__email",
+        )
+    )
+    for player_id, parent_id, first_name, last_name, username, email in rows:
+        if player_id not in parents:
+            name = f"{first_name} {last_name}".strip() or username
+            parents[player_id] = (parent_id, name, email)
+    return parents
+
+
+def _hotels(event_id, user_ids):
+    """{user_id: nombre del hotel} de las reservas activas para el evento"""
+    from django.db.models import Q
+
+    from apps.locations.models import HotelReservation
+
+    hotels = {}
+    rows = (
+        HotelReservation.objects.filter(
+            Q(event_id=event_id)
+            | Q(order__event_id=event_id)
+            | Q(stripe_checkout__event_id=event_id),
+            user_id__in=user_ids,
+            status__in=HOTEL_RESERVATION_STATUSES,
+        )
+        .order_by("pk")
+        .values_list("user_id", "hotel__hotel_name")
+    )
+    for user_id, hotel_name in rows:
+        hotels.setdefault(user_id, hotel_name)
+    return hotels
+
+
+def build_event_roster(event_id):
+    """Filas del roster (sin caché); 6 consultas sin importar el tamaño"""
+    from apps.accounts.models import Player
+
+    registrations = _registrations(event_id)
+    if not registrations:
+        return []
+
+    players = (
+        Player.objects.filter(pk__in=list(registrations))
+        .order_by("user__last_name", "user__first_name", "pk")
+        .values_list(
+            "pk",
+            "user_id",
+            "user__first_name",
+            "user__last_name",
+            "user__email",
+            "user__profile__birth_date",
+            "grade",
+            "division_id",
+            "division__name",
+            "team_id",
+            "team__name",
+        )
+    )
+    players = list(players)
+    parents = _primary_parents([row[0] for row in players])
+    hotels = _hotels(event_id, {user_id for _, user_id in registrations.values()})
+    grade_labels = dict(Player._meta.get_field("grade").choices or [])
+
+    entries = []
+    for (
+        player_id,
+        user_id,
+        first_name,
+        last_name,
+        email,
+        birth_date,
+        grade,
+        division_id,
+        division_name,
+        team_id,
+        team_name,
+    ) in players:
+        payment_status, registered_by = registrations[player_id]
+        parent_id, parent_name, parent_email = parents.get(player_id, (None, "", ""))
+        entries.append(
+            RosterEntry(
+                player_id=player_id,
+                user_id=user_id,
+                first_name=first_name or "",
+                last_name=last_name or "",
+                email=email or "",
+                birth_date=birth_date,
+                grade=grade or "",
+                grade_display=grade_labels.get(grade, grade or ""),
+                division_id=division_id,
+                division_name=division_name or "",
+                team_id=team_id,
+                team_name=team_name or "",
+                parent_id=parent_id,
+                parent_name=parent_name,
+                parent_email=parent_email or "",
+                payment_status=payment_status,
+                hotel_name=hotels.get(registered_by, ""),
+            )
+        )
+    return entries
+
+
+def get_event_roster(event):
+    """EventRoster del evento (instancia o id), cacheado"""
+    event_id = getattr(event, "pk", event)
+    entries = cached_fragment(
+        "events:roster",
+        ["event_roster", f"event_roster:{event_id}"],
+        lambda: [tuple(entry) for entry in build_event_roster(event_id)],
+        timeout=ROSTER_CACHE_TIMEOUT,
+        parts=(event_id,),
+    )
+    return EventRoster(RosterEntry(*row) for row in entries)
+
+
+def invalidate_event_roster(event_id=None):
+    """Invalida el roster de un evento, o el de todos si no se indica"""
+    if event_id is None:
+        invalidate_tags("event_roster")
+    else:
+        invalidate_tags(f"event_roster:{event_id}")
@@ -0,0 +1,349 @@
+"""
+Búsqueda de eventos con ranking y conteo de facetas.
+
+Backends:
+- PostgreSQL: tsvector ponderado (title > description > location) servido por
+  un índice GIN de expresión creado en la migración 0041.
+- SQLite: tabla virtual FTS5 ``events_event_fts`` mantenida por triggers
+  (desarrollo y tests).
+- Cualquier otro motor (o SQLite compilado sin FTS5): ``icontains`` como antes.
+
+Las facetas (categoría, tipo, país y ventana de tiempo) se calculan con una sola
+consulta agrupada y se cachean por combinación de filtros. La caché se invalida
+subiendo un número de versión cada vez que se guarda o elimina un Event.
+"""
+
+import hashlib
+import logging
+import re
+import time
+
+from django.core.cache import cache
+from django.db import DatabaseError, connection
+from django.db.models import (
+    BooleanField,
+    Case,
+    CharField,
+    Count,
+    FloatField,
+    Q,
+    Value,
+    When,
+)
+from django.db.models.expressions import RawSQL
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+FACETS_CACHE_TIMEOUT = 900  # 15 minutos
+FACETS_VERSION_KEY = "events_search_facets_version"
+
+TIME_BUCKETS = ("upcoming", "ongoing", "past", "today")
+
+PG_SEARCH_INDEX = "events_event_search_gin"
+# Debe coincidir exactamente con la expresión del índice GIN para que el
+# planner de PostgreSQL lo utilice.
+PG_DOCUMENT_SQL = (
+    "(setweight(to_tsvector('simple', coalesce(\"events_event\".\"title\", '')), 'A')"
+    " || setweight(to_tsvector('simple', coalesce(\"events_event\".\"description\", '')), 'B')"
+    " || setweight(to_tsvector('simple', coalesce(\"events_event\".\"location\", '')), 'C'))"
+)
+
+SQLITE_FTS_TABLE = "events_event_fts"
+_SQLITE_FTS_TRIGGERS = {
+    "events_event_fts_ai": """
+        CREATE TRIGGER IF NOT EXISTS events_event_fts_ai AFTER INSERT ON events_event
+        BEGIN
+            INSERT INTO events_event_fts(rowid, title, description, location)
+            VALUES (new.id, new.title, new.description, new.location);
+        END
+    """,
+    "events_event_fts_ad": """
+        CREATE TRIGGER IF NOT EXISTS events_event_fts_ad AFTER DELETE ON events_event
+        BEGIN
+            DELETE FROM events_event_fts WHERE rowid = old.id;
+        END
+    """,
+    "events_event_fts_au": """
+        CREATE TRIGGER IF NOT EXISTS events_event_fts_au AFTER UPDATE ON events_event
+        BEGIN
+            DELETE FROM events_event_fts WHERE rowid = old.id;
+            INSERT INTO events_event_fts(rowid, title, description, location)
+            VALUES (new.id, new.title, new.description, new.location);
+        END
+    """,
+}
+
+_sqlite_fts_state = {"ready": None}
+
+
+def install_search_index(schema_editor):
+    """
+    Crea la estructura de búsqueda para el motor actual (usado por la migración).
+    """
+    vendor = schema_editor.connection.vendor
+    with schema_editor.connection.cursor() as cursor:
+        if vendor == "postgresql":
+            cursor.execute(
+                f"CREATE INDEX IF NOT EXISTS {PG_SEARCH_INDEX} "
+                f"ON events_event USING GIN ({PG_DOCUMENT_SQL})"
+            )
+        elif vendor == "sqlite":
+            _install_sqlite_fts(cursor, rebuild=True)
+
+
+def uninstall_search_index(schema_editor):
+    """Reverso de install_search_index"""
+    vendor = schema_editor.connection.vendor
+    with schema_editor.connection.cursor() as cursor:
+        if vendor == "postgresql":
+            cursor.execute(f"DROP INDEX IF EXISTS {PG_SEARCH_INDEX}")
+        elif vendor == "sqlite":
+            for trigger in _SQLITE_FTS_TRIGGERS:
+                cursor.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+            cursor.execute(f"DROP TABLE IF EXISTS {SQLITE_FTS_TABLE}")
+
+
+def _install_sqlite_fts(cursor, rebuild=False):
+    """
+    Crea la tabla FTS5 y sus triggers. Con rebuild=True repuebla el índice
+    desde events_event.
+    """
+    try:
+        cursor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {SQLITE_FTS_TABLE} USING fts5("
+            "title, description, location, "
+            "tokenize = 'unicode61 remove_diacritics 2')"
+        )
+    except DatabaseError:
+        # SQLite compilado sin FTS5: se usará el fallback icontains
+        logger.warning("SQLite sin soporte FTS5; búsqueda de eventos con icontains")
+        return False
+    if rebuild:
+        cursor.execute(f"DELETE FROM {SQLITE_FTS_TABLE}")
+        cursor.execute(
+            f"INSERT INTO {SQLITE_FTS_TABLE}(rowid, title, description, location) "
+            "SELECT id, title, description, location FROM events_event"
+        )
+    for sql in _SQLITE_FTS_TRIGGERS.values():
+        cursor.execute(sql)
+    return True
+
+
+def _sqlite_fts_available():
+    """
+    Verifica (una vez por proceso) que la tabla FTS5 y sus triggers existan.
+
+    SQLite elimina los triggers cuando una migración reconstruye events_event
+    (AlterField/AddField con default), así que se reinstalan y se repuebla el
+    índice si faltan.
+    """
+    if _sqlite_fts_state["ready"] is not None:
+        return _sqlite_fts_state["ready"]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'trigger' AND name IN (%s, %s, %s)",
+            list(_SQLITE_FTS_TRIGGERS),
+        )
+        present = {row[0] for row in cursor.fetchall()}
+        if len(present) == len(_SQLITE_FTS_TRIGGERS):
+            ready = True
+        else:
+            ready = _install_sqlite_fts(cursor, rebuild=True)
+    _sqlite_fts_state["ready"] = ready
+    return ready
+
+
+def _search_tokens(query):
+    """Tokens seguros para las sintaxis de tsquery y FTS5 (solo \\w)."""
+    return re.findall(r"\w+", query or "")[:10]
+
+
+def search_events(queryset, query):
+    """
+    Filtra ``queryset`` por el texto ``query`` y anota ``search_rank``
+    (mayor = más relevante). Cada palabra se busca como prefijo y todas deben
+    aparecer en title, description o location.
+    """
+    tokens = _search_tokens(query)
+    if not tokens:
+        return queryset.annotate(search_rank=Value(0.0, output_field=FloatField()))
+
+    vendor = connection.vendor
+    if vendor == "postgresql":
+        tsquery = " & ".join(f"{token}:*" for token in tokens)
+        return queryset.filter(
+            RawSQL(
+                f"{PG_DOCUMENT_SQL} @@ to_tsquery('simple', %s)",
+                [tsquery],
+                output_field=BooleanField(),
+            )
+        ).annotate(
+            search_rank=RawSQL(
+                f"ts_rank({PG_DOCUMENT_SQL}, to_tsquery('simple', %s))",
+                [tsquery],
+                output_field=FloatField(),
+            )
+        )
+
+    if vendor == "sqlite" and _sqlite_fts_available():
+        match = " ".join('"{}"*'.format(token) for token in tokens)
+        return queryset.filter(
+            id__in=RawSQL(
+                f"SELECT rowid FROM {SQLITE_FTS_TABLE} WHERE {SQLITE_FTS_TABLE} MATCH %s",
+                [match],
+            )
+        ).annotate(
+            # bm25 devuelve valores negativos (más negativo = mejor)
+            search_rank=RawSQL(
+                f"(SELECT -bm25({SQLITE_FTS_TABLE}, 10.0, 4.0, 1.0) "
+                f"FROM {SQLITE_FTS_TABLE} WHERE {SQLITE_FTS_TABLE} MATCH %s "
+                f'AND {SQLITE_FTS_TABLE}.rowid = "events_event"."id")',
+                [match],
+                output_field=FloatField(),
+            )
+        )
+
+    text_filter = Q()
+    for token in tokens:
+        text_filter &= (
+            Q(title__icontains=token)
+            | Q(description__icontains=token)
+            | Q(location__icontains=token)
+        )
+    return queryset.filter(text_filter).annotate(
+        search_rank=Value(0.0, output_field=FloatField())
+    )
+
+
+def _row_matches_time(row, time_filter):
+    if time_filter == "today":
+        return row["is_today"]
+    return row["time_bucket"] == time_filter
+
+
+def _row_matches(row, filters, skip=None):
+    """Indica si una fila agrupada cumple todos los filtros excepto ``skip``."""
+    for name, value in filters.items():
+        if not value or name == skip:
+            continue
+        if name == "time_filter":
+            if not _row_matches_time(row, value):
+                return False
+        elif str(row[f"{name}_id"]) != str(value):
+            return False
+    return True
+
+
+def _compute_event_facets(queryset, filters, today):
+    """
+    Calcula las facetas con una sola consulta agrupada por
+    (categoría, tipo, país, ventana de tiempo, es_hoy).
+
+    Las facetas son disyuntivas: el conteo de cada opción aplica todos los
+    filtros seleccionados salvo el de su propia faceta.
+    """
+    rows = list(
+        queryset.order_by()
+        .annotate(
+            time_bucket=Case(
+                When(start_date__gt=today, then=Value("upcoming")),
+                When(start_date__lte=today, end_date__gte=today, then=Value("ongoing")),
+                When(end_date__lt=today, then=Value("past")),
+                default=Value(""),
+                output_field=CharField(),
+            ),
+            is_today=Case(
+                When(start_date=today, then=Value(True)),
+                default=Value(False),
+                output_field=BooleanField(),
+            ),
+        )
+        .values(
+            "category_id",
+            "event_type_id",
+            "country_id",
+            "country__name",
+            "time_bucket",
+            "is_today",
+        )
+        .annotate(total=Count("id"))
+    )
+
+    facets = {
+        "total": 0,
+        "category": {},
+        "event_type": {},
+        "country": {},
+        "time": {bucket: 0 for bucket in TIME_BUCKETS},
+    }
+    country_names = {}
+    for row in rows:
+        total = row["total"]
+        if _row_matches(row, filters):
+            facets["total"] += total
+        for name in ("category", "event_type", "country"):
+            row_id = row[f"{name}_id"]
+            if row_id is None:
+                continue
+            facets[name].setdefault(row_id, 0)
+            if _row_matches(row, filters, skip=name):
+                facets[name][row_id] += total
+        if row["country_id"] is not None:
+            country_names[row["country_id"]] = row["country__name"]
+        if _row_matches(row, filters, skip="time_filter"):
+            for bucket in TIME_BUCKETS:
+                if _row_matches_time(row, bucket):
+                    facets["time"][bucket] += total
+
+    facets["country"] = sorted(
+        (
+            {"id": country_id, "name": country_names[country_id], "count": count}
+            for country_id, count in facets["country"].items()
+        ),
+        key=lambda item: item["name"] or "",
+    )
+    return facets
+
+
+def get_event_facets(search="", filters=None):
+    """
+    Facetas de los eventos publicados para ``search`` + ``filters``
+    (category, event_type, country, time_filter), cacheadas por combinación.
+
+    Returns:
+        dict: total, category {id: n}, event_type {id: n},
+        country [{id, name, count}] ordenado por nombre y time {bucket: n}.
+    """
+    from .models import Event
+
+    filters = {
+        name: (filters or {}).get(name) or ""
+        for name in ("category", "event_type", "country", "time_filter")
+    }
+    today = timezone.now().date()
+    version = cache.get_or_set(FACETS_VERSION_KEY, lambda: int(time.time()), None)
+    fingerprint = hashlib.md5(
+        "|".join(
+            [" ".join(_search_tokens(search)).lower()]
+            + [str(filters[name]) for name in sorted(filters)]
+        ).encode("utf-8")
+    ).hexdigest()
+    cache_key = f"events_search_facets_v{version}_{today.isoformat()}_{fingerprint}"
+
+    facets = cache.get(cache_key)
+    if facets is None:
+        queryset = search_events(Event.objects.filter(status="published"), search)
+        facets = _compute_event_facets(queryset, filters, today)
+        cache.set(cache_key, facets, FACETS_CACHE_TIMEOUT)
+    return facets
+
+
+def invalidate_event_facets():
+    """Invalida todas las facetas cacheadas (llamado al guardar/eliminar un Event)."""
+    try:
+        cache.incr(FACETS_VERSION_KEY)
+    except ValueError:
+        # La clave no existe (expulsada o primer uso): una versión basada en
+        # tiempo no colisiona con entradas antiguas
+        cache.set(FACETS_VERSION_KEY, int(time.time()), None)
@@ -0,0 +1,98 @@
+"""
+Señales de eventos
+"""
+
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from apps.core.cache_tags import invalidate_tags
+from apps.locations.models import HotelReservation
+
+from .capacity import apply_attendance_transition, sync_event_capacity_limit
+from .models import Event, EventAttendance, EventCategory, EventType
+from .reminders import sync_event_reminders
+from .roster import invalidate_event_roster
+from .search import invalidate_event_facets
+
+
+@receiver(post_save, sender=Event)
+@receiver(post_delete, sender=Event)
+def invalidate_event_search_cache(sender, instance, **kwargs):
+    """Invalida las facetas cacheadas de la búsqueda pública de eventos"""
+    invalidate_event_facets()
+    invalidate_tags("event")
+
+
+@receiver(post_save, sender=EventType)
+@receiver(post_delete, sender=EventType)
+def invalidate_event_type_cache(sender, instance, **kwargs):
+    """Invalida los fragmentos de tipos de eventos, los de eventos y las facetas"""
+    invalidate_event_facets()
+    invalidate_tags("event_type", "event")
+
+
+@receiver(post_save, sender=EventCategory)
+@receiver(post_delete, sender=EventCategory)
+def invalidate_event_category_cache(sender, instance, **kwargs):
+    """
+    Invalida el feed del calendario (usa el color de la categoría), los
+    fragmentos de eventos y las facetas
+    """
+    invalidate_event_facets()
+    invalidate_tags("event_category", "event")
+
+
+@receiver(m2m_changed, sender=Event.divisions.through)
+def invalidate_event_divisions_cache(sender, instance, action, **kwargs):
+    """Editar las divisiones de un evento no dispara post_save del Event"""
+    if action in ("post_add", "post_remove", "post_clear"):
+        invalidate_event_facets()
+        invalidate_tags("event")
+
+
+@receiver(post_save, sender=Event)
+def sync_event_capacity(sender, instance, **kwargs):
+    """Mantiene el límite de cupos copiado en EventCapacity"""
+    update_fields = kwargs.get("update_fields")
+    if update_fields is not None and "max_attendees" not in update_fields:
+        return
+    sync_event_capacity_limit(instance)
+
+
+@receiver(post_save, sender=Event)
+def sync_reminder_due_times(sender, instance, created, **kwargs):
+    """Si cambia la fecha de inicio, mueve los recordatorios pendientes"""
+    update_fields = kwargs.get("update_fields")
+    if created or (update_fields is not None and "start_date" not in update_fields):
+        return
+    sync_event_reminders(instance)
+
+
+@receiver(post_save, sender=EventAttendance)
+def update_capacity_on_attendance_save(sender, instance, **kwargs):
+    """Aplica la transición de estado/división a los contadores de cupos"""
+    new_state = instance.capacity_state()
+    apply_attendance_transition(getattr(instance, "_capacity_state", None), new_state)
+    instance._capacity_state = new_state
+    invalidate_tags("event_attendance")
+
+
+@receiver(post_delete, sender=EventAttendance)
+def update_capacity_on_attendance_delete(sender, instance, **kwargs):
+    apply_attendance_transition(
+        getattr(instance, "_capacity_state", instance.capacity_state()), None
+    )
+    invalidate_tags("event_attendance")
+
+
+@receiver(post_save, sender=EventAttendance)
+@receiver(post_delete, sender=EventAttendance)
+def invalidate_roster_on_attendance_change(sender, instance, **kwargs):
+    invalidate_event_roster(instance.event_id)
+
+
+@receiver(post_save, sender=HotelReservation)
+@receiver(post_delete, sender=HotelReservation)
+def invalidate_roster_on_hotel_reservation_change(sender, instance, **kwargs):
+    """La reserva puede ligarse al evento vía orden o checkout: todos los rosters"""
+    invalidate_event_roster()
@@ -1,3 +1,5 @@
+from io import StringIO
+
 from django.contrib.auth.models import User
 from django.core.management import call_command
 from django.test import Client, TestCase
@@ -249,6 +251,30 @@ class DivisionModelTest(TestCase):
         )
         self.assertEqual(division.age_range, "Sin restricción de edad")
 
+    def test_sync_command_removes_unused_event_divisions_with_signals(self):
+        """Removing divisions from events fires m2m_changed (cache invalidation)"""
+        from datetime import date
+        from unittest import mock
+
+        from apps.accounts.models import Player
+
+        organizer = User.objects.create_user(username="organizer", password="pass")
+        player_user = User.objects.create_user(username="player", password="pass")
+        Player.objects.create(user=player_user, division=self.division)
+        unused = Division.objects.create(name="Unused Division")
+        event = Event.objects.create(
+            title="Sync Event",
+            start_date=date(2099, 1, 10),
+            end_date=date(2099, 1, 11),
+            organizer=organizer,
+        )
+        event.divisions.add(self.division, unused)
+
+        with mock.patch("apps.events.signals.invalidate_tags") as invalidate:
+            call_command("sync_divisions_with_players", stdout=StringIO())
+        self.assertEqual(list(event.divisions.all()), [self.division])
+        invalidate.assert_any_call("event")
+
 
 class EventCategoryModelTest(TestCase):
     """Test cases for EventCategory model"""
@@ -469,3 +495,589 @@ class DivisionViewTest(TestCase):
         )
         self.assertEqual(response.status_code, 200)
         self.assertContains(response, "Test Division")
+
+
+class EventSearchTest(TestCase):
+    """Test cases for the public event search backend and facets"""
+
+    def setUp(self):
+        """Set up test data"""
+        from django.core.cache import cache
+
+        cache.clear()
+        self.user = User.objects.create_user(
+            username="testuser", password="testpass123"
+        )
+        self.category = EventCategory.objects.create(name="Torneos")
+        self.mexico = Country.objects.create(name="México", code="MX")
+        self.usa = Country.objects.create(name="United States", code="US")
+        self.merida = Event.objects.create(
+            title="Copa Mérida",
+            description="Torneo juvenil",
+            location="Estadio Kukulcán",
+            category=self.category,
+            country=self.mexico,
+            status="published",
+            start_date="2099-05-01",
+            end_date="2099-05-03",
+            organizer=self.user,
+        )
+        self.showcase = Event.objects.create(
+            title="Summer Showcase",
+            description="Scouting showcase in Mérida",
+            country=self.usa,
+            status="published",
+            start_date="2020-05-01",
+            end_date="2020-05-03",
+            organizer=self.user,
+        )
+        Event.objects.create(
+            title="Mérida draft",
+            description="Not published",
+            status="draft",
+            organizer=self.user,
+        )
+
+    def test_search_ranks_title_matches_first(self):
+        """Title matches outrank description matches; drafts are excluded"""
+        from .search import search_events
+
+        results = list(
+            search_events(Event.objects.filter(status="published"), "merida").order_by(
+                "-search_rank"
+            )
+        )
+        self.assertEqual(results, [self.merida, self.showcase])
+
+    def test_search_index_follows_updates(self):
+        """Edited events are searchable by their new text"""
+        from .search import search_events
+
+        self.showcase.title = "Winter Classic"
+        self.showcase.save()
+        queryset = Event.objects.filter(status="published")
+        self.assertEqual(list(search_events(queryset, "winter")), [self.showcase])
+        self.assertFalse(search_events(queryset, "summer").exists())
+
+    def test_facets_are_disjunctive_and_cached(self):
+        """Each facet ignores its own filter and is served from cache"""
+        from .search import get_event_facets
+
+        facets = get_event_facets("", {"country": self.mexico.id})
+        self.assertEqual(facets["total"], 1)
+        self.assertEqual(
+            [(c["name"], c["count"]) for c in facets["country"]],
+            [("México", 1), ("United States", 1)],
+        )
+        self.assertEqual(facets["category"], {self.category.id: 1})
+        self.assertEqual(facets["time"]["upcoming"], 1)
+        self.assertEqual(facets["time"]["past"], 0)
+
+        with self.assertNumQueries(0):
+            get_event_facets("", {"country": self.mexico.id})
+
+    def test_facets_invalidated_on_event_save(self):
+        """Saving an event invalidates cached facet counts"""
+        from .search import get_event_facets
+
+        self.assertEqual(get_event_facets("", {})["total"], 2)
+        self.showcase.status = "draft"
+        self.showcase.save()
+        self.assertEqual(get_event_facets("", {})["total"], 1)
+
+    def test_facets_invalidated_on_category_and_division_changes(self):
+        """Category edits and division M2M edits invalidate cached facets"""
+        from django.core.cache import cache
+
+        from .search import FACETS_VERSION_KEY, get_event_facets
+
+        get_event_facets("", {})
+        version = cache.get(FACETS_VERSION_KEY)
+        self.category.name = "Copas"
+        self.category.save()
+        self.assertNotEqual(cache.get(FACETS_VERSION_KEY), version)
+
+        version = cache.get(FACETS_VERSION_KEY)
+        division = Division.objects.create(name="U12")
+        self.merida.divisions.add(division)
+        self.assertNotEqual(cache.get(FACETS_VERSION_KEY), version)
+
+    def test_public_list_view_search(self):
+        """Public list uses the search backend and exposes facet counts"""
+        response = self.client.get(reverse("events:public_list"), {"search": "kukulcan"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(response.context["events"]), [self.merida])
+        self.assertEqual(response.context["facets"]["total"], 1)
+
+
+class EventCapacityTest(TestCase):
+    """Test cases for the denormalized event capacity counters"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.organizer = User.objects.create_user(
+            username="organizer", password="testpass123"
+        )
+        self.division = Division.objects.create(name="10U")
+        self.event = Event.objects.create(
+            title="Capacity Event",
+            start_date="2099-01-01",
+            end_date="2099-01-02",
+            organizer=self.organizer,
+            max_attendees=3,
+        )
+        self.event.divisions.add(self.division)
+
+    def _player(self, username, division=None):
+        from apps.accounts.models import Player, UserProfile
+
+        user = User.objects.create_user(username=username, password="testpass123")
+        UserProfile.objects.create(user=user, user_type="player")
+        return Player.objects.create(user=user, division=division)
+
+    def _capacity(self):
+        from .models import EventCapacity
+
+        return EventCapacity.objects.get(event=self.event)
+
+    def test_counters_follow_attendance_transitions(self):
+        """Save, status change and delete adjust the counters"""
+        attendance = EventAttendance.objects.create(
+            event=self.event, user=self.organizer, status="pending"
+        )
+        self.assertEqual(self._capacity().pending_count, 1)
+
+        attendance.status = "confirmed"
+        attendance.save()
+        capacity = self._capacity()
+        self.assertEqual((capacity.confirmed_count, capacity.pending_count), (1, 0))
+        self.assertEqual(Event.objects.get(pk=self.event.pk).attendees_count, 1)
+
+        attendance.delete()
+        self.assertEqual(self._capacity().confirmed_count, 0)
+
+    def test_claim_seats_is_all_or_nothing(self):
+        """A claim that does not fit raises and reserves nothing"""
+        from .capacity import CapacityExceeded, claim_event_seats
+
+        players = [self._player(f"player{i}") for i in range(4)]
+        with self.assertRaises(CapacityExceeded):
+            claim_event_seats(self.event, players)
+        self.assertEqual(self._capacity().pending_count, 0)
+        self.assertFalse(EventAttendance.objects.filter(event=self.event).exists())
+
+        claimed = claim_event_seats(self.event, players[:3])
+        self.assertEqual(len(claimed), 3)
+        self.assertEqual(self._capacity().pending_count, 3)
+        self.assertTrue(Event.objects.get(pk=self.event.pk).is_full)
+        # Reclamar de nuevo para los mismos jugadores no toma cupos extra
+        self.assertEqual(claim_event_seats(self.event, players[:3]), [])
+
+    def test_division_limit_and_release(self):
+        """Division rows enforce their own limit and release frees seats"""
+        from .capacity import CapacityExceeded, claim_event_seats, release_event_seats
+        from .models import EventDivisionCapacity
+
+        EventDivisionCapacity.objects.create(
+            event=self.event, division=self.division, max_attendees=1
+        )
+        first = self._player("first", self.division)
+        second = self._player("second", self.division)
+
+        claim_event_seats(self.event, [first])
+        with self.assertRaises(CapacityExceeded):
+            claim_event_seats(self.event, [second])
+        self.assertEqual(self._capacity().pending_count, 1)
+
+        self.assertEqual(release_event_seats(self.event, [first.user_id]), 1)
+        self.assertEqual(self._capacity().pending_count, 0)
+        claim_event_seats(self.event, [second])
+        division_capacity = EventDivisionCapacity.objects.get(
+            event=self.event, division=self.division
+        )
+        self.assertEqual(division_capacity.pending_count, 1)
+
+    def test_reconcile_fixes_drifted_counters(self):
+        """The reconcile command recomputes counters from attendances"""
+        from .models import EventCapacity
+
+        EventAttendance.objects.create(
+            event=self.event, user=self.organizer, status="confirmed"
+        )
+        EventCapacity.objects.filter(event=self.event).update(
+            confirmed_count=7, waiting_count=2
+        )
+        call_command(
+            "reconcile_event_capacity", event_ids=[self.event.pk], stdout=StringIO()
+        )
+        capacity = self._capacity()
+        self.assertEqual((capacity.confirmed_count, capacity.waiting_count), (1, 0))
+
+
+class EventReminderDispatchTest(TestCase):
+    """Test cases for the scheduled EventReminder dispatcher"""
+
+    def setUp(self):
+        """Set up test data"""
+        from datetime import date
+
+        from django.core.cache import cache
+
+        cache.clear()
+        self.organizer = User.objects.create_user(
+            username="organizer", password="testpass123"
+        )
+        self.event = Event.objects.create(
+            title="Reminder Event",
+            start_date=date(2099, 1, 10),
+            end_date=date(2099, 1, 11),
+            organizer=self.organizer,
+        )
+        self.users = [
+            User.objects.create_user(username=f"fan{i}", password="testpass123")
+            for i in range(3)
+        ]
+
+    def _remind(self, user, minutes_before=60 * 24, reminder_type="notification"):
+        from .models import EventReminder
+
+        return EventReminder.objects.create(
+            event=self.event,
+            user=user,
+            minutes_before=minutes_before,
+            reminder_type=reminder_type,
+        )
+
+    def test_due_at_follows_event_start(self):
+        """due_at is computed on save and moved when the event date changes"""
+        from datetime import date, timedelta
+
+        from .reminders import event_start_datetime
+
+        reminder = self._remind(self.users[0])
+        start = event_start_datetime(self.event)
+        self.assertEqual(reminder.due_at, start - timedelta(days=1))
+
+        self.event.start_date = date(2099, 2, 10)
+        self.event.save()
+        reminder.refresh_from_db()
+        self.assertEqual(
+            reminder.due_at, event_start_datetime(self.event) - timedelta(days=1)
+        )
+
+    def test_dispatch_sends_due_reminders_once_in_bulk(self):
+        """Due reminders become one bulk notification batch and are marked sent"""
+        from datetime import timedelta
+
+        from apps.accounts.models import Notification
+
+        from .reminders import dispatch_due_reminders, event_start_datetime
+
+        for user in self.users:
+            self._remind(user)
+        later = self._remind(self.users[0], minutes_before=30)
+        now = event_start_datetime(self.event) - timedelta(hours=12)
+
+        stats = dispatch_due_reminders(now=now, batch_size=2)
+        self.assertEqual((stats["sent"], stats["batches"]), (3, 2))
+        notifications = Notification.objects.filter(type="reminder", event=self.event)
+        self.assertEqual(
+            set(notifications.values_list("user_id", flat=True)),
+            {user.pk for user in self.users},
+        )
+
+        # Segunda pasada: nada pendiente (el de 30 minutos aún no vence)
+        self.assertEqual(dispatch_due_reminders(now=now)["sent"], 0)
+        self.assertEqual(notifications.count(), 3)
+        later.refresh_from_db()
+        self.assertFalse(later.sent)
+
+    def test_reminders_for_started_events_are_not_sent(self):
+        """A backlog past the event start is marked sent without notifying"""
+        from datetime import timedelta
+
+        from apps.accounts.models import Notification
+
+        from .reminders import dispatch_due_reminders, event_start_datetime
+
+        reminder = self._remind(self.users[0])
+        stats = dispatch_due_reminders(
+            now=event_start_datetime(self.event) + timedelta(hours=1)
+        )
+        self.assertEqual((stats["sent"], stats["expired"]), (0, 1))
+        reminder.refresh_from_db()
+        self.assertTrue(reminder.sent)
+        self.assertFalse(Notification.objects.filter(type="reminder").exists())
+
+
+class EventCalendarFeedTest(TestCase):
+    """Test cases for the windowed calendar feed and the iCalendar export"""
+
+    def setUp(self):
+        """Set up test data"""
+        from datetime import date
+
+        from django.core.cache import cache
+
+        cache.clear()
+        self.staff = User.objects.create_user(
+            username="staff", password="testpass123", is_staff=True
+        )
+        self.category = EventCategory.objects.create(name="Torneos", color="#ff0000")
+        self.june = Event.objects.create(
+            title="June Cup",
+            description="Summer tournament",
+            category=self.category,
+            status="published",
+            start_date=date(2099, 6, 28),
+            end_date=date(2099, 7, 2),
+            organizer=self.staff,
+        )
+        self.august = Event.objects.create(
+            title="August Cup",
+            description="Late summer",
+            status="published",
+            start_date=date(2099, 8, 10),
+            end_date=date(2099, 8, 11),
+            organizer=self.staff,
+        )
+        self.draft = Event.objects.create(
+            title="Draft Cup",
+            description="Not yet",
+            status="draft",
+            start_date=date(2099, 7, 5),
+            organizer=self.staff,
+        )
+        self.url = reverse("events:calendar_feed")
+
+    def _titles(self, response):
+        self.assertEqual(response.status_code, 200)
+        return [item["title"] for item in response.json()]
+
+    def test_feed_returns_events_overlapping_the_window(self):
+        """Events spanning the window start are included, others are not"""
+        response = self.client.get(self.url, {"start": "2099-07-01", "end": "2099-08-01"})
+        self.assertEqual(self._titles(response), ["June Cup"])
+        item = response.json()[0]
+        self.assertEqual(item["start"], "2099-06-28")
+        self.assertEqual(item["end"], "2099-07-03")  # Fin exclusivo
+        self.assertEqual(item["color"], "#ff0000")
+        self.assertEqual(item["url"], reverse("events:public_detail", args=[self.june.pk]))
+
+        self.client.force_login(self.staff)
+        response = self.client.get(
+            self.url, {"start": "2099-07-01T00:00:00-06:00", "end": "2099-08-01", "scope": "all"}
+        )
+        self.assertEqual(self._titles(response), ["June Cup", "Draft Cup"])
+
+    def test_invalid_windows_are_rejected(self):
+        """Missing, inverted or oversized windows return 400"""
+        for params in (
+            {},
+            {"start": "2099-08-01", "end": "2099-07-01"},
+            {"start": "2099-01-01", "end": "2101-01-01"},
+        ):
+            self.assertEqual(self.client.get(self.url, params).status_code, 400)
+
+    def test_feed_is_cached_until_an_event_changes(self):
+        """Repeated windows are served from cache; saving an Event invalidates"""
+        from datetime import date
+
+        from .calendar_feed import calendar_events
+
+        params = {"start": "2099-08-01", "end": "2099-09-01"}
+        self.assertEqual(self._titles(self.client.get(self.url, params)), ["August Cup"])
+        with self.assertNumQueries(0):
+            calendar_events(
+                date(2099, 8, 1), date(2099, 9, 1), ["published"], "events:public_detail"
+            )
+
+        self.august.title = "August Classic"
+        self.august.save()
+        self.assertEqual(
+            self._titles(self.client.get(self.url, params)), ["August Classic"]
+        )
+
+    def test_ics_export_uses_etag(self):
+        """The subscription streams the user's events and answers 304 when unchanged"""
+        from .calendar_feed import ics_token
+
+        fan = User.objects.create_user(username="fan", password="testpass123")
+        EventAttendance.objects.create(event=self.june, user=fan, status="confirmed")
+        EventAttendance.objects.create(event=self.draft, user=fan, status="confirmed")
+        url = reverse("events:calendar_ics", args=[ics_token(fan)])
+
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        body = b"".join(response.streaming_content).decode()
+        self.assertIn("SUMMARY:June Cup", body)
+        self.assertIn("DTSTART;VALUE=DATE:20990628", body)
+        self.assertNotIn("Draft Cup", body)
+        self.assertNotIn("August Cup", body)
+
+        etag = response["ETag"]
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        self.june.location = "Monterrey"
+        self.june.save()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+        self.assertEqual(self.client.get(url.replace(".ics", "x.ics")).status_code, 404)
+
+
+class EventRosterTest(TestCase):
+    """Test cases for the shared event roster"""
+
+    def setUp(self):
+        """Set up test data"""
+        from datetime import date
+
+        from django.core.cache import cache
+
+        from apps.accounts.models import Player, PlayerParent, UserProfile
+
+        cache.clear()
+        self.staff = User.objects.create_user(
+            username="staff", password="testpass123", is_staff=True
+        )
+        self.event = Event.objects.create(
+            title="Roster Cup",
+            description="Roster",
+            status="published",
+            start_date=date(2099, 3, 1),
+            organizer=self.staff,
+        )
+        self.division = Division.objects.create(name="12U", description="12U")
+        self.other_division = Division.objects.create(name="14U", description="14U")
+
+        self.parent = User.objects.create_user(
+            username="mom", password="testpass123", email="mom@example.com",
+            first_name="Ana", last_name="Ruiz",
+        )
+        self.other_parent = User.objects.create_user(
+            username="dad", password="testpass123", email="dad@example.com"
+        )
+        self.players = []
+        for name, division in (
+            ("Luis", self.division),
+            ("Mario", self.division),
+            ("Nico", self.other_division),
+        ):
+            user = User.objects.create_user(
+                username=name.lower(), password="testpass123", first_name=name
+            )
+            UserProfile.objects.create(user=user, user_type="player")
+            self.players.append(Player.objects.create(user=user, division=division))
+        luis, mario, nico = self.players
+        PlayerParent.objects.create(parent=self.parent, player=luis, is_primary=True)
+        PlayerParent.objects.create(parent=self.parent, player=mario, is_primary=True)
+        PlayerParent.objects.create(parent=self.other_parent, player=nico)
+
+    def _order(self, player, status):
+        from apps.accounts.models import Order
+
+        return Order.objects.create(
+            user=self.parent,
+            event=self.event,
+            status=status,
+            registered_player_ids=[player.pk],
+        )
+
+    def test_confirmed_attendance_overrides_a_stale_pending_order(self):
+        from .roster import NO_PAYMENT, get_event_roster
+
+        luis = self.players[0]
+        self._order(luis, "pending_registration")
+        EventAttendance.objects.create(
+            event=self.event, user=luis.user, status="confirmed"
+        )
+
+        roster = get_event_roster(self.event)
+        (entry,) = [e for e in roster if e.first_name == "Luis"]
+        self.assertEqual(entry.payment_status, NO_PAYMENT)
+
+    def test_roster_rows_are_built_in_fixed_queries_and_cached(self):
+        """Orders, pending orders and attendances become one row per player"""
+        from .roster import NO_PAYMENT, PAID, PENDING, get_event_roster
+
+        luis, mario, nico = self.players
+        self._order(luis, "paid")
+        self._order(mario, "pending_registration")
+        EventAttendance.objects.create(event=self.event, user=nico.user, status="confirmed")
+
+        with self.assertNumQueries(6):
+            roster = get_event_roster(self.event)
+        rows = {entry.first_name: entry for entry in roster}
+        self.assertEqual(rows["Luis"].payment_status, PAID)
+        self.assertEqual(rows["Mario"].payment_status, PENDING)
+        self.assertEqual(rows["Nico"].payment_status, NO_PAYMENT)
+        self.assertEqual(rows["Luis"].parent_name, "Ana Ruiz")
+        self.assertEqual(rows["Nico"].division_name, "14U")
+
+        with self.assertNumQueries(0):
+            roster = get_event_roster(self.event.pk)
+        self.assertEqual(
+            roster.filter(division_id=self.division.pk).exclude(payment_status=PENDING).player_ids(),
+            [luis.pk],
+        )
+        self.assertEqual(
+            [(p["email"], p["players_count"]) for p in roster.parents()],
+            [("mom@example.com", 2), ("dad@example.com", 1)],
+        )
+
+    def test_roster_is_invalidated_by_registration_changes(self):
+        """Paying an order or changing a parent link refreshes the cached roster"""
+        from apps.accounts.models import PlayerParent
+
+        from .roster import PAID, get_event_roster
+
+        luis = self.players[0]
+        order = self._order(luis, "pending")
+        self.assertNotEqual(get_event_roster(self.event)[0].payment_status, PAID)
+
+        order.status = "paid"
+        order.save()
+        self.assertEqual(get_event_roster(self.event)[0].payment_status, PAID)
+
+        PlayerParent.objects.filter(player=luis).update(is_primary=False)
+        PlayerParent.objects.create(parent=self.other_parent, player=luis, is_primary=True)
+        self.assertEqual(get_event_roster(self.event)[0].parent_email, "dad@example.com")
+
+    def test_recipients_api_uses_the_roster(self):
+        """The recipients endpoint lists primary parents of paid players per division"""
+        luis, mario, nico = self.players
+        self._order(luis, "paid")
+        self._order(mario, "pending")
+        EventAttendance.objects.create(event=self.event, user=nico.user, status="confirmed")
+        self.client.force_login(self.staff)
+        url = reverse("events:get_recipients", args=[self.event.pk])
+
+        data = self.client.get(url).json()
+        self.assertEqual(
+            {(r["email"], r["players_count"]) for r in data["recipients"]},
+            {("mom@example.com", 1), ("dad@example.com", 1)},
+        )
+        data = self.client.get(url, {"filter": f"division_{self.division.pk}"}).json()
+        self.assertEqual([r["email"] for r in data["recipients"]], ["mom@example.com"])
+        self.assertEqual(
+            self.client.get(url, {"filter": "division_999999"}).status_code, 404
+        )
+
+        response = self.client.get(reverse("events:admin_detail", args=[self.event.pk]))
+        self.assertEqual(response.context["registered_players_count"], 2)
+        self.assertContains(response, "Ana Ruiz")
+
+    def test_roster_export_streams_one_row_per_player(self):
+        """The roster export reuses the cached roster rows"""
+        from apps.core.exports import export_url
+
+        luis, mario, _ = self.players
+        self._order(luis, "paid")
+        self._order(mario, "pending")
+        self.client.force_login(self.staff)
+
+        response = self.client.get(export_url("event-roster", "csv", event=self.event.pk))
+        lines = b"".join(response.streaming_content).decode("utf-8-sig").splitlines()
+        self.assertEqual(len(lines), 3)
+        self.assertTrue(lines[1].startswith(f"{luis.pk},Luis,"))
+        self.assertIn("mom@example.com,paid", lines[1])
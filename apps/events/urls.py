@@ -31,6 +31,12 @@ urlpatterns = [
         name="toggle_publish",
     ),
     path("calendar/", views.EventCalendarView.as_view(), name="calendar"),
+    path(
+        "calendar/feed/", views.EventCalendarFeedView.as_view(), name="calendar_feed"
+    ),
+    path(
+        "calendar/<str:token>.ics", views.event_calendar_ics, name="calendar_ics"
+    ),
     path("<int:event_id>/attend/", views.EventAttendanceView.as_view(), name="attend"),
     # Division URLs
     path("divisions/", views.DivisionListView.as_view(), name="division_list"),
@@ -5,11 +5,18 @@ from decimal import Decimal
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.core import signing
 from django.db.models import Case, Count, IntegerField, Q, Sum, Value, When
-from django.http import JsonResponse
+from django.http import (
+    Http404,
+    HttpResponseNotModified,
+    JsonResponse,
+    StreamingHttpResponse,
+)
 from django.shortcuts import get_object_or_404
-from django.urls import reverse_lazy
+from django.urls import reverse, reverse_lazy
 from django.utils import timezone
+from django.utils.cache import patch_cache_control
 from django.utils.decorators import method_decorator
 from django.views import View
 from django.views.decorators.clickjacking import xframe_options_exempt
@@ -22,8 +29,20 @@ from django.views.generic import (
     UpdateView,
 )
 
+from apps.core.admin_lists import FilteredListMixin
 from apps.core.mixins import StaffRequiredMixin, SuperuserRequiredMixin
 
+from .calendar_feed import (
+    InvalidWindow,
+    calendar_events,
+    ics_etag,
+    ics_token,
+    iter_ics,
+    load_ics_token,
+    parse_window,
+    user_ics_events,
+)
+from .filters import EventFilterSet
 from .forms import EventForm
 from .models import (
     Division,
@@ -33,82 +52,41 @@ from .models import (
     EventIncludes,
     EventItinerary,
 )
+from .roster import PENDING, get_event_roster
 
 
-class EventListView(StaffRequiredMixin, ListView):
+class EventListView(StaffRequiredMixin, FilteredListMixin, ListView):
     model = Event
     template_name = "events/list.html"
     context_object_name = "events"
     paginate_by = 20
+    filterset_class = EventFilterSet
 
-    def get_queryset(self):
-        # Forzar consulta fresca desde la base de datos
-        # Mostrar todos los eventos (incluyendo despublicados/borradores)
-        queryset = Event.objects.all().select_related(
-            "category", "organizer", "event_type", "country", "state", "city"
-        )
-
-        # Filtros
-        search = self.request.GET.get("search")
-        category = self.request.GET.get("category")
-        event_type = self.request.GET.get("event_type")
-        status = self.request.GET.get("status")
-        time_filter = self.request.GET.get("time_filter")
-
-        if search:
-            queryset = queryset.filter(
-                Q(title__icontains=search)
-                | Q(description__icontains=search)
-                | Q(location__icontains=search)
+    def get_base_queryset(self):
+        # Mostrar todos los eventos (incluyendo despublicados/borradores);
+        # EventFilterSet deja solo los publicados si no se pide otro estado
+        return Event.objects.select_related(
+            "category",
+            "organizer",
+            "event_type",
+            "country",
+            "state",
+            "city",
+            "capacity",  # attendees_count por fila sin COUNT adicional
+        ).annotate(
+            status_priority=Case(
+                When(status="completed", then=Value(0)),
+                default=Value(1),
+                output_field=IntegerField(),
             )
+        )
 
-        if category:
-            queryset = queryset.filter(category__id=category)
-
-        if event_type:
-            queryset = queryset.filter(event_type__id=event_type)
-
-        # Default to 'published' if no status filter is provided
-        # But if status is explicitly 'all', don't filter by status
-        if status == "all":
-            # Don't filter by status - show all
-            pass
-        elif status:
-            queryset = queryset.filter(status=status)
-        else:
-            # Default to 'published' when no status parameter
-            queryset = queryset.filter(status="published")
-
-        if time_filter:
-            now = timezone.now()
-            if time_filter == "upcoming":
-                queryset = queryset.filter(start_date__gt=now)
-            elif time_filter == "ongoing":
-                queryset = queryset.filter(start_date__lte=now, end_date__gte=now)
-            elif time_filter == "past":
-                queryset = queryset.filter(end_date__lt=now)
-            elif time_filter == "today":
-                today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
-                today_end = today_start + timedelta(days=1)
-                queryset = queryset.filter(
-                    start_date__gte=today_start, start_date__lt=today_end
-                )
-
-        # Ordenar: completados primero (por fecha de inicio descendente), luego el resto por fecha ascendente
-        status_filter = self.request.GET.get("status")
-        if status_filter == "completed":
-            # Para completados, ordenar por fecha descendente (más recientes primero)
-            queryset = queryset.order_by("-start_date")
-        else:
-            # Para otros estados, ordenar por fecha ascendente (próximos primero)
-            queryset = queryset.annotate(
-                status_priority=Case(
-                    When(status="completed", then=Value(0)),
-                    default=Value(1),
-                    output_field=IntegerField(),
-                )
-            ).order_by("status_priority", "start_date")
-        return queryset
+    def get_sort_fields(self):
+        # Completados: más recientes primero; el resto: completados primero y
+        # luego por fecha ascendente (próximos primero)
+        if self.request.GET.get("status") == "completed":
+            return ("-start_date",)
+        return ("status_priority", "start_date")
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -124,49 +102,18 @@ class EventListView(StaffRequiredMixin, ListView):
             ("today", "Hoy"),
         ]
 
-        # Obtener conteos por estado para los tabs
-        base_queryset = Event.objects.all()
-        search = self.request.GET.get("search")
-        category = self.request.GET.get("category")
-        event_type = self.request.GET.get("event_type")
-        time_filter = self.request.GET.get("time_filter")
-
-        # Aplicar los mismos filtros que se aplican en get_queryset (excepto status)
-        if search:
-            base_queryset = base_queryset.filter(
-                Q(title__icontains=search)
-                | Q(description__icontains=search)
-                | Q(location__icontains=search)
-            )
-        if category:
-            base_queryset = base_queryset.filter(category__id=category)
-        if event_type:
-            base_queryset = base_queryset.filter(event_type__id=event_type)
-        if time_filter:
-            now = timezone.now()
-            if time_filter == "upcoming":
-                base_queryset = base_queryset.filter(start_date__gt=now)
-            elif time_filter == "ongoing":
-                base_queryset = base_queryset.filter(
-                    start_date__lte=now, end_date__gte=now
-                )
-            elif time_filter == "past":
-                base_queryset = base_queryset.filter(end_date__lt=now)
-            elif time_filter == "today":
-                today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
-                today_end = today_start + timedelta(days=1)
-                base_queryset = base_queryset.filter(
-                    start_date__gte=today_start, start_date__lt=today_end
-                )
-
-        # Contar eventos por estado
-        context["status_counts"] = {
-            "all": base_queryset.count(),
-            "draft": base_queryset.filter(status="draft").count(),
-            "published": base_queryset.filter(status="published").count(),
-            "cancelled": base_queryset.filter(status="cancelled").count(),
-            "completed": base_queryset.filter(status="completed").count(),
-        }
+        # Conteos por estado para los tabs: mismos filtros excepto status,
+        # en una sola consulta
+        data = self.request.GET.copy()
+        data["status"] = "all"
+        base_queryset = EventFilterSet(data, queryset=Event.objects.all()).qs
+        context["status_counts"] = base_queryset.aggregate(
+            all=Count("id"),
+            draft=Count("id", filter=Q(status="draft")),
+            published=Count("id", filter=Q(status="published")),
+            cancelled=Count("id", filter=Q(status="cancelled")),
+            completed=Count("id", filter=Q(status="completed")),
+        )
 
         # Estado activo actual (default: 'all')
         context["active_status"] = self.request.GET.get(
@@ -223,7 +170,7 @@ class EventDetailView(StaffRequiredMixin, DetailView):
 
         from django.db.models import Sum
 
-        from apps.accounts.models import Order, Player
+        from apps.accounts.models import Order, StripeEventCheckout
 
         context = super().get_context_data(**kwargs)
         context["attendees"] = self.object.attendees.filter(
@@ -248,108 +195,26 @@ class EventDetailView(StaffRequiredMixin, DetailView):
         # Ya tenemos el evento cargado desde get_queryset() (con select_related/prefetch)
         context["event"] = self.object
 
-        # Datos para el admin: jugadores registrados al evento
-        # Los jugadores pueden estar registrados a través de:
-        # 1. Order (registered_player_ids)
-        # 2. StripeEventCheckout (player_ids)
-        # 3. EventAttendance (user -> Player)
-
-        player_ids = set()
-
-        # 1. De órdenes pagadas
-        paid_orders = Order.objects.filter(
-            event=self.object, status="paid"
-        ).values_list("registered_player_ids", flat=True)
-        for player_ids_list in paid_orders:
-            if player_ids_list:
-                player_ids.update(player_ids_list)
-
-        # 2. De StripeEventCheckout pagados
-        from apps.accounts.models import StripeEventCheckout
-
-        paid_checkouts = StripeEventCheckout.objects.filter(
-            event=self.object, status="paid"
-        )
-        for checkout in paid_checkouts:
-            if checkout.player_ids:
-                player_ids.update(checkout.player_ids)
-
-        # 3. De EventAttendance confirmados
-        confirmed_attendances = EventAttendance.objects.filter(
-            event=self.object, status="confirmed"
-        ).select_related("user")
-        for attendance in confirmed_attendances:
-            try:
-                player = Player.objects.get(user=attendance.user)
-                player_ids.add(player.id)
-            except Player.DoesNotExist:
-                pass
-
-        # Obtener los jugadores con sus relaciones optimizadas
-        registered_players = (
-            Player.objects.filter(id__in=player_ids)
-            .select_related("user", "division", "user__profile")
-            .prefetch_related("parents__parent")
-            .order_by("user__last_name", "user__first_name")
-        )
-
-        context["registered_players"] = registered_players
-        context["registered_players_count"] = registered_players.count()
+        # Datos para el admin: jugadores registrados al evento (órdenes y
+        # checkouts pagados + asistencias confirmadas), ver events.roster
+        roster = get_event_roster(self.object).exclude(payment_status=PENDING)
+        context["registered_players"] = roster
+        context["registered_players_count"] = roster.count()
 
-        # Contar padres únicos
-        # Los jugadores tienen una relación con padres a través de PlayerParent
-        from apps.accounts.models import PlayerParent
-
-        unique_parents = {}
-        for player in registered_players:
-            # Obtener el padre principal del jugador
-            parent_relation = (
-                PlayerParent.objects.filter(player=player, is_primary=True)
-                .select_related("parent")
-                .first()
-            )
-
-            if not parent_relation:
-                # Si no hay padre principal, tomar el primero
-                parent_relation = (
-                    PlayerParent.objects.filter(player=player)
-                    .select_related("parent")
-                    .first()
-                )
-
-            if parent_relation and parent_relation.parent:
-                parent = parent_relation.parent
-                parent_id = parent.id
-                if parent_id not in unique_parents:
-                    unique_parents[parent_id] = {
-                        "id": parent_id,
-                        "get_full_name": parent.get_full_name() or parent.username,
-                        "username": parent.username,
-                        "email": parent.email,
-                        "players_count": 0,
-                    }
-                unique_parents[parent_id]["players_count"] += 1
-
-        context["unique_parents"] = list(unique_parents.values())
+        unique_parents = roster.parents()
+        context["unique_parents"] = unique_parents
         context["unique_parents_count"] = len(unique_parents)
 
         # Contar registros por división
-        if self.object.divisions.exists():
-            # Crear lista de divisiones con conteos
-            divisions_list = []
-            for division in self.object.divisions.all():
-                # Ahora division es un ForeignKey, podemos comparar directamente
-                division_count = registered_players.filter(division=division).count()
-
-                # Agregar el atributo registered_count a la división
-                division.registered_count = division_count
-                divisions_list.append(division)
-
-            # También crear el diccionario para mantener compatibilidad
-            divisions_with_counts = [
-                {"division": div, "registered_count": div.registered_count}
-                for div in divisions_list
-            ]
+        divisions = list(self.object.divisions.all())
+        if divisions:
+            division_counts = roster.division_counts()
+            divisions_with_counts = []
+            for division in divisions:
+                division.registered_count = division_counts.get(division.pk, 0)
+                divisions_with_counts.append(
+                    {"division": division, "registered_count": division.registered_count}
+                )
             context["divisions_with_counts"] = divisions_with_counts
 
         # Estadísticas de órdenes y checkouts
@@ -370,11 +235,6 @@ class EventDetailView(StaffRequiredMixin, DetailView):
                 order_revenue += order.total_amount or Decimal("0.00")
 
         # Calcular ingresos de StripeEventCheckout
-        from apps.accounts.models import StripeEventCheckout
-
-        paid_checkouts = StripeEventCheckout.objects.filter(
-            event=self.object, status="paid"
-        )
         checkout_revenue = Decimal("0.00")
         for checkout in paid_checkouts:
             if (
@@ -1118,32 +978,76 @@ class EventDetailAPIView(StaffRequiredMixin, View):
         return JsonResponse(data)
 
 
-class EventCalendarView(StaffRequiredMixin, ListView):
-    model = Event
+class EventCalendarView(StaffRequiredMixin, TemplateView):
+    """Calendario; FullCalendar pide los eventos de cada vista al feed"""
+
     template_name = "events/calendar.html"
-    context_object_name = "events"
 
     @method_decorator(xframe_options_exempt)
     def dispatch(self, *args, **kwargs):
         return super().dispatch(*args, **kwargs)
 
-    def get_queryset(self):
-        # Obtener eventos del mes actual (solo publicados)
-        now = timezone.now()
-        month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-        month_end = (month_start + timedelta(days=32)).replace(day=1) - timedelta(
-            days=1
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["calendar_feed_url"] = reverse("events:calendar_feed")
+        context["calendar_ics_url"] = self.request.build_absolute_uri(
+            reverse("events:calendar_ics", args=[ics_token(self.request.user)])
         )
+        return context
 
-        return (
-            Event.objects.filter(
-                status="published",
-                start_date__gte=month_start,
-                start_date__lte=month_end,
-            )
-            .select_related("category", "organizer")
-            .order_by("start_date")
+
+class EventCalendarFeedView(View):
+    """
+    Eventos que se cruzan con ?start=&end= en JSON para FullCalendar.
+
+    Solo publicados, salvo staff con ?scope=all (todos los estados).
+    """
+
+    def get(self, request):
+        try:
+            start, end = parse_window(request.GET.get("start"), request.GET.get("end"))
+        except InvalidWindow as exc:
+            return JsonResponse({"error": str(exc)}, status=400)
+
+        if request.user.is_staff:
+            detail_url_name = "events:admin_detail"
+            if request.GET.get("scope") == "all":
+                statuses = [choice for choice, _ in Event.STATUS_CHOICES]
+            else:
+                statuses = ["published"]
+        else:
+            detail_url_name = "events:public_detail"
+            statuses = ["published"]
+
+        response = JsonResponse(
+            calendar_events(start, end, statuses, detail_url_name), safe=False
+        )
+        patch_cache_control(response, private=True, max_age=60)
+        return response
+
+
+def event_calendar_ics(request, token):
+    """
+    Suscripción iCalendar de los eventos del usuario del token (la URL
+    firmada sustituye a la sesión, los clientes de calendario no la tienen).
+    """
+    try:
+        user_id, season_id = load_ics_token(token)
+    except signing.BadSignature:
+        raise Http404("Calendario no encontrado")
+
+    events = user_ics_events(user_id, season_id)
+    etag = f'"{ics_etag(events)}"'
+    if etag in request.headers.get("If-None-Match", ""):
+        response = HttpResponseNotModified()
+    else:
+        response = StreamingHttpResponse(
+            iter_ics(events, request), content_type="text/calendar; charset=utf-8"
         )
+        response["Content-Disposition"] = 'inline; filename="eventos.ics"'
+    response["ETag"] = etag
+    patch_cache_control(response, private=True, max_age=15 * 60)
+    return response
 
 
 class EventAttendanceView(LoginRequiredMixin, CreateView):
@@ -1651,78 +1555,40 @@ class GetEventRecipientsView(StaffRequiredMixin, View):
     """Vista AJAX para obtener la lista de destinatarios filtrados"""
 
     def get(self, request, pk):
-        from apps.accounts.models import Order, Player, PlayerParent
-
         event = get_object_or_404(Event, pk=pk)
-        recipient_filter = request.GET.get("filter", "all")
-
-        # Obtener los jugadores registrados según el filtro
-        # Los jugadores están relacionados a través de las órdenes pagadas
-        paid_orders = Order.objects.filter(event=event, status="paid").values_list(
-            "registered_player_ids", flat=True
-        )
-
-        # Obtener todos los IDs únicos de jugadores
-        player_ids = set()
-        for player_ids_list in paid_orders:
-            if player_ids_list:
-                player_ids.update(player_ids_list)
-
-        # Obtener los jugadores
-        registered_players = Player.objects.filter(id__in=player_ids).select_related(
-            "user"
-        )
-
-        # Filtrar por división si es necesario
-        if recipient_filter.startswith("division_"):
-            division_id = recipient_filter.replace("division_", "")
-            try:
-                division = Division.objects.get(pk=division_id)
-                registered_players = registered_players.filter(division=division)
-            except Division.DoesNotExist:
-                return JsonResponse(
-                    {"success": False, "error": "División no encontrada"}, status=404
-                )
-
-        # Obtener emails únicos de los padres
-        parent_data = {}
-
-        for player in registered_players:
-            # Obtener el padre principal del jugador
-            parent_relation = (
-                PlayerParent.objects.filter(player=player, is_primary=True)
-                .select_related("parent")
-                .first()
+        roster = recipients_roster(event, request.GET.get("filter", "all"))
+        if roster is None:
+            return JsonResponse(
+                {"success": False, "error": "División no encontrada"}, status=404
             )
 
-            if not parent_relation:
-                # Si no hay padre principal, tomar el primero
-                parent_relation = (
-                    PlayerParent.objects.filter(player=player)
-                    .select_related("parent")
-                    .first()
-                )
-
-            if parent_relation and parent_relation.parent:
-                parent = parent_relation.parent
-                email = parent.email
-                if email:
-                    if email not in parent_data:
-                        parent_data[email] = {
-                            "id": parent.id,
-                            "name": parent.get_full_name() or parent.username,
-                            "email": email,
-                            "players_count": 0,
-                        }
-                    parent_data[email]["players_count"] += 1
-
-        recipients = list(parent_data.values())
+        # Padres principales únicos (por email) de los jugadores
+        recipients = [
+            {key: parent[key] for key in ("id", "name", "email", "players_count")}
+            for parent in roster.parents()
+        ]
 
         return JsonResponse(
             {"success": True, "recipients": recipients, "count": len(recipients)}
         )
 
 
+def recipients_roster(event, recipient_filter):
+    """
+    Roster de destinatarios para ``recipient_filter`` ("all", "parents" o
+    "division_<id>"); None si la división no existe.
+    """
+    roster = get_event_roster(event).exclude(payment_status=PENDING)
+    if recipient_filter.startswith("division_"):
+        division_id = recipient_filter.replace("division_", "")
+        try:
+            division = Division.objects.only("pk").get(pk=division_id)
+        except (Division.DoesNotExist, ValueError):
+            return None
+        roster = roster.filter(division_id=division.pk)
+    return roster
+
+
 class SendEventEmailView(StaffRequiredMixin, View):
     """Vista para enviar emails masivos a los registrados de un evento"""
 
@@ -1730,8 +1596,6 @@ class SendEventEmailView(StaffRequiredMixin, View):
         from django.conf import settings
         from django.core.mail import send_mass_mail
 
-        from apps.accounts.models import Order, Player, PlayerParent
-
         event = get_object_or_404(Event, pk=pk)
 
         # Obtener datos del formulario
@@ -1745,74 +1609,16 @@ class SendEventEmailView(StaffRequiredMixin, View):
                 {"success": False, "error": "Asunto y mensaje requeridos"}, status=400
             )
 
-        # Obtener los jugadores registrados según el filtro
-        # Los jugadores están relacionados a través de las órdenes pagadas
-        paid_orders = Order.objects.filter(event=event, status="paid").values_list(
-            "registered_player_ids", flat=True
-        )
-
-        # Obtener todos los IDs únicos de jugadores
-        player_ids = set()
-        for player_ids_list in paid_orders:
-            if player_ids_list:
-                player_ids.update(player_ids_list)
-
-        # Obtener los jugadores
-        registered_players = Player.objects.filter(id__in=player_ids).select_related(
-            "user"
-        )
-
-        # Filtrar por división si es necesario
-        if recipient_filter.startswith("division_"):
-            division_id = recipient_filter.replace("division_", "")
-            try:
-                division = Division.objects.get(pk=division_id)
-                registered_players = registered_players.filter(division=division)
-            except Division.DoesNotExist:
-                messages.error(request, "División no encontrada.")
-                return JsonResponse(
-                    {"success": False, "error": "División no encontrada"}, status=404
-                )
-
-        # Obtener emails únicos de los padres
-        parent_emails = set()
-        parent_data = {}
-
-        for player in registered_players:
-            # Obtener el padre principal del jugador
-            parent_relation = (
-                PlayerParent.objects.filter(player=player, is_primary=True)
-                .select_related("parent")
-                .first()
+        roster = recipients_roster(event, recipient_filter)
+        if roster is None:
+            messages.error(request, "División no encontrada.")
+            return JsonResponse(
+                {"success": False, "error": "División no encontrada"}, status=404
             )
 
-            if not parent_relation:
-                # Si no hay padre principal, tomar el primero
-                parent_relation = (
-                    PlayerParent.objects.filter(player=player)
-                    .select_related("parent")
-                    .first()
-                )
-
-            if parent_relation and parent_relation.parent:
-                parent = parent_relation.parent
-                email = parent.email
-                if email:
-                    parent_emails.add(email)
-                    if email not in parent_data:
-                        parent_data[email] = {
-                            "name": parent.get_full_name() or parent.username,
-                            "players": [],
-                        }
-                    # Obtener nombre del jugador desde el user
-                    player_name = (
-                        f"{player.user.first_name} {player.user.last_name}"
-                        if player.user
-                        else "Jugador"
-                    )
-                    parent_data[email]["players"].append(player_name)
-
-        if not parent_emails:
+        # Padres principales únicos (por email) con sus jugadores
+        parents = roster.parents()
+        if not parents:
             messages.warning(request, "No se encontraron destinatarios válidos.")
             return JsonResponse(
                 {"success": False, "error": "No hay destinatarios"}, status=400
@@ -1822,8 +1628,7 @@ class SendEventEmailView(StaffRequiredMixin, View):
         email_messages = []
         from_email = settings.DEFAULT_FROM_EMAIL
 
-        for email in parent_emails:
-            data = parent_data[email]
+        for data in parents:
             # Personalizar mensaje con nombre del padre y jugadores
             personalized_message = f"Hola {data['name']},\n\n{message}\n\n"
             personalized_message += (
@@ -1831,7 +1636,9 @@ class SendEventEmailView(StaffRequiredMixin, View):
             )
             personalized_message += f"Atentamente,\nEquipo de {event.title}"
 
-            email_messages.append((subject, personalized_message, from_email, [email]))
+            email_messages.append(
+                (subject, personalized_message, from_email, [data["email"]])
+            )
 
         try:
             # Enviar todos los emails
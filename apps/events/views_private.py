@@ -11,7 +11,7 @@ from decimal import Decimal
 
 from django.db.models import Count, Q, Sum, Avg
 from django.shortcuts import get_object_or_404
-from django.urls import reverse_lazy
+from django.urls import reverse, reverse_lazy
 from django.utils.decorators import method_decorator
 from django.utils import timezone
 from django.views.decorators.clickjacking import xframe_options_exempt
@@ -23,6 +23,7 @@ from django.views.generic import (
     UpdateView,
 )
 
+from .calendar_feed import ics_token
 from .models import Event, EventAttendance, EventCategory
 from .forms import EventForm
 from apps.core.mixins import OwnerOrStaffRequiredMixin
@@ -160,34 +161,23 @@ class EventUpdateView(OwnerOrStaffRequiredMixin, UpdateView):
         return super().form_valid(form)
 
 
-class EventCalendarView(LoginRequiredMixin, ListView):
+class EventCalendarView(LoginRequiredMixin, TemplateView):
     """Calendario de eventos"""
 
-    model = Event
     template_name = "events/calendar.html"
-    context_object_name = "events"
 
     @method_decorator(xframe_options_exempt)
     def dispatch(self, *args, **kwargs):
         return super().dispatch(*args, **kwargs)
 
-    def get_queryset(self):
-        # Obtener eventos del mes actual
-        now = timezone.now()
-        month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-        month_end = (month_start + timedelta(days=32)).replace(day=1) - timedelta(
-            days=1
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        # El feed solo muestra borradores/cancelados a staff
+        context["calendar_feed_url"] = reverse("events:calendar_feed") + "?scope=all"
+        context["calendar_ics_url"] = self.request.build_absolute_uri(
+            reverse("events:calendar_ics", args=[ics_token(self.request.user)])
         )
-
-        queryset = Event.objects.filter(
-            start_date__gte=month_start, start_date__lte=month_end
-        ).select_related("category", "organizer")
-
-        # Si no es staff, solo ver eventos publicados
-        if not (self.request.user.is_staff or self.request.user.is_superuser):
-            queryset = queryset.filter(status="published")
-
-        return queryset.order_by("start_date")
+        return context
 
 
 class EventAttendanceView(LoginRequiredMixin, CreateView):
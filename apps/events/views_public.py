@@ -8,6 +8,7 @@ from django.utils.translation import gettext_lazy as _
 from django.views.generic import DetailView, ListView
 
 from .models import Event, EventCategory, EventType, EventView
+from .search import get_event_facets, search_events
 
 
 class PublicEventListView(ListView):
@@ -35,12 +36,8 @@ class PublicEventListView(ListView):
         country = self.request.GET.get("country")
         time_filter = self.request.GET.get("time_filter")
 
-        if search:
-            queryset = queryset.filter(
-                Q(title__icontains=search)
-                | Q(description__icontains=search)
-                | Q(location__icontains=search)
-            )
+        # Búsqueda full-text con ranking (ver apps/events/search.py)
+        queryset = search_events(queryset, search)
 
         if category:
             queryset = queryset.filter(category__id=category)
@@ -62,40 +59,49 @@ class PublicEventListView(ListView):
                 queryset = queryset.filter(start_date=now)
 
         # Ordenar: eventos futuros primero (por start_date ascendente), luego pasados (por start_date descendente)
+        # Con búsqueda, la relevancia tiene prioridad
         queryset = queryset.annotate(
             is_future=Case(
                 When(start_date__gte=now, then=Value(1)),
                 default=Value(0),
                 output_field=IntegerField(),
             )
-        ).order_by("-is_future", "start_date")
-
-        return queryset
+        )
+        if search:
+            return queryset.order_by("-search_rank", "-is_future", "start_date")
+        return queryset.order_by("-is_future", "start_date")
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context["categories"] = EventCategory.objects.filter(is_active=True)
-        context["event_types"] = EventType.objects.filter(is_active=True)
+
+        # Conteos por faceta (una consulta agrupada, cacheada por filtros)
+        facets = get_event_facets(
+            self.request.GET.get("search", ""),
+            {
+                "category": self.request.GET.get("category"),
+                "event_type": self.request.GET.get("event_type"),
+                "country": self.request.GET.get("country"),
+                "time_filter": self.request.GET.get("time_filter"),
+            },
+        )
+        categories = list(EventCategory.objects.filter(is_active=True))
+        for category in categories:
+            category.facet_count = facets["category"].get(category.id, 0)
+        event_types = list(EventType.objects.filter(is_active=True))
+        for event_type in event_types:
+            event_type.facet_count = facets["event_type"].get(event_type.id, 0)
+
+        context["facets"] = facets
+        context["categories"] = categories
+        context["event_types"] = event_types
         context["time_filters"] = [
-            ("upcoming", _("Upcoming")),
-            ("ongoing", _("Ongoing")),
-            ("past", _("Past")),
-            ("today", _("Today")),
+            ("upcoming", _("Upcoming"), facets["time"]["upcoming"]),
+            ("ongoing", _("Ongoing"), facets["time"]["ongoing"]),
+            ("past", _("Past"), facets["time"]["past"]),
+            ("today", _("Today"), facets["time"]["today"]),
         ]
-        # Obtener países que tienen eventos publicados
-        try:
-            from apps.locations.models import Country
-
-            # Obtener países únicos que tienen eventos publicados y no cancelados
-            countries_with_events = (
-                Country.objects.filter(events__status="published")
-                .exclude(events__status="cancelled")
-                .distinct()
-                .order_by("name")
-            )
-            context["countries"] = countries_with_events
-        except ImportError:
-            context["countries"] = []
+        # Países que tienen eventos publicados (id, name, count)
+        context["countries"] = facets["country"]
         return context
 
 
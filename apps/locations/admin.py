@@ -363,6 +363,7 @@ class HotelReservationAdmin(admin.ModelAdmin):
         "hotel",
         "room",
         "guest_name",
+        "event",
         "check_in",
         "check_out",
         "number_of_guests",
@@ -379,7 +380,15 @@ class HotelReservationAdmin(admin.ModelAdmin):
         "user__email",
     ]
     ordering = ["-check_in"]
-    readonly_fields = ["created_at", "updated_at", "additional_guest_details_json", "order"]
+    list_select_related = ["hotel", "room", "event"]
+    readonly_fields = [
+        "created_at",
+        "updated_at",
+        "additional_guest_details_json",
+        "order",
+        "stripe_checkout",
+        "event",
+    ]
     date_hierarchy = "check_in"
 
     fieldsets = (
@@ -391,6 +400,8 @@ class HotelReservationAdmin(admin.ModelAdmin):
                     "room",
                     "user",
                     "order",
+                    "stripe_checkout",
+                    "event",
                     "status",
                     "total_amount",
                 )
@@ -5,3 +5,8 @@ class LocationsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.locations"
     verbose_name = "Ubicaciones y Temporadas"
+
+    def ready(self):
+        """Registrar exportaciones y señales cuando la app esté lista"""
+        import apps.locations.exports  # noqa
+        import apps.locations.signals  # noqa
@@ -0,0 +1,47 @@
+"""
+Almacén del carrito de reservas de hoteles.
+
+El carrito se guarda en la caché por usuario, fuera de la sesión: así el
+blob de la sesión se mantiene pequeño y añadir o quitar habitaciones no
+reescribe la fila de django_session. Los carritos que aún estén en la
+sesión (clave "hotel_cart") se trasladan al leerlos.
+
+La caché por defecto debe ser compartida y persistente (Redis o la tabla de
+caché en BD, ver settings_prod): con la caché en memoria de cada proceso el
+carrito se pierde al reiniciar y cada worker de gunicorn vería uno distinto.
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+
+LEGACY_SESSION_KEY = "hotel_cart"
+
+
+def cart_timeout():
+    return getattr(settings, "HOTEL_CART_TIMEOUT", 60 * 60 * 24 * 7)
+
+
+def _cart_key(user):
+    return f"hotel_cart:user:{user.pk}"
+
+
+def get_cart(request):
+    """Carrito del usuario ({item_id: datos}); vacío si no hay"""
+    cart = cache.get(_cart_key(request.user))
+    legacy = request.session.pop(LEGACY_SESSION_KEY, None)
+    if cart is None and legacy:
+        cart = legacy
+        save_cart(request, cart)
+    return dict(cart or {})
+
+
+def save_cart(request, cart):
+    if cart:
+        cache.set(_cart_key(request.user), cart, cart_timeout())
+    else:
+        cache.delete(_cart_key(request.user))
+
+
+def clear_cart(request):
+    cache.delete(_cart_key(request.user))
+    request.session.pop(LEGACY_SESSION_KEY, None)
@@ -1,5 +1,5 @@
 """
-Vistas para el carrito de reservas de hoteles - Usa sesión de Django
+Vistas para el carrito de reservas de hoteles - Usa cart_store (caché por usuario)
 """
 
 from django.contrib import messages
@@ -13,6 +13,7 @@ from django.views.generic import TemplateView
 from decimal import Decimal
 import json
 
+from .cart_store import clear_cart, get_cart, save_cart
 from .models import Hotel, HotelRoom, HotelService, HotelReservation
 
 
@@ -23,7 +24,7 @@ class HotelCartView(LoginRequiredMixin, TemplateView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        cart = self.request.session.get("hotel_cart", {})
+        cart = get_cart(self.request)
 
         # Procesar items del carrito
         cart_items = []
@@ -94,7 +95,7 @@ class HotelCartView(LoginRequiredMixin, TemplateView):
                 # Si el item ya no existe, eliminarlo del carrito
                 if item_id in cart:
                     del cart[item_id]
-                    self.request.session["hotel_cart"] = cart
+                    save_cart(self.request, cart)
 
         context["cart_items"] = cart_items
         context["cart_total"] = total
@@ -182,7 +183,7 @@ class AddToCartView(LoginRequiredMixin, View):
                 return JsonResponse({"error": error_msg}, status=400)
 
             # Crear item del carrito
-            cart = request.session.get("hotel_cart", {})
+            cart = get_cart(request)
             item_id = f"room_{room_id}_{check_in}_{check_out}"
 
             cart[item_id] = {
@@ -196,8 +197,7 @@ class AddToCartView(LoginRequiredMixin, View):
                 "services": services,
             }
 
-            request.session["hotel_cart"] = cart
-            request.session.modified = True
+            save_cart(request, cart)
 
             return JsonResponse(
                 {
@@ -221,11 +221,10 @@ class RemoveFromCartView(LoginRequiredMixin, View):
             if not item_id:
                 return JsonResponse({"error": "ID de item requerido"}, status=400)
 
-            cart = request.session.get("hotel_cart", {})
+            cart = get_cart(request)
             if item_id in cart:
                 del cart[item_id]
-                request.session["hotel_cart"] = cart
-                request.session.modified = True
+                save_cart(request, cart)
 
                 return JsonResponse(
                     {
@@ -244,8 +243,7 @@ class ClearCartView(LoginRequiredMixin, View):
     """Limpiar todo el carrito"""
 
     def post(self, request):
-        request.session["hotel_cart"] = {}
-        request.session.modified = True
+        clear_cart(request)
         messages.success(request, "Carrito limpiado exitosamente.")
         return redirect("locations:hotel_cart")
 
@@ -253,7 +251,7 @@ class ClearCartView(LoginRequiredMixin, View):
 @login_required
 def get_cart_json(request):
     """API para obtener el carrito en formato JSON para el sidebar"""
-    cart = request.session.get("hotel_cart", {})
+    cart = get_cart(request)
 
     if not cart:
         return JsonResponse({"success": True, "items": [], "total": "0.00", "count": 0})
@@ -328,7 +326,7 @@ class CheckoutCartView(LoginRequiredMixin, View):
     """Procesar checkout del carrito - Crear todas las reservas"""
 
     def post(self, request):
-        cart = request.session.get("hotel_cart", {})
+        cart = get_cart(request)
 
         if not cart:
             messages.error(request, "El carrito está vacío.")
@@ -427,8 +425,7 @@ class CheckoutCartView(LoginRequiredMixin, View):
 
         # Limpiar carrito si todo fue exitoso
         if created_reservations and not errors:
-            request.session["hotel_cart"] = {}
-            request.session.modified = True
+            clear_cart(request)
             messages.success(
                 request,
                 f"¡{len(created_reservations)} reserva(s) creada(s) exitosamente! Total: ${sum(r.total_amount for r in created_reservations):.2f}",
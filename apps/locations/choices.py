@@ -0,0 +1,191 @@
+"""
+Listas de opciones de país/estado/ciudad para formularios.
+
+Los formularios de cuentas tienen selects de ubicación con miles de opciones.
+En lugar de evaluar un queryset por campo en cada render (y otra vez al
+validar el POST), las tuplas ordenadas (id, nombre) se guardan en memoria del
+proceso por (tipo, padre, solo activos). La validez se controla con la
+versión del tag "location" en la caché compartida: signals.py la sube al
+guardar o borrar un Country/State/City y todos los procesos descartan su
+copia en la siguiente lectura.
+
+- location_choices(kind, parent_id, active_only): tupla de (id, nombre)
+- LocationChoiceField: ModelChoiceField que valida contra esas tuplas
+- LocationSelect: select que se dibuja directamente desde las tuplas
+"""
+
+from django import forms
+from django.core.exceptions import ValidationError
+from django.db import router
+from django.forms.utils import flatatt
+from django.utils.choices import BaseChoiceIterator
+from django.utils.html import format_html, format_html_join
+
+from apps.core.cache_tags import get_tag_versions, invalidate_tags
+
+LOCATION_TAG = "location"
+
+# kind -> (modelo, campo del padre)
+KINDS = {
+    "country": ("Country", None),
+    "state": ("State", "country_id"),
+    "city": ("City", "state_id"),
+}
+
+_store = {"version": None, "choices": {}}
+
+
+def _model(kind):
+    from django.apps import apps
+
+    return apps.get_model("locations", KINDS[kind][0])
+
+
+def _load(kind, parent_id, active_only):
+    model = _model(kind)
+    parent_field = KINDS[kind][1]
+    queryset = model.objects.all()
+    if parent_field:
+        queryset = queryset.filter(**{parent_field: parent_id})
+    if active_only:
+        queryset = queryset.filter(is_active=True)
+    return tuple(queryset.order_by("name").values_list("pk", "name"))
+
+
+def location_choices(kind, parent_id=None, active_only=False):
+    """
+    Tupla ordenada de (id, nombre) de ``kind`` ("country", "state", "city").
+    Estados y ciudades se filtran por ``parent_id`` (país o estado); sin padre
+    la lista está vacía.
+    """
+    if KINDS[kind][1] and not parent_id:
+        return ()
+    version = get_tag_versions([LOCATION_TAG])[LOCATION_TAG]
+    if _store["version"] != version:
+        _store["version"] = version
+        _store["choices"] = {}
+    key = (kind, parent_id, active_only)
+    choices = _store["choices"].get(key)
+    if choices is None:
+        choices = _store["choices"][key] = _load(kind, parent_id, active_only)
+    return choices
+
+
+def invalidate_location_choices():
+    invalidate_tags(LOCATION_TAG)
+
+
+def _parse_id(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class LocationSelect(forms.Select):
+    """
+    Select que arma el HTML de las opciones en una sola pasada, sin la
+    plantilla por opción de forms.Select (notable con miles de ciudades).
+    """
+
+    def render(self, name, value, attrs=None, renderer=None):
+        final_attrs = self.build_attrs(self.attrs, attrs)
+        final_attrs["name"] = name
+        selected = {str(v) for v in self.format_value(value)}
+        options = format_html_join(
+            "",
+            '<option value="{}"{}>{}</option>',
+            (
+                (option_value, " selected" if str(option_value) in selected else "", label)
+                for option_value, label in self.choices
+            ),
+        )
+        return format_html("<select{}>{}</select>", flatatt(final_attrs), options)
+
+
+class _FieldChoices(BaseChoiceIterator):
+    """Opciones del widget resueltas al dibujar (según el padre actual)"""
+
+    def __init__(self, field):
+        self.field = field
+
+    def __iter__(self):
+        if self.field.empty_label is not None:
+            yield ("", self.field.empty_label)
+        yield from self.field.cached_choices()
+
+
+class LocationChoiceField(forms.ModelChoiceField):
+    """
+    ModelChoiceField de ubicación que no consulta la base de datos: las
+    opciones y la validación salen de location_choices. El valor limpio es
+    una instancia con id, nombre y padre cargados (suficiente para asignar la
+    FK); los demás campos se cargan en diferido si se leen.
+
+    Para estados y ciudades se asigna ``parent_id`` (país o estado elegido)
+    desde el ``__init__`` del formulario.
+    """
+
+    def __init__(self, kind, active_only=False, parent_id=None, **kwargs):
+        self.kind = kind
+        self.active_only = active_only
+        self.parent_id = parent_id
+        kwargs.setdefault("widget", LocationSelect(attrs={"class": "form-select"}))
+        super().__init__(queryset=_model(kind).objects.none(), **kwargs)
+        self.widget.choices = _FieldChoices(self)
+
+    def __deepcopy__(self, memo):
+        result = super().__deepcopy__(memo)
+        result.widget.choices = _FieldChoices(result)
+        return result
+
+    @property
+    def parent_id(self):
+        return self._parent_id
+
+    @parent_id.setter
+    def parent_id(self, value):
+        self._parent_id = _parse_id(getattr(value, "pk", value))
+
+    def cached_choices(self):
+        return location_choices(self.kind, self.parent_id, self.active_only)
+
+    def _get_choices(self):
+        return list(_FieldChoices(self))
+
+    choices = property(_get_choices, forms.ChoiceField.choices.fset)
+
+    def _set_queryset(self, queryset):
+        # El queryset solo identifica el modelo; las opciones vienen de la caché
+        self._queryset = queryset
+
+    queryset = property(forms.ModelChoiceField.queryset.fget, _set_queryset)
+
+    def to_python(self, value):
+        if value in self.empty_values:
+            return None
+        if isinstance(value, _model(self.kind)):
+            value = value.pk
+        pk = _parse_id(value)
+        names = dict(self.cached_choices())
+        if pk not in names:
+            raise ValidationError(
+                self.error_messages["invalid_choice"],
+                code="invalid_choice",
+                params={"value": value},
+            )
+        # Instancia "cargada" solo con id, nombre y padre: el resto de los
+        # campos quedan diferidos y se leen de la base si se usan
+        model = _model(self.kind)
+        loaded = {model._meta.pk.attname: pk, "name": names[pk]}
+        parent_field = KINDS[self.kind][1]
+        if parent_field:
+            loaded[parent_field] = self.parent_id
+        fields = [
+            field.attname
+            for field in model._meta.concrete_fields
+            if field.attname in loaded
+        ]
+        return model.from_db(
+            router.db_for_read(model), fields, [loaded[name] for name in fields]
+        )
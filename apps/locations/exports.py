@@ -0,0 +1,77 @@
+"""
+Exportaciones de reservas de hotel registradas en apps.core.exports.
+"""
+
+from django.db.models import Q
+
+from apps.core import exports
+
+from .models import HotelReservation
+
+HOTEL_RESERVATIONS = "hotel-reservations"
+
+RESERVATION_COLUMNS = [
+    "ID",
+    "Creada",
+    "Hotel",
+    "Habitación",
+    "Evento",
+    "Huésped",
+    "Email",
+    "Teléfono",
+    "Huéspedes",
+    "Check-in",
+    "Check-out",
+    "Estado",
+    "Total",
+    "Orden",
+]
+
+
+def _reservations(params):
+    reservations = HotelReservation.objects.order_by("pk")
+    hotel_id = exports.int_param(params, "hotel")
+    if hotel_id:
+        reservations = reservations.filter(hotel_id=hotel_id)
+    event_id = exports.int_param(params, "event")
+    if event_id:
+        reservations = reservations.filter(
+            Q(event_id=event_id)
+            | Q(order__event_id=event_id)
+            | Q(stripe_checkout__event_id=event_id)
+        )
+    if params.get("status"):
+        reservations = reservations.filter(status=params["status"])
+    return reservations
+
+
+def reservation_rows(params):
+    return (
+        _reservations(params)
+        .values_list(
+            "pk",
+            "created_at",
+            "hotel__hotel_name",
+            "room__room_number",
+            "event__title",
+            "guest_name",
+            "guest_email",
+            "guest_phone",
+            "number_of_guests",
+            "check_in",
+            "check_out",
+            "status",
+            "total_amount",
+            "order__order_number",
+        )
+        .iterator(chunk_size=exports.chunk_size())
+    )
+
+
+exports.register(
+    HOTEL_RESERVATIONS,
+    title="Reservas de hotel",
+    columns=RESERVATION_COLUMNS,
+    get_rows=reservation_rows,
+    count=lambda params: _reservations(params).count(),
+)
@@ -0,0 +1,35 @@
+"""
+Filtros de las listas administrativas de ubicaciones (ver apps.core.admin_lists)
+"""
+
+import django_filters
+
+from apps.core.admin_lists import SearchFilterSet, filter_active_status
+
+
+class CountryFilterSet(SearchFilterSet):
+    search_fields = ("name", "code")
+
+    status = django_filters.CharFilter(field_name="is_active", method=filter_active_status)
+
+
+class StateFilterSet(SearchFilterSet):
+    search_fields = ("name", "code", "country__name")
+
+    country = django_filters.NumberFilter(field_name="country_id")
+    status = django_filters.CharFilter(field_name="is_active", method=filter_active_status)
+
+
+class CityFilterSet(SearchFilterSet):
+    search_fields = ("name", "state__name", "state__country__name")
+
+    country = django_filters.NumberFilter(field_name="state__country_id")
+    state = django_filters.NumberFilter(field_name="state_id")
+    status = django_filters.CharFilter(field_name="is_active", method=filter_active_status)
+
+
+class HotelReservationFilterSet(SearchFilterSet):
+    search_fields = ("guest_name", "guest_email", "hotel__hotel_name")
+
+    hotel = django_filters.NumberFilter(field_name="hotel_id")
+    status = django_filters.CharFilter()
@@ -0,0 +1,61 @@
+"""
+Comando para poblar HotelReservation.stripe_checkout y HotelReservation.event
+en reservas antiguas.
+
+La migración 0032_backfill_reservation_links ya enlaza las reservas
+existentes; el comando sirve para volver a ejecutarlo tras cargas masivas.
+La resolución está en apps.locations.reservation_links. Solo procesa
+reservas con alguna FK vacía, así que se puede interrumpir y volver a
+ejecutar; ``--after-id`` permite saltar lo ya revisado.
+"""
+
+from django.core.management.base import BaseCommand
+
+from apps.accounts.models import Order, StripeEventCheckout
+from apps.locations.models import HotelReservation
+from apps.locations.reservation_links import link_reservations
+
+
+class Command(BaseCommand):
+    help = "Asigna checkout de Stripe y evento a reservas antiguas desde sus notas"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Reservas por lote (default: 500)",
+        )
+        parser.add_argument(
+            "--after-id",
+            type=int,
+            default=0,
+            help="Empezar después de esta reserva (para reanudar)",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Solo muestra cuántas reservas se actualizarían",
+        )
+
+    def handle(self, *args, **options):
+        def report(last_id, changed):
+            if options["verbosity"] > 1:
+                self.stdout.write(f"  Lote hasta la reserva #{last_id}: {len(changed)}")
+
+        updated, last_id = link_reservations(
+            HotelReservation,
+            Order,
+            StripeEventCheckout,
+            batch_size=options["batch_size"],
+            after_id=options["after_id"],
+            dry_run=options["dry_run"],
+            on_batch=report,
+        )
+
+        prefix = "MODO DRY-RUN: " if options["dry_run"] else ""
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{prefix}{updated} reservas enlazadas (última revisada: #{last_id})"
+            )
+        )
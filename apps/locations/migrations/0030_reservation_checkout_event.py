@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:48
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0057_order_player_links'),
+        ('events', '0042_event_capacity'),
+        ('locations', '0029_siteimage'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='hotelreservation',
+            name='event',
+            field=models.ForeignKey(blank=True, help_text='Evento para el que se reservó el hotel', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='hotel_reservations', to='events.event', verbose_name='Evento'),
+        ),
+        migrations.AddField(
+            model_name='hotelreservation',
+            name='stripe_checkout',
+            field=models.ForeignKey(blank=True, help_text='Checkout con el que se pagó la reserva', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='hotel_reservations', to='accounts.stripeeventcheckout', verbose_name='Checkout de Stripe'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('locations', '0030_reservation_checkout_event'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='hotelreservation',
+            index=models.Index(fields=['-created_at', '-id'], name='hotelres_created_keyset_idx'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+from django.db import migrations
+
+
+def backfill_reservation_links(apps, schema_editor):
+    """Enlaza las reservas existentes con su checkout y evento"""
+    from apps.locations.reservation_links import link_reservations
+
+    link_reservations(
+        apps.get_model("locations", "HotelReservation"),
+        apps.get_model("accounts", "Order"),
+        apps.get_model("accounts", "StripeEventCheckout"),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0057_order_player_links'),
+        ('locations', '0031_reservation_created_keyset_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            backfill_reservation_links, migrations.RunPython.noop
+        ),
+    ]
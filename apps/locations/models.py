@@ -4,6 +4,8 @@ from django.contrib.auth import get_user_model
 from django.core.validators import MaxLengthValidator, MinLengthValidator
 from django.db import models
 
+from .reservation_links import parse_reservation_session_id
+
 User = get_user_model()
 
 
@@ -1241,6 +1243,24 @@ class HotelReservation(models.Model):
         verbose_name="Orden",
         help_text="Orden asociada a esta reserva (si fue comprada a través de una orden)",
     )
+    stripe_checkout = models.ForeignKey(
+        "accounts.StripeEventCheckout",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="hotel_reservations",
+        verbose_name="Checkout de Stripe",
+        help_text="Checkout con el que se pagó la reserva",
+    )
+    event = models.ForeignKey(
+        "events.Event",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="hotel_reservations",
+        verbose_name="Evento",
+        help_text="Evento para el que se reservó el hotel",
+    )
     guest_name = models.CharField(
         max_length=200,
         verbose_name="Nombre del Huésped",
@@ -1314,6 +1334,10 @@ class HotelReservation(models.Model):
         verbose_name = "Reserva de Hotel"
         verbose_name_plural = "Reservas de Hotel"
         ordering = ["-created_at"]
+        indexes = [
+            # Paginación por cursor de la lista administrativa
+            models.Index(fields=["-created_at", "-id"], name="hotelres_created_keyset_idx"),
+        ]
 
     def __str__(self):
         return f"Reserva #{self.id} - {self.hotel.hotel_name} - {self.guest_name}"
@@ -1483,42 +1507,32 @@ class HotelReservation(models.Model):
     @property
     def related_event(self):
         """
-        Obtiene el evento relacionado a esta reserva a través de StripeEventCheckout.
-        Busca el stripe_session_id en las notas y encuentra el checkout correspondiente.
-        """
-        if not self.notes:
-            return None
-
-        import re
+        Evento relacionado a esta reserva.
 
-        # Buscar el stripe_session_id en las notas
-        match = re.search(
-            r"Reserva pagada vía Stripe session ([a-zA-Z0-9_]+)", self.notes
-        )
-        if not match:
-            return None
+        Usa las FK ``event`` / ``stripe_checkout`` (con select_related("event")
+        no hace consultas; añadir "stripe_checkout__event" para las que solo
+        tienen checkout). Las reservas sin FK se resuelven desde el
+        stripe_session_id de las notas.
+        """
+        if self.event_id:
+            return self.event
+        if self.stripe_checkout_id:
+            return self.stripe_checkout.event
 
-        stripe_session_id = match.group(1)
+        stripe_session_id = parse_reservation_session_id(self.notes)
         if not stripe_session_id:
             return None
 
-        try:
-            from apps.accounts.models import StripeEventCheckout
+        from apps.accounts.models import StripeEventCheckout
 
-            checkout = (
-                StripeEventCheckout.objects.filter(
-                    stripe_session_id=stripe_session_id, user=self.user, status="paid"
-                )
-                .select_related("event")
-                .first()
+        checkout = (
+            StripeEventCheckout.objects.filter(
+                stripe_session_id=stripe_session_id, user=self.user, status="paid"
             )
-
-            if checkout and checkout.event:
-                return checkout.event
-        except Exception:
-            pass
-
-        return None
+            .select_related("event")
+            .first()
+        )
+        return checkout.event if checkout else None
 
     @property
     def registered_players_in_event(self):
@@ -0,0 +1,121 @@
+"""
+Enlace de reservas antiguas con su checkout de Stripe y su evento.
+
+Las reservas creadas antes de HotelReservation.stripe_checkout /
+HotelReservation.event solo guardaban el stripe_session_id en las notas
+("Reserva pagada vía Stripe session ..."). Cada reserva se resuelve:
+
+1. Desde la orden asociada (order.stripe_checkout / order.event).
+2. Desde el stripe_session_id de las notas (checkout del mismo usuario).
+
+Las funciones reciben las clases de modelo para poder usarse tanto desde el
+comando backfill_reservation_links como desde la migración de datos (con
+los modelos históricos).
+"""
+
+import re
+
+from django.db import transaction
+from django.db.models import Q
+
+RESERVATION_SESSION_RE = re.compile(
+    r"Reserva pagada vía Stripe session ([a-zA-Z0-9_]+)"
+)
+
+
+def parse_reservation_session_id(notes):
+    """stripe_session_id de las notas de reservas antiguas (o None)"""
+    match = RESERVATION_SESSION_RE.search(notes or "")
+    return match.group(1) if match else None
+
+
+def resolve_reservation_links(batch, order_model, checkout_model):
+    """Asigna las FK en memoria; retorna las reservas modificadas"""
+    orders = {
+        pk: (checkout_id, event_id)
+        for pk, checkout_id, event_id in order_model.objects.filter(
+            pk__in={r.order_id for r in batch if r.order_id}
+        ).values_list("pk", "stripe_checkout_id", "event_id")
+    }
+    session_ids = {
+        r.pk: parse_reservation_session_id(r.notes)
+        for r in batch
+        if not r.stripe_checkout_id
+    }
+    checkouts = {
+        (session_id, user_id): (pk, event_id)
+        for pk, session_id, user_id, event_id in checkout_model.objects.filter(
+            stripe_session_id__in={s for s in session_ids.values() if s}
+        ).values_list("pk", "stripe_session_id", "user_id", "event_id")
+    }
+    checkout_events = dict(
+        checkout_model.objects.filter(
+            pk__in={r.stripe_checkout_id for r in batch if r.stripe_checkout_id}
+            | {checkout_id for checkout_id, _ in orders.values() if checkout_id}
+        ).values_list("pk", "event_id")
+    )
+
+    changed = []
+    for reservation in batch:
+        checkout_id, event_id = reservation.stripe_checkout_id, reservation.event_id
+        order_checkout_id, order_event_id = orders.get(
+            reservation.order_id, (None, None)
+        )
+        checkout_id = checkout_id or order_checkout_id
+        event_id = event_id or order_event_id
+        if not checkout_id:
+            checkout_id, session_event_id = checkouts.get(
+                (session_ids.get(reservation.pk), reservation.user_id), (None, None)
+            )
+            event_id = event_id or session_event_id
+        if checkout_id and not event_id:
+            event_id = checkout_events.get(checkout_id)
+
+        if (checkout_id, event_id) != (
+            reservation.stripe_checkout_id,
+            reservation.event_id,
+        ):
+            reservation.stripe_checkout_id = checkout_id
+            reservation.event_id = event_id
+            changed.append(reservation)
+    return changed
+
+
+def link_reservations(
+    reservation_model,
+    order_model,
+    checkout_model,
+    batch_size=500,
+    after_id=0,
+    dry_run=False,
+    on_batch=None,
+):
+    """
+    Recorre por lotes (en orden de id) las reservas con alguna FK vacía y
+    las enlaza. ``on_batch(last_id, changed)`` se llama tras cada lote.
+
+    Returns:
+        tuple: (reservas enlazadas, última reserva revisada)
+    """
+    pending = reservation_model.objects.filter(
+        Q(stripe_checkout__isnull=True) | Q(event__isnull=True)
+    ).only("pk", "user_id", "order_id", "stripe_checkout_id", "event_id", "notes")
+
+    last_id = after_id
+    updated = 0
+    while True:
+        batch = list(pending.filter(pk__gt=last_id).order_by("pk")[:batch_size])
+        if not batch:
+            break
+        last_id = batch[-1].pk
+
+        changed = resolve_reservation_links(batch, order_model, checkout_model)
+        if changed and not dry_run:
+            with transaction.atomic():
+                reservation_model.objects.bulk_update(
+                    changed, ["stripe_checkout", "event"]
+                )
+        updated += len(changed)
+        if on_batch:
+            on_batch(last_id, changed)
+    return updated, last_id
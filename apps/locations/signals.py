@@ -0,0 +1,20 @@
+"""
+Señales de ubicaciones
+"""
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .choices import invalidate_location_choices
+from .models import City, Country, State
+
+
+@receiver(post_save, sender=Country)
+@receiver(post_delete, sender=Country)
+@receiver(post_save, sender=State)
+@receiver(post_delete, sender=State)
+@receiver(post_save, sender=City)
+@receiver(post_delete, sender=City)
+def invalidate_location_choices_cache(sender, instance, **kwargs):
+    """Invalida las listas de opciones de ubicación de los formularios"""
+    invalidate_location_choices()
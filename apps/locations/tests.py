@@ -412,3 +412,160 @@ class LocationModelPropertiesTest(TestCase):
     def test_city_country_name_property(self):
         """Test city country name property"""
         self.assertEqual(self.city.country.name, "México")
+
+
+class HotelReservationLinkTest(TestCase):
+    """Test cases for the reservation -> checkout/event foreign keys"""
+
+    def setUp(self):
+        """Set up test data"""
+        from datetime import date
+        from decimal import Decimal
+
+        from apps.accounts.models import StripeEventCheckout
+        from apps.events.models import Event
+
+        from .models import Hotel, HotelReservation, HotelRoom
+
+        self.user = User.objects.create_user(username="guest", password="testpass123")
+        self.event = Event.objects.create(
+            title="Hotel Event",
+            start_date="2099-01-01",
+            end_date="2099-01-02",
+            organizer=self.user,
+        )
+        self.checkout = StripeEventCheckout.objects.create(
+            user=self.user,
+            event=self.event,
+            stripe_session_id="cs_test_legacy",
+            status="paid",
+        )
+        hotel = Hotel.objects.create(hotel_name="Hotel Centro", address="Calle 1")
+        room = HotelRoom.objects.create(
+            hotel=hotel,
+            room_number="101",
+            room_type="double",
+            capacity=2,
+            price_per_night=Decimal("100.00"),
+        )
+        self.reservation = HotelReservation.objects.create(
+            hotel=hotel,
+            room=room,
+            user=self.user,
+            guest_name="Guest",
+            guest_email="guest@example.com",
+            guest_phone="555",
+            number_of_guests=1,
+            check_in=date(2099, 1, 1),
+            check_out=date(2099, 1, 2),
+            notes="Reserva pagada vía Stripe session cs_test_legacy",
+        )
+
+    def test_backfill_links_legacy_reservations(self):
+        """The backfill command resolves the checkout from the notes once"""
+        from io import StringIO
+
+        from django.core.management import call_command
+
+        from .models import HotelReservation
+
+        # Sin FK, related_event sigue resolviendo desde las notas
+        self.assertEqual(self.reservation.related_event, self.event)
+
+        call_command("backfill_reservation_links", stdout=StringIO())
+        reservation = HotelReservation.objects.select_related("event").get(
+            pk=self.reservation.pk
+        )
+        self.assertEqual(reservation.stripe_checkout_id, self.checkout.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(reservation.related_event, self.event)
+        self.assertEqual(
+            list(self.checkout.hotel_reservations.all()), [self.reservation]
+        )
+
+    def test_data_migration_links_existing_reservations(self):
+        """The 0032 data migration links reservations without running the command"""
+        import importlib
+
+        from django.apps import apps
+
+        migration = importlib.import_module(
+            "apps.locations.migrations.0032_backfill_reservation_links"
+        )
+        migration.backfill_reservation_links(apps, None)
+        self.reservation.refresh_from_db()
+        self.assertEqual(self.reservation.stripe_checkout_id, self.checkout.pk)
+        self.assertEqual(self.reservation.event_id, self.event.pk)
+
+
+class LocationChoicesTest(TestCase):
+    """Cached country/state/city choices used by the account forms"""
+
+    def setUp(self):
+        from django.core.cache import cache
+
+        cache.clear()
+        self.mexico = Country.objects.create(name="México", code="MX")
+        self.peru = Country.objects.create(name="Perú", code="PE", is_active=False)
+        self.jalisco = State.objects.create(name="Jalisco", country=self.mexico)
+        self.colima = State.objects.create(name="Colima", country=self.mexico)
+        self.gdl = City.objects.create(name="Guadalajara", state=self.jalisco)
+
+    def test_choices_are_cached_and_invalidated_on_save(self):
+        from .choices import location_choices
+
+        self.assertEqual(
+            location_choices("state", self.mexico.pk),
+            ((self.colima.pk, "Colima"), (self.jalisco.pk, "Jalisco")),
+        )
+        with self.assertNumQueries(0):
+            location_choices("state", self.mexico.pk)
+        self.assertEqual(
+            location_choices("country", active_only=True), ((self.mexico.pk, "México"),)
+        )
+
+        State.objects.create(name="Aguascalientes", country=self.mexico)
+        self.assertEqual(location_choices("state", self.mexico.pk)[0][1], "Aguascalientes")
+        self.assertEqual(location_choices("city"), ())
+
+    def test_field_validates_and_renders_without_queries(self):
+        from django import forms
+
+        from .choices import LocationChoiceField
+
+        class AddressForm(forms.Form):
+            country = LocationChoiceField("country", active_only=True)
+            state = LocationChoiceField("state")
+            city = LocationChoiceField("city", required=False)
+
+            def __init__(self, *args, **kwargs):
+                super().__init__(*args, **kwargs)
+                self.fields["state"].parent_id = self.data.get("country")
+                self.fields["city"].parent_id = self.data.get("state")
+
+        data = {"country": self.mexico.pk, "state": self.jalisco.pk, "city": self.gdl.pk}
+        self.assertTrue(AddressForm(data).is_valid())  # calienta la caché
+
+        form = AddressForm(data)
+        with self.assertNumQueries(0):
+            self.assertTrue(form.is_valid())
+            html = str(form["state"])
+        self.assertEqual(form.cleaned_data["city"], self.gdl)
+        self.assertEqual(form.cleaned_data["state"].country_id, self.mexico.pk)
+        self.assertIn(f'<option value="{self.jalisco.pk}" selected>Jalisco</option>', html)
+
+        # Only id, name and parent are loaded; other fields are deferred
+        country = form.cleaned_data["country"]
+        self.assertEqual(
+            country.get_deferred_fields(),
+            {"code", "is_active", "created_at", "updated_at"},
+        )
+        with self.assertNumQueries(1):
+            self.assertEqual(country.code, "MX")
+        self.assertIn('class="form-select"', html)
+
+        # Un estado de otro país o un país inactivo no son opciones válidas
+        form = AddressForm({"country": self.peru.pk, "state": self.jalisco.pk})
+        self.assertFalse(form.is_valid())
+        self.assertIn("country", form.errors)
+        self.assertIn("state", form.errors)
@@ -20,9 +20,16 @@ from django.views.generic import (
     UpdateView,
 )
 
+from apps.core.admin_lists import FilteredListMixin
 from apps.core.mixins import StaffRequiredMixin, SuperuserRequiredMixin
 from apps.media.models import MediaFile
 
+from .filters import (
+    CityFilterSet,
+    CountryFilterSet,
+    HotelReservationFilterSet,
+    StateFilterSet,
+)
 from .forms import HotelForm, HotelRoomForm
 from .models import (
     City,
@@ -44,41 +51,23 @@ from .models import (
 
 
 # ===== COUNTRY VIEWS (Admin) =====
-class AdminCountryListView(StaffRequiredMixin, ListView):
+class AdminCountryListView(StaffRequiredMixin, FilteredListMixin, ListView):
     """Lista administrativa de países"""
 
     model = Country
     template_name = "locations/country_list.html"
     context_object_name = "countries"
     paginate_by = 20
+    filterset_class = CountryFilterSet
+    sort_options = {
+        "name": ("name",),
+        "code": ("code",),
+        "created": ("-created_at",),
+    }
+    default_sort = "name"
 
-    def get_queryset(self):
-        queryset = Country.objects.all()
-        search = self.request.GET.get("search")
-        status = self.request.GET.get("status")
-        sort = self.request.GET.get("sort", "name")
-
-        if search:
-            queryset = queryset.filter(
-                Q(name__icontains=search) | Q(code__icontains=search)
-            )
-
-        if status == "active":
-            queryset = queryset.filter(is_active=True)
-        elif status == "inactive":
-            queryset = queryset.filter(is_active=False)
-
-        # Ordenamiento
-        if sort == "name":
-            queryset = queryset.order_by("name")
-        elif sort == "code":
-            queryset = queryset.order_by("code")
-        elif sort == "created":
-            queryset = queryset.order_by("-created_at")
-        else:
-            queryset = queryset.order_by("name")
-
-        return queryset
+    def get_base_queryset(self):
+        return Country.objects.all()
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -260,47 +249,24 @@ class AdminCountryDeleteView(SuperuserRequiredMixin, DeleteView):
 
 
 # ===== STATE VIEWS (Admin) =====
-class AdminStateListView(StaffRequiredMixin, ListView):
+class AdminStateListView(StaffRequiredMixin, FilteredListMixin, ListView):
     """Lista administrativa de estados"""
 
     model = State
     template_name = "locations/state_list.html"
     context_object_name = "states"
     paginate_by = 20
-
-    def get_queryset(self):
-        queryset = State.objects.select_related("country").all()
-        search = self.request.GET.get("search")
-        country = self.request.GET.get("country")
-        status = self.request.GET.get("status")
-        sort = self.request.GET.get("sort", "name")
-
-        if search:
-            queryset = queryset.filter(
-                Q(name__icontains=search)
-                | Q(code__icontains=search)
-                | Q(country__name__icontains=search)
-            )
-        if country:
-            queryset = queryset.filter(country_id=country)
-        if status == "active":
-            queryset = queryset.filter(is_active=True)
-        elif status == "inactive":
-            queryset = queryset.filter(is_active=False)
-
-        # Ordenamiento
-        if sort == "name":
-            queryset = queryset.order_by("name")
-        elif sort == "code":
-            queryset = queryset.order_by("code")
-        elif sort == "country":
-            queryset = queryset.order_by("country__name", "name")
-        elif sort == "created":
-            queryset = queryset.order_by("-created_at")
-        else:
-            queryset = queryset.order_by("country__name", "name")
-
-        return queryset
+    filterset_class = StateFilterSet
+    sort_options = {
+        "name": ("name",),
+        "code": ("code",),
+        "country": ("country__name", "name"),
+        "created": ("-created_at",),
+    }
+    default_sort = "name"
+
+    def get_base_queryset(self):
+        return State.objects.select_related("country")
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -492,50 +458,24 @@ class AdminStateDeleteView(SuperuserRequiredMixin, DeleteView):
 
 
 # ===== CITY VIEWS (Admin) =====
-class AdminCityListView(StaffRequiredMixin, ListView):
+class AdminCityListView(StaffRequiredMixin, FilteredListMixin, ListView):
     """Lista administrativa de ciudades"""
 
     model = City
     template_name = "locations/city_list.html"
     context_object_name = "cities"
     paginate_by = 20
-
-    def get_queryset(self):
-        queryset = City.objects.select_related("state__country").all()
-        search = self.request.GET.get("search")
-        country = self.request.GET.get("country")
-        state = self.request.GET.get("state")
-        status = self.request.GET.get("status")
-        sort = self.request.GET.get("sort", "name")
-
-        if search:
-            queryset = queryset.filter(
-                Q(name__icontains=search)
-                | Q(state__name__icontains=search)
-                | Q(state__country__name__icontains=search)
-            )
-        if country:
-            queryset = queryset.filter(state__country_id=country)
-        if state:
-            queryset = queryset.filter(state_id=state)
-        if status == "active":
-            queryset = queryset.filter(is_active=True)
-        elif status == "inactive":
-            queryset = queryset.filter(is_active=False)
-
-        # Ordenamiento
-        if sort == "name":
-            queryset = queryset.order_by("name")
-        elif sort == "state":
-            queryset = queryset.order_by("state__name", "name")
-        elif sort == "country":
-            queryset = queryset.order_by("state__country__name", "state__name", "name")
-        elif sort == "created":
-            queryset = queryset.order_by("-created_at")
-        else:
-            queryset = queryset.order_by("state__country__name", "state__name", "name")
-
-        return queryset
+    filterset_class = CityFilterSet
+    sort_options = {
+        "name": ("name",),
+        "state": ("state__name", "name"),
+        "country": ("state__country__name", "state__name", "name"),
+        "created": ("-created_at",),
+    }
+    default_sort = "name"
+
+    def get_base_queryset(self):
+        return City.objects.select_related("state__country")
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -2900,39 +2840,20 @@ class AdminHotelServiceDeleteView(StaffRequiredMixin, DeleteView):
 
 
 # ===== HOTEL RESERVATION VIEWS (Admin) =====
-class AdminHotelReservationListView(StaffRequiredMixin, ListView):
+class AdminHotelReservationListView(StaffRequiredMixin, FilteredListMixin, ListView):
     """Lista administrativa de reservas de hotel"""
 
     model = HotelReservation
     template_name = "locations/hotel_reservation_list.html"
     context_object_name = "reservations"
     paginate_by = 20
+    filterset_class = HotelReservationFilterSet
+    ordering = ("-created_at",)
 
-    def get_queryset(self):
-        queryset = HotelReservation.objects.select_related(
-            "hotel", "room", "user"
-        ).all()
-
-        # Filtro por hotel
-        hotel = self.request.GET.get("hotel")
-        if hotel:
-            queryset = queryset.filter(hotel_id=hotel)
-
-        # Filtro por estado
-        status = self.request.GET.get("status")
-        if status:
-            queryset = queryset.filter(status=status)
-
-        # Búsqueda
-        search = self.request.GET.get("search")
-        if search:
-            queryset = queryset.filter(
-                Q(guest_name__icontains=search)
-                | Q(guest_email__icontains=search)
-                | Q(hotel__hotel_name__icontains=search)
-            )
-
-        return queryset.order_by("-created_at")
+    def get_base_queryset(self):
+        return HotelReservation.objects.select_related(
+            "hotel", "room", "user", "event", "stripe_checkout__event"
+        )
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -2947,6 +2868,9 @@ class AdminHotelReservationDetailView(StaffRequiredMixin, DetailView):
     model = HotelReservation
     template_name = "locations/hotel_reservation_detail.html"
     context_object_name = "reservation"
+    queryset = HotelReservation.objects.select_related(
+        "hotel", "room", "event", "stripe_checkout__event"
+    )
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -342,7 +342,7 @@ class FrontHotelReservationListView(LoginRequiredMixin, ListView):
         # Solo mostrar reservas del usuario actual
         queryset = (
             HotelReservation.objects.filter(user=self.request.user)
-            .select_related("hotel", "room")
+            .select_related("hotel", "room", "event", "stripe_checkout__event")
             .order_by("-created_at")
         )
 
@@ -365,6 +365,9 @@ class FrontHotelReservationDetailView(LoginRequiredMixin, DetailView):
     model = HotelReservation
     template_name = "locations/front_hotel_reservation_detail.html"
     context_object_name = "reservation"
+    queryset = HotelReservation.objects.select_related(
+        "hotel", "room", "event", "stripe_checkout__event"
+    )
 
     def dispatch(self, request, *args, **kwargs):
         reservation = self.get_object()
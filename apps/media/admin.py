@@ -13,7 +13,7 @@ class MediaFileAdmin(admin.ModelAdmin):
     list_display = ['thumbnail', 'title', 'file_type', 'file_size_display', 'status', 'uploaded_by', 'created_at']
     list_filter = ['file_type', 'status', 'created_at', 'uploaded_by']
     search_fields = ['title', 'description', 'tags', 'original_file']
-    readonly_fields = ['file_size', 'processed_file_size', 'width', 'height', 'mime_type', 'compression_ratio', 'thumbnail_preview', 'created_at', 'updated_at']
+    readonly_fields = ['file_size', 'content_hash', 'processed_file_size', 'width', 'height', 'mime_type', 'compression_ratio', 'thumbnail_preview', 'created_at', 'updated_at']
     fieldsets = (
         (_('Información Básica'), {
             'fields': ('title', 'description', 'alt_text', 'tags')
@@ -5,9 +5,3 @@ class MediaConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.media"
     verbose_name = "Multimedia"
-
-
-
-
-
-
@@ -0,0 +1,331 @@
+"""
+Cliente de clamd (ClamAV) para escanear subidas sin archivos temporales.
+
+- Protocolo nativo de clamd: cada conexión abre una sesión (zIDSESSION) y
+  reutiliza el socket para varios zINSTREAM, por lo que no hay conexión ni
+  PING por archivo. Las conexiones se guardan en un pool pequeño
+  (CLAMAV_POOL_SIZE); si clamd cerró una sesión inactiva, se reintenta una vez
+  con una conexión nueva.
+- El contenido se envía por INSTREAM en bloques, tal como llega del upload.
+- Los veredictos (limpio / infectado) se cachean por SHA-256 del contenido:
+  volver a subir el mismo archivo no lo escanea otra vez.
+- start_scan() ejecuta el escaneo en un hilo para que el formulario corra el
+  resto de validaciones mientras clamd trabaja.
+
+Configuración (settings): CLAMAV_SOCKET o CLAMAV_HOST/CLAMAV_PORT,
+CLAMAV_TIMEOUT, CLAMAV_POOL_SIZE, CLAMAV_VERDICT_TIMEOUT.
+"""
+
+import hashlib
+import io
+import os
+import queue
+import socket
+import struct
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+
+CHUNK_SIZE = 64 * 1024
+VERDICT_CACHE_PREFIX = "clamav:verdict"
+
+
+class ClamdError(Exception):
+    """clamd no disponible o respuesta inválida"""
+
+
+class ScanResult:
+    def __init__(self, infected, signature="", cached=False):
+        self.infected = infected
+        self.signature = signature
+        self.cached = cached
+
+    def __repr__(self):
+        state = f"FOUND {self.signature}" if self.infected else "OK"
+        return f"<ScanResult {state}{' (cached)' if self.cached else ''}>"
+
+
+class ClamdConnection:
+    """Sesión persistente con clamd (zIDSESSION)"""
+
+    def __init__(self, socket_path=None, host="localhost", port=3310, timeout=30):
+        if socket_path:
+            self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            address = socket_path
+        else:
+            self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            address = (host, port)
+        self.sock.settimeout(timeout)
+        try:
+            self.sock.connect(address)
+            self.sock.sendall(b"zIDSESSION\0")
+        except OSError as e:
+            self.sock.close()
+            raise ClamdError(f"No se pudo conectar a clamd: {e}") from e
+        self._buffer = b""
+
+    def _reply(self):
+        while b"\0" not in self._buffer:
+            data = self.sock.recv(4096)
+            if not data:
+                raise ClamdError("clamd cerró la conexión")
+            self._buffer += data
+        reply, self._buffer = self._buffer.split(b"\0", 1)
+        # En modo sesión la respuesta es "<n>: <resultado>"
+        reply = reply.decode("utf-8", "replace")
+        return reply.split(": ", 1)[1] if reply[:1].isdigit() else reply
+
+    def ping(self):
+        self.sock.sendall(b"zPING\0")
+        return self._reply() == "PONG"
+
+    def instream(self, chunks):
+        """Envía ``chunks`` (bytes) por INSTREAM y retorna ScanResult"""
+        self.sock.sendall(b"zINSTREAM\0")
+        for chunk in chunks:
+            for start in range(0, len(chunk), CHUNK_SIZE):
+                piece = chunk[start : start + CHUNK_SIZE]
+                self.sock.sendall(struct.pack("!L", len(piece)) + piece)
+        self.sock.sendall(struct.pack("!L", 0))
+
+        reply = self._reply()
+        # "stream: OK" | "stream: <firma> FOUND" | "<mensaje> ERROR"
+        if reply.endswith("ERROR"):
+            raise ClamdError(reply)
+        if reply.endswith("FOUND"):
+            signature = reply[len("stream: ") : -len(" FOUND")]
+            return ScanResult(True, signature)
+        if reply.endswith("OK"):
+            return ScanResult(False)
+        raise ClamdError(f"Respuesta inesperada de clamd: {reply}")
+
+    def close(self):
+        try:
+            self.sock.sendall(b"zEND\0")
+        except OSError:
+            pass
+        self.sock.close()
+
+
+class ClamdPool:
+    """Pool de sesiones con clamd; las conexiones se crean bajo demanda"""
+
+    def __init__(self, size=4, **connection_kwargs):
+        self.size = size
+        self.connection_kwargs = connection_kwargs
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+
+    @contextmanager
+    def connection(self):
+        self._slots.acquire()
+        try:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                conn = ClamdConnection(**self.connection_kwargs)
+            try:
+                yield conn
+            except Exception:
+                conn.close()
+                raise
+            else:
+                self._idle.put(conn)
+        finally:
+            self._slots.release()
+
+    def instream(self, chunks_factory):
+        """
+        Escanea con una conexión del pool. ``chunks_factory`` debe retornar
+        un iterable nuevo en cada llamada (para poder reintentar).
+        """
+        try:
+            with self.connection() as conn:
+                return conn.instream(chunks_factory())
+        except (OSError, ClamdError) as e:
+            if isinstance(e, ClamdError) and "clamd cerró" not in str(e):
+                raise
+        # Sesión cerrada por clamd (IdleTimeout): un reintento con conexión nueva
+        try:
+            with self.connection() as conn:
+                return conn.instream(chunks_factory())
+        except OSError as e:
+            raise ClamdError(str(e)) from e
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+_pool = None
+_pool_lock = threading.Lock()
+_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="clamav")
+
+
+def get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ClamdPool(
+                size=getattr(settings, "CLAMAV_POOL_SIZE", 4),
+                socket_path=getattr(settings, "CLAMAV_SOCKET", None),
+                host=getattr(settings, "CLAMAV_HOST", "localhost"),
+                port=getattr(settings, "CLAMAV_PORT", 3310),
+                timeout=getattr(settings, "CLAMAV_TIMEOUT", 30),
+            )
+        return _pool
+
+
+def reset_pool():
+    """Cierra las conexiones (p. ej. al cambiar la configuración en tests)"""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+        _pool = None
+
+
+def upload_chunks_factory(file):
+    """
+    Retorna una función que produce los bloques de ``file`` sin mover la
+    posición del archivo original, para poder leerlo desde otro hilo mientras
+    las demás validaciones usan ``file``.
+
+    Desenvuelve FieldFile / UploadedFile: un TemporaryUploadedFile (o un
+    archivo del storage local) se lee desde su ruta, uno en memoria se
+    recorre sobre su buffer (sin copiarlo) y un FieldFile de otro storage se
+    abre de nuevo por su nombre. Cualquier otro objeto se lee por bloques
+    moviendo y restaurando su posición; esa función lleva ``shares_position``
+    porque no puede leerse mientras otro hilo usa ``file``.
+    """
+    raw = file
+    while True:
+        path = None
+        if hasattr(raw, "temporary_file_path"):
+            path = raw.temporary_file_path()
+        elif isinstance(raw, io.IOBase) and isinstance(getattr(raw, "name", None), str):
+            # Archivo abierto desde el storage local
+            path = raw.name if os.path.isfile(raw.name) else None
+        if path:
+
+            def read_path():
+                with open(path, "rb") as handle:
+                    while chunk := handle.read(CHUNK_SIZE):
+                        yield chunk
+
+            return read_path
+        if hasattr(raw, "getbuffer"):
+            data = raw.getbuffer()
+            return lambda: (
+                data[i : i + CHUNK_SIZE] for i in range(0, len(data), CHUNK_SIZE)
+            )
+        inner = getattr(raw, "file", None)
+        if inner is None or inner is raw:
+            break
+        raw = inner
+
+    storage = getattr(file, "storage", None)
+    if storage is not None and getattr(file, "_committed", False) and file.name:
+
+        def read_storage():
+            with storage.open(file.name, "rb") as handle:
+                while chunk := handle.read(CHUNK_SIZE):
+                    yield chunk
+
+        return read_storage
+
+    def read_shared():
+        offset = 0
+        while True:
+            position = file.tell()
+            file.seek(offset)
+            chunk = file.read(CHUNK_SIZE)
+            file.seek(position)
+            if not chunk:
+                break
+            offset += len(chunk)
+            yield chunk
+
+    read_shared.shares_position = True
+    return read_shared
+
+
+def content_sha256(chunks):
+    digest = hashlib.sha256()
+    for chunk in chunks:
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _verdict_key(sha256):
+    return f"{VERDICT_CACHE_PREFIX}:{sha256}"
+
+
+def scan_upload(file, sha256=None):
+    """
+    Escanea un archivo subido.
+
+    Args:
+        file: UploadedFile (o cualquier objeto con read/seek)
+        sha256: hash del contenido si ya se calculó
+
+    Returns:
+        ScanResult
+
+    Raises:
+        ClamdError: si clamd no está disponible o falla
+    """
+    return _scan_chunks(upload_chunks_factory(file), sha256)
+
+
+def start_scan(file, sha256=None):
+    """
+    Igual que scan_upload, pero en un hilo: retorna un Future con el
+    ScanResult. El hilo lee su propia vista del contenido, así que ``file``
+    se puede seguir usando mientras tanto (si no puede, se escanea aquí
+    mismo y el Future ya viene resuelto).
+    """
+    chunks_factory = upload_chunks_factory(file)
+    if getattr(chunks_factory, "shares_position", False):
+        future = Future()
+        try:
+            future.set_result(_scan_chunks(chunks_factory, sha256))
+        except Exception as exc:
+            future.set_exception(exc)
+        return future
+    return _executor.submit(_scan_in_worker, chunks_factory, sha256)
+
+
+def _scan_in_worker(chunks_factory, sha256):
+    """
+    _scan_chunks en un hilo del pool. La caché puede abrir una conexión a la
+    base de datos (DatabaseCache) propia del hilo: se cierra al terminar.
+    """
+    try:
+        return _scan_chunks(chunks_factory, sha256)
+    finally:
+        connections.close_all()
+
+
+def _scan_chunks(chunks_factory, sha256):
+    if sha256 is None:
+        sha256 = content_sha256(chunks_factory())
+
+    verdict = cache.get(_verdict_key(sha256))
+    if verdict is not None:
+        return ScanResult(verdict["infected"], verdict["signature"], cached=True)
+
+    result = get_pool().instream(chunks_factory)
+    cache.set(
+        _verdict_key(sha256),
+        {"infected": result.infected, "signature": result.signature},
+        getattr(settings, "CLAMAV_VERDICT_TIMEOUT", 60 * 60 * 24),
+    )
+    return result
@@ -7,7 +7,9 @@ from django.utils.translation import gettext_lazy as _
 
 from .models import MediaFile
 from .validators import (
-    scan_file_for_viruses,
+    inspect_upload,
+    start_virus_scan,
+    validate_duplicate_upload,
     validate_file_extension,
     validate_file_integrity,
     validate_file_size,
@@ -85,19 +87,31 @@ class MediaFileUploadForm(forms.ModelForm):
         # Validar extensión
         validate_file_extension(original_file, allowed_extensions)
 
+        # Validar tamaño (None = usar límites automáticos por tipo)
+        validate_file_size(original_file, max_size_mb=None)
+
+        # Una sola lectura del archivo: tamaño, SHA-256 y magic bytes
+        inspection = inspect_upload(original_file)
+
+        # Rechazar duplicados antes de escanear o decodificar
+        validate_duplicate_upload(inspection, exclude_pk=self.instance.pk)
+
+        # Escanear en busca de virus (si está habilitado) mientras corren
+        # las demás validaciones
+        virus_scan = start_virus_scan(original_file, sha256=inspection.sha256)
+
         # Validar integridad del archivo
         try:
-            validate_file_integrity(original_file)
+            validate_file_integrity(original_file, inspection)
         except ValidationError as e:
             raise ValidationError(
                 _('Error al validar el archivo: {}').format(str(e))
             )
 
-        # Validar tamaño (None = usar límites automáticos por tipo)
-        validate_file_size(original_file, max_size_mb=None)
+        virus_scan.wait()
 
-        # Escanear en busca de virus (si está habilitado)
-        scan_file_for_viruses(original_file)
+        # El modelo reutiliza el hash y la imagen decodificada al guardar
+        self.instance._upload_inspection = inspection
 
         return original_file
 
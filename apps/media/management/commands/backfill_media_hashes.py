@@ -0,0 +1,39 @@
+"""
+Comando de gestión para calcular el hash SHA-256 de archivos existentes
+
+Los archivos subidos antes de MediaFile.content_hash no se detectan como
+duplicados hasta que tienen su hash.
+"""
+
+import logging
+
+from django.core.management.base import BaseCommand
+
+from apps.media.models import MediaFile
+from apps.media.validators import inspect_upload
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Calcula content_hash para archivos multimedia que no lo tienen'
+
+    def handle(self, *args, **options):
+        media_files = MediaFile.objects.filter(content_hash='').only('pk', 'original_file')
+
+        updated = 0
+        errors = 0
+        for media_file in media_files.iterator():
+            try:
+                with media_file.original_file.open('rb') as handle:
+                    sha256 = inspect_upload(handle).sha256
+            except Exception:
+                errors += 1
+                logger.exception(f'Error calculando hash de MediaFile #{media_file.pk}')
+                continue
+            MediaFile.objects.filter(pk=media_file.pk).update(content_hash=sha256)
+            updated += 1
+
+        self.stdout.write(
+            self.style.SUCCESS(f'{updated} archivo(s) actualizados, {errors} con error.')
+        )
@@ -0,0 +1,22 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("media", "0004_alter_mediafile_original_file_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="mediafile",
+            name="content_hash",
+            field=models.CharField(
+                blank=True,
+                db_index=True,
+                help_text="Hash del archivo original (detecta subidas duplicadas)",
+                max_length=64,
+                verbose_name="Hash SHA-256",
+            ),
+        ),
+    ]
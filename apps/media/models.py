@@ -165,6 +165,13 @@ class MediaFile(models.Model):
     file_size = models.PositiveIntegerField(
         default=0, verbose_name=_("Tamaño del Archivo (bytes)")
     )
+    content_hash = models.CharField(
+        max_length=64,
+        blank=True,
+        db_index=True,
+        verbose_name=_("Hash SHA-256"),
+        help_text=_("Hash del archivo original (detecta subidas duplicadas)"),
+    )
     processed_file_size = models.PositiveIntegerField(
         default=0,
         blank=True,
@@ -234,6 +241,13 @@ class MediaFile(models.Model):
         """Procesar archivo al guardar"""
         is_new = not self.pk
         if self.original_file and is_new:
+            # Inspección hecha por el formulario (o una lectura aquí)
+            inspection = getattr(self, "_upload_inspection", None)
+            if inspection is None:
+                from .validators import inspect_upload
+
+                inspection = inspect_upload(self.original_file)
+            self.content_hash = inspection.sha256
             # Detectar tipo de archivo
             self._detect_file_type()
             # Calcular tamaño
@@ -365,23 +379,20 @@ class MediaFile(models.Model):
 
             from PIL import Image
 
-            # Leer la imagen original y validar que no esté corrupta
-            self.original_file.seek(0)
+            # Reutilizar la imagen decodificada durante la validación
+            inspection = getattr(self, "_upload_inspection", None)
+            img = inspection.image if inspection else None
+            if img is None:
+                self.original_file.seek(0)
+                try:
+                    img = Image.open(self.original_file)
+                    img.load()  # Decodificar completa (falla si está corrupta)
+                except Exception as e:
+                    import logging
 
-            # Verificar que la imagen sea válida antes de procesar
-            try:
-                img = Image.open(self.original_file)
-                img.verify()  # Verificar integridad
-            except Exception as e:
-                import logging
-
-                logger = logging.getLogger(__name__)
-                logger.error(f"Imagen corrupta detectada: {e}")
-                raise ValueError(f"La imagen está corrupta: {e}")
-
-            # Reabrir después de verify (verify cierra el archivo)
-            self.original_file.seek(0)
-            img = Image.open(self.original_file)
+                    logger = logging.getLogger(__name__)
+                    logger.error(f"Imagen corrupta detectada: {e}")
+                    raise ValueError(f"La imagen está corrupta: {e}")
 
             # Guardar dimensiones
             self.width = img.width
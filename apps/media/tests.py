@@ -0,0 +1,236 @@
+import hashlib
+import io
+import socketserver
+import struct
+import threading
+from unittest import mock
+
+from PIL import Image
+
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+
+from apps.media import clamav
+from apps.media.forms import MediaFileUploadForm
+from apps.media.models import MediaFile
+from apps.media.validators import (
+    inspect_upload,
+    scan_file_for_viruses,
+    start_virus_scan,
+)
+
+EICAR = rb"X5O!P%@AP[4\PZX54(P^)7CC)7}$EICAR-STANDARD-ANTIVIRUS-TEST-FILE!$H+H*"
+
+
+class FakeClamdHandler(socketserver.BaseRequestHandler):
+    """Subconjunto del protocolo de clamd: IDSESSION, PING, INSTREAM, END"""
+
+    def _read_command(self):
+        command = b""
+        while not command.endswith(b"\0"):
+            data = self.request.recv(1)
+            if not data:
+                return None
+            command += data
+        return command[1:-1]
+
+    def _read_exact(self, size):
+        data = b""
+        while len(data) < size:
+            chunk = self.request.recv(size - len(data))
+            if not chunk:
+                raise ConnectionError
+            data += chunk
+        return data
+
+    def handle(self):
+        server = self.server
+        server.connections += 1
+        session = False
+        request_id = 0
+        while True:
+            command = self._read_command()
+            if command is None or command == b"END":
+                return
+            if command == b"IDSESSION":
+                session = True
+                continue
+            request_id += 1
+            if command == b"PING":
+                reply = "PONG"
+            elif command == b"INSTREAM":
+                content = b""
+                while size := struct.unpack("!L", self._read_exact(4))[0]:
+                    content += self._read_exact(size)
+                server.scans += 1
+                if EICAR in content:
+                    reply = "stream: Eicar-Signature FOUND"
+                else:
+                    reply = "stream: OK"
+            else:
+                reply = "UNKNOWN COMMAND"
+            prefix = f"{request_id}: " if session else ""
+            self.request.sendall(f"{prefix}{reply}".encode() + b"\0")
+
+
+class FakeClamd(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), FakeClamdHandler)
+        self.connections = 0
+        self.scans = 0
+
+
+class ClamAVScanTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.clamd = FakeClamd()
+        threading.Thread(target=cls.clamd.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        clamav.reset_pool()
+        cls.clamd.shutdown()
+        cls.clamd.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        cache.clear()
+        clamav.reset_pool()
+        self.clamd.connections = 0
+        self.clamd.scans = 0
+        settings_override = override_settings(
+            ENABLE_VIRUS_SCAN=True,
+            CLAMAV_SOCKET=None,
+            CLAMAV_HOST="127.0.0.1",
+            CLAMAV_PORT=self.clamd.server_address[1],
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def _upload(self, content, name="archivo.txt"):
+        return SimpleUploadedFile(name, content, content_type="text/plain")
+
+    def test_clean_file_passes_and_keeps_file_position(self):
+        upload = self._upload(b"contenido limpio" * 10000)
+        upload.read(10)
+        scan_file_for_viruses(upload)
+        self.assertEqual(upload.tell(), 10)
+        self.assertEqual(self.clamd.scans, 1)
+
+    def test_plain_stream_is_read_in_chunks_and_keeps_position(self):
+        class PlainStream:
+            def __init__(self, data):
+                self._buffer = io.BytesIO(data)
+                self.sizes = []
+
+            def read(self, size=-1):
+                self.sizes.append(size)
+                return self._buffer.read(size)
+
+            def seek(self, offset, whence=0):
+                return self._buffer.seek(offset, whence)
+
+            def tell(self):
+                return self._buffer.tell()
+
+        content = b"x" * (clamav.CHUNK_SIZE * 2 + 5)
+        stream = PlainStream(content)
+        stream.read(3)
+        chunks = list(clamav.upload_chunks_factory(stream)())
+        self.assertEqual(b"".join(chunks), content)
+        self.assertNotIn(-1, stream.sizes)
+        self.assertEqual(stream.tell(), 3)
+
+        start_virus_scan(stream).wait()
+        self.assertEqual(stream.tell(), 3)
+        self.assertEqual(self.clamd.scans, 1)
+
+    def test_infected_file_is_rejected(self):
+        with self.assertRaisesMessage(ValidationError, "Eicar-Signature"):
+            scan_file_for_viruses(self._upload(EICAR))
+
+    def test_connections_are_reused(self):
+        for i in range(3):
+            start_virus_scan(self._upload(f"archivo {i}".encode())).wait()
+        self.assertEqual(self.clamd.scans, 3)
+        self.assertEqual(self.clamd.connections, 1)
+
+    def test_worker_closes_its_database_connections(self):
+        with mock.patch.object(clamav.connections, "close_all") as close_all:
+            start_virus_scan(self._upload(b"escaneo en hilo")).wait()
+        close_all.assert_called_once_with()
+
+    def test_verdict_is_cached_by_content(self):
+        scan_file_for_viruses(self._upload(b"mismo contenido", "a.txt"))
+        scan_file_for_viruses(self._upload(b"mismo contenido", "b.txt"))
+        self.assertEqual(self.clamd.scans, 1)
+
+        # El veredicto de infectado también se cachea
+        for _ in range(2):
+            with self.assertRaises(ValidationError):
+                scan_file_for_viruses(self._upload(EICAR))
+        self.assertEqual(self.clamd.scans, 2)
+
+    @override_settings(CLAMAV_PORT=1, REQUIRE_VIRUS_SCAN=True)
+    def test_unavailable_clamd_blocks_when_required(self):
+        clamav.reset_pool()
+        with self.assertRaisesMessage(ValidationError, "no está disponible"):
+            scan_file_for_viruses(self._upload(b"sin servidor"))
+
+
+class UploadPipelineTest(TestCase):
+    def _png(self, color="red"):
+        buffer = io.BytesIO()
+        Image.new("RGB", (40, 30), color).save(buffer, format="PNG")
+        return buffer.getvalue()
+
+    def _form(self, content, name="foto.png"):
+        return MediaFileUploadForm(
+            data={"title": ""},
+            files={"original_file": SimpleUploadedFile(name, content, "image/png")},
+        )
+
+    def test_inspection_reads_size_hash_and_header_once(self):
+        content = b"%PDF-1.4" + b"x" * 200000
+        upload = SimpleUploadedFile("doc.pdf", content)
+        upload.read(5)
+        inspection = inspect_upload(upload)
+        self.assertEqual(inspection.size, len(content))
+        self.assertEqual(inspection.sha256, hashlib.sha256(content).hexdigest())
+        self.assertTrue(inspection.header.startswith(b"%PDF"))
+        self.assertEqual(upload.tell(), 5)
+
+    def test_image_is_decoded_once_and_kept_for_processing(self):
+        form = self._form(self._png())
+        with mock.patch("PIL.Image.open", wraps=Image.open) as image_open:
+            self.assertTrue(form.is_valid(), form.errors)
+        self.assertEqual(image_open.call_count, 1)
+        inspection = form.instance._upload_inspection
+        self.assertEqual(inspection.image.size, (40, 30))
+        self.assertEqual(form.cleaned_data["title"], "foto")
+
+    def test_duplicate_upload_is_rejected_before_decoding(self):
+        content = self._png("blue")
+        MediaFile.objects.bulk_create(
+            [
+                MediaFile(
+                    title="Original",
+                    original_file="image/2026/01/original.png",
+                    content_hash=hashlib.sha256(content).hexdigest(),
+                )
+            ]
+        )
+        form = self._form(content, "copia.png")
+        with mock.patch("PIL.Image.open") as image_open:
+            self.assertFalse(form.is_valid())
+        image_open.assert_not_called()
+        self.assertIn("Original", str(form.errors["original_file"]))
+
+        # Un archivo distinto sí pasa
+        self.assertTrue(self._form(self._png("green")).is_valid())
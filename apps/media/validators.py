@@ -1,11 +1,10 @@
 """
 Validadores para verificar integridad de archivos multimedia
 """
+import hashlib
 import io
 import logging
-import os
 import struct
-import tempfile
 from pathlib import Path
 
 from django.conf import settings
@@ -15,35 +14,75 @@ from django.utils.translation import gettext_lazy as _
 logger = logging.getLogger(__name__)
 
 
-def validate_file_integrity(file):
+class UploadInspection:
+    """
+    Resultado de leer el archivo una sola vez: tamaño, SHA-256, primeros
+    bytes (magic bytes) y la imagen ya decodificada (si es imagen) para que el
+    modelo la procese sin volver a abrir el archivo.
+    """
+
+    HEADER_SIZE = 32
+
+    def __init__(self, size, sha256, header):
+        self.size = size
+        self.sha256 = sha256
+        self.header = header
+        self.image = None
+
+
+def inspect_upload(file):
+    """
+    Recorre el archivo una vez (sin copiarlo ni mover su posición) y retorna
+    un UploadInspection.
+    """
+    from .clamav import upload_chunks_factory
+
+    digest = hashlib.sha256()
+    size = 0
+    header = b''
+    for chunk in upload_chunks_factory(file)():
+        digest.update(chunk)
+        size += len(chunk)
+        if len(header) < UploadInspection.HEADER_SIZE:
+            header += bytes(chunk[:UploadInspection.HEADER_SIZE - len(header)])
+    return UploadInspection(size, digest.hexdigest(), header)
+
+
+def validate_duplicate_upload(inspection, exclude_pk=None):
+    """Rechaza un archivo idéntico (mismo SHA-256) a uno ya subido"""
+    from .models import MediaFile
+
+    existing = MediaFile.objects.filter(content_hash=inspection.sha256).exclude(
+        status='deleted'
+    )
+    if exclude_pk:
+        existing = existing.exclude(pk=exclude_pk)
+    duplicate = existing.only('pk', 'title').first()
+    if duplicate:
+        raise ValidationError(
+            _('Este archivo ya fue subido como "{}".').format(duplicate.title)
+        )
+
+
+def validate_file_integrity(file, inspection=None):
     """
     Valida que el archivo no esté corrupto verificando:
     1. Magic bytes (firma del archivo)
     2. Integridad del contenido según el tipo
+
+    Usa ``inspection`` (ver inspect_upload) si ya se calculó. Las imágenes se
+    decodifican una vez y quedan en ``inspection.image``.
     """
     if not file:
         return
 
-    # Guardar posición actual
-    current_pos = file.tell() if hasattr(file, 'tell') else 0
-
-    # Leer los primeros bytes para verificar magic bytes
-    try:
-        file.seek(0)
-        header = file.read(16)
-        file.seek(current_pos)  # Restaurar posición original
-    except (AttributeError, IOError):
-        # Si no se puede leer, puede ser un archivo en memoria
-        # Intentar leer de otra forma
+    if inspection is None:
         try:
-            if hasattr(file, 'read'):
-                file.seek(0)
-                header = file.read(16)
-                file.seek(0)
-            else:
-                return  # No se puede validar
+            inspection = inspect_upload(file)
         except Exception:
-            return  # Si falla, continuar sin validar magic bytes
+            return  # Si no se puede leer, continuar sin validar magic bytes
+
+    header = inspection.header[:16]
 
     filename = file.name.lower() if hasattr(file, 'name') else ''
     ext = Path(filename).suffix.lower() if filename else ''
@@ -55,62 +94,53 @@ def validate_file_integrity(file):
                 _('El archivo no es una imagen JPEG válida o está corrupto.')
             )
         # Validar con PIL
-        _validate_image(file, ext)
+        _validate_image(file, inspection)
 
     elif ext == '.png':
         if not header.startswith(b'\x89PNG\r\n\x1a\n'):
             raise ValidationError(
                 _('El archivo no es una imagen PNG válida o está corrupto.')
             )
-        _validate_image(file, ext)
+        _validate_image(file, inspection)
 
     elif ext == '.gif':
         if not (header.startswith(b'GIF87a') or header.startswith(b'GIF89a')):
             raise ValidationError(
                 _('El archivo no es una imagen GIF válida o está corrupto.')
             )
-        _validate_image(file, ext)
+        _validate_image(file, inspection)
 
     elif ext == '.bmp':
         if not header.startswith(b'BM'):
             raise ValidationError(
                 _('El archivo no es una imagen BMP válida o está corrupto.')
             )
-        _validate_image(file, ext)
+        _validate_image(file, inspection)
 
     elif ext == '.webp':
         if not header.startswith(b'RIFF') or b'WEBP' not in header[:12]:
             raise ValidationError(
                 _('El archivo no es una imagen WebP válida o está corrupto.')
             )
-        _validate_image(file, ext)
+        _validate_image(file, inspection)
 
     elif ext == '.pdf':
         if not header.startswith(b'%PDF'):
             raise ValidationError(
                 _('El archivo no es un PDF válido o está corrupto.')
             )
-        _validate_pdf(file)
+        _validate_pdf(inspection)
 
     elif ext in ['.mp4', '.m4a']:
         # MP4/M4A tienen estructura más compleja, verificar cajas básicas
         if not (header.startswith(b'\x00\x00\x00') or b'ftyp' in header[:12]):
             # Algunos MP4 pueden empezar con diferentes estructuras
             # Verificar que al menos tenga estructura válida
-            file.seek(0)
-            try:
-                # Leer más bytes para verificar estructura MP4
-                larger_header = file.read(32)
-                if b'ftyp' not in larger_header and b'moov' not in larger_header:
-                    raise ValidationError(
-                        _('El archivo no es un MP4/M4A válido o está corrupto.')
-                    )
-            except Exception:
+            larger_header = inspection.header[:32]
+            if b'ftyp' not in larger_header and b'moov' not in larger_header:
                 raise ValidationError(
                     _('El archivo no es un MP4/M4A válido o está corrupto.')
                 )
-            finally:
-                file.seek(0)
 
     elif ext == '.zip':
         # Office files (docx, xlsx, pptx) son ZIP
@@ -147,37 +177,35 @@ def validate_file_integrity(file):
             )
 
 
-def _validate_image(file, ext):
-    """Valida que una imagen sea válida usando PIL"""
+def _validate_image(file, inspection):
+    """
+    Valida que una imagen sea válida usando PIL.
+
+    La decodifica completa una sola vez (load() falla si está truncada o
+    corrupta) y la deja en ``inspection.image`` para el procesamiento.
+    """
     try:
         from PIL import Image
 
+        position = file.tell()
         file.seek(0)
-        img = Image.open(file)
-
-        # Verificar que la imagen se pueda leer completamente
-        img.verify()
-
-        # Para algunos formatos, necesitamos reabrir después de verify
-        file.seek(0)
-        img = Image.open(file)
-
-        # Intentar cargar la imagen completamente
-        img.load()
-
-        # Verificar dimensiones razonables
-        if img.width <= 0 or img.height <= 0:
-            raise ValidationError(
-                _('La imagen tiene dimensiones inválidas.')
-            )
-
-        # Verificar que no sea demasiado grande (prevención de bombas ZIP)
-        if img.width > 50000 or img.height > 50000:
-            raise ValidationError(
-                _('La imagen es demasiado grande. Dimensiones máximas: 50000x50000px.')
-            )
+        try:
+            img = Image.open(file)
+            # Verificar dimensiones antes de decodificar (prevención de bombas)
+            if img.width <= 0 or img.height <= 0:
+                raise ValidationError(
+                    _('La imagen tiene dimensiones inválidas.')
+                )
+            if img.width > 50000 or img.height > 50000:
+                raise ValidationError(
+                    _('La imagen es demasiado grande. Dimensiones máximas: 50000x50000px.')
+                )
+            # Cargar la imagen completamente
+            img.load()
+        finally:
+            file.seek(position)
 
-        file.seek(0)
+        inspection.image = img
 
     except Image.UnidentifiedImageError:
         raise ValidationError(
@@ -191,47 +219,22 @@ def _validate_image(file, ext):
         )
 
 
-def _validate_pdf(file):
-    """Valida que un PDF sea válido"""
-    try:
-        file.seek(0)
-        content = file.read(1024)
-        file.seek(0)
-
-        # Verificar que tenga la estructura básica de PDF
-        if b'%PDF' not in content:
-            raise ValidationError(
-                _('El archivo no es un PDF válido.')
-            )
-
-        # Verificar que tenga al menos un objeto PDF (%%EOF o similar)
-        # Leer más del archivo si es necesario
-        file.seek(0, 2)  # Ir al final
-        file_size = file.tell()
-        file.seek(0)
-
-        if file_size < 100:  # PDFs muy pequeños probablemente están corruptos
-            raise ValidationError(
-                _('El archivo PDF parece estar corrupto o incompleto.')
-            )
-
-        # Leer los últimos bytes para verificar %%EOF
-        if file_size > 1024:
-            file.seek(max(0, file_size - 1024))
-            end_content = file.read()
-            if b'%%EOF' not in end_content and b'endobj' not in end_content:
-                # Algunos PDFs pueden no tener %%EOF, pero deberían tener endobj
-                pass  # No es crítico, algunos PDFs válidos no lo tienen
-
-        file.seek(0)
+def _validate_pdf(inspection):
+    """Valida que un PDF sea válido (con los bytes ya leídos en la inspección)"""
+    # Verificar que tenga la estructura básica de PDF
+    if b'%PDF' not in inspection.header:
+        raise ValidationError(
+            _('El archivo no es un PDF válido.')
+        )
 
-    except Exception as e:
-        if isinstance(e, ValidationError):
-            raise
+    if inspection.size < 100:  # PDFs muy pequeños probablemente están corruptos
         raise ValidationError(
-            _('Error al validar el PDF: El archivo puede estar corrupto.')
+            _('El archivo PDF parece estar corrupto o incompleto.')
         )
 
+    # Algunos PDFs válidos no tienen %%EOF al final (deberían tener endobj),
+    # así que no es un error si falta
+
 
 def validate_file_size(file, max_size_mb=None):
     """
@@ -307,13 +310,44 @@ def validate_file_extension(file, allowed_extensions):
         )
 
 
-def scan_file_for_viruses(file):
+class VirusScan:
+    """Escaneo en curso; ``wait()`` aplica el veredicto"""
+
+    def __init__(self, future=None):
+        self.future = future
+
+    def wait(self):
+        if self.future is None:
+            return
+
+        from .clamav import ClamdError
+
+        try:
+            result = self.future.result()
+        except ClamdError as e:
+            logger.error(f'Error al escanear archivo con ClamAV: {e}')
+            # Si ClamAV no está disponible, registrar error pero no bloquear
+            # salvo que el escaneo sea obligatorio
+            if getattr(settings, 'REQUIRE_VIRUS_SCAN', False):
+                raise ValidationError(
+                    _('El servicio de escaneo antivirus no está disponible. Por favor, contacta al administrador.')
+                )
+            return
+
+        if result.infected:
+            raise ValidationError(
+                _('Virus detectado en el archivo: {}. El archivo ha sido rechazado por seguridad.').format(
+                    result.signature or 'Unknown'
+                )
+            )
+
+
+def start_virus_scan(file, sha256=None):
     """
-    Escanea un archivo en busca de virus usando ClamAV
+    Inicia el escaneo con ClamAV en segundo plano y retorna un VirusScan.
 
-    Requiere:
-    - ClamAV instalado en el servidor
-    - pyclamd instalado: pip install pyclamd
+    Permite correr el resto de validaciones mientras clamd escanea; llamar
+    a ``wait()`` antes de aceptar el archivo. Ver apps/media/clamav.py.
 
     Configuración en settings.py:
     ENABLE_VIRUS_SCAN = True  # Habilitar escaneo
@@ -322,86 +356,15 @@ def scan_file_for_viruses(file):
     CLAMAV_HOST = 'localhost'  # Host de ClamAV
     CLAMAV_PORT = 3310  # Puerto de ClamAV
     """
-    # Verificar si el escaneo está habilitado
-    enable_scan = getattr(settings, 'ENABLE_VIRUS_SCAN', False)
-    if not enable_scan:
-        return  # Escaneo deshabilitado, continuar sin validar
+    if not getattr(settings, 'ENABLE_VIRUS_SCAN', False) or not file:
+        return VirusScan()
 
-    if not file:
-        return
-
-    try:
-        import pyclamd
-    except ImportError:
-        logger.warning(
-            'pyclamd no está instalado. Instala con: pip install pyclamd'
-        )
-        # Si no está instalado, no bloquear la subida pero registrar advertencia
-        return
-
-    try:
-        # Intentar conectar a ClamAV
-        clamav_socket = getattr(settings, 'CLAMAV_SOCKET', None)
-        clamav_host = getattr(settings, 'CLAMAV_HOST', 'localhost')
-        clamav_port = getattr(settings, 'CLAMAV_PORT', 3310)
-
-        if clamav_socket:
-            # Conectar vía socket Unix (Linux)
-            try:
-                cd = pyclamd.ClamdUnixSocket(clamav_socket)
-            except Exception:
-                # Fallback a TCP
-                cd = pyclamd.ClamdNetworkSocket(clamav_host, clamav_port)
-        else:
-            # Conectar vía TCP
-            cd = pyclamd.ClamdNetworkSocket(clamav_host, clamav_port)
-
-        # Verificar que ClamAV esté funcionando
-        cd.ping()
+    from .clamav import start_scan
 
-        # Guardar el archivo temporalmente para escanearlo
-        file.seek(0)
-        with tempfile.NamedTemporaryFile(delete=False) as temp_file:
-            # Escribir el contenido del archivo
-            for chunk in file.chunks():
-                temp_file.write(chunk)
-            temp_file_path = temp_file.name
+    return VirusScan(start_scan(file, sha256=sha256))
 
-        try:
-            # Escanear el archivo
-            scan_result = cd.scan_file(temp_file_path)
 
-            if scan_result:
-                # Virus detectado
-                virus_name = list(scan_result.values())[0][1] if scan_result else 'Unknown'
-                raise ValidationError(
-                    _('Virus detectado en el archivo: {}. El archivo ha sido rechazado por seguridad.').format(
-                        virus_name
-                    )
-                )
-        finally:
-            # Eliminar archivo temporal
-            try:
-                os.unlink(temp_file_path)
-            except Exception:
-                pass
-
-        # Resetear posición del archivo
-        file.seek(0)
-
-    except pyclamd.ConnectionError:
-        logger.error('No se pudo conectar a ClamAV. Verifica que el servicio esté ejecutándose.')
-        # Si ClamAV no está disponible, registrar error pero no bloquear
-        # En producción, podrías querer bloquear la subida si ClamAV es crítico
-        if getattr(settings, 'REQUIRE_VIRUS_SCAN', False):
-            raise ValidationError(
-                _('El servicio de escaneo antivirus no está disponible. Por favor, contacta al administrador.')
-            )
-    except Exception as e:
-        logger.error(f'Error al escanear archivo con ClamAV: {e}')
-        # Si hay error, decidir si bloquear o permitir
-        if getattr(settings, 'REQUIRE_VIRUS_SCAN', False):
-            raise ValidationError(
-                _('Error al escanear el archivo. Por favor, intenta nuevamente o contacta al administrador.')
-            )
+def scan_file_for_viruses(file):
+    """Escanea un archivo en busca de virus usando ClamAV (bloqueante)"""
+    start_virus_scan(file).wait()
 
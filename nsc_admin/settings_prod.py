@@ -36,6 +36,54 @@ STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
 # Media files
 MEDIA_ROOT = BASE_DIR / "media"
 
+# Archivos privados: Django verifica permisos y nginx hace la transferencia
+# (ver location /protected-files/ en config/nginx.prod.conf)
+PROTECTED_MEDIA_ACCEL_LOCATIONS = {MEDIA_ROOT: "/protected-files/media/"}
+
+# Métricas por petición (Server-Timing para staff y log "request_metrics");
+# antes de la sesión para contar también sus consultas
+MIDDLEWARE = list(MIDDLEWARE)  # noqa: F405
+MIDDLEWARE.insert(
+    MIDDLEWARE.index("django.contrib.sessions.middleware.SessionMiddleware"),
+    "apps.core.middleware.QueryMetricsMiddleware",
+)
+REQUEST_METRICS_WARN_QUERIES = int(os.environ.get("REQUEST_METRICS_WARN_QUERIES", "50"))
+
+# Perfiles cProfile de una muestra de peticiones (visor en /profiling/);
+# opt-in con REQUEST_PROFILING_ENABLED=1
+MIDDLEWARE.insert(
+    MIDDLEWARE.index("django.contrib.auth.middleware.AuthenticationMiddleware") + 1,
+    "apps.core.middleware.RequestProfilingMiddleware",
+)
+REQUEST_PROFILING_ENABLED = os.environ.get("REQUEST_PROFILING_ENABLED", "0") == "1"
+REQUEST_PROFILING_SAMPLE_RATE = float(os.environ.get("REQUEST_PROFILING_SAMPLE_RATE", "0.01"))
+REQUEST_PROFILING_MAX_SAMPLES = int(os.environ.get("REQUEST_PROFILING_MAX_SAMPLES", "200"))
+
+# Caché compartida entre los workers de gunicorn: sesiones, carrito de hoteles
+# (apps.locations.cart_store), tags de caché y contadores. Redis (con AOF en
+# docker-compose.prod.yml) sobrevive a reinicios; sin REDIS_URL se usa la tabla
+# de caché en BD (crearla con "python manage.py createcachetable")
+REDIS_URL = os.environ.get("REDIS_URL", "")
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+            "LOCATION": "django_cache",
+        }
+    }
+
+# Notificaciones del panel: gunicorn WSGI (docker/Dockerfile) no puede servir el
+# stream SSE; activar NOTIFICATIONS_STREAMING=1 solo al desplegar bajo ASGI
+NOTIFICATIONS_STREAMING = os.environ.get("NOTIFICATIONS_STREAMING", "0") == "1"
+NOTIFICATIONS_POLL_WAIT = int(os.environ.get("NOTIFICATIONS_POLL_WAIT", "5"))
+
 # Security settings
 SECURE_BROWSER_XSS_FILTER = True
 SECURE_CONTENT_TYPE_NOSNIFF = True
@@ -45,6 +93,9 @@ SECURE_REDIRECT_EXEMPT = []
 SECURE_SSL_REDIRECT = True
 SECURE_PROXY_SSL_HEADER = ("HTTP_X_FORWARDED_PROTO", "https")
 SESSION_COOKIE_SECURE = True
+# Sesiones en caché con escritura perezosa en BD (apps.core.session_backend)
+SESSION_ENGINE = "apps.core.session_backend"
+SESSION_DB_TOUCH_INTERVAL = int(os.environ.get("SESSION_DB_TOUCH_INTERVAL", "300"))
 CSRF_COOKIE_SECURE = True
 
 # Email settings for production
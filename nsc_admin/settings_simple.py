@@ -50,10 +50,12 @@ INSTALLED_APPS = DJANGO_APPS + THIRD_PARTY_APPS + LOCAL_APPS
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
+    "apps.core.middleware.QueryMetricsMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "apps.core.middleware.RequestProfilingMiddleware",
     "hijack.middleware.HijackUserMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
@@ -133,9 +135,27 @@ LOGIN_URL = "/users/login/"
 LOGIN_REDIRECT_URL = "/dashboard/"
 LOGOUT_REDIRECT_URL = "/users/login/"
 
+# Cache
+# Memoria local: válida solo con un proceso (runserver). Con varios workers la
+# caché debe ser compartida (ver settings_prod: Redis o tabla en BD)
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    }
+}
+
 # Session settings
+# Sesiones en caché: la fila en BD solo se reescribe si cambian los datos y la
+# expiración se extiende como mucho cada SESSION_DB_TOUCH_INTERVAL segundos
+SESSION_ENGINE = "apps.core.session_backend"
 SESSION_COOKIE_AGE = 3600  # 1 hour
 SESSION_SAVE_EVERY_REQUEST = True
+SESSION_DB_TOUCH_INTERVAL = 300
+
+# Notificaciones del panel: el stream SSE solo funciona bajo ASGI (uvicorn/daphne);
+# con gunicorn WSGI el panel usa un long-poll corto de NOTIFICATIONS_POLL_WAIT segundos
+NOTIFICATIONS_STREAMING = False
+NOTIFICATIONS_POLL_WAIT = 5
 
 # WhiteNoise settings
 STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
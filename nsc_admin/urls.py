@@ -11,14 +11,14 @@ Class-based views
     1. Add an import:  from other_app.views import Home
     2. Add a URL to urlpatterns:  path('', Home.as_view(), name='home')
 Including another URLconf
-    1. Import the include() function: from django.urls import include, path
+    1. Import the include() function: from django.urls import include, path, re_path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 
 from django.conf import settings
 from django.conf.urls.static import static
 from django.contrib import admin
-from django.urls import include, path
+from django.urls import include, path, re_path
 
 from apps.accounts.views_private import UserDashboardView, forbidden_media
 from apps.accounts.views_public import (
@@ -27,12 +27,44 @@ from apps.accounts.views_public import (
     PublicPlayerProfileView,
     PublicTeamListView,
 )
-from apps.core.views import CachedJavaScriptCatalog, service_worker, set_language
+from apps.core.sitemap import sitemap_index, sitemap_section
+from apps.core.views import (
+    CachedJavaScriptCatalog,
+    ExportView,
+    ProfilingReportView,
+    export_download,
+    protected_media_object,
+    protected_media_signed,
+    qr_code,
+    service_worker,
+    set_language,
+)
 from apps.events.views import DashboardView
 
 urlpatterns = [
     # Bloquear acceso directo a documentos de verificación
     path("media/accounts/age_verification/<path:filename>", forbidden_media),
+    path("media/exports/<path:filename>", forbidden_media),
+    # Archivos privados: permiso en Django, transferencia por nginx
+    path(
+        "protected-media/<slug:kind>/<int:object_id>/",
+        protected_media_object,
+        name="protected_media_object",
+    ),
+    path(
+        "protected-media/s/<str:token>/",
+        protected_media_signed,
+        name="protected_media",
+    ),
+    # Exportaciones CSV/XLSX en streaming (staff)
+    re_path(
+        r"^exports/(?P<kind>[-\w]+)\.(?P<fmt>csv|xlsx)$",
+        ExportView.as_view(),
+        name="export",
+    ),
+    path("exports/download/<str:token>/", export_download, name="export_download"),
+    # Perfiles de peticiones muestreadas (staff)
+    path("profiling/", ProfilingReportView.as_view(), name="profiling_report"),
     path("admin/", admin.site.urls),
     path("admin/login/", admin.site.login, name="admin_login"),  # Login admin separado
     path("", PublicHomeView.as_view(), name="home"),  # Home público
@@ -67,6 +99,15 @@ urlpatterns = [
     path("hijack/", include("hijack.urls")),
     path("files/", include("apps.media.urls")),  # Multimedia
     path("sw.js", service_worker),
+    re_path(
+        r"^qr/(?P<token>[\w:-]+)\.(?P<fmt>svg|png)$", qr_code, name="qr_code"
+    ),
+    path("sitemap.xml", sitemap_index, name="sitemap_index"),
+    path(
+        "sitemap-<slug:section>-<int:page>.xml",
+        sitemap_section,
+        name="sitemap_section",
+    ),
     path("i18n/setlang/", set_language, name="set_language"),  # Language switching
     # JavaScript i18n catalog (uses djangojs.po) - Optimizado con caché
     path("jsi18n/", CachedJavaScriptCatalog.as_view(), name="javascript-catalog"),
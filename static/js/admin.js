@@ -173,9 +173,8 @@ class AdminDashboard {
     }
 
     startNotificationToastPolling() {
-        // Lightweight polling:
-        // 1) poll unread count (cheap)
-        // 2) only if count increases, fetch unread notifications list and toast new ones
+        // Toasts for new notifications: SSE stream (ASGI) or a short long-poll
+        // on since_id every COUNT_POLL_MS
         const COUNT_POLL_MS = 25000;
         const STORAGE_KEY = 'nsc_seen_notification_ids_v1';
         const LAST_COUNT_KEY = 'nsc_last_notification_count_v1';
@@ -211,23 +210,10 @@ class AdminDashboard {
             }
         };
 
-        const getLastCount = () => {
-            const v = readJson(LAST_COUNT_KEY, 0);
-            return (typeof v === 'number' && Number.isFinite(v)) ? v : 0;
-        };
-
         const setLastCount = (n) => {
             writeJson(LAST_COUNT_KEY, n);
         };
 
-        const fetchCount = () => {
-            return fetch('/accounts/api/notifications/count/', {
-                method: 'GET',
-                headers: { 'X-Requested-With': 'XMLHttpRequest' },
-                credentials: 'same-origin'
-            }).then(r => r.json());
-        };
-
         const fetchUnreadList = () => {
             return fetch('/accounts/api/notifications/?limit=10&unread_only=true', {
                 method: 'GET',
@@ -251,48 +237,64 @@ class AdminDashboard {
                 .catch(() => {});
         };
 
-        const handleNew = (data) => {
-            if (!data || !data.success) return;
-            const list = Array.isArray(data.notifications) ? data.notifications : [];
-            const unreadCount = (data.unread_count !== undefined) ? (data.unread_count || 0) : 0;
-            AdminDashboard.prototype.updateBadgeUI.call(this, unreadCount);
+        const toastNew = (n) => {
+            if (!n || !n.id || getSeen().includes(n.id)) return;
+            this.showToast(n.message || '', 'primary', n.title || 'Notificación', 8000);
+            addSeen(n.id);
+        };
 
-            const seen = getSeen();
-            const newOnes = list.filter(n => n && n.id && !seen.includes(n.id)).reverse();
-            newOnes.forEach(n => {
-                const title = n.title || 'Notificación';
-                const message = n.message || '';
-                this.showToast(message, 'primary', title, 8000);
-                addSeen(n.id);
+        // Streaming (SSE) only when the server runs under ASGI
+        // (NOTIFICATIONS_STREAMING). The server pushes new notifications and
+        // the cached unread count; EventSource reconnects with Last-Event-ID.
+        const streamingEnabled = document.body && document.body.dataset.notificationStream === '1';
+        if (streamingEnabled && window.EventSource) {
+            const stream = new EventSource('/accounts/api/notifications/stream/');
+            stream.addEventListener('count', (e) => {
+                try {
+                    const count = JSON.parse(e.data).count || 0;
+                    setLastCount(count);
+                    AdminDashboard.prototype.updateBadgeUI.call(this, count);
+                } catch (err) {}
             });
-        };
+            stream.addEventListener('notification', (e) => {
+                try { toastNew(JSON.parse(e.data)); } catch (err) {}
+            });
+            this._notificationStream = stream;
+            return;
+        }
 
-        const tick = () => {
-            if (document.hidden) return;
-            fetchCount()
+        // Default (WSGI): short long-poll on since_id. The first request only
+        // returns the current cursor, so existing unread ones are not toasted.
+        let cursor = null;
+        const schedule = () => {
+            this._notificationToastTimeout = window.setTimeout(poll, COUNT_POLL_MS);
+        };
+        const poll = () => {
+            if (document.hidden) {
+                schedule();
+                return;
+            }
+            const query = (cursor === null) ? '' : `?since_id=${cursor}`;
+            fetch(`/accounts/api/notifications/poll/${query}`, {
+                method: 'GET',
+                headers: { 'X-Requested-With': 'XMLHttpRequest' },
+                credentials: 'same-origin'
+            })
+                .then(r => r.json())
                 .then(data => {
                     if (!data || !data.success) return;
-                    const current = data.count || 0;
-                    const last = getLastCount();
-
-                    // Always keep badge updated
-                    AdminDashboard.prototype.updateBadgeUI.call(this, current);
-
-                    // Only fetch list/toast when count increases
-                    if (current > last) {
-                        setLastCount(current);
-                        fetchUnreadList().then(handleNew).catch(() => {});
-                    } else {
-                        setLastCount(current);
-                    }
+                    cursor = data.cursor;
+                    const count = data.unread_count || 0;
+                    setLastCount(count);
+                    AdminDashboard.prototype.updateBadgeUI.call(this, count);
+                    (data.notifications || []).forEach(toastNew);
                 })
-                .catch(() => {});
+                .catch(() => {})
+                .finally(schedule);
         };
 
         warmup();
-
-        // store interval handle for potential future cleanup
-        this._notificationToastInterval = window.setInterval(tick, COUNT_POLL_MS);
+        poll();
     }
 
     initializeThemeToggle() {
@@ -6206,6 +6208,21 @@ AdminDashboard.prototype.closeNotifications = function () {
     }
 }
 
+AdminDashboard.prototype.formatTimeAgo = function (isoDate) {
+    const created = new Date(isoDate);
+    if (Number.isNaN(created.getTime())) return '';
+    const seconds = Math.max(0, Math.floor((Date.now() - created.getTime()) / 1000));
+    const plural = (n, one, many) => `Hace ${n} ${n > 1 ? many : one}`;
+    const days = Math.floor(seconds / 86400);
+    if (days >= 365) return plural(Math.floor(days / 365), 'año', 'años');
+    if (days >= 30) return plural(Math.floor(days / 30), 'mes', 'meses');
+    if (days >= 7) return plural(Math.floor(days / 7), 'semana', 'semanas');
+    if (days >= 1) return plural(days, 'día', 'días');
+    if (seconds >= 3600) return plural(Math.floor(seconds / 3600), 'hora', 'horas');
+    if (seconds >= 60) return plural(Math.floor(seconds / 60), 'minuto', 'minutos');
+    return 'Hace unos segundos';
+};
+
 AdminDashboard.prototype.loadNotifications = function () {
     const notificationList = document.getElementById('notificationList');
     if (!notificationList) return;
@@ -6242,7 +6259,7 @@ AdminDashboard.prototype.loadNotifications = function () {
                             <div class="notification-content">
                                 <h6>${this.escapeHtml(notification.title)}</h6>
                                 <p>${this.escapeHtml(notification.message)}</p>
-                                <small>${this.escapeHtml(notification.time)}</small>
+                                <small>${this.escapeHtml(this.formatTimeAgo(notification.created_at))}</small>
                             </div>
                             <button class="notification-mark-read" data-id="${notification.id}">
                                 <i class="fas fa-check"></i>